@@ -0,0 +1,229 @@
+# LAP Entries
+
+# Python file destined to measure outside of the OT-2 the simulation of the scripts of the LAP entries with their example variable files
+# This code does not belong to a specific entry of the LAP repository and it does not run any protocol in the robot
+
+# Every script is simulated with opentrons.simulate reading the filled example of its variable file (ExampleVariableFiles.py) instead of the one in /data/user_storage,
+# and the maps that the script exports, in any of its formats, are written in a temporary folder that is removed after the simulation
+# If the simulation of an entry fails, its error is written in the results and the rest of the entries are simulated
+
+# For every entry it records the simulation time, the peak of memory, the number of commands of the protocol and how many times the wells, columns and rows
+# of a labware have been requested to Opentrons (wells(), columns(), rows(), wells_by_name(), rows_by_name(), columns_by_name() and labware[well name]).
+# The peak of memory of Opentrons reading the script (parsing and compiling its source, which grows with the length of the script) is recorded apart
+# from the peak of the rest of the simulation, so the memory used by the protocol is not hidden by the size of the script.
+# These results are written to a CSV file that can be used as a baseline to see the regressions and improvements when the scripts are modified.
+# If a previous CSV is given as baseline, its time, memory and labware calls are added to the results to compare them
+
+# This file needs to be in the LAPEntries folder and the packages of the scripts need to be installed
+# Usage: python BenchmarkSimulationEntries.py [-out PATH_CSV] [-baseline PATH_CSV_BASELINE] [-repetitions NUMBER] [-entries ENTRY ...]
+
+# Needed packages for the script to run correctly
+import argparse
+import builtins
+import functools
+import os
+import tempfile
+import time
+import tracemalloc
+import pandas as pd
+import opentrons.protocols.parse
+import opentrons.simulate
+from openpyxl import Workbook
+from opentrons.protocol_api.labware import Labware
+from ExampleVariableFiles import write_example_variable_file
+
+# Entries that are benchmarked by default, each one with its script and the name of the variable file that the script reads
+entries = [
+	{"Entry":"LAP-CellMediaInoculation-OT2-2.0.0", "Script":"ScriptPlateGenerationAndIncubation_v200.py", "Variable File":"VariablesPlateIncubation.xlsx"},
+	{"Entry":"LAP-ColonyCounterSelection-OT2-2.0.0", "Script":"CounterSelectionScript_v200.py", "Variable File":"VariablesCounterSelection.xlsx"},
+	{"Entry":"LAP-CustomReagentMixingMultiSinglePip-OT2-1.0.0", "Script":"ScriptMixingReagents_v100.py", "Variable File":"VariablesCustomMixing.xlsx"},
+	{"Entry":"LAP-MoCloAssembly-OT2-2.0.0", "Script":"ScriptMoCloConstructAssembly_v200.py", "Variable File":"VariablesMoCloAssembly.xlsx"},
+	{"Entry":"LAP-NplateMerging-OT2-2.0.0", "Script":"ScriptMergePlates_v200.py", "Variable File":"VariablesMergeSamples.xlsx"},
+	{"Entry":"LAP-PCR-OT2-2.0.0", "Script":"ScriptPCR_v200.py", "Variable File":"VariablesPCR.xlsx"}
+]
+
+# Methods of the labware that generate the wells, columns or rows every time that they are called
+labware_methods = ["wells", "columns", "rows", "wells_by_name", "rows_by_name", "columns_by_name", "__getitem__"]
+
+def count_labware_calls (counter):
+	"""
+	Function that will replace the methods of the Opentrons labware that generate its wells, columns and rows by others that count how many times they are called
+	and then call the original method
+
+	It returns the original methods so they can be restored after the simulation
+
+	1 mandatory argument is needed for this function
+	"""
+	original_methods = {}
+	for name_method in labware_methods:
+		original_methods[name_method] = getattr(Labware, name_method)
+
+		def counted_method (*args, original_method = original_methods[name_method], **kwargs):
+			counter["Calls"] += 1
+			return original_method(*args, **kwargs)
+
+		setattr(Labware, name_method, functools.wraps(original_methods[name_method])(counted_method))
+
+	return original_methods
+
+def measure_script_reading (peaks):
+	"""
+	Function that will replace the function of Opentrons that parses and compiles the source of the script by another one that records the peak of memory
+	while it is called and then restarts the peak, so the peak of the rest of the simulation does not include it
+
+	It returns the original function so it can be restored after the simulation
+
+	1 mandatory argument is needed for this function
+	"""
+	original_function = opentrons.protocols.parse._parse_python
+
+	def measured_function (*args, **kwargs):
+		peaks["Simulation"] = max(peaks["Simulation"], tracemalloc.get_traced_memory()[1])
+		tracemalloc.reset_peak()
+		result = original_function(*args, **kwargs)
+		peaks["Reading"] = max(peaks["Reading"], tracemalloc.get_traced_memory()[1])
+		tracemalloc.reset_peak()
+		return result
+
+	opentrons.protocols.parse._parse_python = functools.wraps(original_function)(measured_function)
+
+	return original_function
+
+def redirect_user_storage (folder_read, folder_write):
+	"""
+	Function that will make pandas, open and openpyxl read the files of /data/user_storage from a folder and write them in another one,
+	so the scripts can be simulated without changing the paths of the robot that they have
+
+	It returns the original functions so they can be restored after the simulation
+
+	2 mandatory arguments are needed for this function
+	"""
+	original_functions = {"read_excel":pd.read_excel, "ExcelWriter":pd.ExcelWriter, "open":builtins.open, "save":Workbook.save}
+
+	def read_excel (path, *args, **kwargs):
+		if type(path) == str and path.startswith("/data/user_storage/"):
+			path = os.path.join(folder_read, os.path.basename(path))
+		return original_functions["read_excel"](path, *args, **kwargs)
+
+	def excel_writer (path, *args, **kwargs):
+		if type(path) == str and path.startswith("/data/user_storage/"):
+			path = os.path.join(folder_write, os.path.basename(path))
+		return original_functions["ExcelWriter"](path, *args, **kwargs)
+
+	def open_file (path, mode = "r", *args, **kwargs):
+		if type(path) == str and path.startswith("/data/user_storage/"):
+			path = os.path.join(folder_read if mode.startswith("r") else folder_write, os.path.basename(path))
+		return original_functions["open"](path, mode, *args, **kwargs)
+
+	def save_workbook (workbook, path):
+		if type(path) == str and path.startswith("/data/user_storage/"):
+			path = os.path.join(folder_write, os.path.basename(path))
+		return original_functions["save"](workbook, path)
+
+	pd.read_excel = read_excel
+	pd.ExcelWriter = excel_writer
+	builtins.open = open_file
+	Workbook.save = save_workbook
+
+	return original_functions
+
+def simulate_entry (entry, folder_entries):
+	"""
+	Function that will simulate the script of an entry with its example variable file and return the time that it has taken, the peak of memory of the simulation,
+	the peak of memory of reading the script, the number of commands of the protocol and the number of calls to the methods of the labware that generate the wells, columns and rows
+
+	2 mandatory arguments are needed for this function
+	"""
+	folder_entry = os.path.join(folder_entries, entry["Entry"])
+
+	counter = {"Calls":0}
+	peaks = {"Simulation":0, "Reading":0}
+	with tempfile.TemporaryDirectory() as folder_example, tempfile.TemporaryDirectory() as folder_output:
+		write_example_variable_file(entry["Entry"], folder_example)
+		original_functions = redirect_user_storage(folder_example, folder_output)
+		original_methods = count_labware_calls(counter)
+		original_parse = measure_script_reading(peaks)
+		try:
+			with open(os.path.join(folder_entry, entry["Script"])) as protocol_file:
+				tracemalloc.start()
+				start_time = time.perf_counter()
+
+				run_log, bundle = opentrons.simulate.simulate(protocol_file, file_name = entry["Script"])
+
+				simulation_time = time.perf_counter() - start_time
+				peaks["Simulation"] = max(peaks["Simulation"], tracemalloc.get_traced_memory()[1])
+				tracemalloc.stop()
+		finally:
+			# The labware and pandas need to be restored even if the simulation raises an error
+			for name_method, original_method in original_methods.items():
+				setattr(Labware, name_method, original_method)
+			opentrons.protocols.parse._parse_python = original_parse
+			pd.read_excel = original_functions["read_excel"]
+			pd.ExcelWriter = original_functions["ExcelWriter"]
+			builtins.open = original_functions["open"]
+			Workbook.save = original_functions["save"]
+
+	return simulation_time, peaks["Simulation"], peaks["Reading"], len(run_log), counter["Calls"]
+
+def benchmark (entries, repetitions):
+	"""
+	Function that will simulate every entry the given number of times and return a table with the results,
+	the time is the mean of the repetitions and the memory and calls are the ones of the last repetition because they do not change between them
+
+	The entries whose simulation fails have their error in the column Error and the rest of the columns empty
+
+	2 mandatory arguments are needed for this function
+	"""
+	folder_entries = os.path.dirname(os.path.abspath(__file__))
+
+	results = []
+	for entry in entries:
+		times_entry = []
+		try:
+			for repetition in range(repetitions):
+				simulation_time, peak_memory, peak_memory_reading, number_commands, labware_calls = simulate_entry(entry, folder_entries)
+				times_entry.append(simulation_time)
+		except Exception as error_simulation:
+			# The errors of the protocols are wrapped by Opentrons, which can summarize them
+			if hasattr(error_simulation, "to_stderr_string"):
+				results.append({"Entry":entry["Entry"], "Script":entry["Script"], "Error":error_simulation.to_stderr_string()})
+			else:
+				results.append({"Entry":entry["Entry"], "Script":entry["Script"], "Error":f"{type(error_simulation).__name__}: {error_simulation}"})
+			continue
+
+		results.append({"Entry":entry["Entry"],
+						"Script":entry["Script"],
+						"Commands":number_commands,
+						"Labware Calls":labware_calls,
+						"Time (s)":sum(times_entry)/len(times_entry),
+						"Peak Memory (KiB)":peak_memory/1024,
+						"Peak Memory Reading Script (KiB)":peak_memory_reading/1024,
+						"Error":None})
+
+	return pd.DataFrame(results)
+
+if __name__ == "__main__":
+	parser = argparse.ArgumentParser(description = "Benchmark of the simulation of the scripts of the LAP entries with their example variable files")
+	parser.add_argument("-out", dest = "path_output", default = "BenchmarkSimulationEntries.csv", help = "CSV file in which the results are going to be written. Default: BenchmarkSimulationEntries.csv")
+	parser.add_argument("-baseline", dest = "path_baseline", default = None, help = "CSV file of a previous run of this script to compare the results with")
+	parser.add_argument("-repetitions", dest = "repetitions", type = int, default = 3, help = "Number of times that every script is simulated to calculate the mean time. Default: 3")
+	parser.add_argument("-entries", dest = "names_entries", nargs = "+", default = None, help = "Names of the entries to simulate. Default: all of them")
+	arguments = parser.parse_args()
+
+	if arguments.names_entries:
+		entries = [entry for entry in entries if entry["Entry"] in arguments.names_entries]
+
+	table_results = benchmark(entries, arguments.repetitions)
+
+	# Add the results of the baseline to see the changes in the time, memory and calls to the labware
+	if arguments.path_baseline:
+		table_baseline = pd.read_csv(arguments.path_baseline)[["Entry", "Commands", "Labware Calls", "Time (s)", "Peak Memory (KiB)"]]
+		table_baseline.columns = ["Entry", "Commands Baseline", "Labware Calls Baseline", "Time (s) Baseline", "Peak Memory (KiB) Baseline"]
+		table_results = table_results.merge(table_baseline, on = "Entry", how = "left")
+
+	table_results.to_csv(arguments.path_output, index = False)
+	print(table_results.drop(columns = ["Error"]).to_string(index = False))
+
+	# The errors are printed apart because they are too long for the table
+	for index_entry, row in table_results[table_results["Error"].notna()].iterrows():
+		print(f"\n{row['Entry']} could not be simulated: {row['Error']}")
@@ -0,0 +1,836 @@
+# LAP Entries
+
+# Python file destined to check in milliseconds, outside of the OT-2 and without the Opentrons runtime, if a variable file of a LAP entry can be performed
+# This code does not belong to a specific entry of the LAP repository and it does not run any protocol in the robot
+
+# The script of the entry is executed with stand-in objects of the protocol, pipettes, labware and modules instead of the ones of opentrons.protocol_api,
+# which is never imported. The labware is built from the JSON definitions of the labware, so the script runs all its steps: the check of the variables,
+# the calculation of the tubes, tips and volumes needed, the layout of the deck and the planning of the transfers. Instead of moving the robot,
+# every command of the pipettes and modules is registered with an estimation of the time it takes in the robot
+
+# For every variable file it prints the deck map, the tips used by every pipette, the wells with liquids loaded (tubes, reservoirs and plates),
+# the volumes aspirated and dispensed, the pauses of the protocol and the estimated time. If the variables are not feasible it prints the error of the script,
+# the errors that are not raised by the checks of the variables (e.g., AttributeError or TypeError) are bugs and they are raised instead
+# Several variable files can be given to compare them, e.g., sweeping the values of a variable
+
+# The rules of the deck conflicts are simplified (only occupied slots and the slots allowed for the modules are checked) and the times are an estimation,
+# so the simulation of Opentrons (opentrons_simulate) is still the final check before running a protocol in the robot
+
+# This file needs to be in the LAPEntries folder and the packages of the scripts, except opentrons, need to be installed
+# The labware definitions are searched in the given folders, the folder of the entry and, if it is installed, the package opentrons_shared_data
+# Usage: python DryRunEntries.py ENTRY [-variables PATH_VARIABLE_FILE ...] [-labware FOLDER ...] [-maps FOLDER]
+
+# Needed packages for the script to run correctly
+import argparse
+import builtins
+import glob
+import importlib.util
+import json
+import math
+import os
+import re
+import sys
+import tempfile
+import time
+import types
+import pandas as pd
+from openpyxl import Workbook
+from ExampleVariableFiles import write_example_variable_file
+
+# Entries that can be checked, each one with its script and the name of the variable file that the script reads
+entries = [
+	{"Entry":"LAP-CellMediaInoculation-OT2-2.0.0", "Script":"ScriptPlateGenerationAndIncubation_v200.py", "Variable File":"VariablesPlateIncubation.xlsx"},
+	{"Entry":"LAP-ColonyCounterSelection-OT2-2.0.0", "Script":"CounterSelectionScript_v200.py", "Variable File":"VariablesCounterSelection.xlsx"},
+	{"Entry":"LAP-CustomReagentMixingMultiSinglePip-OT2-1.0.0", "Script":"ScriptMixingReagents_v100.py", "Variable File":"VariablesCustomMixing.xlsx"},
+	{"Entry":"LAP-MoCloAssembly-OT2-2.0.0", "Script":"ScriptMoCloConstructAssembly_v200.py", "Variable File":"VariablesMoCloAssembly.xlsx"},
+	{"Entry":"LAP-NplateMerging-OT2-2.0.0", "Script":"ScriptMergePlates_v200.py", "Variable File":"VariablesMergeSamples.xlsx"},
+	{"Entry":"LAP-PCR-OT2-2.0.0", "Script":"ScriptPCR_v200.py", "Variable File":"VariablesPCR.xlsx"}
+]
+
+# Version of Opentrons which behaviour the stand-ins imitate, e.g., the complex commands of the pipettes call their aspirate and dispense
+version_stand_ins = "8.2.0"
+
+# Pipettes of the OT-2 with their channels, minimum and maximum volume (uL) and default flow rates (uL/s) of aspiration, dispense and blow out
+pipettes_specifications = {
+	"p20_single_gen2":{"Channels":1, "Min Volume":1, "Max Volume":20, "Aspirate":7.56, "Dispense":7.56, "Blow Out":7.56},
+	"p20_multi_gen2":{"Channels":8, "Min Volume":1, "Max Volume":20, "Aspirate":7.6, "Dispense":7.6, "Blow Out":7.6},
+	"p300_single_gen2":{"Channels":1, "Min Volume":20, "Max Volume":300, "Aspirate":92.86, "Dispense":92.86, "Blow Out":92.86},
+	"p300_multi_gen2":{"Channels":8, "Min Volume":20, "Max Volume":300, "Aspirate":94, "Dispense":94, "Blow Out":94},
+	"p1000_single_gen2":{"Channels":1, "Min Volume":100, "Max Volume":1000, "Aspirate":274.7, "Dispense":274.7, "Blow Out":274.7},
+	"p10_single":{"Channels":1, "Min Volume":1, "Max Volume":10, "Aspirate":5, "Dispense":10, "Blow Out":1000},
+	"p10_multi":{"Channels":8, "Min Volume":1, "Max Volume":10, "Aspirate":5, "Dispense":10, "Blow Out":1000},
+	"p50_single":{"Channels":1, "Min Volume":5, "Max Volume":50, "Aspirate":25, "Dispense":50, "Blow Out":1000},
+	"p50_multi":{"Channels":8, "Min Volume":5, "Max Volume":50, "Aspirate":25, "Dispense":50, "Blow Out":1000},
+	"p300_single":{"Channels":1, "Min Volume":30, "Max Volume":300, "Aspirate":150, "Dispense":300, "Blow Out":1000},
+	"p300_multi":{"Channels":8, "Min Volume":30, "Max Volume":300, "Aspirate":150, "Dispense":300, "Blow Out":1000},
+	"p1000_single":{"Channels":1, "Min Volume":100, "Max Volume":1000, "Aspirate":500, "Dispense":1000, "Blow Out":1000}
+}
+
+# Modules that can be loaded with their name in the deck and the slots in which they can be placed, the thermocycler occupies 4 slots
+modules_specifications = {
+	"thermocycler":{"Display Name":"Thermocycler Module GEN1", "Slots":[7], "Slots Occupied":[7, 8, 10, 11]},
+	"heatershaker":{"Display Name":"Heater-Shaker Module GEN1", "Slots":[1, 3, 4, 6, 7, 9, 10], "Slots Occupied":[]},
+	"temperature":{"Display Name":"Temperature Module GEN2", "Slots":list(range(1, 12)), "Slots Occupied":[]},
+	"magnetic":{"Display Name":"Magnetic Module GEN2", "Slots":list(range(1, 12)), "Slots Occupied":[]}
+}
+
+# Estimated seconds that the OT-2 takes in every command, the aspirations and dispenses also take the time of their volume with the flow rate
+seconds_commands = {
+	"Pick Up Tip":8,
+	"Drop Tip":6,
+	"Move To Well":2.5,
+	"Blow Out":1.5,
+	"Touch Tip":3,
+	"Home":10,
+	"Temperature Change":30,
+	"Lid":20,
+	"Module Command":2
+}
+
+# Definition of the trash of the slot 12, which is always in the deck
+definition_trash = {"ordering":[["A1"]],
+					"wells":{"A1":{"depth":0, "totalLiquidVolume":1100000, "shape":"rectangular", "xDimension":225, "yDimension":160}},
+					"metadata":{"displayName":"Opentrons Fixed Trash"},
+					"parameters":{"loadName":"opentrons_1_trash_1100ml_fixed", "isTiprack":False}}
+
+#----------------------------------------------------------------------------------------------------------------------------------------------------------------------------------------------------------------
+# Stand-in objects of the Opentrons API
+
+class OutOfTipsError(Exception):
+	"""
+	Error raised when a pipette cannot find a tip in its tip racks, as the one of opentrons.protocol_api.labware
+	"""
+	pass
+
+class DeckConflictError(Exception):
+	"""
+	Error raised when a labware or module cannot be placed in a slot, as the one of opentrons.motion_planning.deck_conflict
+	"""
+	pass
+
+class LabwareDefinitions:
+	"""
+	Class that will find and store the JSON definitions of the labware, so every definition is read only once during the dry run
+
+	The definitions are searched first in the given folders, in any JSON file whose load name is the requested one, and then in the definitions
+	of the package opentrons_shared_data, which is located without importing opentrons
+	"""
+	def __init__(self, folders_labware):
+		self.definitions = {}
+		self.pathsCustom = {}
+		for folder in folders_labware:
+			for path_definition in glob.glob(os.path.join(folder, "**", "*.json"), recursive = True):
+				try:
+					with open(path_definition) as file_definition:
+						definition = json.load(file_definition)
+					self.pathsCustom.setdefault(definition["parameters"]["loadName"], path_definition)
+				except (ValueError, KeyError, TypeError): # JSON files that are not labware definitions
+					continue
+
+		# The package keeps the definitions in data/labware/definitions/2, the older versions in labware/definitions/2
+		self.folderSharedData = None
+		specification_shared_data = importlib.util.find_spec("opentrons_shared_data")
+		if specification_shared_data != None and specification_shared_data.submodule_search_locations:
+			folder_package = list(specification_shared_data.submodule_search_locations)[0]
+			for folder_definitions in [os.path.join(folder_package, "data", "labware", "definitions", "2"), os.path.join(folder_package, "labware", "definitions", "2")]:
+				if os.path.isdir(folder_definitions):
+					self.folderSharedData = folder_definitions
+					break
+
+	def get_labware_definition(self, load_name, namespace = None, version = None, bundled_defs = None, extra_defs = None):
+		if load_name in self.definitions:
+			return self.definitions[load_name]
+
+		if load_name in self.pathsCustom:
+			path_definition = self.pathsCustom[load_name]
+		elif self.folderSharedData != None and os.path.isdir(os.path.join(self.folderSharedData, str(load_name))):
+			versions = sorted(glob.glob(os.path.join(self.folderSharedData, str(load_name), "*.json")), key = lambda path: int(os.path.splitext(os.path.basename(path))[0]))
+			if version != None:
+				versions = [path for path in versions if os.path.basename(path) == f"{version}.json"]
+			if len(versions) == 0:
+				raise FileNotFoundError(f'Unable to find a labware definition for "{load_name}" version {version}')
+			path_definition = versions[-1]
+		else:
+			raise FileNotFoundError(f'Unable to find a labware definition for "{load_name}", give the folder of its JSON definition with -labware')
+
+		with open(path_definition) as file_definition:
+			self.definitions[load_name] = json.load(file_definition)
+
+		return self.definitions[load_name]
+
+class Liquid:
+	"""
+	Liquid defined in the protocol
+	"""
+	def __init__(self, name, description, display_color):
+		self.name = name
+		self.description = description
+		self.display_color = display_color
+
+class Location:
+	"""
+	Point of a well (top, bottom or center) given to the commands of the pipettes
+	"""
+	def __init__(self, well, z):
+		self.well = well
+		self.z = z
+		# The scripts compare the points of the heights of the tubes, the x and y of the wells are not needed for that
+		self.point = types.SimpleNamespace(x = 0, y = 0, z = z)
+
+	def __str__(self):
+		return f"{self.well} (z = {self.z})"
+
+class Well:
+	"""
+	Well of a labware built from its definition, with the volume it has during the dry run
+	"""
+	def __init__(self, labware, name, definition_well):
+		self._parent = labware
+		self._core = types.SimpleNamespace(_name = name,
+										   _row_name = re.match(r"^([A-Za-z]+)", name).group(1),
+										   _column_name = re.search(r"(\d+)$", name).group(1))
+		self.depth = definition_well["depth"]
+		self.max_volume = definition_well["totalLiquidVolume"]
+		if definition_well.get("shape") == "circular":
+			self.diameter = definition_well["diameter"]
+			self.length = None
+			self.width = None
+		else:
+			self.diameter = None
+			self.length = definition_well.get("xDimension")
+			self.width = definition_well.get("yDimension")
+		self.volume = 0
+		self.liquid = None
+
+	def __str__(self):
+		return f"{self._core._name} of {self._parent}"
+
+	def __repr__(self):
+		return str(self)
+
+	def top(self, z = 0.0):
+		return Location(self, self.depth+z)
+
+	def bottom(self, z = 0.0):
+		return Location(self, z)
+
+	def center(self):
+		return Location(self, self.depth/2)
+
+	def load_liquid(self, liquid, volume):
+		self.liquid = liquid
+		self.volume += volume
+		self._parent._protocol.liquidsLoaded.append([liquid.name, self, volume])
+
+class Labware:
+	"""
+	Labware built from its JSON definition with the same ways of getting its wells, columns and rows as the labware of Opentrons
+	"""
+	def __init__(self, definition, parent, protocol, label = None):
+		self.load_name = definition["parameters"]["loadName"]
+		self.name = label if label != None else self.load_name
+		self.parent = parent
+		self.is_tiprack = definition["parameters"].get("isTiprack", False)
+		self._displayName = label if label != None else definition["metadata"]["displayName"]
+		self._protocol = protocol
+		self._usedTips = set() # Names of the tips that have been picked up
+
+		self._wells = [Well(self, name_well, definition["wells"][name_well]) for column in definition["ordering"] for name_well in column]
+		self._wellsByName = {well._core._name:well for well in self._wells}
+		self._columns = {}
+		self._rows = {}
+		for well in self._wells:
+			self._columns.setdefault(well._core._column_name, []).append(well)
+			self._rows.setdefault(well._core._row_name, []).append(well)
+		self._rows = dict(sorted(self._rows.items(), key = lambda row: (len(row[0]), row[0])))
+
+	def __str__(self):
+		return f"{self._displayName} on {self.parent}"
+
+	def __repr__(self):
+		return str(self)
+
+	def __getitem__(self, name_well):
+		return self._wellsByName[name_well]
+
+	def wells(self):
+		return list(self._wells)
+
+	def wells_by_name(self):
+		return dict(self._wellsByName)
+
+	def columns(self):
+		return [list(column) for column in self._columns.values()]
+
+	def columns_by_name(self):
+		return {name_column:list(column) for name_column, column in self._columns.items()}
+
+	def rows(self):
+		return [list(row) for row in self._rows.values()]
+
+	def rows_by_name(self):
+		return {name_row:list(row) for name_row, row in self._rows.items()}
+
+class Module:
+	"""
+	Module of the deck, the commands of the modules are registered with their estimated time instead of being performed
+	"""
+	def __init__(self, kind, slot, protocol):
+		self.kind = kind
+		self.slot = slot
+		self.labware = None
+		self._protocol = protocol
+
+	def __str__(self):
+		return f"{modules_specifications[self.kind]['Display Name']} on {self.slot}"
+
+	def __repr__(self):
+		return str(self)
+
+	def load_labware(self, name, label = None, namespace = None, version = None):
+		self.labware = Labware(self._protocol._definitions.get_labware_definition(name, namespace, version), self, self._protocol, label = label)
+		return self.labware
+
+	def __getattr__(self, name_command):
+		# Any other command of the module is registered with an estimation of its time
+		if name_command.startswith("_"):
+			raise AttributeError(name_command)
+
+		def command_module (*args, **kwargs):
+			if name_command == "execute_profile":
+				steps = kwargs.get("steps", args[0] if len(args) > 0 else [])
+				repetitions = kwargs.get("repetitions", args[1] if len(args) > 1 else 1)
+				seconds = sum(step.get("hold_time_seconds", 0)+60*step.get("hold_time_minutes", 0)+seconds_commands["Temperature Change"] for step in steps)*repetitions
+			elif name_command == "set_block_temperature":
+				seconds = kwargs.get("hold_time_seconds", 0)+60*kwargs.get("hold_time_minutes", 0)+seconds_commands["Temperature Change"]
+			elif name_command in ["set_lid_temperature", "set_and_wait_for_temperature", "set_temperature"]:
+				seconds = 2*seconds_commands["Temperature Change"]
+			elif name_command in ["open_lid", "close_lid"]:
+				seconds = seconds_commands["Lid"]
+			else:
+				seconds = seconds_commands["Module Command"]
+			self._protocol.register(f"{name_command} {self}", seconds)
+
+		return command_module
+
+class FlowRates:
+	"""
+	Flow rates of a pipette in uL/s
+	"""
+	def __init__(self, aspirate, dispense, blow_out):
+		self.aspirate = aspirate
+		self.dispense = dispense
+		self.blow_out = blow_out
+
+class Pipette:
+	"""
+	Pipette that picks the tips of its tip racks as the pipettes of Opentrons do and registers its commands with their estimated time,
+	tracking the volume of the wells it aspirates from and dispenses to
+	"""
+	def __init__(self, name, mount, protocol, tip_racks = None):
+		if name not in pipettes_specifications:
+			raise Exception(f"The pipette '{name}' is not one of the pipettes of the OT-2 contemplated in the dry run: {', '.join(pipettes_specifications.keys())}")
+
+		self.name = name
+		self.mount = mount
+		self.channels = pipettes_specifications[name]["Channels"]
+		self.min_volume = pipettes_specifications[name]["Min Volume"]
+		self.max_volume = pipettes_specifications[name]["Max Volume"]
+		self.flow_rate = FlowRates(pipettes_specifications[name]["Aspirate"], pipettes_specifications[name]["Dispense"], pipettes_specifications[name]["Blow Out"])
+		self.tip_racks = list(tip_racks) if tip_racks != None else []
+		self.starting_tip = None
+		self.has_tip = False
+		self._protocol = protocol
+		self._lastWell = None
+
+	def __str__(self):
+		return f"{self.name} on {self.mount} mount"
+
+	def _well(self, location):
+		# Well of the location given to a command, the last one used if there is not a location
+		if location == None:
+			return self._lastWell
+		if isinstance(location, Location):
+			location = location.well
+		self._lastWell = location
+		return location
+
+	def _wells_channels(self, well):
+		# Wells reached by all the channels, in a labware with 1 row all the channels go to the same well
+		if self.channels == 1 or well == None:
+			return [well]
+		column = well._parent._columns[well._core._column_name]
+		if len(column) == 1:
+			return [well]*self.channels
+		return column[column.index(well):column.index(well)+self.channels]
+
+	def _first_row(self, locations):
+		# Locations of the list that are in the first row of their labware, a single location is kept in any row
+		if len(locations) == 1:
+			return locations
+		return [location for location in locations if (location.well if isinstance(location, Location) else location)._core._row_name == "A"]
+
+	def _next_tips(self):
+		# Tips that the pipette would pick, starting in the starting tip of its tip racks as Opentrons does
+		tip_racks = self.tip_racks
+		index_start = 0
+		if self.starting_tip != None and self.starting_tip._parent in tip_racks:
+			tip_racks = tip_racks[tip_racks.index(self.starting_tip._parent):]
+			index_start = tip_racks[0]._wells.index(self.starting_tip)
+
+		for index_tiprack, tiprack in enumerate(tip_racks):
+			index_first = index_start if index_tiprack == 0 else 0
+			for column in tiprack._columns.values():
+				for index_row in range(len(column)-self.channels+1):
+					tips = column[index_row:index_row+self.channels]
+					if tiprack._wells.index(tips[0]) >= index_first and all(tip._core._name not in tiprack._usedTips for tip in tips):
+						return tips
+		return None
+
+	def pick_up_tip(self, location = None, **kwargs):
+		if self.has_tip:
+			raise Exception(f"The pipette {self} cannot pick up a tip because it has already one")
+
+		if location != None:
+			tips = self._wells_channels(location.well if isinstance(location, Location) else location)
+		else:
+			tips = self._next_tips()
+			if tips == None:
+				raise OutOfTipsError(f"The pipette {self} has no more tips in its tip racks")
+
+		for tip in tips:
+			tip._parent._usedTips.add(tip._core._name)
+		self.has_tip = True
+		self._protocol.tipsUsed[self.mount] = self._protocol.tipsUsed.get(self.mount, 0)+len(tips)
+		self._protocol.register(f"Pick up tip {tips[0]} with {self}", seconds_commands["Pick Up Tip"])
+
+	def drop_tip(self, location = None, **kwargs):
+		if not self.has_tip:
+			raise Exception(f"The pipette {self} cannot drop a tip because it does not have one")
+		self.has_tip = False
+		self._protocol.register(f"Drop tip of {self}", seconds_commands["Drop Tip"])
+
+	def return_tip(self, **kwargs):
+		self.drop_tip()
+
+	def reset_tipracks(self):
+		for tiprack in self.tip_racks:
+			tiprack._usedTips.clear()
+		self._protocol.tipracksReplaced[self.mount] = self._protocol.tipracksReplaced.get(self.mount, 0)+1
+
+	def aspirate(self, volume = None, location = None, rate = 1.0):
+		if not self.has_tip:
+			raise Exception(f"The pipette {self} cannot aspirate without a tip")
+		if volume == None:
+			volume = self.max_volume
+		well = self._well(location)
+		for well_channel in self._wells_channels(well):
+			well_channel.volume -= volume
+			if well_channel.liquid != None and well_channel.volume < -0.01:
+				self._protocol.warnings.add(f"More volume is aspirated than the one loaded in {well_channel}")
+		self._protocol.volumeAspirated[self.mount] = self._protocol.volumeAspirated.get(self.mount, 0)+volume*self.channels
+		self._protocol.register(f"Aspirate {volume} uL from {well} with {self}", seconds_commands["Move To Well"]+volume/(self.flow_rate.aspirate*rate))
+
+	def dispense(self, volume = None, location = None, rate = 1.0):
+		if not self.has_tip:
+			raise Exception(f"The pipette {self} cannot dispense without a tip")
+		if volume == None:
+			volume = self.max_volume
+		well = self._well(location)
+		for well_channel in self._wells_channels(well):
+			well_channel.volume += volume
+			if well_channel.volume > well_channel.max_volume+0.01:
+				self._protocol.warnings.add(f"The volume dispensed in {well_channel} is greater than its maximum volume, {well_channel.max_volume} uL")
+		self._protocol.volumeDispensed[self.mount] = self._protocol.volumeDispensed.get(self.mount, 0)+volume*self.channels
+		self._protocol.register(f"Dispense {volume} uL in {well} with {self}", seconds_commands["Move To Well"]+volume/(self.flow_rate.dispense*rate))
+
+	def mix(self, repetitions = 1, volume = None, location = None, rate = 1.0):
+		if volume == None:
+			volume = self.max_volume
+		well = self._well(location)
+		self._protocol.register(f"Mix {repetitions} times {volume} uL in {well} with {self}", seconds_commands["Move To Well"]+repetitions*(volume/(self.flow_rate.aspirate*rate)+volume/(self.flow_rate.dispense*rate)))
+
+	def blow_out(self, location = None):
+		self._well(location)
+		self._protocol.register(f"Blow out with {self}", seconds_commands["Blow Out"])
+
+	def touch_tip(self, location = None, radius = 1.0, v_offset = -1.0, speed = 60.0):
+		self._well(location)
+		self._protocol.register(f"Touch tip with {self}", seconds_commands["Touch Tip"])
+
+	def air_gap(self, volume = None, height = None):
+		self._protocol.register(f"Air gap with {self}", seconds_commands["Move To Well"])
+
+	def move_to(self, location, **kwargs):
+		self._well(location)
+		self._protocol.register(f"Move {self} to {location}", seconds_commands["Move To Well"])
+
+	def transfer(self, volume, source, dest, **kwargs):
+		self._plan_transfer(volume, source, dest, kwargs, distribute = False)
+
+	def distribute(self, volume, source, dest, **kwargs):
+		self._plan_transfer(volume, source, dest, kwargs, distribute = True)
+
+	def consolidate(self, volume, source, dest, **kwargs):
+		self._plan_transfer(volume, source, dest, kwargs, distribute = False)
+
+	def _plan_transfer(self, volume, source, dest, arguments, distribute = False):
+		# Split the transfer in the aspirations and dispenses that the pipette does as the complex commands of Opentrons
+		sources = flatten_locations(source)
+		destinations = flatten_locations(dest)
+		# As Opentrons does, a multi-channel pipette only goes to the wells of the first row when it is given several wells, e.g., whole columns
+		if self.channels > 1:
+			sources = self._first_row(sources)
+			destinations = self._first_row(destinations)
+		number_transfers = max(len(sources), len(destinations))
+		if len(sources) == 1:
+			sources = sources*number_transfers
+		if len(destinations) == 1:
+			destinations = destinations*number_transfers
+		if len(sources) != len(destinations):
+			raise Exception(f"The pipette {self} cannot transfer from {len(sources)} sources to {len(destinations)} destinations")
+		volumes = list(volume) if isinstance(volume, (list, tuple)) else [volume]*number_transfers
+
+		new_tip = arguments.get("new_tip", "once")
+		air_gap = arguments.get("air_gap", 0)
+		disposal_volume = arguments.get("disposal_volume", self.min_volume) if distribute else 0
+		volume_tip = self.max_volume-air_gap-disposal_volume
+		if volume_tip <= 0:
+			raise Exception(f"The pipette {self} cannot transfer with an air gap of {air_gap} uL and a disposal volume of {disposal_volume} uL")
+
+		# Groups of dispenses done with 1 aspiration, the distributions fill the tip with several destinations of the same source
+		groups = []
+		for source_transfer, destination, volume_transfer in zip(sources, destinations, volumes):
+			if volume_transfer <= 0:
+				continue
+			for index_part in range(math.ceil(volume_transfer/volume_tip)):
+				volume_part = min(volume_tip, volume_transfer-index_part*volume_tip)
+				if distribute and len(groups) > 0 and groups[-1]["Source"] is source_transfer and groups[-1]["Volume"]+volume_part <= volume_tip:
+					groups[-1]["Dispenses"].append([destination, volume_part])
+					groups[-1]["Volume"] += volume_part
+				else:
+					groups.append({"Source":source_transfer, "Dispenses":[[destination, volume_part]], "Volume":volume_part})
+
+		if new_tip == "once" and len(groups) > 0:
+			self.pick_up_tip()
+		for group in groups:
+			if new_tip == "always":
+				self.pick_up_tip()
+			if arguments.get("mix_before"):
+				self.mix(*arguments["mix_before"], group["Source"])
+			self.aspirate(group["Volume"]+disposal_volume, group["Source"])
+			if arguments.get("touch_tip"):
+				self.touch_tip()
+			if air_gap:
+				self.air_gap(air_gap)
+			for destination, volume_dispense in group["Dispenses"]:
+				self.dispense(volume_dispense, destination)
+				if arguments.get("mix_after"):
+					self.mix(*arguments["mix_after"], destination)
+				if arguments.get("touch_tip"):
+					self.touch_tip()
+			if disposal_volume > 0 or arguments.get("blow_out"):
+				self.blow_out()
+			if new_tip == "always":
+				self.drop_tip()
+		if new_tip == "once" and len(groups) > 0:
+			self.drop_tip()
+
+class Deck(dict):
+	"""
+	Slots of the deck with the labware or module placed in each of them, None if the slot is free
+	"""
+	pass
+
+class ProtocolContext:
+	"""
+	Protocol that loads the stand-in labware, pipettes and modules and registers the commands of the script with their estimated time
+	"""
+	def __init__(self, definitions):
+		self._definitions = definitions
+		self.deck = Deck({slot:None for slot in range(1, 13)})
+		self.deck[12] = Labware(definition_trash, 12, self)
+		self.loaded_instruments = {}
+		self.slotsBlocked = set() # Slots occupied by a module placed in another slot
+
+		self.commands = []
+		self.pauses = []
+		self.liquidsLoaded = []
+		self.tipsUsed = {}
+		self.tipracksReplaced = {}
+		self.volumeAspirated = {}
+		self.volumeDispensed = {}
+		self.warnings = set()
+
+	def register(self, description, seconds):
+		self.commands.append([description, seconds])
+
+	def _check_slot(self, location):
+		if location not in self.deck.keys():
+			raise ValueError(f"The slot {location} does not exist in the deck")
+		if self.deck[location] != None or location in self.slotsBlocked:
+			raise DeckConflictError(f"The slot {location} is already occupied")
+
+	def load_labware(self, load_name, location, label = None, namespace = None, version = None):
+		location = int(location)
+		self._check_slot(location)
+		self.deck[location] = Labware(self._definitions.get_labware_definition(load_name, namespace, version), location, self, label = label)
+		return self.deck[location]
+
+	def load_instrument(self, instrument_name, mount, tip_racks = None, replace = False):
+		self.loaded_instruments[mount] = Pipette(instrument_name, mount, self, tip_racks = tip_racks)
+		return self.loaded_instruments[mount]
+
+	def load_module(self, module_name, location = None, configuration = None, **kwargs):
+		kind = [kind for kind in modules_specifications.keys() if kind in module_name.lower().replace("-", "").replace(" ", "")]
+		if len(kind) == 0:
+			raise ValueError(f"The module '{module_name}' is not contemplated in the dry run")
+		kind = kind[0]
+
+		location = modules_specifications[kind]["Slots"][0] if location == None else int(location)
+		if location not in modules_specifications[kind]["Slots"]:
+			raise DeckConflictError(f"The module '{module_name}' cannot be placed in the slot {location}")
+		for slot in [location]+modules_specifications[kind]["Slots Occupied"]:
+			self._check_slot(slot)
+
+		self.deck[location] = Module(kind, location, self)
+		self.slotsBlocked.update(slot for slot in modules_specifications[kind]["Slots Occupied"] if slot != location)
+		return self.deck[location]
+
+	def define_liquid(self, name, description = None, display_color = None):
+		return Liquid(name, description, display_color)
+
+	def pause(self, msg = None):
+		self.pauses.append(msg)
+		self.register(f"Pause: {msg}", 0)
+
+	def comment(self, msg):
+		self.register(f"Comment: {msg}", 0)
+
+	def delay(self, seconds = 0, minutes = 0, msg = None):
+		self.register(f"Delay {seconds+60*minutes} seconds", seconds+60*minutes)
+
+	def home(self):
+		self.register("Home", seconds_commands["Home"])
+
+	def is_simulating(self):
+		return True
+
+#----------------------------------------------------------------------------------------------------------------------------------------------------------------------------------------------------------------
+# Functions of the dry run
+
+def flatten_locations (locations):
+	"""
+	Function that will return the wells or locations given to a complex command of a pipette as a flat list
+
+	1 mandatory argument is needed for this function
+	"""
+	if isinstance(locations, (list, tuple)):
+		return [location for element in locations for location in flatten_locations(element)]
+	return [locations]
+
+def stand_in_modules (definitions):
+	"""
+	Function that will create the modules opentrons, opentrons.protocol_api, opentrons.protocol_api.labware and opentrons.motion_planning.deck_conflict
+	with the stand-in objects, so the scripts import them instead of the ones of Opentrons
+
+	1 mandatory argument is needed for this function
+	"""
+	module_opentrons = types.ModuleType("opentrons")
+	module_protocol_api = types.ModuleType("opentrons.protocol_api")
+	module_labware = types.ModuleType("opentrons.protocol_api.labware")
+	module_motion_planning = types.ModuleType("opentrons.motion_planning")
+	module_deck_conflict = types.ModuleType("opentrons.motion_planning.deck_conflict")
+
+	module_labware.get_labware_definition = definitions.get_labware_definition
+	module_labware.OutOfTipsError = OutOfTipsError
+	module_labware.Labware = Labware
+	module_labware.Well = Well
+	module_protocol_api.labware = module_labware
+	module_protocol_api.ProtocolContext = ProtocolContext
+	module_deck_conflict.DeckConflictError = DeckConflictError
+	module_motion_planning.deck_conflict = module_deck_conflict
+	module_opentrons.protocol_api = module_protocol_api
+	module_opentrons.__version__ = version_stand_ins
+	module_opentrons.motion_planning = module_motion_planning
+
+	return {"opentrons":module_opentrons,
+			"opentrons.protocol_api":module_protocol_api,
+			"opentrons.protocol_api.labware":module_labware,
+			"opentrons.motion_planning":module_motion_planning,
+			"opentrons.motion_planning.deck_conflict":module_deck_conflict}
+
+def redirect_user_storage (path_variables, name_variable_file, folder_read, folder_write):
+	"""
+	Function that will make the scripts read the variable file given instead of the one of /data/user_storage, the rest of the files of that folder
+	from the folder of the entry, and write the files of that folder (e.g., the maps) in another folder
+
+	It returns the original functions so they can be restored after the dry run
+
+	4 mandatory arguments are needed for this function
+	"""
+	original_functions = {"read_excel":pd.read_excel, "ExcelWriter":pd.ExcelWriter, "open":builtins.open, "save":Workbook.save}
+
+	def path_read (path):
+		if type(path) == str and path.startswith("/data/user_storage/"):
+			if os.path.basename(path) == name_variable_file:
+				return path_variables
+			return os.path.join(folder_read, os.path.basename(path))
+		return path
+
+	def path_write (path):
+		if type(path) == str and path.startswith("/data/user_storage/"):
+			return os.path.join(folder_write, os.path.basename(path))
+		return path
+
+	def read_excel (path, *args, **kwargs):
+		return original_functions["read_excel"](path_read(path), *args, **kwargs)
+
+	def excel_writer (path, *args, **kwargs):
+		return original_functions["ExcelWriter"](path_write(path), *args, **kwargs)
+
+	def open_file (path, mode = "r", *args, **kwargs):
+		return original_functions["open"](path_read(path) if mode.startswith("r") else path_write(path), mode, *args, **kwargs)
+
+	def save_workbook (workbook, path):
+		return original_functions["save"](workbook, path_write(path))
+
+	pd.read_excel = read_excel
+	pd.ExcelWriter = excel_writer
+	builtins.open = open_file
+	Workbook.save = save_workbook
+
+	return original_functions
+
+def variables_not_feasible (error):
+	"""
+	Function that will return if an error raised by the script of an entry comes from its variables not being feasible
+
+	The scripts check the variables raising Exception or their own errors (defined in the script, e.g., NotSuitablePipette) and the stand-in objects raise
+	the errors that Opentrons would raise with them (OutOfTipsError, DeckConflictError, FileNotFoundError for a labware and ValueError for a slot or module).
+	The rest of errors, e.g., AttributeError or TypeError, are bugs of the script or of the stand-in objects and not a problem of the variables
+
+	1 mandatory argument is needed for this function
+	"""
+	return type(error) in [Exception, OutOfTipsError, DeckConflictError, FileNotFoundError, ValueError] or type(error).__module__ == "dry_run_protocol"
+
+def dry_run (entry, path_variables = None, folders_labware = [], folder_maps = None):
+	"""
+	Function that will run the script of an entry with the stand-in objects of the Opentrons API and return the protocol with everything registered,
+	the time that the planning has taken and the error raised by the script if the variables are not feasible (None if they are)
+
+	The errors that do not come from the variables (see variables_not_feasible) are raised, so a bug is not reported as variables that are not feasible
+
+	By default the variable file is the filled example of the entry (ExampleVariableFiles.py) and the exported maps are removed after the dry run
+
+	1 mandatory argument and 3 optional are needed for this function
+	"""
+	folder_entry = os.path.join(os.path.dirname(os.path.abspath(__file__)), entry["Entry"])
+	if path_variables != None and not os.path.exists(path_variables):
+		raise Exception(f"The variable file '{path_variables}' cannot be found")
+
+	definitions = LabwareDefinitions(list(folders_labware)+[folder_entry])
+	protocol = ProtocolContext(definitions)
+	modules_opentrons = stand_in_modules(definitions)
+	original_modules = {name_module:sys.modules.get(name_module) for name_module in modules_opentrons.keys()}
+	error = None
+
+	with tempfile.TemporaryDirectory() as folder_temporary:
+		if path_variables == None:
+			path_variables = write_example_variable_file(entry["Entry"], folder_temporary)
+		original_functions = redirect_user_storage(path_variables, entry["Variable File"], folder_entry, folder_maps if folder_maps != None else folder_temporary)
+		sys.modules.update(modules_opentrons)
+		try:
+			start_time = time.perf_counter()
+
+			namespace_script = {"__name__":"dry_run_protocol", "__file__":os.path.join(folder_entry, entry["Script"])}
+			with open(os.path.join(folder_entry, entry["Script"])) as file_script:
+				exec(compile(file_script.read(), entry["Script"], "exec"), namespace_script)
+			try:
+				namespace_script["run"](protocol)
+			except Exception as error_script:
+				if not variables_not_feasible(error_script):
+					raise
+				error = error_script
+
+			planning_time = time.perf_counter() - start_time
+		finally:
+			# The modules of opentrons and the functions of pandas, open and openpyxl need to be restored even if the dry run raises an error
+			for name_module, original_module in original_modules.items():
+				if original_module == None:
+					sys.modules.pop(name_module, None)
+				else:
+					sys.modules[name_module] = original_module
+			pd.read_excel = original_functions["read_excel"]
+			pd.ExcelWriter = original_functions["ExcelWriter"]
+			builtins.open = original_functions["open"]
+			Workbook.save = original_functions["save"]
+
+	return protocol, planning_time, error
+
+def print_dry_run (protocol, planning_time, error, entry, path_variables):
+	"""
+	Function that will print the deck map, tips, liquids, volumes, pauses and estimated time of a dry run
+
+	5 mandatory arguments are needed for this function
+	"""
+	print(f"\n{entry['Entry']} with {os.path.basename(path_variables)} (planned in {planning_time*1000:.1f} ms)")
+	if error != None:
+		print(f"  NOT FEASIBLE: {error}")
+		return
+
+	print("  Deck map:")
+	for slot, labware in protocol.deck.items():
+		if labware != None:
+			print(f"    Slot {slot}: {labware}")
+		elif slot in protocol.slotsBlocked:
+			print(f"    Slot {slot}: Occupied by a module")
+		else:
+			print(f"    Slot {slot}: Empty")
+
+	print("  Tips:")
+	for mount, pipette in protocol.loaded_instruments.items():
+		tipracks = [str(tiprack) for tiprack in pipette.tip_racks]
+		print(f"    {pipette}: {protocol.tipsUsed.get(mount, 0)} tips, {len(tipracks)} tip rack(s) in the deck and replaced {protocol.tipracksReplaced.get(mount, 0)} time(s)")
+
+	print("  Tubes and wells with liquids:")
+	liquids = {}
+	for name_liquid, well, volume in protocol.liquidsLoaded:
+		liquids.setdefault(name_liquid, {"Wells":set(), "Volume":0})
+		liquids[name_liquid]["Wells"].add(well)
+		liquids[name_liquid]["Volume"] += volume
+	for name_liquid, liquid in liquids.items():
+		print(f"    {name_liquid}: {len(liquid['Wells'])} well(s) with {liquid['Volume']:.2f} uL")
+
+	print("  Volumes:")
+	for mount, pipette in protocol.loaded_instruments.items():
+		print(f"    {pipette}: {protocol.volumeAspirated.get(mount, 0):.2f} uL aspirated and {protocol.volumeDispensed.get(mount, 0):.2f} uL dispensed")
+
+	if len(protocol.pauses) > 0:
+		print(f"  Pauses ({len(protocol.pauses)}):")
+		for message in protocol.pauses:
+			print(f"    {message}")
+
+	if len(protocol.warnings) > 0:
+		print("  Warnings:")
+		for warning in sorted(protocol.warnings):
+			print(f"    {warning}")
+
+	estimated_time = sum(seconds for description, seconds in protocol.commands)
+	print(f"  Estimated time: {int(estimated_time//3600)} h {int(estimated_time%3600//60)} min {int(estimated_time%60)} s in {len(protocol.commands)} commands, without the time of the pauses")
+
+if __name__ == "__main__":
+	parser = argparse.ArgumentParser(description = "Dry run of the scripts of the LAP entries without the Opentrons runtime to check in milliseconds if the variable files are feasible")
+	parser.add_argument("entry", help = f"Name of the entry to check: {', '.join(entry['Entry'] for entry in entries)}")
+	parser.add_argument("-variables", dest = "paths_variables", nargs = "+", default = [None], help = "Variable file(s) to check, each one is run separately. Default: the filled example of the entry")
+	parser.add_argument("-labware", dest = "folders_labware", nargs = "+", default = [], help = "Folder(s) with the JSON definitions of the custom labware")
+	parser.add_argument("-maps", dest = "folder_maps", default = None, help = "Folder in which the maps exported by the script are written. Default: they are not kept")
+	arguments = parser.parse_args()
+
+	entry = [entry for entry in entries if entry["Entry"] == arguments.entry]
+	if len(entry) == 0:
+		raise Exception(f"The entry {arguments.entry} cannot be checked, only the following ones can: {', '.join(entry['Entry'] for entry in entries)}")
+
+	for path_variables in arguments.paths_variables:
+		protocol, planning_time, error = dry_run(entry[0], path_variables, arguments.folders_labware, arguments.folder_maps)
+		print_dry_run(protocol, planning_time, error, entry[0], path_variables if path_variables != None else entry[0]["Variable File"])
@@ -0,0 +1,289 @@
+# LAP Entries
+
+# Python file destined to write filled variable files of the LAP entries, the variable files of the entry folders are empty templates
+# This code does not belong to a specific entry of the LAP repository and it does not run any protocol in the robot
+
+# The variable files are written with the tables of this file, so the benchmark of the simulations (BenchmarkSimulationEntries.py), the dry run (DryRunEntries.py)
+# and their tests can run every entry with the same variables. The values are an example of a normal use of every entry with labware of the Opentrons namespace
+
+# Usage: python ExampleVariableFiles.py [-out FOLDER] [-entries ENTRY ...]
+
+# Needed packages for the script to run correctly
+import argparse
+import os
+import pandas as pd
+
+# Maps of the source plates used by the examples, 8 rows (A to H) and 12 columns (1 to 12)
+name_rows = ["A", "B", "C", "D", "E", "F", "G", "H"]
+name_columns = list(range(1, 13))
+
+def map_plate (value_well, text_columns = False):
+	"""
+	Function that will create a map of a 96-well plate with the value returned by value_well(row, column) in every well
+
+	Some scripts join the names of the rows and columns of the maps without converting them, so the names of the columns can be written as text
+
+	1 mandatory argument and 1 optional are needed for this function
+	"""
+	map_values = pd.DataFrame([[value_well(row, column) for column in name_columns] for row in name_rows], index = name_rows, columns = [str(column) if text_columns else column for column in name_columns])
+	map_values.index.name = "Row/Column"
+	return map_values
+
+def table_variables (rows, name_column_variables = "Variable Names", name_columns_values = ["Value"]):
+	"""
+	Function that will create a table of variables with the names of the variables in the first column and their values in the others
+
+	1 mandatory argument and 2 optional are needed for this function
+	"""
+	return pd.DataFrame(rows, columns = [name_column_variables]+list(name_columns_values))
+
+# Tables of the variable file of every entry, each table is a sheet with the same name
+examples = {
+	"LAP-CellMediaInoculation-OT2-2.0.0":{
+		"Variable File":"VariablesPlateIncubation.xlsx",
+		"Sheets":{
+			"GeneralVariables":table_variables([["Name Source Plate", "biorad_96_wellplate_200ul_pcr"],
+												["Number of Source Plates", 1],
+												["Name Final Plate", "corning_96_wellplate_360ul_flat"],
+												["Volume of Sample to Transfer (uL)", 5],
+												["Name Medias", "LB, LB_Kan"],
+												["Volume of Media to Transfer (uL)", 150],
+												["Name Tuberack", "opentrons_15_tuberack_falcon_15ml_conical"],
+												["Change Tip In Media Distribution", "media"],
+												["Change Tip In Sample Transfer", "column"],
+												["Position Transfer Sample", "bottom"],
+												["Touch Tip After Transferring Sample", False],
+												["Touch Tip In Distribution Media", False],
+												["Mixing Volume Before Sample Transfer (uL)", None],
+												["Number Times of Mixing Volume", None],
+												["Flow Rate Mixing", None]]),
+			"PipetteVariables":table_variables([["Name Right Pipette (Multichannel)", "p20_multi_gen2"],
+												["API Name Right Pipette TipRack", "opentrons_96_tiprack_20ul"],
+												["Initial Tip Right Pipette", "A1"],
+												["Name Left Pipette (Singlechannel)", "p300_single_gen2"],
+												["API Name Left Pipette TipRack", "opentrons_96_tiprack_300ul"],
+												["Initial Tip Left Pipette", "A1"],
+												["Replace Tipracks", False]]),
+			"PerPlateVariables":table_variables([["Samples per plate", 24],
+												 ["Media(s) per plate", "LB, LB_Kan"],
+												 ["First Well With Sample", "A1"],
+												 ["Number of Replicas", 2],
+												 ["Only Media(s) Plate Creation", False],
+												 ["Only Sample(s) Plate Creation", False]], name_columns_values = ["Plate 1"])
+		}
+	},
+	"LAP-ColonyCounterSelection-OT2-2.0.0":{
+		"Variable File":"VariablesCounterSelection.xlsx",
+		"Sheets":{
+			"GeneralVariables":table_variables([["API Name Source Plate", "biorad_96_wellplate_200ul_pcr"],
+												["API Name Final Plate", "corning_96_wellplate_360ul_flat"],
+												["API Name Rack Falcon Reactives", "opentrons_15_tuberack_falcon_15ml_conical"],
+												["Name Reactives", "LB, LB_Kan"],
+												["Number of Source Plates", 1],
+												["Volume per Reactive (uL)", "150, 150"],
+												["Name Final File Maps", "FinalMapsSelection"]]),
+			"PipetteVariables":table_variables([["API Name Right Pipette", "p20_single_gen2"],
+												["API Name Left Pipette", "p300_single_gen2"],
+												["API Name Tiprack Left Pipette", "opentrons_96_tiprack_300ul"],
+												["API Name Tiprack Right Pipette", "opentrons_96_tiprack_20ul"],
+												["Initial Tip Left Pipette", "A1"],
+												["Initial Tip Right Pipette", "A1"],
+												["Replace Tipracks", False]]),
+			"PerPlateVariables":table_variables([["Threshold Selection Value", 50],
+												 ["Name Sheet Selection Value<Threshold", "ColonyCounts"],
+												 ["Name Sheet Selection Value>Threshold", "Fluorescence"],
+												 ["Reactives Per Plate", "LB, LB_Kan"],
+												 ["Well Start Final Plate", "A1"],
+												 ["Final Map Name", "SelectedColonies"],
+												 ["Volume Transfer Sample (uL)", 5]], name_columns_values = ["Plate 1"]),
+			"ColonyCounts":map_plate(lambda row, column: (name_rows.index(row)*12+column*7)%100),
+			"Fluorescence":map_plate(lambda row, column: (name_rows.index(row)*31+column*13)%100)
+		}
+	},
+	"LAP-CustomReagentMixingMultiSinglePip-OT2-1.0.0":{
+		"Variable File":"VariablesCustomMixing.xlsx",
+		"Sheets":{
+			"GeneralVariables":table_variables([["API Name Labware with Reagent(s) in Tube(s)", "opentrons_15_tuberack_falcon_15ml_conical"],
+												["Type of Reagent Tube", "falcon"],
+												["API Name Labware with Reagents(s) in Plate(s)", "nest_96_wellplate_2ml_deep"],
+												["API Name Final Plate", "corning_96_wellplate_360ul_flat"],
+												["Number of Final Plates", 2],
+												["Change Tip In Distribution", "reagent"],
+												["Position Dispense Final Well", "bottom"],
+												["Touch Tip After Dispense", False],
+												["Internal Replicas", 1],
+												["Optimization Space Source Plate Reagents Disposition", "high"]]),
+			"PipetteVariables":table_variables([["Name Right Pipette", "p300_multi_gen2"],
+												["API Name Right Pipette TipRack", "opentrons_96_tiprack_300ul"],
+												["Initial Tip Right Pipette", "A1"],
+												["Name Left Pipette", "p300_single_gen2"],
+												["API Name Left Pipette TipRack", "opentrons_96_tiprack_300ul"],
+												["Initial Tip Left Pipette", "A1"],
+												["Replace Tipracks", False]]),
+			"FinalPlatesVariables":table_variables([["Number of Replicas", 1, 1],
+													["Name Sheet Map Reagents", "ReagentsMulti", "ReagentsSingle"],
+													["Name Sheet Map Volumes", "VolumesMulti", "VolumesSingle"],
+													["Type of Pipette to Create Plate", "multi", "single"]], name_columns_values = ["Plate 1", "Plate 2"]),
+			# The columns of the plate created with the multichannel pipette combine a buffer with one of the 3 dyes
+			"ReagentsMulti":map_plate(lambda row, column: f"Buffer, Dye{(name_rows.index(row)+column)%3}" if column <= 6 else None, True),
+			"VolumesMulti":map_plate(lambda row, column: "100, 50" if column <= 6 else None, True),
+			"ReagentsSingle":map_plate(lambda row, column: f"Buffer, Dye{name_rows.index(row)%3}" if column <= 2 else None, True),
+			"VolumesSingle":map_plate(lambda row, column: f"120, {20*column}" if column <= 2 else None, True)
+		}
+	},
+	"LAP-MoCloAssembly-OT2-2.0.0":{
+		"Variable File":"VariablesMoCloAssembly.xlsx",
+		"Sheets":{
+			"GeneralVariables":table_variables([["API Name Final Plate", "biorad_96_wellplate_200ul_pcr"],
+												["API Name Labware Eppendorfs Reagents", "opentrons_24_aluminumblock_nest_1.5ml_snapcap"],
+												["Name File Final Constructs", "FinalConstructs"],
+												["Well Start Final Labware", "A1"],
+												["API Name Labware DNA Constructs", "biorad_96_wellplate_200ul_pcr"],
+												["Number DNA Parts Plates", 1]]),
+			"PerPlateVariables":table_variables([["Name Map DNA Parts", "MapParts"],
+												 ["Number of Parts", 11]], name_columns_values = ["Plate 1"]),
+			"PipetteVariables":table_variables([["API Name Right Pipette", "p20_single_gen2"],
+												["API Name Left Pipette", "p300_single_gen2"],
+												["API Name Tiprack Left Pipette", "opentrons_96_tiprack_300ul"],
+												["API Name Tiprack Right Pipette", "opentrons_96_tiprack_20ul"],
+												["Initial Tip Left Pipette", "A1"],
+												["Initial Tip Right Pipette", "A1"],
+												["Replace Tipracks", False]]),
+			"ReactionVariables":table_variables([["Volume Acceptor Plasmid (uL)", 2],
+												 ["Volume Module Plasmid (uL)", 2],
+												 ["Volume Restriction Enzyme (uL)", 1],
+												 ["Volume Ligase (uL)", 1],
+												 ["Volume Buffer (uL)", 2],
+												 ["Volume ATP/Serum (uL)", 2],
+												 ["Volume Final Each Reaction (uL)", 20],
+												 ["Extra Pipetting Factor", 0.1],
+												 ["Position Distribute Water", "bottom"],
+												 ["Touch Tip After Distributing Water", False],
+												 ["Change Tip in Water Distribution", "never"],
+												 ["Position Distribute Reaction Mix", "bottom"],
+												 ["Touch Tip After Distributing Reaction Mix", False],
+												 ["Change Tip in Mix Distribution", "aspirate"],
+												 ["Position Distribute Acceptor/Module", "bottom"],
+												 ["Touch Tip After Distributing Acceptor/Module", False],
+												 ["Change Tip in Acceptor/Module Distribution", "aspirate"]]),
+			"ModuleVariables":table_variables([["Presence Thermocycler", True],
+											   ["Presence Heater-Shaker", False],
+											   ["Final Open Lid", False],
+											   ["Temperature Lid", 100],
+											   ["Hold Block Temperature After Profile", 4],
+											   ["RPM Heater-Shaker", None],
+											   ["API Name Heater-Shaker Labware", None],
+											   ["Max Volume Per Mix Tube In Shaker", None],
+											   ["Pause Before Temperature Program", False],
+											   ["Initial Thermocycle Block Temperature", None]]),
+			"TemperatureProfile":pd.DataFrame([[42, 120, "-", "Start"],
+											   [16, 300, 25, "End"],
+											   [60, 300, "-", "-"],
+											   [80, 600, "-", "-"]], columns = ["Temperature", "Time (s)", "Number of Cycles", "Cycle Status"]),
+			# Every construct joins the acceptor plasmid with 1 promoter, 1 RBS, 1 CDS and 1 terminator of the map of the parts
+			"Combinations":pd.DataFrame([[f"Construct{index_construct+1}", "Acceptor", f"Promoter{index_construct%4+1}", f"RBS{index_construct//4%2+1}", f"CDS{index_construct%3+1}", "Terminator1", None] for index_construct in range(12)],
+										columns = ["Name", "Acceptor Plasmid", "Part 1", "Part 2", "Part 3", "Part 4", "Part 5"]),
+			"MapParts":map_plate(lambda row, column: {(1, "A"):"Promoter1", (1, "B"):"Promoter2", (1, "C"):"Promoter3", (1, "D"):"Promoter4",
+													  (2, "A"):"RBS1", (2, "B"):"RBS2", (3, "A"):"CDS1", (3, "B"):"CDS2", (3, "C"):"CDS3",
+													  (4, "A"):"Terminator1", (4, "B"):"Acceptor"}.get((column, row)))
+		}
+	},
+	"LAP-NplateMerging-OT2-2.0.0":{
+		"Variable File":"VariablesMergeSamples.xlsx",
+		"Sheets":{
+			"GeneralVariables":table_variables([["API Name Source Plate", "biorad_96_wellplate_200ul_pcr"],
+												["API Name Final Plate", "biorad_96_wellplate_200ul_pcr"],
+												["API Name Rack Falcon Reactives", "opentrons_15_tuberack_falcon_15ml_conical"],
+												["Volume Reactive Transfer (uL)", 20],
+												["Number of Source Plates", 2],
+												["Name File Final Map", "MergedPlates"],
+												["Well Start Final Plate", "A1"]]),
+			"PipetteVariables":table_variables([["API Name Right Pipette", "p20_single_gen2"],
+												["API Name Left Pipette", "p300_single_gen2"],
+												["API Name Tiprack Left Pipette", "opentrons_96_tiprack_300ul"],
+												["API Name Tiprack Right Pipette", "opentrons_96_tiprack_20ul"],
+												["Initial Tip Left Pipette", "A1"],
+												["Initial Tip Right Pipette", "A1"],
+												["Replace Tipracks", False]]),
+			"PerPlateVariables":table_variables([["Name Sheet Map Identifiers", "IdentifiersPlate1", "IdentifiersPlate2"],
+												 ["Type of Sample Selection", "first", "random"],
+												 ["First Well Consider Take", "A1", "A1"],
+												 ["Number Samples Pick", 30, 20],
+												 ["Volume Transfer Sample (uL)", 5, 10]], name_columns_values = ["Plate 1", "Plate 2"]),
+			"IdentifiersPlate1":map_plate(lambda row, column: f"Strain1-{row}{column}"),
+			"IdentifiersPlate2":map_plate(lambda row, column: f"Strain2-{row}{column}" if column <= 6 else None)
+		}
+	},
+	"LAP-PCR-OT2-2.0.0":{
+		"Variable File":"VariablesPCR.xlsx",
+		"Sheets":{
+			"GeneralVariables":table_variables([["API Name Source Plate", "biorad_96_wellplate_200ul_pcr"],
+												["Number of Source Plates", 1],
+												["API Name Final PCR Plate", "biorad_96_wellplate_200ul_pcr"],
+												["Well Start Final PCR Plate", "A1"],
+												["API Name Eppendorf Reagents Rack", "opentrons_24_aluminumblock_nest_1.5ml_snapcap"],
+												["Final Map Name", "FinalMapPCR"]], "Variable Name"),
+			"SamplesPlateVariables":table_variables([["Number Samples", 28],
+													 ["Well Start", "A1"],
+													 ["Position Controls", "D4"],
+													 ["Wells not to perform PCR", "B2"],
+													 ["Map IDs", "MapSamples"]], "Variable Name", ["Plate 1"]),
+			"PipetteVariables":table_variables([["API Name Right Pipette", "p300_single_gen2"],
+												["API Name Left Pipette", "p20_single_gen2"],
+												["API Name Tiprack Left Pipette", "opentrons_96_tiprack_20ul"],
+												["API Name Tiprack Right Pipette", "opentrons_96_tiprack_300ul"],
+												["Initial Tip Left Pipette", "A1"],
+												["Initial Tip Right Pipette", "A1"],
+												["Replace Tipracks", False]], "Variable Name"),
+			"ReagentsPerReaction":table_variables([["Number primer/set", 2],
+												   ["Number sets", 3],
+												   ["Volume each primer (uL)", 1],
+												   ["Volume polymerase mix (uL)", 7.5],
+												   ["Volume sample DNA Template (uL)", 2],
+												   ["Final volume (uL)", 15],
+												   ["Extra Pipetting Factor", 0.1]], "Variable Name"),
+			"ModuleVariables":table_variables([["Presence Thermocycler", True],
+											   ["Presence Heater-Shaker", False],
+											   ["Final Open Lid", False],
+											   ["Temperature Lid", 100],
+											   ["Hold Block Temperature", 4],
+											   ["RPM Heater-Shaker", None],
+											   ["API Name Heater-Shaker Labware", None],
+											   ["Max Volume Per Mix Tube In Shaker", None],
+											   ["Pause Before Temperature Program", False]], "Variable Name"),
+			"TemperatureProfile":pd.DataFrame([[95, 180, "-", "-"],
+											   [95, 30, "-", "Start"],
+											   [55, 30, "-", "-"],
+											   [72, 60, 30, "End"],
+											   [72, 300, "-", "-"]], columns = ["Temperature", "Time (s)", "Number of Cycles", "Cycle Status"]),
+			"MapSamples":map_plate(lambda row, column: f"Sample{row}{column}")
+		}
+	}
+}
+
+def write_example_variable_file (name_entry, folder):
+	"""
+	Function that will write the filled variable file of an entry in a folder with the name that the script of the entry reads
+	and return the path of the file
+
+	2 mandatory arguments are needed for this function
+	"""
+	if name_entry not in examples.keys():
+		raise Exception(f"There is not an example of the variable file of the entry {name_entry}, only of the following ones: {', '.join(examples.keys())}")
+
+	path_variable_file = os.path.join(folder, examples[name_entry]["Variable File"])
+	with pd.ExcelWriter(path_variable_file, engine = "openpyxl") as writer:
+		for name_sheet, table in examples[name_entry]["Sheets"].items():
+			# The maps keep the names of the rows as index, the rest of the tables do not have index
+			table.to_excel(writer, sheet_name = name_sheet, index = table.index.name == "Row/Column")
+
+	return path_variable_file
+
+if __name__ == "__main__":
+	parser = argparse.ArgumentParser(description = "Write the filled variable files of the LAP entries")
+	parser.add_argument("-out", dest = "folder_output", default = ".", help = "Folder in which the variable files are going to be written. Default: current folder")
+	parser.add_argument("-entries", dest = "names_entries", nargs = "+", default = list(examples.keys()), help = "Names of the entries. Default: all of them")
+	arguments = parser.parse_args()
+
+	for name_entry in arguments.names_entries:
+		print(write_example_variable_file(name_entry, arguments.folder_output))
@@ -23,6 +23,7 @@ import opentrons
 import pandas as pd
 import math
 import random
+from types import MappingProxyType
 from opentrons.motion_planning.deck_conflict import DeckConflictError
 from opentrons.protocol_api.labware import OutOfTipsError
 
@@ -35,7 +36,7 @@ class UserVariables:
 	Class that will contain the parameters setted in the variables csv and will process them to work easily in the rest of the protocol
 	The coding of this function is dependant of the variables in the Template of the protocol and the names have to be consistent with the rest of the code
 	"""
-	def __init__(self, general, each_plate, pipettes):
+	def __init__(self, general, each_plate, pipettes, liquid_classes = None, reagent_liquid_classes = None):
 		"""
 		This function will take the pandas dataframe that will be the table of the excel variable files
 		"""
@@ -56,6 +57,11 @@ class UserVariables:
 		self.APINameSamplePlate = general[general["Variable Names"] == "Name Source Plate"]["Value"].values[0]
 		self.APINameIncubationPlate = general[general["Variable Names"] == "Name Final Plate"]["Value"].values[0]
 		self.APINameFalconPlate = general[general["Variable Names"] == "Name Tuberack"]["Value"].values[0]
+		# Optional reservoir for the medias, if it is given the medias are distributed by columns with the multi-channel pipette instead of from falcons
+		if "Name Reservoir Medias" in general["Variable Names"].values:
+			self.APINameReservoirMedia = general[general["Variable Names"] == "Name Reservoir Medias"]["Value"].values[0]
+		else:
+			self.APINameReservoirMedia = float("nan")
 
 		self.APINamePipR = pipettes[pipettes["Variable Names"] == "Name Right Pipette (Multichannel)"]["Value"].values[0]
 		self.APINamePipL = pipettes[pipettes["Variable Names"] == "Name Left Pipette (Singlechannel)"]["Value"].values[0]
@@ -71,6 +77,17 @@ class UserVariables:
 		self.numberReplicas = list(each_plate[each_plate["Variable Names"] == "Number of Replicas"].values[0][1:])
 		self.nameSourcePlates = list(each_plate.columns)
 		self.nameSourcePlates.remove("Variable Names")
+		
+		# Liquid classes and the reagents that use them, in case the user defines them
+		if isinstance(liquid_classes, pd.DataFrame):
+			self.liquidClasses = liquid_classes.dropna(how = "all")
+		else:
+			self.liquidClasses = None
+		
+		if isinstance(reagent_liquid_classes, pd.DataFrame):
+			self.reagentLiquidClasses = reagent_liquid_classes.dropna(how = "all")
+		else:
+			self.reagentLiquidClasses = None
 		return
 	
 	def check(self):
@@ -226,7 +243,7 @@ class UserVariables:
 
 			# We check the position that the dispense in the final wells is one of the accepted values
 			if pd.isna(self.positionTransferSample):
-				self.positionTransferSample == "bottom"
+				self.positionTransferSample = "bottom"
 			elif self.positionTransferSample not in ["top", "bottom", "center"]:
 				raise Exception("'Position Transfer Sample' can only have 3 values: top, bottom or center. If left empty, 'bottom' value will be assumed.\nFor the behaviour with each argument check the manual of the LAP entry")
 
@@ -240,38 +257,59 @@ class UserVariables:
 			else:
 				raise Exception("'Touch Tip After Transferring Sample' can only have 2 values: True or False. If left empty assumed as False")
 			
-			# If samples are going to be transferred we need to have a dource and final labware that has 8 rows
-			if len(definition_source_plate["ordering"][0]) != 8:
-				raise Exception("At least 1 final plate is going to contain samples which means that the 8-channel pipette is going to be used. For that reason, the labware defined in 'Name Source Plate' needs to have 8 rows.")
+			# If samples are going to be transferred we need to have a source and final labware that has 8 rows or a multiple of them, in which the channels reach every other well of a column
+			if len(definition_source_plate["ordering"][0]) % 8 != 0:
+				raise Exception("At least 1 final plate is going to contain samples which means that the 8-channel pipette is going to be used. For that reason, the labware defined in 'Name Source Plate' needs to have 8 rows or a multiple of them, for example, the 16 rows of a 384-well plate.")
 			
-			if len(definition_final_plate["ordering"][0]) != 8:
-				raise Exception("At least 1 final plate is going to contain samples which means that the 8-channel pipette is going to be used. For that reason, the labware defined in 'Name Final Plate' needs to have 8 rows.")
+			if len(definition_final_plate["ordering"][0]) % 8 != 0:
+				raise Exception("At least 1 final plate is going to contain samples which means that the 8-channel pipette is going to be used. For that reason, the labware defined in 'Name Final Plate' needs to have 8 rows or a multiple of them, for example, the 16 rows of a 384-well plate.")
 		else: # Only media plates are going to be created
 			self.volumeSample = 0
-			self.APINameTipR = None
-			self.startingTipPipR = None
-			self.APINamePipR = float("nan")
+			if pd.isna(self.APINameReservoirMedia): # The multi-channel pipette is still needed if the medias are distributed from a reservoir
+				self.APINameTipR = None
+				self.startingTipPipR = None
+				self.APINamePipR = float("nan")
 		
 		# ---------------------------------------------------------
 		
 		if any(element == False for element in self.onlySamplePlate[:self.numberSourcePlates]): # It will go in if at least 1 final plate with media will be created
-			# We are goign to need the falcon tubes so the labware name variable needs to be defined
-			if pd.isna(self.APINameFalconPlate):
-				raise Exception("If at least 1 plate is going to be inoculated with media, the variable 'Name Tuberack' needs to be defined")
-
-			# Check if the labware of the falcon tuberack it is on the opentrons app, this needs to be first on the checking because if not other checking will do a false exception
-			try:
-				definition_rack = labware_context.get_labware_definition(self.APINameFalconPlate)
-			except OSError: # This would be catching the FileNotFoundError that happens when a labware is not found
-				raise Exception(f"The falcon tube rack labware {self.APINameFalconPlate} is not in the opentrons labware space so it cannot be defined. Check for any typo of the api labware name or that the labware is in the Opentrons App.")
+			# The medias can be in a reservoir, from which they are distributed with the multi-channel pipette, or in falcon tubes
+			if not pd.isna(self.APINameReservoirMedia):
+				try:
+					definition_reservoir = labware_context.get_labware_definition(self.APINameReservoirMedia)
+				except OSError: # This would be catching the FileNotFoundError that happens when a labware is not found
+					raise Exception(f"The reservoir labware {self.APINameReservoirMedia} is not in the opentrons labware space so it cannot be defined. Check for any typo of the api labware name or that the labware is in the Opentrons App.")
+				
+				# All the channels of the pipette take the media from the same well of the reservoir and dispense it in a whole column of the final plate
+				if len(definition_reservoir["ordering"][0]) != 1:
+					raise Exception("The wells of the labware in 'Name Reservoir Medias' need to be reached by all the channels of the multi-channel pipette, i.e., the reservoir can only have 1 row of wells")
+				if len(definition_final_plate["ordering"][0]) % 8 != 0:
+					raise Exception("The medias in 'Name Reservoir Medias' are distributed with the 8-channel pipette. For that reason, the labware defined in 'Name Final Plate' needs to have 8 rows or a multiple of them, for example, the 16 rows of a 384-well plate.")
+				
+				if pd.isna(self.APINamePipR) or pd.isna(self.startingTipPipR) or pd.isna(self.APINameTipR):
+					raise Exception("If the medias are in 'Name Reservoir Medias', the variables 'Name Right Pipette (Multichannel)', 'API Name Right Pipette TipRack' and 'Initial Tip Right Pipette' need to be established")
+				try:
+					definition_tiprack_right = labware_context.get_labware_definition(self.APINameTipR)
+				except OSError: # This would be catching the FileNotFoundError that happens when a labware is not found
+					raise Exception(f"The right tip rack {self.APINameTipR} is not in the opentrons labware space so it cannot be defined. Check for any typo of the api labware name or that the labware is in the Opentrons App.")
+				if self.startingTipPipR not in definition_tiprack_right["wells"].keys():
+					raise Exception("Starting tip of right pipette is not valid, check for typos")
+			elif pd.isna(self.APINameFalconPlate): # We are goign to need the falcon tubes so the labware name variable needs to be defined
+				raise Exception("If at least 1 plate is going to be inoculated with media, the variable 'Name Tuberack' or 'Name Reservoir Medias' needs to be defined")
+			else:
+				# Check if the labware of the falcon tuberack it is on the opentrons app, this needs to be first on the checking because if not other checking will do a false exception
+				try:
+					definition_rack = labware_context.get_labware_definition(self.APINameFalconPlate)
+				except OSError: # This would be catching the FileNotFoundError that happens when a labware is not found
+					raise Exception(f"The falcon tube rack labware {self.APINameFalconPlate} is not in the opentrons labware space so it cannot be defined. Check for any typo of the api labware name or that the labware is in the Opentrons App.")
 
-			# Check the falcon tube rack is only composed by only 1 type of falcons, 15 or 50mL
-			if len(definition_rack["groups"]) > 1:
-				raise Exception("The falcon rack needs to have only 1 type of tube admitted, either with 15mL or 50mL falcons. Tube racks such as 'Opentrons 10 Tube Rack with Falcon 4x50 mL, 6x15 mL Conical' are not valid")
+				# Check the falcon tube rack is only composed by only 1 type of falcons, 15 or 50mL
+				if len(definition_rack["groups"]) > 1:
+					raise Exception("The falcon rack needs to have only 1 type of tube admitted, either with 15mL or 50mL falcons. Tube racks such as 'Opentrons 10 Tube Rack with Falcon 4x50 mL, 6x15 mL Conical' are not valid")
 
-			# Check that the volume of those falcons are either 15ml or 50mL
-			if list(definition_rack["wells"].values())[0]['totalLiquidVolume'] not in [15000, 50000]:
-				raise Exception("The tubes of the falcon rack needs to be either 15mL or 50mL")
+				# Check that the volume of those falcons are either 15ml or 50mL
+				if list(definition_rack["wells"].values())[0]['totalLiquidVolume'] not in [15000, 50000]:
+					raise Exception("The tubes of the falcon rack needs to be either 15mL or 50mL")
 
 			# Check that if a final plate with media is going to be created, the left pipette is defined in the variable file and all the related variables
 			if pd.isna(self.APINamePipL):
@@ -406,6 +444,9 @@ class UserVariables:
 					self.numberReplicas[index_replica] = int(number_replica)
 				except:
 					raise Exception("The values of 'Number of Replicas' need to be either empty, assumed to be 0, or a whole number")
+		
+		# Check the sheet of liquid classes and the one that relates the reagents with them, if they have been given
+		self.liquidClasses, self.reagentLiquidClasses = liquid_classes_table_to_dict(self.liquidClasses, self.reagentLiquidClasses, ["Samples"] + self.nameAntibiotics)
 
 class SetParameters:
 	"""
@@ -427,6 +468,12 @@ class SetParameters:
 		self.volMaxPipLTiprackL = 0
 		self.volMaxTubeRack = 0
 		self.wellsTubeRack = 0
+		# Default liquid classes, the rates are factors of the default flow rates of the pipettes or the maximum flow rate of the pipette (max) and the delays are the seconds waited after
+		# every aspiration and dispense. They can be overwritten or extended with the sheet LiquidClasses
+		self.liquidClasses = {"aqueous":{"Aspirate Rate":"max", "Dispense Rate":"max", "Blow Out Rate":"max", "Aspirate Delay":0, "Dispense Delay":0, "Touch Tip":None},
+							  "glycerol-enzyme":{"Aspirate Rate":0.2, "Dispense Rate":0.2, "Blow Out Rate":1, "Aspirate Delay":1, "Dispense Delay":1, "Touch Tip":None}}
+		self.reagentLiquidClasses = {"Samples":"aqueous"} # The medias are added when the variables are assigned
+		self.defaultFlowRates = {} # It will be filled when the pipettes are loaded
 
 	def assign_variables(self, user_variables, protocol):
 		# Assign the color for the samples, in case it is needed in the future
@@ -436,18 +483,42 @@ class SetParameters:
 			display_color = "#ffbb51"
 		)
 		
+		# Liquid classes defined by the user and the reagents that use them
+		if user_variables.liquidClasses != None:
+			self.liquidClasses.update(user_variables.liquidClasses)
+		
+		if user_variables.reagentLiquidClasses != None:
+			self.reagentLiquidClasses.update(user_variables.reagentLiquidClasses)
+		
+		# Media that do not have a liquid class will be handled as aqueous
+		for media in user_variables.nameAntibiotics:
+			if media not in self.reagentLiquidClasses.keys():
+				self.reagentLiquidClasses[media] = "aqueous"
+		
+		for reagent, liquid_class in self.reagentLiquidClasses.items():
+			if liquid_class not in self.liquidClasses.keys():
+				raise Exception(f"The liquid class '{liquid_class}' of the reagent '{reagent}' is not defined. The liquid classes defined are: {', '.join(self.liquidClasses.keys())}. New classes can be defined in the sheet 'LiquidClasses'")
+		
+		# The touch tip of a liquid class, if it is established, is the one performed with the reagents of that class
+		if self.liquidClasses[self.reagentLiquidClasses["Samples"]]["Touch Tip"] != None:
+			user_variables.touchTipTransferSample = self.liquidClasses[self.reagentLiquidClasses["Samples"]]["Touch Tip"]
+		
 		# Pipette Variables
 		# The variables user_variables.APINamePipR and user_variables.APINamePipL will be a NaN value either if they were left empty or not needed, this last part will be established in the check process
 		if not pd.isna(user_variables.APINamePipR):
 			self.pipR = protocol.load_instrument(user_variables.APINamePipR, mount = "right")
+			self.defaultFlowRates["right"] = {"Aspirate":self.pipR.flow_rate.aspirate, "Dispense":self.pipR.flow_rate.dispense, "Blow Out":self.pipR.flow_rate.blow_out}
 			if self.pipR.channels != 8:
 				raise Exception("Right pipette needs to have 8 channels, i.e., multi channel")
 			# Check if the volumes can be picked with these set of pipettes
-			if self.pipR.min_volume > user_variables.volumeSample:
+			if user_variables.volumeSample > 0 and self.pipR.min_volume > user_variables.volumeSample:
 				raise Exception ("The volume 'Volume of Sample to Transfer (uL)' cannot be picked by the multi-channel pipette, try another volume or pipette")
+			if not pd.isna(user_variables.APINameReservoirMedia) and self.pipR.min_volume > user_variables.volumeAntibiotic:
+				raise Exception ("The volume 'Volume of Media to Transfer (uL)' cannot be picked by the multi-channel pipette, try another volume or pipette")
 		
 		if not pd.isna(user_variables.APINamePipL):
 			self.pipL = protocol.load_instrument(user_variables.APINamePipL, mount = "left")
+			self.defaultFlowRates["left"] = {"Aspirate":self.pipL.flow_rate.aspirate, "Dispense":self.pipL.flow_rate.dispense, "Blow Out":self.pipL.flow_rate.blow_out}
 			if self.pipL.channels != 1:
 				raise Exception("Left pipette needs to have 1 channel, i.e., single channel")
 			# Check if the volumes can be picked with these set of pipettes
@@ -462,7 +533,7 @@ class SetParameters:
 
 		# We ar egoing to set the different types of media tubes are needed
 		for media in user_variables.nameAntibiotics: # This variable is going to be empty if not defined or no final plates with media are going to be created, the latter is established in the check process
-			self.antibioticWells[media] = {"Positions":[], "Volumes":None, "Reactions Per Tube":None, "Number Total Reactions":0, "Definition Liquid": None}
+			self.antibioticWells[media] = {"Positions":[], "Volumes":None, "Reactions Per Tube":None, "Number Total Reactions":0, "Definition Liquid": None, "Wells Distribute":None}
 			
 			while True: # It is inside of while because the color can be taken already by other media type
 				color_liquid = f"#{random.randint(0, 0xFFFFFF):06x}"
@@ -573,8 +644,12 @@ class SetParameters:
 			else:
 				self.volMaxPipLTiprackL = volMaxTiprackL
 		
-		# We define the max volume of the falcon tubes and the number of wells for the future calculation of how many tube racks are needed
-		if user_variables.nameAntibiotics:
+		# We define the max volume of the falcon tubes (or the reservoir wells) and the number of wells for the future calculation of how many tube racks (or reservoirs) are needed
+		if user_variables.nameAntibiotics and not pd.isna(user_variables.APINameReservoirMedia):
+			first_key = list(opentrons.protocol_api.labware.get_labware_definition(user_variables.APINameReservoirMedia)["wells"].keys())[0]
+			self.volMaxTubeRack = opentrons.protocol_api.labware.get_labware_definition(user_variables.APINameReservoirMedia)["wells"][first_key]["totalLiquidVolume"]
+			self.wellsTubeRack = len(opentrons.protocol_api.labware.get_labware_definition(user_variables.APINameReservoirMedia)["wells"])
+		elif user_variables.nameAntibiotics:
 			first_key = list(opentrons.protocol_api.labware.get_labware_definition(user_variables.APINameFalconPlate)["wells"].keys())[0]
 			self.volMaxTubeRack = opentrons.protocol_api.labware.get_labware_definition(user_variables.APINameFalconPlate)["wells"][first_key]["totalLiquidVolume"]
 			self.wellsTubeRack = len(opentrons.protocol_api.labware.get_labware_definition(user_variables.APINameFalconPlate)["wells"])
@@ -663,6 +738,45 @@ def number_tubes_needed (vol_reactive_per_reaction_factor, number_reactions, vol
 	# When the volume can fit every tube (exit from the while loop) we return the number of tubes and the reactions that will fit in every tube
 	return (number_tubes, reactions_per_tube, volumes_tubes)
 
+def labware_accessors (labware):
+	"""
+	Function that will build, once the labware is loaded, the tables of its wells so they do not need to be generated again every time
+	that a well, a column or a row is needed, as it happens with the methods wells(), columns(), rows() and wells_by_name() of the labware
+
+	The tables are immutable: the wells, columns and rows are tuples (in the same order as the labware returns them) and
+	the tables by name are read-only dictionaries, so they can be shared by all the parts of the script without being modified by mistake
+
+	1 mandatory argument is needed for this function
+	"""
+	return MappingProxyType({"Wells":tuple(labware.wells()),
+							 "Columns":tuple(tuple(column) for column in labware.columns()),
+							 "Rows":tuple(tuple(row) for row in labware.rows()),
+							 "Wells By Name":MappingProxyType(dict(labware.wells_by_name())),
+							 "Columns By Name":MappingProxyType({name_column:tuple(column) for name_column, column in labware.columns_by_name().items()}),
+							 "Rows By Name":MappingProxyType({name_row:tuple(row) for name_row, row in labware.rows_by_name().items()})})
+
+def channel_groups_columns (columns, number_channels = 8):
+	"""
+	Function that will return the groups of wells of the given columns that the channels of a multi-channel pipette reach at once
+
+	In a labware with as many rows as channels every column is a group. In a labware with a multiple of them, for example a 384-well plate with 16 rows and an 8-channel pipette,
+	the channels are separated by several rows, so every column has one group for each of its first rows (A1 and B1 in a 384-well plate) and the groups are interleaved
+
+	The groups are returned column by column and, inside every column, by their first row. The first element of every group is the well in which the pipette is placed
+
+	1 mandatory argument and 1 optional are needed for this function
+	"""
+	groups = []
+	for column in columns:
+		if len(column) % number_channels != 0:
+			raise Exception(f"The columns of the labware have {len(column)} wells, so they cannot be reached by the {number_channels} channels of the pipette. The number of rows of the labware needs to be a multiple of the channels")
+
+		rows_between_channels = len(column) // number_channels
+		for first_row in range(rows_between_channels):
+			groups.append(column[first_row::rows_between_channels])
+
+	return groups
+
 def generator_positions (labware_wells_name):
 	"""
 	Function that will return the next element everytime is called from a given list
@@ -1071,6 +1185,236 @@ def distribute_z_tracking_falcon15_50ml (pipette_used, tip_rack_pipette, deck_si
 	# Return the remaining volume in the tube used in case it had more than needed and wants to be used again
 	return vol_source
 
+def find_safe_reservoir_height (vol_well, theory_position):
+	"""
+	This function will return the height in which the pipette should aspirate the volume of a reservoir well without getting the tips too wet but in the liquid
+
+	The height of the liquid is calculated with the volume and the area of the well, so it works with rectangular (troughs) and circular wells of straight walls
+
+	This function takes 2 inputs, the reservoir well and the volume it has and will return the same position with the according height
+	"""
+
+	# Area of the well, in mm2, from its dimensions
+	if theory_position.diameter != None:
+		area_well = math.pi*(theory_position.diameter/2)**2
+	else:
+		area_well = theory_position.length*theory_position.width
+	
+	# The tips go 2mm under the surface of the liquid and never lower than 1mm from the bottom
+	height_liquid = vol_well/area_well # The volumes are in uL, i.e., mm3
+	final_position = theory_position.bottom(z = max(height_liquid-2, 1))
+	
+	return final_position
+
+def distribute_z_tracking_reservoir (pipette_used, tip_rack_pipette, deck_situation, vol_source, vol_distribute_well, pos_source, pos_final, protocol, vol_max_transfer, new_tip = "never", replace_tiprack = False, initial_tip_pip = "A1", same_tiprack = False, touch_tip = False):
+	"""
+	Function that will distribute with a pipette (pipette_used) the same volume (vol_distribute_well) from 1 reservoir well (pos_source) to a list of 1 or more final positions (pos_final) tracking the height of aspiration
+	in the reservoir well by tracking its current volume.
+
+	With a multi-channel pipette the final positions are the first well of each final column and every channel takes vol_distribute_well from the reservoir well, so the well needs to be reached by all the channels, for example, the troughs of a reservoir
+
+	For that purpose is needed to provide different information to the function:
+		- pipette_used: pipette that is going to be used to transfer the volumes
+		- tip_rack_pipette: the API name of the tiprack that is going to be defined in case that the pipette is out of tips
+		- deck_situation: dictionary that represents the slot as keys and the loaded labware that is in each of them as values. It is used in case a tiprack needs to be defined
+		- vol_source: initial volume of the reservoir well
+		- vol_distribute_well: volume that is going to be transferred to each one of the final wells
+		- pos_source: reservoir well with the volume to distribute
+		- pos_final: list of final positions to distribute the volume to
+		- protocol: the opentrons protocol context of the script
+		- vol_max_transfer: the maximum volume that can be transferred with pipette_used in 1 aspiration, for example, the max of the pipette or the maximum of the tips attached to the pipette
+		- new_tip: optional argument that establish when the tip should be changed. It can be every time it aspirates (aspirate), every time the pipette goes to the final position (well) or never (never). By default is set as never
+		- replace_tiprack: optional argument that establish that once a tip rack is empty, if this one should be replaced or 1 additional tip rack should be added to the protocol deck. By default is set as False
+		- initial_tip_pip: optional argument that establish in case that a tiprack is defined for the first time this will set which tip should be picked first, by default is set as "A1"
+		- same_tiprack: optional argument that establish defines that both pipettes set during the protocol have the same tip rack attached. By default is set as False
+		- touch_tip: optional argument that establish that during the transfer there would be a touch tip in the source and final position
+
+	The function returns the volume left in the reservoir well
+	"""
+
+	# Check that the new_tip argument has a correct value
+	if new_tip not in ["never", "aspirate", "well"]:
+		raise Exception("The argument new_tip only accepts 3 values: never, aspirate, well")
+
+	# Check if actually the pipette can transfer vol_distribute_well
+	if vol_distribute_well < pipette_used.min_volume:
+		raise Exception(f"The pipette {pipette_used} cannot transfer the volume assigned for each well, {vol_distribute_well}ul")
+	
+	# Every channel of the pipette takes the volume from the same reservoir well
+	# Because we are using floats and there is the problem of the error caused when doing floating-point arithmetic we are going to give a range of error in the substractions
+	if vol_source - len(pos_final)*vol_distribute_well*pipette_used.channels < -0.001:
+		raise Exception(f"Not enough volume in the source reservoir well, {vol_source}uL, to distribute {vol_distribute_well}uL to {len(pos_final)} positions with {pipette_used.channels} channel(s)")
+	
+	# Number of final positions that are distributed with 1 aspiration, if the volume does not fit in 1 aspiration the distribute splits it
+	if new_tip == "well" or vol_distribute_well > vol_max_transfer:
+		number_pos_distr = 1
+	else:
+		number_pos_distr = int(vol_max_transfer/vol_distribute_well)
+	
+	for start_position in range(0, len(pos_final), number_pos_distr):
+		position_distribute = pos_final[start_position:start_position+number_pos_distr]
+		
+		# It wont have a tip if the new_tip is aspirate or well or if it is the first time it gets into the function
+		if not pipette_used.has_tip:
+			check_tip_and_pick (pipette_used,
+								tip_rack_pipette,
+								deck_situation,
+								protocol,
+								replace_tiprack = replace_tiprack,
+								initial_tip = initial_tip_pip,
+								same_tiprack = same_tiprack)
+		
+		# The height of aspiration is the one of the volume that is left after the aspiration so the tips are in the liquid until the end of it
+		vol_source = vol_source - len(position_distribute)*vol_distribute_well*pipette_used.channels
+		pipette_used.distribute(vol_distribute_well, find_safe_reservoir_height(vol_source, pos_source), position_distribute, new_tip = "never", disposal_volume = 0, touch_tip = touch_tip)
+		
+		if new_tip != "never":
+			pipette_used.drop_tip()
+	
+	return vol_source
+
+def set_liquid_class (pipettes, liquid_class, liquid_classes, default_flow_rates, protocol):
+	"""
+	Function that will set the aspirate, dispense and blow out flow rates of the given pipettes to the ones of a liquid class
+	and the seconds that the pipettes wait after every aspiration and dispense
+
+	The rates of the liquid classes are factors of the default flow rates of each pipette, so the same liquid class can be used with any pipette,
+	or 'max' to use the maximum flow rate of the pipette. No rate is set higher than the maximum flow rate of the pipette
+	If the liquid class is None, the default flow rates of the pipettes are restored and the delays are removed
+
+	The delays replace the aspirate and dispense of the pipettes by ones that wait after them, which is only done in the versions of Opentrons
+	where it has been checked that the transfers, distributions and mixes call the aspirate and dispense of the pipette, so they also perform the delays
+
+	5 mandatory arguments are needed for this function
+	"""
+	# Maximum flow rates of aspiration, dispense and blow out, in uL/s, of the pipettes of the OT-2 as they are in their definitions
+	max_flow_rates = {"p10_single":[50, 50, 1000], "p10_multi":[50, 50, 1000], "p50_single":[100, 100, 1000], "p50_multi":[100, 100, 1000],
+					  "p300_single":[600, 600, 1000], "p300_multi":[600, 600, 1000], "p1000_single":[2000, 2000, 1000],
+					  "p20_single_gen2":[24, 24, 24], "p20_multi_gen2":[24, 24, 24], "p300_single_gen2":[275, 275, 275],
+					  "p300_multi_gen2":[275, 275, 275], "p1000_single_gen2":[812, 812, 812]}
+
+	# Check that the liquid class is one of the defined ones
+	if liquid_class != None and liquid_class not in liquid_classes.keys():
+		raise Exception(f"The liquid class '{liquid_class}' is not defined. The liquid classes defined are: {', '.join(liquid_classes.keys())}")
+
+	# Major versions of Opentrons in which the transfers, distributions and mixes call the aspirate and dispense of the pipette
+	versions_with_delays = [6, 7, 8]
+
+	if liquid_class == None:
+		factors_class = {"Aspirate Rate":1, "Dispense Rate":1, "Blow Out Rate":1, "Aspirate Delay":0, "Dispense Delay":0}
+	else:
+		factors_class = liquid_classes[liquid_class]
+
+	# Check that the delays will be performed in the complex commands of the installed version of Opentrons
+	if factors_class.get("Aspirate Delay", 0) > 0 or factors_class.get("Dispense Delay", 0) > 0:
+		import opentrons
+		version_opentrons = str(getattr(opentrons, "__version__", "unknown"))
+		if version_opentrons.split(".")[0] not in [str(version) for version in versions_with_delays]:
+			raise Exception(f"The liquid class '{liquid_class}' has delays, which can only be performed with the major versions {', '.join([str(version) for version in versions_with_delays])} of Opentrons and the installed one is {version_opentrons}. Set the delays of the liquid class to 0 or use one of those versions")
+
+	def with_delay (command, seconds):
+		# Command of the pipette that performs the given one and then waits the seconds of the liquid class
+		def command_and_delay (*args, **kwargs):
+			result_command = command(*args, **kwargs)
+			protocol.delay(seconds = seconds)
+			return result_command
+		return command_and_delay
+
+	# Set the rates and delays in all the pipettes that have been loaded
+	for pipette in pipettes:
+		if pipette == None:
+			continue
+
+		if pipette.name not in max_flow_rates.keys():
+			raise Exception(f"The maximum flow rates of the pipette '{pipette.name}' are not known, so a liquid class cannot be set in it. The pipettes contemplated are: {', '.join(max_flow_rates.keys())}")
+
+		rates_pipette = {}
+		for index_rate, name_rate in enumerate(["Aspirate", "Dispense", "Blow Out"]):
+			max_rate = max_flow_rates[pipette.name][index_rate]
+			if factors_class[f"{name_rate} Rate"] == "max":
+				rates_pipette[name_rate] = max_rate
+			else:
+				rates_pipette[name_rate] = min(default_flow_rates[pipette.mount][name_rate]*factors_class[f"{name_rate} Rate"], max_rate)
+		pipette.flow_rate.aspirate = rates_pipette["Aspirate"]
+		pipette.flow_rate.dispense = rates_pipette["Dispense"]
+		pipette.flow_rate.blow_out = rates_pipette["Blow Out"]
+
+		# The delays replace the aspirate and dispense of this pipette by ones that wait after them, the ones of a previous liquid class are removed first
+		pipette.__dict__.pop("aspirate", None)
+		pipette.__dict__.pop("dispense", None)
+		if factors_class.get("Aspirate Delay", 0) > 0:
+			pipette.aspirate = with_delay(pipette.aspirate, factors_class["Aspirate Delay"])
+		if factors_class.get("Dispense Delay", 0) > 0:
+			pipette.dispense = with_delay(pipette.dispense, factors_class["Dispense Delay"])
+
+	return
+
+def liquid_classes_table_to_dict (table_classes, table_reagents, reagents, touch_tip = True):
+	"""
+	Function that will check the sheets LiquidClasses and ReagentLiquidClasses of a variable file and return them as 2 dictionaries,
+	one with the liquid classes and their rates, delays and touch tip and another one with the liquid class of each reagent
+
+	The rates can be a factor of the default flow rate of the pipette or 'max', and the delays, in seconds, are 0 if left empty
+	The column 'Touch Tip' is only read if touch_tip is True. If it is left empty in a class, its value is None
+	If a table is not given (it is not a DataFrame), its dictionary is None
+
+	3 mandatory arguments are needed for this function and 1 optional
+	"""
+	columns_rates = ["Aspirate Rate", "Dispense Rate", "Blow Out Rate"]
+	columns_delays = ["Aspirate Delay", "Dispense Delay"]
+	values_true = ["true", "TRUE", "True", 1, True]
+	values_false = ["false", "FALSE", "False", 0, False]
+
+	liquid_classes = None
+	if isinstance(table_classes, pd.DataFrame):
+		if not all(item in list(table_classes.columns) for item in ["Liquid Class"] + columns_rates + (["Touch Tip"] if touch_tip else [])):
+			raise Exception(f"'LiquidClasses' sheet table needs to have the columns: {', '.join(['Liquid Class'] + columns_rates + (['Touch Tip'] if touch_tip else []))}. The columns {' and '.join(columns_delays)} are optional")
+		if table_classes[["Liquid Class"] + columns_rates].isna().any().any():
+			raise Exception(f"The columns {', '.join(['Liquid Class'] + columns_rates)} of the sheet 'LiquidClasses' cannot have empty cells")
+		if pd.Series(table_classes["Liquid Class"].values).is_unique == False:
+			raise Exception("The values of the column 'Liquid Class' in the sheet 'LiquidClasses' have to be unique")
+
+		liquid_classes = {}
+		for row in table_classes.to_dict("records"):
+			values_class = {}
+			for column in columns_rates:
+				if str(row[column]).strip().lower() == "max":
+					values_class[column] = "max"
+				elif pd.api.types.is_number(row[column]) and row[column] > 0:
+					values_class[column] = row[column]
+				else:
+					raise Exception(f"The values of the columns {', '.join(columns_rates)} in the sheet 'LiquidClasses' have to be greater than 0 or 'max'")
+			for column in columns_delays:
+				if column not in row.keys() or pd.isna(row[column]):
+					values_class[column] = 0
+				elif pd.api.types.is_number(row[column]) and row[column] >= 0:
+					values_class[column] = row[column]
+				else:
+					raise Exception(f"The values of the columns {' and '.join(columns_delays)} in the sheet 'LiquidClasses' are seconds and cannot be negative. If left empty, 0 is assumed")
+			if touch_tip:
+				if pd.isna(row["Touch Tip"]):
+					values_class["Touch Tip"] = None
+				elif row["Touch Tip"] in values_true + values_false:
+					values_class["Touch Tip"] = row["Touch Tip"] in values_true
+				else:
+					raise Exception("The column 'Touch Tip' of the sheet 'LiquidClasses' only accepts 2 values, True or False. If left empty, the touch tip variables of the protocol will be used")
+			liquid_classes[row["Liquid Class"]] = values_class
+
+	reagent_liquid_classes = None
+	if isinstance(table_reagents, pd.DataFrame):
+		if not all(item in list(table_reagents.columns) for item in ["Reagent", "Liquid Class"]):
+			raise Exception("'ReagentLiquidClasses' sheet table needs to have 2 columns: 'Reagent' and 'Liquid Class'")
+		if table_reagents[["Reagent", "Liquid Class"]].isna().any().any():
+			raise Exception("None of the cells of the sheet 'ReagentLiquidClasses' can be left empty")
+		if pd.Series(table_reagents["Reagent"].values).is_unique == False:
+			raise Exception("The values of the column 'Reagent' in the sheet 'ReagentLiquidClasses' have to be unique")
+		if not all(reagent in reagents for reagent in table_reagents["Reagent"].values):
+			raise Exception(f"The values of the column 'Reagent' in the sheet 'ReagentLiquidClasses' can only be: {', '.join(reagents)}")
+
+		reagent_liquid_classes = dict(zip(table_reagents["Reagent"].values, table_reagents["Liquid Class"].values))
+
+	return liquid_classes, reagent_liquid_classes
+
 def find_safe_15mLfalcon_height (vol_falcon, theory_position):
 	"""
 	This function will return the height in which the pipette should aspirate and or dispense the volume to not get wet while doing it
@@ -1240,7 +1584,7 @@ def run(protocol:opentrons.protocol_api.ProtocolContext):
 			raise Exception("'PipetteVariables' Sheet table needs to have 7 rows with the following names: 'Name Right Pipette (Multichannel)', 'API Name Right Pipette TipRack', 'Name Left Pipette (Singlechannel)', 'API Name Left Pipette TipRack','Initial Tip Left Pipette', 'Initial Tip Right Pipette', 'Replace Tipracks'")
 	
 	# Get initialized user_variables and check for initial errors
-	user_variables = UserVariables(general_variables, plate_variables, pip_variables)
+	user_variables = UserVariables(general_variables, plate_variables, pip_variables, liquid_classes = excel_variables.get("LiquidClasses"), reagent_liquid_classes = excel_variables.get("ReagentLiquidClasses"))
 	user_variables.check()
 
 	# Initialize program_variables and assign the variables using the values inside of user_variable
@@ -1269,10 +1613,11 @@ def run(protocol:opentrons.protocol_api.ProtocolContext):
 			# Set the correspondant labware
 			plate["Position"] = labware[0]
 			plate["Opentrons Place"] = labware[1]
+			plate["Accessors"] = labware_accessors(labware[1])
 			
 			# Set the liquid of samples in the wells that the user has established that are filled with 90% of the maximum volume of that well
-			for well in plate["Opentrons Place"].wells()[plate["Index First Well Sample"]:(plate["Index First Well Sample"]+plate["Number Samples"])]:
-				well.load_liquid(program_variables.liquid_samples, volume = 0.9*plate["Opentrons Place"].wells()[0].max_volume)
+			for well in plate["Accessors"]["Wells"][plate["Index First Well Sample"]:(plate["Index First Well Sample"]+plate["Number Samples"])]:
+				well.load_liquid(program_variables.liquid_samples, volume = 0.9*plate["Accessors"]["Wells"][0].max_volume)
 	
 	# Set the final plates which number has been calculated in the assign_variables method of the class SettedParameters
 	# First lets get the labels
@@ -1291,17 +1636,75 @@ def run(protocol:opentrons.protocol_api.ProtocolContext):
 	for index_labware, labware in enumerate(labware_final.items()):
 		program_variables.incubationPlates[index_labware]["Position"] = labware[0]
 		program_variables.incubationPlates[index_labware]["Opentrons Place"] = labware[1]
+		program_variables.incubationPlates[index_labware]["Accessors"] = labware_accessors(labware[1])
+	
+	# The multi-channel pipette reaches at once groups of wells of a column, the whole column in plates of 8 rows or every other well of a column in the 384-well plates (channel_groups_columns)
+	# The groups of the source columns with samples are placed in the groups of the final plates in the same order, so the source and final plates can have different number of rows
+	for index_source_plate, source_plate in program_variables.samplePlates.items():
+		if source_plate["Only Media"] == False:
+			last_column_sample = math.ceil((source_plate["Index First Well Sample"]+source_plate["Number Samples"])/len(source_plate["Accessors"]["Columns"][0]))
+			source_plate["Groups Samples"] = channel_groups_columns(source_plate["Accessors"]["Columns"][source_plate["First Column Sample"]:last_column_sample], program_variables.pipR.channels)
+			for final_plate in program_variables.incubationPlates.values():
+				if final_plate["Source Plate"] == index_source_plate:
+					final_plate["Groups Channels"] = channel_groups_columns(final_plate["Accessors"]["Columns"], program_variables.pipR.channels)
+					if len(source_plate["Groups Samples"]) > len(final_plate["Groups Channels"]):
+						raise Exception(f"The samples of '{user_variables.nameSourcePlates[index_source_plate]}' need {len(source_plate['Groups Samples'])} groups of {program_variables.pipR.channels} wells and the final plate {user_variables.APINameIncubationPlate} only has {len(final_plate['Groups Channels'])}")
 
 	#----------------------------------------------------------------------------------------------------------------------------------------------------------------------------------------------------------------
-	# Calculate how many falcon labware do we need and set them in the deck
+	# Set the wells of the final plates that are going to be filled with each media
+	for media_type in program_variables.antibioticWells.keys(): # It wont go in the loop if there is no antibiotic to distribute
+		wells_distribute_antibiotic = []
+		first_wells_groups = []
+		
+		for plate_incubation in program_variables.incubationPlates.values():
+			if plate_incubation["Antibiotic"] == media_type:
+				# Find the first well that needs to be filled
+				if program_variables.samplePlates[plate_incubation["Source Plate"]]["Only Media"]:
+					# Set the wells to distribute the sample
+					wells_plate = plate_incubation["Accessors"]["Wells"][program_variables.samplePlates[plate_incubation["Source Plate"]]["Index First Well Sample"]:program_variables.samplePlates[plate_incubation["Source Plate"]]["Index First Well Sample"]+plate_incubation["Number Samples"]]
+				else:
+					# The samples are transferred by groups of wells, so the wells with media are the ones in which the groups place the wells of the source plate that have a sample
+					source_plate = program_variables.samplePlates[plate_incubation["Source Plate"]]
+					final_wells_source = {}
+					for group_source, group_final in zip(source_plate["Groups Samples"], plate_incubation["Groups Channels"]):
+						final_wells_source.update(zip(group_source, group_final))
+					wells_samples_final = set(final_wells_source[well] for well in source_plate["Accessors"]["Wells"][source_plate["Index First Well Sample"]:source_plate["Index First Well Sample"]+plate_incubation["Number Samples"]])
+					
+					# Set the wells to distribute the sample in the order of the final plate
+					wells_plate = [well for well in plate_incubation["Accessors"]["Wells"] if well in wells_samples_final]
+				wells_distribute_antibiotic += wells_plate
+				
+				# The multi-channel pipette distributes the media from a reservoir to the groups of wells that its channels reach at once, so in that case we only need the first well of the groups that have some of these wells
+				if not pd.isna(user_variables.APINameReservoirMedia):
+					first_well_groups_plate = {well:group[0] for group in channel_groups_columns(plate_incubation["Accessors"]["Columns"], program_variables.pipR.channels) for well in group}
+					for well in wells_plate:
+						if first_well_groups_plate[well] not in first_wells_groups:
+							first_wells_groups.append(first_well_groups_plate[well])
+		
+		if pd.isna(user_variables.APINameReservoirMedia):
+			program_variables.antibioticWells[media_type]["Wells Distribute"] = wells_distribute_antibiotic
+		else:
+			program_variables.antibioticWells[media_type]["Wells Distribute"] = first_wells_groups
+			program_variables.antibioticWells[media_type]["Number Total Reactions"] = len(first_wells_groups)
+	
+	#----------------------------------------------------------------------------------------------------------------------------------------------------------------------------------------------------------------
+	# Calculate how many falcon labware (or reservoirs) do we need and set them in the deck
 
 	# First we need to know the max reactive tube volume
 	# For that we need to know the maximum volume of the tubes and how many tubes of the reactives we need in total
 	# It is only going to the enter the following condition if there is at least 1 plate that is going to have media
 	if len(program_variables.antibioticWells) != 0: # It will go in only if there is some media to store in the falcon tube racks
+		# From a reservoir every channel of the multi-channel pipette takes the volume of 1 well of the column
+		if pd.isna(user_variables.APINameReservoirMedia):
+			volume_reaction_media = user_variables.volumeAntibiotic
+			labware_media = user_variables.APINameFalconPlate
+		else:
+			volume_reaction_media = user_variables.volumeAntibiotic*program_variables.pipR.channels
+			labware_media = user_variables.APINameReservoirMedia
+		
 		total_falcons_media = 0 # Initialize
 		for antibiotic_type in program_variables.antibioticWells.keys():
-			number_tubes, program_variables.antibioticWells[antibiotic_type]["Reactions Per Tube"], program_variables.antibioticWells[antibiotic_type]["Volumes"] = number_tubes_needed(user_variables.volumeAntibiotic,
+			number_tubes, program_variables.antibioticWells[antibiotic_type]["Reactions Per Tube"], program_variables.antibioticWells[antibiotic_type]["Volumes"] = number_tubes_needed(volume_reaction_media,
 																																														program_variables.antibioticWells[antibiotic_type]["Number Total Reactions"],
 																																														0.9*program_variables.volMaxTubeRack)
 			# The 0.9 max well volume is only to not overfill the volume and give space to put more liquid so the pipetting is assure
@@ -1311,7 +1714,7 @@ def run(protocol:opentrons.protocol_api.ProtocolContext):
 		tuberacks_needed = math.ceil(total_falcons_media/program_variables.wellsTubeRack)
 		
 		labware_falcons = setting_labware(tuberacks_needed,
-										  user_variables.APINameFalconPlate,
+										  labware_media,
 										  dict(zip(protocol.deck.keys(),protocol.deck.values())),
 										  protocol, label = "Reactive Labware")
 		
@@ -1331,165 +1734,182 @@ def run(protocol:opentrons.protocol_api.ProtocolContext):
 	
 	#----------------------------------------------------------------------------------------------------------------------------------------------------------------------------------------------------------------
 	# Distribute the media to their corresponding plates
+	# The medias are distributed from the falcons with the single-channel pipette or from the reservoir with the multi-channel pipette
+	if pd.isna(user_variables.APINameReservoirMedia):
+		pipette_media = program_variables.pipL
+		tiprack_media = user_variables.APINameTipL
+		starting_tip_media = user_variables.startingTipPipL
+		max_volume_media = program_variables.volMaxPipLTiprackL
+	else:
+		pipette_media = program_variables.pipR
+		tiprack_media = user_variables.APINameTipR
+		starting_tip_media = user_variables.startingTipPipR
+		max_volume_media = program_variables.volMaxPipRTiprackR
+	
 	for media_type in program_variables.antibioticWells.keys(): # It wont go in the loop if there is no antibiotic to distribute
-		if program_variables.pipL.has_tip == False:
-			check_tip_and_pick(program_variables.pipL,
-							   user_variables.APINameTipL,
+		if pipette_media.has_tip == False:
+			check_tip_and_pick(pipette_media,
+							   tiprack_media,
 							   dict(zip(protocol.deck.keys(), protocol.deck.values())),
-							   protocol, initial_tip = user_variables.startingTipPipL,
+							   protocol, initial_tip = starting_tip_media,
 							   replace_tiprack = user_variables.replaceTiprack,
 							   same_tiprack = program_variables.sameTiprack)
 		
-		wells_distribute_antibiotic = []
+		# Set the flow rates of the liquid class of the media and its touch tip, if the class establishes it
+		set_liquid_class([program_variables.pipR, program_variables.pipL], program_variables.reagentLiquidClasses[media_type], program_variables.liquidClasses, program_variables.defaultFlowRates, protocol)
+		if program_variables.liquidClasses[program_variables.reagentLiquidClasses[media_type]]["Touch Tip"] != None:
+			touch_tip_media = program_variables.liquidClasses[program_variables.reagentLiquidClasses[media_type]]["Touch Tip"]
+		else:
+			touch_tip_media = user_variables.touchTipDistributeMedia
+		
+		wells_distribute_antibiotic = list(program_variables.antibioticWells[media_type]["Wells Distribute"])
 		
-		for plate_incubation in program_variables.incubationPlates.values():
-			if plate_incubation["Antibiotic"] == media_type:
-				# Find the first well that needs to be filled
-				if program_variables.samplePlates[plate_incubation["Source Plate"]]["Only Media"]:
-					# Set the wells to distribute the sample
-					wells_distribute_antibiotic += plate_incubation["Opentrons Place"].wells()[program_variables.samplePlates[plate_incubation["Source Plate"]]["Index First Well Sample"]:program_variables.samplePlates[plate_incubation["Source Plate"]]["Index First Well Sample"]+plate_incubation["Number Samples"]]
-				else:
-					# Because we are going to transfer samples and we are going to start at the beginning of the plate we need to know the row we start to distribute that media
-					row_well_initial = plate_incubation["Opentrons Place"].wells()[program_variables.samplePlates[plate_incubation["Source Plate"]]["Index First Well Sample"]]._core._row_name
-					index_row_initial = list(plate_incubation["Opentrons Place"].rows_by_name().keys()).index(row_well_initial)
-					
-					# Set the wells to distribute the sample
-					wells_distribute_antibiotic += plate_incubation["Opentrons Place"].wells()[index_row_initial:index_row_initial+plate_incubation["Number Samples"]]
-
 		# Distribute the media
 		# We are going to use a for loop because we have calculated before how many tubes are needed and how many reactions are going to be distributed from each one
 		for index_tube, reactions_tube in enumerate(program_variables.antibioticWells[media_type]["Reactions Per Tube"]):
-			if user_variables.changeTipDistribute in ["tube", "aspirate", "well"] and index_tube != 0:
-				program_variables.pipL.drop_tip()
-				# We dont need to pick another because the function 'distribute_z_tracking_falcon15_50ml' will pick one if needed
-
-			if len(wells_distribute_antibiotic) <= reactions_tube: # There are enough volume in the tube to only transfer from this tube
-				program_variables.antibioticWells[media_type]["Volumes"][index_tube] = distribute_z_tracking_falcon15_50ml (program_variables.pipL,
-																															user_variables.APINameTipL,
-																															dict(zip(protocol.deck.keys(),protocol.deck.values())),
-																															program_variables.antibioticWells[media_type]["Volumes"][index_tube],
-																															user_variables.volumeAntibiotic,
-																															program_variables.antibioticWells[media_type]["Positions"][index_tube],
-																															wells_distribute_antibiotic, # This is the different part from the distribute function from the else part
-																															program_variables.antibioticWells[media_type]["Positions"][index_tube].max_volume,
-																															protocol,
-																															program_variables.volMaxPipLTiprackL,
-																															new_tip = program_variables.argumentNewTipDistribute,
-																															replace_tiprack = user_variables.replaceTiprack,
-																															initial_tip_pip = user_variables.startingTipPipL,
-																															same_tiprack = program_variables.sameTiprack,
-																															touch_tip = user_variables.touchTipDistributeMedia)
-				# We dont delete the wells we have distributed to because they are all of them
-				reactions_tube -= len(wells_distribute_antibiotic)
-			else: # There is not enough volume in the tube so we will need part of this tube and from the next one
-				program_variables.antibioticWells[media_type]["Volumes"][index_tube] = distribute_z_tracking_falcon15_50ml (program_variables.pipL,
-																															user_variables.APINameTipL,
+			if user_variables.changeTipDistribute in ["tube", "aspirate", "well"] and index_tube != 0 and pipette_media.has_tip:
+				pipette_media.drop_tip()
+				# We dont need to pick another because the distribute functions will pick one if needed
+			
+			# The tube (or reservoir well) fills the next reactions_tube wells
+			if pd.isna(user_variables.APINameReservoirMedia):
+				program_variables.antibioticWells[media_type]["Volumes"][index_tube] = distribute_z_tracking_falcon15_50ml (pipette_media,
+																															tiprack_media,
 																															dict(zip(protocol.deck.keys(),protocol.deck.values())),
 																															program_variables.antibioticWells[media_type]["Volumes"][index_tube],
 																															user_variables.volumeAntibiotic,
 																															program_variables.antibioticWells[media_type]["Positions"][index_tube],
-																															wells_distribute_antibiotic[:reactions_tube], # This is the different part from the distribute function from the if part
+																															wells_distribute_antibiotic[:reactions_tube],
 																															program_variables.antibioticWells[media_type]["Positions"][index_tube].max_volume,
 																															protocol,
-																															program_variables.volMaxPipLTiprackL,
+																															max_volume_media,
 																															new_tip = program_variables.argumentNewTipDistribute,
 																															replace_tiprack = user_variables.replaceTiprack,
-																															initial_tip_pip = user_variables.startingTipPipL,
+																															initial_tip_pip = starting_tip_media,
 																															same_tiprack = program_variables.sameTiprack,
-																															touch_tip = user_variables.touchTipDistributeMedia)
-				del wells_distribute_antibiotic[:reactions_tube]
-				reactions_tube -= len(wells_distribute_antibiotic) # It will end up being 0 because we will need the next tube(s) as well to distribute to all the wells
+																															touch_tip = touch_tip_media)
+			else:
+				program_variables.antibioticWells[media_type]["Volumes"][index_tube] = distribute_z_tracking_reservoir (pipette_media,
+																														tiprack_media,
+																														dict(zip(protocol.deck.keys(),protocol.deck.values())),
+																														program_variables.antibioticWells[media_type]["Volumes"][index_tube],
+																														user_variables.volumeAntibiotic,
+																														program_variables.antibioticWells[media_type]["Positions"][index_tube],
+																														wells_distribute_antibiotic[:reactions_tube],
+																														protocol,
+																														max_volume_media,
+																														new_tip = program_variables.argumentNewTipDistribute,
+																														replace_tiprack = user_variables.replaceTiprack,
+																														initial_tip_pip = starting_tip_media,
+																														same_tiprack = program_variables.sameTiprack,
+																														touch_tip = touch_tip_media)
+			del wells_distribute_antibiotic[:reactions_tube]
 		
-		# Per each media we are going to drop the tip because the function distribute_z_tracking_falcon15_50ml keeps the last tip used unless changetip is never
-		if user_variables.changeTipDistribute != "never" and program_variables.pipL.has_tip:
-			program_variables.pipL.drop_tip()
+		# Per each media we are going to drop the tip because the distribute functions keep the last tip used unless changetip is never
+		if user_variables.changeTipDistribute != "never" and pipette_media.has_tip:
+			pipette_media.drop_tip()
 	
 	# Now that we have finished distributing the media, if needed, we need to drop the tip that will be attached in case the changetip was never
-	# We ar eonly going to do that if the pipette is defined
-	if program_variables.pipL != None:
-		if program_variables.pipL.has_tip:
-			program_variables.pipL.drop_tip()
+	# We ar eonly going to do that if the pipette is defined, the multi-channel one is the one that distributes if the medias are in a reservoir
+	for pipette in [program_variables.pipL, program_variables.pipR]:
+		if pipette != None and pipette.has_tip:
+			pipette.drop_tip()
 
 	#----------------------------------------------------------------------------------------------------------------------------------------------------------------------------------------------------------------
 	# Transfer samples to different plates
-	for final_plate in program_variables.incubationPlates.values():
-		# Check if for this final plate samples need to be transfered
-		if program_variables.samplePlates[final_plate["Source Plate"]]["Only Media"] == True: # There could be mixed types of final plates
+	set_liquid_class([program_variables.pipR, program_variables.pipL], program_variables.reagentLiquidClasses["Samples"], program_variables.liquidClasses, program_variables.defaultFlowRates, protocol)
+	for index_source_plate, source_plate in program_variables.samplePlates.items():
+		# Check if for this source plate samples need to be transfered
+		if source_plate["Only Media"] == True: # There could be mixed types of final plates
 			continue
-
-		# We need to see how many movements are needed to transfer all the volume of sample to the final wells because we need to change tip every time we dispense in a well
-		movements = math.ceil(user_variables.volumeSample/program_variables.volMaxPipRTiprackR)
-		# Calculate how much volume every movement should transfer
-		vol_per_movement = user_variables.volumeSample/movements
 		
-		# Calculate how many columns are we trasnfering
-		number_column_samples = math.ceil(final_plate["Number Samples"]/program_variables.pipR.channels)
-
-		# Either if the new tip is plate or is the first time it goes into the function, we will pick a tip
-		if program_variables.pipR.has_tip == False:
-			check_tip_and_pick(program_variables.pipR,
-							   user_variables.APINameTipR,
-							   dict(zip(protocol.deck.keys(),protocol.deck.values())),
-							   protocol,
-							   replace_tiprack = user_variables.replaceTiprack,
-							   initial_tip = user_variables.startingTipPipR,
-							   same_tiprack = program_variables.sameTiprack)
+		final_plates_source = [final_plate for final_plate in program_variables.incubationPlates.values() if final_plate["Source Plate"] == index_source_plate]
+		
+		# If the sample is dispensed in the top of the wells the tip does not touch the media, so all the final plates of this source plate (replicas and medias) are filled at the same time
+		# and the same aspiration of a source column is dispensed in as many final plates as the tip can hold the volume of sample of
+		# Otherwise the tip goes into the media, so an aspiration is never dispensed in more than 1 final plate and every final plate is filled on its own, as in the previous versions,
+		# with 'Change Tip In Sample Transfer' deciding when the tip that has been in the media is replaced
+		if user_variables.positionTransferSample == "top":
+			groups_final_plates = [final_plates_source]
+			plates_per_aspiration = int(program_variables.volMaxPipRTiprackR // user_variables.volumeSample)
+		else:
+			groups_final_plates = [[final_plate] for final_plate in final_plates_source]
+			plates_per_aspiration = min(int(program_variables.volMaxPipRTiprackR // user_variables.volumeSample), 1)
 		
-		# Iterate over the columns to transfer
-		for index_column in range(number_column_samples):
-			# We pick a tip if needed
+		# Every group of the source plate is mixed only once, before its first aspiration, even if the final plates are filled one after the other
+		groups_mixed = []
+		
+		for group_final_plates in groups_final_plates:
+			# Either if the new tip is plate or is the first time it goes into the function, we will pick a tip
 			if program_variables.pipR.has_tip == False:
 				check_tip_and_pick(program_variables.pipR,
 								   user_variables.APINameTipR,
-								   dict(zip(protocol.deck.keys(), protocol.deck.values())),
+								   dict(zip(protocol.deck.keys(),protocol.deck.values())),
 								   protocol,
 								   replace_tiprack = user_variables.replaceTiprack,
 								   initial_tip = user_variables.startingTipPipR,
 								   same_tiprack = program_variables.sameTiprack)
 			
-			for _ in range(movements): # Iterate through the ammount of the times we need to transfer the samples
-				# We pick a tip if needed
-				if program_variables.pipR.has_tip == False:
-					check_tip_and_pick(program_variables.pipR,
-									   user_variables.APINameTipR,
-									   dict(zip(protocol.deck.keys(), protocol.deck.values())),
-									   protocol,
-									   replace_tiprack = user_variables.replaceTiprack,
-									   initial_tip = user_variables.startingTipPipR,
-									   same_tiprack = program_variables.sameTiprack)
-				
-				# First we check that the mixing volume is not higher than the volume the pipette can aspirate
-				if not pd.isna(user_variables.volumeMixing):
-					if user_variables.volumeMixing > program_variables.pipR.max_volume: # This is only going to be checked if the user has decided to mix previously
-						raise Exception(f"'Volume of Sample to Transfer (uL)' is going to be transfered with {program_variables.pipR}. This pipette cannot mix {user_variables.volumeMixing}, try another combination of variables")
-					program_variables.pipR.mix(user_variables.timesMixing,
-											   user_variables.volumeMixing,
-											   program_variables.samplePlates[final_plate["Source Plate"]]["Opentrons Place"].columns()[program_variables.samplePlates[final_plate["Source Plate"]]["First Column Sample"]+index_column][0],
-											   rate = user_variables.rateMixing)
+			# Iterate over the groups of wells of the source columns to transfer, the whole columns or, in a 384-well plate, every other well of the columns
+			for index_group, source_group in enumerate(source_plate["Groups Samples"]):
 				
-				if user_variables.positionTransferSample == "top":
-					final_position = final_plate["Opentrons Place"].columns()[index_column][0].top()
-				elif user_variables.positionTransferSample == "center":
-					final_position = final_plate["Opentrons Place"].columns()[index_column][0].center()
+				# Establish the aspirations for this column, each one is the volume dispensed in every final plate and the final plates
+				aspirations_column = []
+				if plates_per_aspiration >= 1: # The volume of 1 or several final plates fit in the tip
+					for index_first_plate in range(0, len(group_final_plates), plates_per_aspiration):
+						aspirations_column.append((user_variables.volumeSample, group_final_plates[index_first_plate:index_first_plate+plates_per_aspiration]))
 				else:
-					final_position = final_plate["Opentrons Place"].columns()[index_column]
+					# We need to see how many movements are needed to transfer all the volume of sample to every final well
+					movements = math.ceil(user_variables.volumeSample/program_variables.volMaxPipRTiprackR)
+					for final_plate in group_final_plates:
+						aspirations_column += [(user_variables.volumeSample/movements, [final_plate])]*movements
 				
-				program_variables.pipR.transfer(vol_per_movement,
-												program_variables.samplePlates[final_plate["Source Plate"]]["Opentrons Place"].columns()[program_variables.samplePlates[final_plate["Source Plate"]]["First Column Sample"]+index_column],
-												final_position,
-												new_tip = "never")
-				
-				if user_variables.touchTipTransferSample:
-					program_variables.pipR.touch_tip(final_plate["Opentrons Place"].columns()[index_column][0])
+				for volume_dispense, final_plates_aspiration in aspirations_column: # Iterate through the ammount of the times we need to aspirate the samples
+					# We pick a tip if needed
+					if program_variables.pipR.has_tip == False:
+						check_tip_and_pick(program_variables.pipR,
+										   user_variables.APINameTipR,
+										   dict(zip(protocol.deck.keys(), protocol.deck.values())),
+										   protocol,
+										   replace_tiprack = user_variables.replaceTiprack,
+										   initial_tip = user_variables.startingTipPipR,
+										   same_tiprack = program_variables.sameTiprack)
+					
+					# The source group is only mixed before its first aspiration
+					if not pd.isna(user_variables.volumeMixing) and index_group not in groups_mixed:
+						# First we check that the mixing volume is not higher than the volume the pipette can aspirate
+						if user_variables.volumeMixing > program_variables.pipR.max_volume: # This is only going to be checked if the user has decided to mix previously
+							raise Exception(f"'Volume of Sample to Transfer (uL)' is going to be transfered with {program_variables.pipR}. This pipette cannot mix {user_variables.volumeMixing}, try another combination of variables")
+						program_variables.pipR.mix(user_variables.timesMixing,
+												   user_variables.volumeMixing,
+												   source_group[0],
+												   rate = user_variables.rateMixing)
+						groups_mixed.append(index_group)
+					
+					program_variables.pipR.aspirate(volume_dispense*len(final_plates_aspiration), source_group[0])
+					
+					for final_plate in final_plates_aspiration:
+						if user_variables.positionTransferSample == "top":
+							final_position = final_plate["Groups Channels"][index_group][0].top()
+						elif user_variables.positionTransferSample == "center":
+							final_position = final_plate["Groups Channels"][index_group][0].center()
+						else:
+							final_position = final_plate["Groups Channels"][index_group][0]
+						
+						program_variables.pipR.dispense(volume_dispense, final_position)
+						
+						if user_variables.touchTipTransferSample:
+							program_variables.pipR.touch_tip(final_plate["Groups Channels"][index_group][0])
+					
+					if user_variables.changeTipTransfer == "aspirate": # We change every time a new aspiration is needed
+						program_variables.pipR.drop_tip()
 				
-				if user_variables.changeTipTransfer == "aspirate": # We change every time a new movement is needed
+				if user_variables.changeTipTransfer == "column" and program_variables.pipR.has_tip: # We change tips every time we move from column to column
 					program_variables.pipR.drop_tip()
 			
-			if user_variables.changeTipTransfer == "column": # We change tips every time we move from column to column
+			# We change tips every time we start to transfer to new final plates, i.e., every final plate or, if the sample is dispensed in the top, every source plate
+			if user_variables.changeTipTransfer == "plate" and program_variables.pipR.has_tip:
 				program_variables.pipR.drop_tip()
-		
-		if user_variables.changeTipTransfer == "plate": # We change tips everytime we start to transfer to a new final plate
-			program_variables.pipR.drop_tip()
 	
 	# We have already trasnferred all the samples to the final plates if needed so we need to make sure there is no tip attached at the end
 	# Which will happen always that the chnage tip during transfer is never or there is a leftover of the transferring
@@ -315,8 +315,13 @@ class SettedParameters:
 											  "Threshold Value":user_variables.threshold[index_plate],
 											  "Map Selected Colonies":None, # We will create this map when we establish the final plates
 											  "Name Final Map":user_variables.nameFinalSheet[index_plate],
-											  "Selected Colonies": [],
+											  "Selected Colonies": None, # We will select them once all the values of the plate are stored
 											  "Volume Transfer Sample":float(user_variables.volumesSamplesPerPlate[index_plate])}
+			
+			# Select the colonies that fulfill the threshold, we do not need the labware to be loaded for it
+			self.samplePlates[index_plate]["Selected Colonies"] = threshold_selection_wells(self.samplePlates[index_plate]["Values for Selection (Lower than Threshold)"],
+																							 self.samplePlates[index_plate]["Values for Selection (Greater than Threshold)"],
+																							 self.samplePlates[index_plate]["Threshold Value"])
 			if self.numberReactives > 0 and pd.isna(user_variables.reactivesPerPlate[index_plate]) == False:
 				self.samplePlates[index_plate]["Mediums"] = user_variables.reactivesPerPlate[index_plate].replace(" ","").split(",")	
 
@@ -453,6 +458,29 @@ def number_tubes_needed (vol_reactive_per_reaction_factor, number_reactions, vol
 	# When the volume can fit every tube (exit from the while loop) we return the number of tubes and the reactions that will fit in every tube
 	return (number_tubes, reactions_per_tube, volumes_tubes)
 
+def threshold_selection_wells (values_lower, values_higher, threshold):
+	"""
+	Function that will select the wells of a plate that have a value lower or equal than the threshold in one map of values
+	and a value greater or equal than the threshold in another map of values of the same plate
+
+	Both maps are compared at once as arrays and the selected wells are returned as [index_row, index_column] in the order of the wells in the labware,
+	i.e., column by column, so the selection does not need the labware to be loaded
+
+	3 mandatory arguments are needed for this function
+	"""
+	# Both maps need to have the same dimensions to be compared cell by cell
+	values_lower = np.asarray(values_lower, dtype = float)
+	values_higher = np.asarray(values_higher, dtype = float)
+
+	if values_lower.shape != values_higher.shape:
+		raise Exception(f"The maps of values need to have the same dimensions to select the wells and they have {values_lower.shape} and {values_higher.shape}")
+
+	# Cells that fulfill both conditions
+	mask_selected = (values_lower <= threshold) & (values_higher >= threshold)
+
+	# Transposing the mask the indexes come sorted by column and then by row, which is the order of the wells in the labware
+	return [[int(index_row), int(index_column)] for index_column, index_row in np.argwhere(mask_selected.T)]
+
 def generator_positions (labware_wells_name):
 	"""
 	Function that will return the next element everytime is called from a given list
@@ -730,13 +758,8 @@ def run(protocol:opentrons.protocol_api.ProtocolContext):
 	
 	#----------------------------------------------------------------------------------------------------------------------------------------------------------------------------------------------------------------
 	# Select which colonies are going to be selected
+	# The selection itself has been done when the variables were assigned (threshold_selection_wells), here we only check that the selected colonies can be transferred
 	for index_plate, plate_source in enumerate(program_variables.samplePlates.values()):
-		for index_column in range(len(plate_source["Opentrons Place"].columns())): # Go through columns
-			for index_row in range(len(plate_source["Opentrons Place"].rows())): # Go through rows
-				# Check if the values are according to the threshold that it was set
-				if plate_source['Values for Selection (Lower than Threshold)'].iloc[index_row, index_column] <= plate_source["Threshold Value"] and plate_source['Values for Selection (Greater than Threshold)'].iloc[index_row, index_column] >= plate_source["Threshold Value"]:
-					plate_source["Selected Colonies"].append([index_row, index_column])
-		
 		# Let's check that there is at least 1 sample that is going to be selected, because it does not make sense to run with this one if no sample is going to be selected
 		if len(plate_source["Selected Colonies"]) == 0:
 			raise Exception(f"The Source Plate {index_plate+1} does not have any sample that fulfills the set of selection variables")
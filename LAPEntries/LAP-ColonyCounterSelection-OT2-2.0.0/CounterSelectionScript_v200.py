@@ -21,10 +21,14 @@
 
 ## Packages needed for the running of the protocol
 import opentrons
+import re
 import pandas as pd
 import random
 import math
 import numpy as np
+import csv
+from types import MappingProxyType
+from openpyxl import Workbook
 from opentrons.motion_planning.deck_conflict import DeckConflictError
 from opentrons.protocol_api.labware import OutOfTipsError
 
@@ -42,6 +46,11 @@ class UserVariables:
 		self.nameReactives = general[general["Variable Names"] == "Name Reactives"]["Value"].values[0]
 		self.volumesReactivePerPlate = general[general["Variable Names"] == "Volume per Reactive (uL)"]["Value"].values[0]
 		self.finalMapName = general[general["Variable Names"] == "Name Final File Maps"]["Value"].values[0]
+		# Optional variable, files without this row will export the final maps only as an excel file
+		if "Format Final Maps" in general["Variable Names"].values:
+			self.formatsFinalMaps = general[general["Variable Names"] == "Format Final Maps"]["Value"].values[0]
+		else:
+			self.formatsFinalMaps = np.nan
 
 		if type(self.nameReactives) == str:
 			self.nameReactives = self.nameReactives.replace(" ","").split(",")
@@ -55,6 +64,11 @@ class UserVariables:
 			
 		self.APINameSamplePlate = general[general["Variable Names"] == "API Name Source Plate"]["Value"].values[0]
 		self.APINameFalconPlate = general[general["Variable Names"] == "API Name Rack Falcon Reactives"]["Value"].values[0]
+		# Optional reservoir for the reactives, if it is given they are distributed by columns with the 8-channel pipette instead of from falcons
+		if "API Name Reservoir Reactives" in general["Variable Names"].values:
+			self.APINameReservoirReactives = general[general["Variable Names"] == "API Name Reservoir Reactives"]["Value"].values[0]
+		else:
+			self.APINameReservoirReactives = np.nan
 		self.APINameFinalPlate = general[general["Variable Names"] == "API Name Final Plate"]["Value"].values[0]
 		self.dimensionsFalcon = {"rows":None, "columns":None, "volume":None} # It will get filled after the check and it will be needed for the future
 		
@@ -74,6 +88,12 @@ class UserVariables:
 		self.nameSheetHigherThreshold = list(each_plate[each_plate["Variable Names"] == "Name Sheet Selection Value>Threshold"].values[0][1:])
 		self.wellStartFinalPlate = list(each_plate[each_plate["Variable Names"] == "Well Start Final Plate"].values[0][1:])
 		
+		# Optional variable, if a plate has a selection expression it is used instead of the threshold and the 2 maps of values
+		if "Selection Expression" in each_plate["Variable Names"].values:
+			self.selectionExpression = list(each_plate[each_plate["Variable Names"] == "Selection Expression"].values[0][1:])
+		else:
+			self.selectionExpression = [np.nan]*len(self.threshold)
+		
 		self.nameFinalSheet = list(each_plate[each_plate["Variable Names"] == "Final Map Name"].values[0][1:])
 		self.volumesSamplesPerPlate = list(each_plate[each_plate["Variable Names"] == "Volume Transfer Sample (uL)"].values[0][1:])
 		
@@ -97,11 +117,19 @@ class UserVariables:
 		if any(pd.isna(element) for element in [self.APINameSamplePlate, self.APINameFinalPlate, self.numberSourcePlates, self.finalMapName]):
 			raise Exception("The variables 'API Name Source Plate', 'API Name Final Plate', 'Number of Source Plates' and 'Name Final File Maps' from Sheet 'GeneralVariables' cannot be left empty")
 		
+		# The final maps are exported by default only as an excel file
+		if pd.isna(self.formatsFinalMaps):
+			self.formatsFinalMaps = ["xlsx"]
+		else:
+			self.formatsFinalMaps = str(self.formatsFinalMaps).replace(" ","").lower().split(",")
+			if any(format_map not in ["xlsx", "csv", "tsv", "long"] for format_map in self.formatsFinalMaps):
+				raise Exception("The variable 'Format Final Maps' can only have the formats 'xlsx', 'csv', 'tsv' and 'long' separated by commas")
+		
 		if pd.isna(self.replaceTiprack):
 			raise Exception("The variables 'Replace Tipracks' from Sheet 'PipetteVariables' cannot be left empty")
 		
-		if self.nameReactives != None and pd.isna(self.APINameFalconPlate):
-			raise Exception("If the variable 'Name Reactives' has a value, 'API Name Rack Falcon Reactives' must have one too")
+		if self.nameReactives != None and pd.isna(self.APINameFalconPlate) and pd.isna(self.APINameReservoirReactives):
+			raise Exception("If the variable 'Name Reactives' has a value, 'API Name Rack Falcon Reactives' or 'API Name Reservoir Reactives' must have one too")
 			
 		if self.replaceTiprack in [1, True, "True", "true", "TRUE"]:
 			self.replaceTiprack = True
@@ -152,7 +180,23 @@ class UserVariables:
 		except OSError:
 			raise Exception(f"The final plate labware {self.APINameFinalPlate} is not in the opentrons labware space so it cannot be defined. Check for any typo of the api labware name or that the labware is in the Opentrons App.")
 
-		if self.nameReactives != None:
+		if self.nameReactives != None and not pd.isna(self.APINameReservoirReactives):
+			try:
+				definition_reservoir = labware_context.get_labware_definition(self.APINameReservoirReactives)
+			except OSError:
+				raise Exception(f"The reservoir labware {self.APINameReservoirReactives} is not in the opentrons labware space so it cannot be defined. Check for any typo of the api labware name or that the labware is in the Opentrons App.")
+			
+			# All the channels of the pipette take the reactive from the same well of the reservoir and dispense it in a whole column of the final plate
+			if len(definition_reservoir["ordering"][0]) != 1:
+				raise Exception("The wells of the labware in 'API Name Reservoir Reactives' need to be reached by all the channels of the 8-channel pipette, i.e., the reservoir can only have 1 row of wells")
+			if len(definition_final_plate["ordering"][0]) % 8 != 0:
+				raise Exception("The reactives in 'API Name Reservoir Reactives' are distributed with the 8-channel pipette. For that reason, the labware defined in 'API Name Final Plate' needs to have 8 rows or a multiple of them, for example, the 16 rows of a 384-well plate.")
+			
+			# The reservoir takes the place of the falcon rack in the rest of the script
+			self.dimensionsFalcon["rows"] = len(definition_reservoir["ordering"][0])
+			self.dimensionsFalcon["columns"] = len(definition_reservoir["ordering"])
+			self.dimensionsFalcon["volume"] = list(definition_reservoir["wells"].values())[0]["totalLiquidVolume"]
+		elif self.nameReactives != None:
 			try:
 				definition_rack = labware_context.get_labware_definition(self.APINameFalconPlate)
 			except OSError:
@@ -199,12 +243,16 @@ class UserVariables:
 		if len(self.threshold) < (self.numberSourcePlates) or len(self.nameSheetLowerThreshold) < (self.numberSourcePlates) or len(self.nameSheetHigherThreshold) < (self.numberSourcePlates) or len(self.reactivesPerPlate) < (self.numberSourcePlates) or len(self.wellStartFinalPlate) < (self.numberSourcePlates) or len(self.nameFinalSheet) < (self.numberSourcePlates) or len(self.volumesSamplesPerPlate) < (self.numberSourcePlates):
 			raise Exception("We need to have at least the same number of plate columns on the Sheet 'PerPlateVariables' as in 'Number of Source Plates'")
 		
-		if any(pd.isna(elem) == True for elem in self.threshold[:self.numberSourcePlates]) or any(pd.isna(elem) == False for elem in self.threshold[self.numberSourcePlates:]):
-			raise Exception("The cell values of 'Threshold Selection Value' need to be as many as the 'Number of Source Plates' and be in consecutive columns")
-		if any(pd.isna(elem) == True for elem in self.nameSheetLowerThreshold[:self.numberSourcePlates]) or any(pd.isna(elem) == False for elem in self.nameSheetLowerThreshold[self.numberSourcePlates:]):
-			raise Exception("The cell values of 'Name Sheet Selection Value<Threshold' need to be as many as the 'Number of Source Plates' and be in consecutive columns")
-		if any(pd.isna(elem) == True for elem in self.nameSheetHigherThreshold[:self.numberSourcePlates]) or any(pd.isna(elem) == False for elem in self.nameSheetHigherThreshold[self.numberSourcePlates:]):
-			raise Exception("The cell values of 'Name Sheet Selection Value>Threshold' need to be as many as the 'Number of Source Plates' and be in consecutive columns")
+		if any(pd.isna(elem) == False for elem in self.selectionExpression[self.numberSourcePlates:]):
+			raise Exception("The cell values of 'Selection Expression' cannot be more than the 'Number of Source Plates'")
+		
+		# The threshold and the maps of values are only needed in the plates that do not have a selection expression
+		if any(pd.isna(elem) == True and pd.isna(expression) == True for elem, expression in zip(self.threshold[:self.numberSourcePlates], self.selectionExpression[:self.numberSourcePlates])) or any(pd.isna(elem) == False for elem in self.threshold[self.numberSourcePlates:]):
+			raise Exception("The cell values of 'Threshold Selection Value' need to be as many as the 'Number of Source Plates' that do not have a 'Selection Expression' and be in consecutive columns")
+		if any(pd.isna(elem) == True and pd.isna(expression) == True for elem, expression in zip(self.nameSheetLowerThreshold[:self.numberSourcePlates], self.selectionExpression[:self.numberSourcePlates])) or any(pd.isna(elem) == False for elem in self.nameSheetLowerThreshold[self.numberSourcePlates:]):
+			raise Exception("The cell values of 'Name Sheet Selection Value<Threshold' need to be as many as the 'Number of Source Plates' that do not have a 'Selection Expression' and be in consecutive columns")
+		if any(pd.isna(elem) == True and pd.isna(expression) == True for elem, expression in zip(self.nameSheetHigherThreshold[:self.numberSourcePlates], self.selectionExpression[:self.numberSourcePlates])) or any(pd.isna(elem) == False for elem in self.nameSheetHigherThreshold[self.numberSourcePlates:]):
+			raise Exception("The cell values of 'Name Sheet Selection Value>Threshold' need to be as many as the 'Number of Source Plates' that do not have a 'Selection Expression' and be in consecutive columns")
 		if any(pd.isna(elem) == False for elem in self.reactivesPerPlate[self.numberSourcePlates:]):
 			raise Exception("The cell values of 'Reactives Per Plate' cannot be more than the 'Number of Source Plates'")
 		if any(pd.isna(elem) == True for elem in self.wellStartFinalPlate[:self.numberSourcePlates]) or any(pd.isna(elem) == False for elem in self.wellStartFinalPlate[self.numberSourcePlates:]):
@@ -223,7 +271,9 @@ class UserVariables:
 			raise Exception("The value for each media needs to be greater than 0")
 		
 		# Check if the sheet names for the selection values exist and if they fit the labware source description
-		for sheet_name_lowerThreshold in self.nameSheetLowerThreshold[:self.numberSourcePlates]:
+		for sheet_name_lowerThreshold, expression in zip(self.nameSheetLowerThreshold[:self.numberSourcePlates], self.selectionExpression[:self.numberSourcePlates]):
+			if pd.isna(expression) == False:
+				continue
 			try:
 				# values_lower = pd.read_excel("VariablesCounterSelection.xlsx", sheet_name = sheet_name_lowerThreshold, index_col = 0, engine = "openpyxl")
 				values_lower = pd.read_excel("/data/user_storage/VariablesCounterSelection.xlsx", sheet_name = sheet_name_lowerThreshold, index_col = 0, engine = "openpyxl")
@@ -239,7 +289,9 @@ class UserVariables:
 			if not pd.api.types.is_numeric_dtype(values_lower.to_numpy()):
 				raise Exception(f"The Sheet {sheet_name_lowerThreshold} has a value that is not a number")
 		
-		for sheet_name_higherThreshold in self.nameSheetHigherThreshold[:self.numberSourcePlates]:
+		for sheet_name_higherThreshold, expression in zip(self.nameSheetHigherThreshold[:self.numberSourcePlates], self.selectionExpression[:self.numberSourcePlates]):
+			if pd.isna(expression) == False:
+				continue
 			try:
 				# values_higher = pd.read_excel("VariablesCounterSelection.xlsx", sheet_name = sheet_name_higherThreshold, index_col = 0, engine = "openpyxl")
 				values_higher = pd.read_excel("/data/user_storage/VariablesCounterSelection.xlsx", sheet_name = sheet_name_higherThreshold, index_col = 0, engine = "openpyxl")
@@ -254,6 +306,26 @@ class UserVariables:
 				raise Exception(f"The Sheet {sheet_name_higherThreshold} has an empty cell")
 			if not pd.api.types.is_numeric_dtype(values_higher.to_numpy()):
 				raise Exception(f"The Sheet {sheet_name_higherThreshold} has a value that is not a number")
+		
+		# Check the selection expressions and the sheets of the maps of values that they use
+		for index_plate, expression in enumerate(self.selectionExpression[:self.numberSourcePlates]):
+			if pd.isna(expression):
+				continue
+			self.selectionExpression[index_plate] = parse_selection_expression(expression)
+			
+			for sheet_name_map in self.selectionExpression[index_plate]["Maps"]:
+				try:
+					# values_map = pd.read_excel("VariablesCounterSelection.xlsx", sheet_name = sheet_name_map, index_col = 0, engine = "openpyxl")
+					values_map = pd.read_excel("/data/user_storage/VariablesCounterSelection.xlsx", sheet_name = sheet_name_map, index_col = 0, engine = "openpyxl")
+				except ValueError: # Error that appears when the sheet 'sheet_name_map' does not exist in the excel file
+					raise Exception(f"The Sheet Name {sheet_name_map} used in the 'Selection Expression' of '{self.nameSourcePlates[index_plate]}' does not exist in excel file")
+				
+				if values_map.shape[0] != len(definition_source_plate["ordering"][0]) or values_map.shape[1] != len(definition_source_plate["ordering"]):
+					raise Exception(f"Selecting Sheet Values in '{sheet_name_map}' should have the dimension of the source labware ({len(definition_source_plate['ordering'][0])} rows and {len(definition_source_plate['ordering'])} columns).\nYou need to include the name of teh rows and the name of the columns")
+				
+				# Empty cells are allowed in these maps, the wells with an empty value are never selected
+				if not pd.api.types.is_numeric_dtype(values_map.to_numpy()):
+					raise Exception(f"The Sheet {sheet_name_map} has a value that is not a number")
 			
 		# Check if there is any typo in the starting tip of both pipettes
 		if pd.isna(self.APINamePipR) == False and (self.startingTipPipR not in definition_tiprack_right["groups"][0]["wells"]):
@@ -296,6 +368,7 @@ class SettedParameters:
 		self.numberReactives = 0
 		self.pipR = None
 		self.pipL = None
+		self.pipMulti = None
 		self.sameTiprack = None
 		self.samplePlates = {}
 		self.finalPlates = {}
@@ -305,6 +378,7 @@ class SettedParameters:
 		self.liquid_samples = None # Initial
 		self.maxVolumePipR = None
 		self.maxVolumePipL = None
+		self.maxVolumePipMulti = None
 		return
 	
 	def assign_variables(self, user_variables, protocol):
@@ -323,8 +397,8 @@ class SettedParameters:
 		# Define the pipettes and some related variables variables
 		if pd.isna(user_variables.APINamePipR) == False:
 			self.pipR = protocol.load_instrument(user_variables.APINamePipR, mount = "right")
-			if self.pipR.channels != 1:
-				raise Exception("Both Right Mount Pipette and Left Mount pipette have to be single channel")
+			if self.pipR.channels not in [1, 8]:
+				raise Exception("Both Right Mount Pipette and Left Mount pipette have to be single channel or 8-channel pipettes")
 			# Set the max volume of the right pipette
 			if self.pipR.max_volume <= user_variables.volMaxTipR:
 				self.maxVolumePipR = self.pipR.max_volume
@@ -333,13 +407,37 @@ class SettedParameters:
 			
 		if pd.isna(user_variables.APINamePipL) == False:
 			self.pipL = protocol.load_instrument(user_variables.APINamePipL, mount = "left")
-			if self.pipL.channels != 1:
-				raise Exception("Both Right Mount Pipette and Left Mount pipette have to be single channel")
+			if self.pipL.channels not in [1, 8]:
+				raise Exception("Both Right Mount Pipette and Left Mount pipette have to be single channel or 8-channel pipettes")
 			# Set the max volume of the left pipette
 			if self.pipL.max_volume <= user_variables.volMaxTipL:
 				self.maxVolumePipL = self.pipL.max_volume
 			else:
 				self.maxVolumePipL = user_variables.volMaxTipL
+		
+		# An 8-channel pipette is only used to move at once the columns of the source plates that are fully selected
+		# The media and the rest of colonies are transferred with the single-channel pipette, so pipR and pipL only keep the single-channel ones
+		if (self.pipR != None and self.pipR.channels == 8) or (self.pipL != None and self.pipL.channels == 8):
+			if not ((self.pipR != None and self.pipR.channels == 1) or (self.pipL != None and self.pipL.channels == 1)):
+				raise Exception("If an 8-channel pipette is established, the other mount needs to have a single-channel pipette to distribute the media and transfer the colonies that are not in a fully selected column")
+			
+			if self.pipR != None and self.pipR.channels == 8:
+				self.pipMulti = self.pipR
+				self.maxVolumePipMulti = self.maxVolumePipR
+				starting_tip_multi = user_variables.startingTipPipR
+				self.pipR = None
+			else:
+				self.pipMulti = self.pipL
+				self.maxVolumePipMulti = self.maxVolumePipL
+				starting_tip_multi = user_variables.startingTipPipL
+				self.pipL = None
+			
+			# The 8-channel pipette picks whole columns of tips
+			if not starting_tip_multi.startswith("A"):
+				raise Exception(f"The initial tip of the 8-channel pipette needs to be in the first row of the tiprack, for example, A1, and it is {starting_tip_multi}")
+		
+		if user_variables.nameReactives != None and not pd.isna(user_variables.APINameReservoirReactives) and self.pipMulti == None:
+			raise Exception("If the reactives are in 'API Name Reservoir Reactives', one of the pipettes needs to be an 8-channel pipette to distribute them")
 
 		if user_variables.APINamePipR == user_variables.APINamePipL:
 			self.sameTiprack = True
@@ -354,6 +452,7 @@ class SettedParameters:
 												"Reactions Per Tube":None,
 												"Number Total Reactions":0,
 												"Definition Liquid": None,
+												"Wells Distribute":None,
 												"Volume Per Sample":float(user_variables.volumesReactivePerPlate[index_reactive])}
 				
 				# Give the colour
@@ -376,15 +475,38 @@ class SettedParameters:
 											  "Label":f"Source Plate '{user_variables.nameSourcePlates[index_plate]}'",
 											  "Mediums":None,
 											  "Opentrons Place":None,
-											  "Values for Selection (Lower than Threshold)":pd.read_excel("/data/user_storage/VariablesCounterSelection.xlsx", sheet_name = user_variables.nameSheetLowerThreshold[index_plate], index_col = 0, engine = "openpyxl"), ### CAMBIO
-											  "Values for Selection (Greater than Threshold)":pd.read_excel("/data/user_storage/VariablesCounterSelection.xlsx", sheet_name = user_variables.nameSheetHigherThreshold[index_plate], index_col = 0, engine = "openpyxl"), ### CAMBIO
-											#   "Values for Selection (Lower than Threshold)":pd.read_excel("VariablesCounterSelection.xlsx", sheet_name = user_variables.nameSheetLowerThreshold[index_plate], index_col = 0, engine = "openpyxl"), ### CAMBIO
-											#   "Values for Selection (Greater than Threshold)":pd.read_excel("VariablesCounterSelection.xlsx", sheet_name = user_variables.nameSheetHigherThreshold[index_plate], index_col = 0, engine = "openpyxl"), ### CAMBIO
+											  "Values for Selection (Lower than Threshold)":None, # Only read if the plate does not have a selection expression
+											  "Values for Selection (Greater than Threshold)":None, # Only read if the plate does not have a selection expression
+											  "Maps Selection Expression":None, # Only read if the plate has a selection expression
 											  "Threshold Value":user_variables.threshold[index_plate],
 											  "Map Selected Colonies":None, # We will create this map when we establish the final plates
 											  "Name Final Map":user_variables.nameFinalSheet[index_plate],
-											  "Selected Colonies": [],
+											  "Selected Colonies": None, # We will select them once all the values of the plate are stored
+											  "Moves Colonies": None, # Set once the final plates are defined
+											  "Index Final Wells": None, # Set once the final plates are defined
 											  "Volume Transfer Sample":float(user_variables.volumesSamplesPerPlate[index_plate])}
+			
+			# Select the colonies that fulfill the threshold or the selection expression, we do not need the labware to be loaded for it
+			if pd.isna(user_variables.selectionExpression[index_plate]):
+				self.samplePlates[index_plate]["Values for Selection (Lower than Threshold)"] = pd.read_excel("/data/user_storage/VariablesCounterSelection.xlsx", sheet_name = user_variables.nameSheetLowerThreshold[index_plate], index_col = 0, engine = "openpyxl") ### CAMBIO
+				self.samplePlates[index_plate]["Values for Selection (Greater than Threshold)"] = pd.read_excel("/data/user_storage/VariablesCounterSelection.xlsx", sheet_name = user_variables.nameSheetHigherThreshold[index_plate], index_col = 0, engine = "openpyxl") ### CAMBIO
+				# self.samplePlates[index_plate]["Values for Selection (Lower than Threshold)"] = pd.read_excel("VariablesCounterSelection.xlsx", sheet_name = user_variables.nameSheetLowerThreshold[index_plate], index_col = 0, engine = "openpyxl") ### CAMBIO
+				# self.samplePlates[index_plate]["Values for Selection (Greater than Threshold)"] = pd.read_excel("VariablesCounterSelection.xlsx", sheet_name = user_variables.nameSheetHigherThreshold[index_plate], index_col = 0, engine = "openpyxl") ### CAMBIO
+				
+				self.samplePlates[index_plate]["Selected Colonies"] = threshold_selection_wells(self.samplePlates[index_plate]["Values for Selection (Lower than Threshold)"],
+																								 self.samplePlates[index_plate]["Values for Selection (Greater than Threshold)"],
+																								 self.samplePlates[index_plate]["Threshold Value"])
+			else:
+				self.samplePlates[index_plate]["Maps Selection Expression"] = {}
+				for sheet_name_map in user_variables.selectionExpression[index_plate]["Maps"]:
+					self.samplePlates[index_plate]["Maps Selection Expression"][sheet_name_map] = pd.read_excel("/data/user_storage/VariablesCounterSelection.xlsx", sheet_name = sheet_name_map, index_col = 0, engine = "openpyxl") ### CAMBIO
+					# self.samplePlates[index_plate]["Maps Selection Expression"][sheet_name_map] = pd.read_excel("VariablesCounterSelection.xlsx", sheet_name = sheet_name_map, index_col = 0, engine = "openpyxl") ### CAMBIO
+				
+				# All the wells of the source plate can be selected, the dimensions are needed in case the expression does not use any map
+				definition_source_plate = opentrons.protocol_api.labware.get_labware_definition(user_variables.APINameSamplePlate)
+				self.samplePlates[index_plate]["Selected Colonies"] = selection_expression_wells(user_variables.selectionExpression[index_plate],
+																								  self.samplePlates[index_plate]["Maps Selection Expression"],
+																								  wells_available = np.ones((len(definition_source_plate["ordering"][0]), len(definition_source_plate["ordering"])), dtype = bool))
 			if self.numberReactives > 0 and pd.isna(user_variables.reactivesPerPlate[index_plate]) == False:
 				self.samplePlates[index_plate]["Mediums"] = user_variables.reactivesPerPlate[index_plate].replace(" ","").split(",")	
 
@@ -409,25 +531,65 @@ class SettedParameters:
 															   "Opentrons Place":None,
 															   "Index Well Start":opentrons.protocol_api.labware.get_labware_definition(user_variables.APINameFinalPlate)["groups"][0]["wells"].index(user_variables.wellStartFinalPlate[index_plate])}
 					incubation_plates_needed += 1
+		
+		# Plan the moves of the selected colonies to the final plate(s), all the final plates of a source plate have the same layout
+		# With an 8-channel pipette that can transfer the volume of the samples, the fully selected columns, or groups of every other well of a column in a 384-well plate, are moved at once (column_packed_layout)
+		definition_source_plate = opentrons.protocol_api.labware.get_labware_definition(user_variables.APINameSamplePlate)
+		definition_final_plate = opentrons.protocol_api.labware.get_labware_definition(user_variables.APINameFinalPlate)
+		for index_plate, source_plate in self.samplePlates.items():
+			if self.pipMulti != None and self.pipMulti.min_volume <= source_plate["Volume Transfer Sample"]:
+				number_channels = self.pipMulti.channels
+			else:
+				number_channels = 1
+			source_plate["Moves Colonies"] = column_packed_layout(source_plate["Selected Colonies"],
+																  len(definition_source_plate["ordering"][0]),
+																  definition_final_plate["groups"][0]["wells"].index(user_variables.wellStartFinalPlate[index_plate]),
+																  len(definition_final_plate["ordering"][0]),
+																  number_channels = number_channels)
+			
+			# Index of the wells of the final plate(s) that will have a colony, needed for the media and to check that they fit in the labware
+			source_plate["Index Final Wells"] = [index_well for move in source_plate["Moves Colonies"] for index_well in move["Index Final Wells"]]
 		return
 
-class MapLabware:
+class PlateGrid:
 	"""
-	Class that will store the map of each of the final plates to final export
+	Class that will store a value for every well of a plate in an array with the shape of the plate instead of in a DataFrame, which is only created
+	when the map is exported, so setting the values of the wells during the protocol does not have the overhead of pandas
+
+	There are 2 kinds of grids:
+		- numeric: the values are numbers stored in a float array, empty wells are 0
+		- names: the array has a reference to the value of each well, empty wells are None
 	"""
-	def __init__(self, labware):
+	__slots__ = ("index_rows", "index_columns", "kind", "grid")
 
-		self.name_rows = list(labware.rows_by_name().keys())
-		self.name_columns = list(labware.columns_by_name().keys())
-		number_rows = len(self.name_rows)
-		number_columns = len(self.name_columns)
-		
-		self.map = pd.DataFrame(np.full((number_rows,number_columns), None), columns = self.name_columns, index = self.name_rows)
-		self.map.index.name = "Row/Column"
+	def __init__(self, name_rows, name_columns, kind = "names"):
+		if kind not in ["numeric", "names"]:
+			raise Exception(f"The kind of PlateGrid '{kind}' is not contemplated, only 'numeric' and 'names' are")
+
+		self.index_rows = {name_row:index_row for index_row, name_row in enumerate(name_rows)}
+		self.index_columns = {str(name_column):index_column for index_column, name_column in enumerate(name_columns)}
+		self.kind = kind
+
+		if kind == "numeric":
+			self.grid = np.zeros((len(self.index_rows), len(self.index_columns)), dtype = float)
+		else:
+			self.grid = np.full((len(self.index_rows), len(self.index_columns)), None, dtype = object)
 
 	def assign_value(self, value, row, column):
-		self.map.loc[row, column] = value
-		
+		self.grid[self.index_rows[row], self.index_columns[str(column)]] = value
+
+	def assign_values(self, values, rows, columns):
+		# Assign at once the values to the cells (rows[i], columns[i]), if only 1 value is given it is assigned to all the cells
+		positions_rows = [self.index_rows[row] for row in rows]
+		positions_columns = [self.index_columns[str(column)] for column in columns]
+		self.grid[positions_rows, positions_columns] = values
+
+	def to_dataframe(self):
+		# The DataFrame is only created to export the map, with the same format that the maps had
+		map_plate = pd.DataFrame(self.grid, columns = list(self.index_columns.keys()), index = list(self.index_rows.keys()))
+		map_plate.index.name = "Row/Column"
+		return map_plate
+
 class NotSuitablePipette(Exception):
 	"""
 	Custom Error raised when there is no pipette that can transfer the volume
@@ -520,6 +682,539 @@ def number_tubes_needed (vol_reactive_per_reaction_factor, number_reactions, vol
 	# When the volume can fit every tube (exit from the while loop) we return the number of tubes and the reactions that will fit in every tube
 	return (number_tubes, reactions_per_tube, volumes_tubes)
 
+def threshold_selection_wells (values_lower, values_higher, threshold):
+	"""
+	Function that will select the wells of a plate that have a value lower or equal than the threshold in one map of values
+	and a value greater or equal than the threshold in another map of values of the same plate
+
+	Both maps are compared at once as arrays and the selected wells are returned as [index_row, index_column] in the order of the wells in the labware,
+	i.e., column by column, so the selection does not need the labware to be loaded
+
+	3 mandatory arguments are needed for this function
+	"""
+	# Both maps need to have the same dimensions to be compared cell by cell
+	values_lower = np.asarray(values_lower, dtype = float)
+	values_higher = np.asarray(values_higher, dtype = float)
+
+	if values_lower.shape != values_higher.shape:
+		raise Exception(f"The maps of values need to have the same dimensions to select the wells and they have {values_lower.shape} and {values_higher.shape}")
+
+	# Cells that fulfill both conditions
+	mask_selected = (values_lower <= threshold) & (values_higher >= threshold)
+
+	# Transposing the mask the indexes come sorted by column and then by row, which is the order of the wells in the labware
+	return [[int(index_row), int(index_column)] for index_column, index_row in np.argwhere(mask_selected.T)]
+
+def parse_selection_expression (expression):
+	"""
+	Function that will read a selection expression of wells and return its parts so they can be evaluated with selection_expression_wells
+
+	The expression has the structure [WHERE] condition [ORDER BY value [ASC|DESC], ...] [LIMIT number], for example,
+	GFP/OD600 > 2 AND OD600 > 0.3 ORDER BY GFP DESC LIMIT 24, where GFP and OD600 are the names of the maps of values (sheets) of the plate
+	Names of maps with spaces or with the name of a keyword need to be written between quotes, for example, 'OD 600'
+
+	The condition admits the operators +, -, *, /, >, >=, <, <=, =, !=, AND, OR, NOT and parentheses, the condition can be omitted to select all the wells
+
+	1 mandatory argument is needed for this function
+	"""
+	# Split the expression in tokens, each one is (type, value)
+	pattern_tokens = re.compile(r"\s*(?:(?P<number>(?:\d+\.?\d*|\.\d+)(?:[eE][-+]?\d+)?)|'(?P<quoted_single>[^']*)'|\"(?P<quoted_double>[^\"]*)\"|(?P<word>[A-Za-z_][A-Za-z0-9_.]*)|(?P<operator>>=|<=|==|!=|<>|>|<|=|\+|-|\*|/|\(|\)|,))")
+	keywords = ["WHERE", "AND", "OR", "NOT", "ORDER", "BY", "ASC", "DESC", "LIMIT"]
+
+	tokens = []
+	position = 0
+	expression = str(expression).strip()
+	while position < len(expression):
+		token = pattern_tokens.match(expression, position)
+		if token == None:
+			index_character = len(expression) - len(expression[position:].lstrip())
+			raise Exception(f"The selection expression '{expression}' has a character that is not recognised in the position {index_character+1}: '{expression[index_character]}'")
+		position = token.end()
+
+		if token.group("number") != None:
+			tokens.append(("number", float(token.group("number"))))
+		elif token.group("quoted_single") != None or token.group("quoted_double") != None:
+			tokens.append(("map", token.group("quoted_single") if token.group("quoted_single") != None else token.group("quoted_double")))
+		elif token.group("word") != None and token.group("word").upper() in keywords:
+			tokens.append(("keyword", token.group("word").upper()))
+		elif token.group("word") != None:
+			tokens.append(("map", token.group("word")))
+		else:
+			tokens.append(("operator", {"==":"=", "<>":"!="}.get(token.group("operator"), token.group("operator"))))
+	tokens.append(("end", None))
+
+	# Recursive descent through the tokens, each part of the condition is returned as a tuple (type of node, values of the node)
+	index_token = [0]
+	maps_used = []
+
+	def next_is (type_token, value_token = None):
+		return tokens[index_token[0]][0] == type_token and (value_token == None or tokens[index_token[0]][1] == value_token)
+
+	def take (type_token, value_token = None):
+		if not next_is(type_token, value_token):
+			found = tokens[index_token[0]][1] if tokens[index_token[0]][0] != "end" else "the end of the expression"
+			expected = value_token if value_token != None else {"end":"the end of the expression", "number":"a number", "map":"a map name"}.get(type_token, type_token)
+			raise Exception(f"The selection expression '{expression}' expected {expected} and found {found}")
+		index_token[0] += 1
+		return tokens[index_token[0]-1][1]
+
+	def read_or ():
+		node = read_and()
+		while next_is("keyword", "OR"):
+			take("keyword", "OR")
+			node = ("OR", node, read_and())
+		return node
+
+	def read_and ():
+		node = read_not()
+		while next_is("keyword", "AND"):
+			take("keyword", "AND")
+			node = ("AND", node, read_not())
+		return node
+
+	def read_not ():
+		if next_is("keyword", "NOT"):
+			take("keyword", "NOT")
+			return ("NOT", read_not())
+		return read_comparison()
+
+	def read_comparison ():
+		node = read_sum()
+		if next_is("operator") and tokens[index_token[0]][1] in [">", ">=", "<", "<=", "=", "!="]:
+			operator = take("operator")
+			node = (operator, node, read_sum())
+		return node
+
+	def read_sum ():
+		node = read_product()
+		while next_is("operator", "+") or next_is("operator", "-"):
+			operator = take("operator")
+			node = (operator, node, read_product())
+		return node
+
+	def read_product ():
+		node = read_unary()
+		while next_is("operator", "*") or next_is("operator", "/"):
+			operator = take("operator")
+			node = (operator, node, read_unary())
+		return node
+
+	def read_unary ():
+		if next_is("operator", "-"):
+			take("operator", "-")
+			return ("NEGATIVE", read_unary())
+		if next_is("number"):
+			return ("NUMBER", take("number"))
+		if next_is("map"):
+			name_map = take("map")
+			if name_map not in maps_used:
+				maps_used.append(name_map)
+			return ("MAP", name_map)
+		if next_is("operator", "("):
+			take("operator", "(")
+			node = read_or()
+			take("operator", ")")
+			return node
+		found = tokens[index_token[0]][1] if tokens[index_token[0]][0] != "end" else "the end of the expression"
+		raise Exception(f"The selection expression '{expression}' expected a number, a map name or '(' and found {found}")
+
+	# Condition, if there is one
+	if next_is("keyword", "WHERE"):
+		take("keyword", "WHERE")
+		condition = read_or()
+	elif next_is("keyword", "ORDER") or next_is("keyword", "LIMIT") or next_is("end"):
+		condition = None
+	else:
+		condition = read_or()
+
+	# Order of the selected wells, if there is one
+	order = []
+	if next_is("keyword", "ORDER"):
+		take("keyword", "ORDER")
+		take("keyword", "BY")
+		while True:
+			value_order = read_sum()
+			descending = False
+			if next_is("keyword", "DESC"):
+				take("keyword", "DESC")
+				descending = True
+			elif next_is("keyword", "ASC"):
+				take("keyword", "ASC")
+			order.append((value_order, descending))
+			if not next_is("operator", ","):
+				break
+			take("operator", ",")
+
+	# Max number of wells selected, if there is one
+	limit = None
+	if next_is("keyword", "LIMIT"):
+		take("keyword", "LIMIT")
+		limit = take("number")
+		if limit != int(limit) or limit < 1:
+			raise Exception(f"The LIMIT of the selection expression '{expression}' needs to be an integer greater than 0")
+		limit = int(limit)
+
+	take("end")
+
+	return {"Expression":expression, "Condition":condition, "Order":order, "Limit":limit, "Maps":maps_used}
+
+def selection_expression_wells (selection_expression, maps_values, wells_available = None):
+	"""
+	Function that will select the wells of a plate that fulfill a selection expression (output of parse_selection_expression)
+	evaluating it at once over all the maps of values of the plate
+
+	The selected wells are returned as [index_row, index_column] sorted as the ORDER BY of the expression establishes and, when the values are the same or there is no order,
+	in the order of the wells in the labware (column by column). Wells with an empty value in any map of the expression are never selected and, if wells_available is given, neither the ones that are False in it
+
+	2 mandatory arguments and 1 optional are needed for this function
+	"""
+	# Check that all the maps needed are given and that they have the same dimensions
+	for name_map in selection_expression["Maps"]:
+		if name_map not in maps_values.keys():
+			raise Exception(f"The map of values '{name_map}' of the selection expression '{selection_expression['Expression']}' has not been provided")
+
+	arrays_maps = {name_map:np.asarray(maps_values[name_map], dtype = float) for name_map in selection_expression["Maps"]}
+	if wells_available is not None:
+		shape_plate = np.asarray(wells_available).shape
+	elif len(arrays_maps) > 0:
+		shape_plate = list(arrays_maps.values())[0].shape
+	else:
+		raise Exception(f"The selection expression '{selection_expression['Expression']}' needs at least 1 map of values or the available wells to know the dimensions of the plate")
+
+	if any(array_map.shape != shape_plate for array_map in arrays_maps.values()):
+		raise Exception(f"The maps of values of the selection expression '{selection_expression['Expression']}' need to have the same dimensions")
+
+	def evaluate (node):
+		# Every node is evaluated in the whole plate, the result is an array with the dimensions of the plate
+		if node[0] == "NUMBER":
+			return np.full(shape_plate, node[1])
+		if node[0] == "MAP":
+			return arrays_maps[node[1]]
+		if node[0] == "NEGATIVE":
+			return -evaluate(node[1])
+		if node[0] == "NOT":
+			return ~logical(node[1])
+		if node[0] in ["AND", "OR"]:
+			return logical(node[1]) & logical(node[2]) if node[0] == "AND" else logical(node[1]) | logical(node[2])
+
+		left = numerical(node[1])
+		right = numerical(node[2])
+		# Empty values or divisions by 0 give NaN and these ones never fulfill a comparison
+		with np.errstate(divide = "ignore", invalid = "ignore"):
+			return {"+":np.add, "-":np.subtract, "*":np.multiply, "/":np.divide,
+					">":np.greater, ">=":np.greater_equal, "<":np.less, "<=":np.less_equal, "=":np.equal, "!=":np.not_equal}[node[0]](left, right)
+
+	def logical (node):
+		result = evaluate(node)
+		if result.dtype != bool:
+			raise Exception(f"The selection expression '{selection_expression['Expression']}' uses a value where a condition is needed, for example, after AND, OR, NOT or as the whole condition")
+		return result
+
+	def numerical (node):
+		result = evaluate(node)
+		if result.dtype == bool:
+			raise Exception(f"The selection expression '{selection_expression['Expression']}' uses a condition where a value is needed, for example, in an arithmetic operation or in ORDER BY")
+		return result
+
+	# Wells that fulfill the condition, if there is one
+	if selection_expression["Condition"] != None:
+		mask_selected = logical(selection_expression["Condition"])
+	else:
+		mask_selected = np.ones(shape_plate, dtype = bool)
+
+	if wells_available is not None:
+		mask_selected = mask_selected & np.asarray(wells_available, dtype = bool)
+
+	# Wells with an empty value in any map of the expression are never selected, not even through NOT, != or an ORDER BY without condition
+	for array_map in arrays_maps.values():
+		mask_selected = mask_selected & ~np.isnan(array_map)
+
+	# Neither the wells in which a value of ORDER BY cannot be calculated, e.g., a division 0/0, because they cannot be sorted
+	values_order = []
+	for value_order, descending in selection_expression["Order"]:
+		with np.errstate(divide = "ignore", invalid = "ignore"):
+			values_order.append([numerical(value_order), descending])
+		mask_selected = mask_selected & ~np.isnan(values_order[-1][0])
+
+	# Index of the selected wells going through the plate column by column, which is the order of the wells in the labware
+	index_wells = np.flatnonzero(mask_selected.T)
+
+	# Sort the wells by the values of ORDER BY, lexsort is stable so wells with the same values keep the labware order
+	if len(values_order) > 0:
+		keys_order = [index_wells]
+		for values_plate, descending in reversed(values_order):
+			values_wells = values_plate.T.ravel()[index_wells]
+			keys_order.append(-values_wells if descending else values_wells)
+		index_wells = index_wells[np.lexsort(keys_order)]
+
+	if selection_expression["Limit"] != None:
+		index_wells = index_wells[:selection_expression["Limit"]]
+
+	return [[int(index_well % shape_plate[0]), int(index_well // shape_plate[0])] for index_well in index_wells]
+
+def channel_groups_columns (columns, number_channels = 8):
+	"""
+	Function that will return the groups of wells of the given columns that the channels of a multi-channel pipette reach at once
+
+	In a labware with as many rows as channels every column is a group. In a labware with a multiple of them, for example a 384-well plate with 16 rows and an 8-channel pipette,
+	the channels are separated by several rows, so every column has one group for each of its first rows (A1 and B1 in a 384-well plate) and the groups are interleaved
+
+	The groups are returned column by column and, inside every column, by their first row. The first element of every group is the well in which the pipette is placed
+
+	1 mandatory argument and 1 optional are needed for this function
+	"""
+	groups = []
+	for column in columns:
+		if len(column) % number_channels != 0:
+			raise Exception(f"The columns of the labware have {len(column)} wells, so they cannot be reached by the {number_channels} channels of the pipette. The number of rows of the labware needs to be a multiple of the channels")
+
+		rows_between_channels = len(column) // number_channels
+		for first_row in range(rows_between_channels):
+			groups.append(column[first_row::rows_between_channels])
+
+	return groups
+
+def column_packed_layout (selected_wells, number_rows_source, index_start_final, number_rows_final, number_channels = 8):
+	"""
+	Function that will plan the moves of selected wells of a source plate to consecutive wells of a final plate grouping them by source column,
+	so the columns of the source plate that are selected completely can be moved at once with a multi-channel pipette
+
+	The fully selected columns are placed in whole columns of the final plate and the rest of wells, moved one by one, are placed before them
+	until the first column of the final plate starts and after them. If there are no fully selected columns the wells are placed in the same order they are given
+
+	The index of the wells are the ones of the labware, i.e., going through the plate column by column
+
+	4 mandatory arguments and 1 optional are needed for this function
+	"""
+	# Find the groups of wells of the source columns that the channels of the pipette reach at once (channel_groups_columns) and are fully selected,
+	# only possible if the columns of both plates have a multiple of the channels as wells. In 384-well plates every column has 2 interleaved groups, the one of A1 and the one of B1
+	full_groups = []
+	if number_channels > 1 and number_rows_source % number_channels == 0 and number_rows_final % number_channels == 0:
+		wells_selected = set(map(tuple, selected_wells))
+		columns_selected = list(dict.fromkeys(index_column for index_row, index_column in selected_wells))
+		for group in channel_groups_columns([[(index_row, index_column) for index_row in range(number_rows_source)] for index_column in columns_selected], number_channels):
+			if all(well in wells_selected for well in group):
+				full_groups.append(group)
+	
+	wells_full_groups = set(well for group in full_groups for well in group)
+	single_wells = [well for well in selected_wells if tuple(well) not in wells_full_groups]
+
+	moves = []
+	index_final = index_start_final
+	# Wells of the columns of the groups that are left empty by them, the wells moved one by one are placed there first
+	wells_left_groups = []
+
+	if len(full_groups) > 0:
+		# Wells moved one by one until the next column of the final plate starts, if there are not enough these positions are left empty
+		while index_final % number_rows_final != 0 and len(single_wells) > 0:
+			moves.append({"Source Wells":[single_wells.pop(0)], "Index Final Wells":[index_final]})
+			index_final += 1
+		if index_final % number_rows_final != 0:
+			index_final += number_rows_final - index_final % number_rows_final
+
+		# Groups moved at once in the groups of the final columns, so with a 384-well final plate 2 groups fill a column
+		first_column_final = index_final // number_rows_final
+		groups_final = channel_groups_columns([list(range(index_column*number_rows_final, (index_column+1)*number_rows_final)) for index_column in range(first_column_final, first_column_final+len(full_groups))], number_channels)
+		for group_source, group_final in zip(full_groups, groups_final):
+			moves.append({"Source Wells":[list(well) for well in group_source], "Index Final Wells":group_final})
+		
+		wells_groups_final = set(index_well for move in moves[-len(full_groups):] for index_well in move["Index Final Wells"])
+		index_end_groups = (max(wells_groups_final) // number_rows_final + 1)*number_rows_final
+		wells_left_groups = [index_well for index_well in range(index_final, index_end_groups) if index_well not in wells_groups_final]
+		index_final = index_end_groups
+
+	# The rest of the wells are moved one by one after the groups
+	for well in single_wells:
+		if len(wells_left_groups) > 0:
+			moves.append({"Source Wells":[well], "Index Final Wells":[wells_left_groups.pop(0)]})
+		else:
+			moves.append({"Source Wells":[well], "Index Final Wells":[index_final]})
+			index_final += 1
+
+	return moves
+
+def find_safe_reservoir_height (vol_well, theory_position):
+	"""
+	This function will return the height in which the pipette should aspirate the volume of a reservoir well without getting the tips too wet but in the liquid
+
+	The height of the liquid is calculated with the volume and the area of the well, so it works with rectangular (troughs) and circular wells of straight walls
+
+	This function takes 2 inputs, the reservoir well and the volume it has and will return the same position with the according height
+	"""
+
+	# Area of the well, in mm2, from its dimensions
+	if theory_position.diameter != None:
+		area_well = math.pi*(theory_position.diameter/2)**2
+	else:
+		area_well = theory_position.length*theory_position.width
+	
+	# The tips go 2mm under the surface of the liquid and never lower than 1mm from the bottom
+	height_liquid = vol_well/area_well # The volumes are in uL, i.e., mm3
+	final_position = theory_position.bottom(z = max(height_liquid-2, 1))
+	
+	return final_position
+
+def distribute_z_tracking_reservoir (pipette_used, tip_rack_pipette, deck_situation, vol_source, vol_distribute_well, pos_source, pos_final, protocol, vol_max_transfer, new_tip = "never", replace_tiprack = False, initial_tip_pip = "A1", same_tiprack = False, touch_tip = False):
+	"""
+	Function that will distribute with a pipette (pipette_used) the same volume (vol_distribute_well) from 1 reservoir well (pos_source) to a list of 1 or more final positions (pos_final) tracking the height of aspiration
+	in the reservoir well by tracking its current volume.
+
+	With a multi-channel pipette the final positions are the first well of each final column and every channel takes vol_distribute_well from the reservoir well, so the well needs to be reached by all the channels, for example, the troughs of a reservoir
+
+	For that purpose is needed to provide different information to the function:
+		- pipette_used: pipette that is going to be used to transfer the volumes
+		- tip_rack_pipette: the API name of the tiprack that is going to be defined in case that the pipette is out of tips
+		- deck_situation: dictionary that represents the slot as keys and the loaded labware that is in each of them as values. It is used in case a tiprack needs to be defined
+		- vol_source: initial volume of the reservoir well
+		- vol_distribute_well: volume that is going to be transferred to each one of the final wells
+		- pos_source: reservoir well with the volume to distribute
+		- pos_final: list of final positions to distribute the volume to
+		- protocol: the opentrons protocol context of the script
+		- vol_max_transfer: the maximum volume that can be transferred with pipette_used in 1 aspiration, for example, the max of the pipette or the maximum of the tips attached to the pipette
+		- new_tip: optional argument that establish when the tip should be changed. It can be every time it aspirates (aspirate), every time the pipette goes to the final position (well) or never (never). By default is set as never
+		- replace_tiprack: optional argument that establish that once a tip rack is empty, if this one should be replaced or 1 additional tip rack should be added to the protocol deck. By default is set as False
+		- initial_tip_pip: optional argument that establish in case that a tiprack is defined for the first time this will set which tip should be picked first, by default is set as "A1"
+		- same_tiprack: optional argument that establish defines that both pipettes set during the protocol have the same tip rack attached. By default is set as False
+		- touch_tip: optional argument that establish that during the transfer there would be a touch tip in the source and final position
+
+	The function returns the volume left in the reservoir well
+	"""
+
+	# Check that the new_tip argument has a correct value
+	if new_tip not in ["never", "aspirate", "well"]:
+		raise Exception("The argument new_tip only accepts 3 values: never, aspirate, well")
+
+	# Check if actually the pipette can transfer vol_distribute_well
+	if vol_distribute_well < pipette_used.min_volume:
+		raise Exception(f"The pipette {pipette_used} cannot transfer the volume assigned for each well, {vol_distribute_well}ul")
+	
+	# Every channel of the pipette takes the volume from the same reservoir well
+	# Because we are using floats and there is the problem of the error caused when doing floating-point arithmetic we are going to give a range of error in the substractions
+	if vol_source - len(pos_final)*vol_distribute_well*pipette_used.channels < -0.001:
+		raise Exception(f"Not enough volume in the source reservoir well, {vol_source}uL, to distribute {vol_distribute_well}uL to {len(pos_final)} positions with {pipette_used.channels} channel(s)")
+	
+	# Number of final positions that are distributed with 1 aspiration, if the volume does not fit in 1 aspiration the distribute splits it
+	if new_tip == "well" or vol_distribute_well > vol_max_transfer:
+		number_pos_distr = 1
+	else:
+		number_pos_distr = int(vol_max_transfer/vol_distribute_well)
+	
+	for start_position in range(0, len(pos_final), number_pos_distr):
+		position_distribute = pos_final[start_position:start_position+number_pos_distr]
+		
+		# It wont have a tip if the new_tip is aspirate or well or if it is the first time it gets into the function
+		if not pipette_used.has_tip:
+			check_tip_and_pick (pipette_used,
+								tip_rack_pipette,
+								deck_situation,
+								protocol,
+								replace_tiprack = replace_tiprack,
+								initial_tip = initial_tip_pip,
+								same_tiprack = same_tiprack)
+		
+		# The height of aspiration is the one of the volume that is left after the aspiration so the tips are in the liquid until the end of it
+		vol_source = vol_source - len(position_distribute)*vol_distribute_well*pipette_used.channels
+		pipette_used.distribute(vol_distribute_well, find_safe_reservoir_height(vol_source, pos_source), position_distribute, new_tip = "never", disposal_volume = 0, touch_tip = touch_tip)
+		
+		if new_tip != "never":
+			pipette_used.drop_tip()
+	
+	return vol_source
+
+def labware_accessors (labware):
+	"""
+	Function that will build, once the labware is loaded, the tables of its wells so they do not need to be generated again every time
+	that a well, a column or a row is needed, as it happens with the methods wells(), columns(), rows() and wells_by_name() of the labware
+
+	The tables are immutable: the wells, columns and rows are tuples (in the same order as the labware returns them) and
+	the tables by name are read-only dictionaries, so they can be shared by all the parts of the script without being modified by mistake
+
+	1 mandatory argument is needed for this function
+	"""
+	return MappingProxyType({"Wells":tuple(labware.wells()),
+							 "Columns":tuple(tuple(column) for column in labware.columns()),
+							 "Rows":tuple(tuple(row) for row in labware.rows()),
+							 "Wells By Name":MappingProxyType(dict(labware.wells_by_name())),
+							 "Columns By Name":MappingProxyType({name_column:tuple(column) for name_column, column in labware.columns_by_name().items()}),
+							 "Rows By Name":MappingProxyType({name_row:tuple(row) for name_row, row in labware.rows_by_name().items()})})
+
+def export_maps (maps, path_export, formats = ["xlsx"], name_values = "Sample", extra_columns = None, other_tables = None):
+	"""
+	Function that will export at once all the maps of the plates, DataFrames with the names of the rows and columns of the plate as index and columns,
+	in the given formats, so every map is read only once independently of the number of formats
+
+	The formats that can be given are:
+		- xlsx: 1 excel file with a sheet per map and per other table, written row by row with the write-only mode of openpyxl, faster and lighter than pandas.to_excel
+		- csv or tsv: 1 file per map and per other table, named with the path and the name of the map. The maps have the same format as the identity maps of LAPu
+		- long: 1 csv file with a row per filled well of all the maps and the columns Plate, Well, name_values and the extra columns
+
+	The values of extra_columns are dictionaries with the names of the maps as keys and, as values, a value for all the wells of that map or a DataFrame with a value for each well
+
+	It returns the list of files that have been written
+
+	2 mandatory arguments and 4 optional are needed for this function
+	"""
+	# Check that all the formats can be exported
+	formats_allowed = ["xlsx", "csv", "tsv", "long"]
+	if len(formats) == 0 or any(format_export not in formats_allowed for format_export in formats):
+		raise Exception(f"The formats of the maps to export need to be one or more of the following ones: {', '.join(formats_allowed)}. The ones given are: {', '.join(map(str, formats))}")
+
+	if extra_columns == None:
+		extra_columns = {}
+	if other_tables == None:
+		other_tables = {}
+
+	# Rows of every map and table, the maps keep the names of the rows in the first column and the empty wells (None or NaN, which is not equal to itself) are empty cells
+	rows_tables = {}
+	for name_map, map_plate in maps.items():
+		rows_tables[name_map] = [[map_plate.index.name if map_plate.index.name != None else ""] + [str(name_column) for name_column in map_plate.columns]]
+		for row_map in map_plate.itertuples(name = None):
+			rows_tables[name_map].append([None if value is None or value != value else value for value in row_map])
+	for name_table, table in other_tables.items():
+		rows_tables[name_table] = [list(table.columns)] + [list(row_table) for row_table in table.itertuples(index = False, name = None)]
+
+	files_exported = []
+
+	if "xlsx" in formats:
+		workbook = Workbook(write_only = True)
+		for name_table, rows_table in rows_tables.items():
+			sheet = workbook.create_sheet(title = name_table)
+			for row_table in rows_table:
+				sheet.append(row_table)
+		workbook.save(f"{path_export}.xlsx")
+		files_exported.append(f"{path_export}.xlsx")
+
+	for format_export, delimiter in [("csv", ","), ("tsv", "\t")]:
+		if format_export in formats:
+			for name_table, rows_table in rows_tables.items():
+				with open(f"{path_export}_{name_table}.{format_export}", "w", newline = "") as file_table:
+					csv.writer(file_table, delimiter = delimiter).writerows(rows_table)
+				files_exported.append(f"{path_export}_{name_table}.{format_export}")
+
+	if "long" in formats:
+		# The wells of each map are given in the same order as the labware, column by column
+		with open(f"{path_export}_long.csv", "w", newline = "") as file_long:
+			writer_long = csv.writer(file_long)
+			writer_long.writerow(["Plate", "Well", name_values] + list(extra_columns.keys()))
+			for name_map, map_plate in maps.items():
+				for name_column in map_plate.columns:
+					for name_row in map_plate.index:
+						value = map_plate.at[name_row, name_column]
+						if value is None or value != value:
+							continue
+
+						values_extra = []
+						for values_column in extra_columns.values():
+							value_extra = values_column.get(name_map)
+							if hasattr(value_extra, "at"): # A DataFrame with a value per well
+								value_extra = value_extra.at[name_row, name_column]
+							values_extra.append(value_extra)
+
+						writer_long.writerow([name_map, f"{name_row}{name_column}", value] + values_extra)
+		files_exported.append(f"{path_export}_long.csv")
+
+	return files_exported
+
 def generator_positions (labware_wells_name):
 	"""
 	Function that will return the next element everytime is called from a given list
@@ -1150,19 +1845,25 @@ def run(protocol:opentrons.protocol_api.ProtocolContext):
 	for index_labware, labware in enumerate(source_plates.items()):
 		program_variables.samplePlates[index_labware]["Position"] = labware[0]
 		program_variables.samplePlates[index_labware]["Opentrons Place"] = labware[1]
+		program_variables.samplePlates[index_labware]["Accessors"] = labware_accessors(labware[1])
 		
 		# Check that the name of the rows and colums from the maps given by the user actually are coherent with the source labware
-		row_names = list(labware[1].rows_by_name().keys())
-		columns_names = list(labware[1].columns_by_name().keys())
+		row_names = list(program_variables.samplePlates[index_labware]["Accessors"]["Rows By Name"].keys())
+		columns_names = list(program_variables.samplePlates[index_labware]["Accessors"]["Columns By Name"].keys())
 		
-		rows_map_lower = list(program_variables.samplePlates[index_labware]['Values for Selection (Lower than Threshold)'].index.values)
-		columns_map_lower = list(map(str, list(program_variables.samplePlates[index_labware]['Values for Selection (Lower than Threshold)'].columns.values)))
+		if program_variables.samplePlates[index_labware]["Maps Selection Expression"] != None:
+			for sheet_name_map, values_map in program_variables.samplePlates[index_labware]["Maps Selection Expression"].items():
+				if row_names != list(values_map.index.values) or columns_names != list(map(str, list(values_map.columns.values))):
+					raise Exception(f"The columns and rows of the sheet '{sheet_name_map}' used in the selection expression of '{program_variables.samplePlates[index_labware]['Name Plate']}' need to have the same names as the ones in {user_variables.APINameSamplePlate}, columns {columns_names} and rows {row_names}")
+		else:
+			rows_map_lower = list(program_variables.samplePlates[index_labware]['Values for Selection (Lower than Threshold)'].index.values)
+			columns_map_lower = list(map(str, list(program_variables.samplePlates[index_labware]['Values for Selection (Lower than Threshold)'].columns.values)))
 
-		rows_map_higher = list(program_variables.samplePlates[index_labware]['Values for Selection (Greater than Threshold)'].index.values)
-		columns_map_higher = list(map(str, list(program_variables.samplePlates[index_labware]['Values for Selection (Greater than Threshold)'].columns.values)))
+			rows_map_higher = list(program_variables.samplePlates[index_labware]['Values for Selection (Greater than Threshold)'].index.values)
+			columns_map_higher = list(map(str, list(program_variables.samplePlates[index_labware]['Values for Selection (Greater than Threshold)'].columns.values)))
 
-		if row_names != rows_map_lower or row_names != rows_map_higher or columns_names != columns_map_lower or columns_names != columns_map_higher:
-			raise Exception(f"""
+			if row_names != rows_map_lower or row_names != rows_map_higher or columns_names != columns_map_lower or columns_names != columns_map_higher:
+				raise Exception(f"""
 The columns and rows of the sheets with the values to compare for '{program_variables.samplePlates[index_labware]["Name Plate"]}' need to have the same names as the ones in {user_variables.APINameSamplePlate}:
 	Labware Names:
 		- Column names: {columns_names}
@@ -1174,7 +1875,7 @@ The columns and rows of the sheets with the values to compare for '{program_vari
 		- Sheet Lower Values Rows: {rows_map_lower}""")
 
 		# Set the liquid of samples
-		for well in program_variables.samplePlates[index_labware]["Opentrons Place"].wells():
+		for well in program_variables.samplePlates[index_labware]["Accessors"]["Wells"]:
 			well.load_liquid(program_variables.liquid_samples, volume = 0.9*vol_max_well_source_labware)
 	
 	for index_plate, plate in program_variables.finalPlates.items():
@@ -1182,24 +1883,22 @@ The columns and rows of the sheets with the values to compare for '{program_vari
 		program_variables.deckPositions = {**program_variables.deckPositions , **final_plate}
 		plate["Position"] = list(final_plate.keys())[0]
 		plate["Opentrons Place"] = list(final_plate.values())[0]
+		plate["Accessors"] = labware_accessors(plate["Opentrons Place"])
 		if program_variables.samplePlates[plate['Source Plate']]["Map Selected Colonies"] == None:
-			program_variables.samplePlates[plate['Source Plate']]["Map Selected Colonies"] = MapLabware(list(final_plate.values())[0])
+			program_variables.samplePlates[plate['Source Plate']]["Map Selected Colonies"] = PlateGrid(plate["Accessors"]["Rows By Name"].keys(), plate["Accessors"]["Columns By Name"].keys())
 	
 	#----------------------------------------------------------------------------------------------------------------------------------------------------------------------------------------------------------------
 	# Select which colonies are going to be transferred to the final plate(s)
+	# The selection itself has been done when the variables were assigned (threshold_selection_wells or selection_expression_wells), here we only check that the selected colonies can be transferred
 	for index_plate, plate_source in enumerate(program_variables.samplePlates.values()):
-		for index_column in range(len(plate_source["Opentrons Place"].columns())): # Go through columns
-			for index_row in range(len(plate_source["Opentrons Place"].rows())): # Go through rows
-				# Check if the values are according to the threshold that it was set
-				if plate_source['Values for Selection (Lower than Threshold)'].iloc[index_row, index_column] <= plate_source["Threshold Value"] and plate_source['Values for Selection (Greater than Threshold)'].iloc[index_row, index_column] >= plate_source["Threshold Value"]:
-					plate_source["Selected Colonies"].append([index_row, index_column])
-		
 		# Let's check that there is at least 1 sample that is going to be selected, because it does not make sense to run with this one if no sample is going to be selected
 		if len(plate_source["Selected Colonies"]) == 0:
 			raise Exception(f"The Source Plate '{user_variables.nameSourcePlates[index_plate]}' does not have any sample that fulfills the set of selection variables")
 		
 		# Let's check if the numebr of selected colonies fit in the final labware given the first well in which it should be placed the first selected colony
-		if len(plate_source["Selected Colonies"])+list(plate_source["Opentrons Place"].wells_by_name().keys()).index(user_variables.wellStartFinalPlate[index_plate]) > len(labware_context.get_labware_definition(user_variables.APINameFinalPlate)["wells"]):
+		# The index of the start well is taken from the final labware, the source and final plates can have different formats (for example, 96 and 384 wells)
+		# With an 8-channel pipette some wells can be left empty so the fully selected columns are placed in whole columns of the final plate
+		if max(plate_source["Index Final Wells"]) >= len(labware_context.get_labware_definition(user_variables.APINameFinalPlate)["wells"]):
 			raise Exception(f"There are {len(plate_source['Selected Colonies'])} samples in '{user_variables.nameSourcePlates[index_plate]}' that fulfill the parameters given but they do not fit in the final plate given the {user_variables.APINameFinalPlate} labware and the start well provided")
 	
 
@@ -1212,14 +1911,45 @@ The columns and rows of the sheets with the values to compare for '{program_vari
 		
 		# This number is needed for both when there is no medium and when it is
 		labware_final["Number Samples"] = len(program_variables.samplePlates[labware_final["Source Plate"]]["Selected Colonies"])
+	
+	# Define the wells that are going to be the final position for the transferring of each reactive
+	for reactive_type in program_variables.reactiveWells.keys():
+		wells_distribute_reactive = []
+		first_wells_groups = []
+		for plate_incubation in program_variables.finalPlates.values():
+			if plate_incubation["Medium"] == reactive_type:
+				wells_plate = [plate_incubation["Accessors"]["Wells"][index_well] for index_well in program_variables.samplePlates[plate_incubation["Source Plate"]]["Index Final Wells"]]
+				wells_distribute_reactive += wells_plate
+				
+				# The 8-channel pipette distributes the reactive from a reservoir to the groups of wells that its channels reach at once, whole columns or every other well
+				# of a column in a 384-well plate (channel_groups_columns), so in that case the reactions are the groups that have some of these wells
+				if not pd.isna(user_variables.APINameReservoirReactives):
+					first_well_groups_plate = {well:group[0] for group in channel_groups_columns(plate_incubation["Accessors"]["Columns"], program_variables.pipMulti.channels) for well in group}
+					for well in wells_plate:
+						if first_well_groups_plate[well] not in first_wells_groups:
+							first_wells_groups.append(first_well_groups_plate[well])
+		
+		if pd.isna(user_variables.APINameReservoirReactives):
+			program_variables.reactiveWells[reactive_type]["Wells Distribute"] = wells_distribute_reactive
+		else:
+			program_variables.reactiveWells[reactive_type]["Wells Distribute"] = first_wells_groups
+			program_variables.reactiveWells[reactive_type]["Number Total Reactions"] = len(first_wells_groups)
 
 
 	# We need to know the max reactive tube volume
 	# For that we need to know the maximum volume of the tubes and how many tubes of the reactives we need in total
 	if user_variables.nameReactives != None:
+		# From a reservoir every channel of the 8-channel pipette takes the volume of 1 well of the column
+		if pd.isna(user_variables.APINameReservoirReactives):
+			channels_reactives = 1
+			labware_reactives = user_variables.APINameFalconPlate
+		else:
+			channels_reactives = program_variables.pipMulti.channels
+			labware_reactives = user_variables.APINameReservoirReactives
+		
 		total_falcons_medium = 0 # Initialize
 		for reactive_type in program_variables.reactiveWells.keys():
-			number_tubes, program_variables.reactiveWells[reactive_type]["Reactions Per Tube"], program_variables.reactiveWells[reactive_type]["Volumes"] = number_tubes_needed(program_variables.reactiveWells[reactive_type]["Volume Per Sample"],
+			number_tubes, program_variables.reactiveWells[reactive_type]["Reactions Per Tube"], program_variables.reactiveWells[reactive_type]["Volumes"] = number_tubes_needed(program_variables.reactiveWells[reactive_type]["Volume Per Sample"]*channels_reactives,
 																																												program_variables.reactiveWells[reactive_type]["Number Total Reactions"],
 																																												0.9*user_variables.dimensionsFalcon["volume"])
 			# The 0.9 max well volume is only to not overfill the volume and give space to put more liquid so the pipetting is assure
@@ -1231,7 +1961,7 @@ The columns and rows of the sheets with the values to compare for '{program_vari
 		
 		if tuberacks_needed > 0:
 			labware_falcons = setting_labware(tuberacks_needed,
-											  user_variables.APINameFalconPlate,
+											  labware_reactives,
 											  program_variables.deckPositions,
 											  protocol,
 											  label = "Reactive Labware")
@@ -1255,9 +1985,14 @@ The columns and rows of the sheets with the values to compare for '{program_vari
 	# Transfer the reactives to their plates
 
 	for reactive_type in program_variables.reactiveWells.keys():
-		optimal_pipette = give_me_optimal_pipette (program_variables.reactiveWells[reactive_type]["Volume Per Sample"],
-												   program_variables.pipR,
-												   program_variables.pipL)
+		# The reactives are distributed from the falcons with the optimal single-channel pipette or from the reservoir with the 8-channel pipette
+		if pd.isna(user_variables.APINameReservoirReactives):
+			optimal_pipette = give_me_optimal_pipette (program_variables.reactiveWells[reactive_type]["Volume Per Sample"],
+													   program_variables.pipR,
+													   program_variables.pipL)
+		else:
+			optimal_pipette = program_variables.pipMulti
+		
 		if optimal_pipette.mount == "right":
 			tiprack = user_variables.APINameTipR
 			starting_tip = user_variables.startingTipPipR
@@ -1266,6 +2001,8 @@ The columns and rows of the sheets with the values to compare for '{program_vari
 			tiprack = user_variables.APINameTipL
 			starting_tip = user_variables.startingTipPipL
 			volume_max = program_variables.maxVolumePipL
+		if optimal_pipette == program_variables.pipMulti:
+			volume_max = program_variables.maxVolumePipMulti
 
 		check_tip_and_pick(optimal_pipette,
 						   tiprack,
@@ -1275,31 +2012,12 @@ The columns and rows of the sheets with the values to compare for '{program_vari
 						   initial_tip = starting_tip,
 						   same_tiprack = program_variables.sameTiprack)
 		
-		# Define the wells that are going to be the final position for the transferring of this specific reactive
-		wells_distribute_reactive = []
-
-		for plate_incubation in program_variables.finalPlates.values():
-			if plate_incubation["Medium"] == reactive_type:
-				wells_distribute_reactive += plate_incubation["Opentrons Place"].wells()[plate_incubation["Index Well Start"]:plate_incubation["Index Well Start"]+plate_incubation["Number Samples"]]
+		# The wells that are going to be the final position for the transferring of this specific reactive
+		wells_distribute_reactive = list(program_variables.reactiveWells[reactive_type]["Wells Distribute"])
 		
-		# We transfer with the given falcon tubes to the final wells tracking the height of the volume
+		# We transfer with the given falcon tubes (or reservoir wells) to the final wells tracking the height of the volume
 		for index_tube, tube in enumerate(program_variables.reactiveWells[reactive_type]["Reactions Per Tube"]):
-			if len(wells_distribute_reactive) <= tube:
-				program_variables.reactiveWells[reactive_type]["Volumes"][index_tube] = distribute_z_tracking_falcon15_50ml (optimal_pipette,
-																												 			 tiprack,
-																															 dict(zip(protocol.deck.keys(), protocol.deck.values())),
-																															 program_variables.reactiveWells[reactive_type]["Volumes"][index_tube],
-																															 program_variables.reactiveWells[reactive_type]["Volume Per Sample"],
-																															 program_variables.reactiveWells[reactive_type]["Positions"][index_tube],
-																															 wells_distribute_reactive,
-																															 user_variables.dimensionsFalcon["volume"],
-																															 protocol,
-																															 volume_max,
-																															 replace_tiprack = user_variables.replaceTiprack,
-																															 initial_tip_pip = starting_tip,
-																															 same_tiprack = program_variables.sameTiprack)
-				tube -= len(wells_distribute_reactive)
-			else:
+			if pd.isna(user_variables.APINameReservoirReactives):
 				program_variables.reactiveWells[reactive_type]["Volumes"][index_tube] = distribute_z_tracking_falcon15_50ml (optimal_pipette,
 																															 tiprack,
 																															 dict(zip(protocol.deck.keys(), protocol.deck.values())),
@@ -1313,8 +2031,20 @@ The columns and rows of the sheets with the values to compare for '{program_vari
 																															 replace_tiprack = user_variables.replaceTiprack,
 																															 initial_tip_pip = starting_tip,
 																															 same_tiprack = program_variables.sameTiprack)
-				del wells_distribute_reactive[:tube]
-				tube -= len(wells_distribute_reactive)
+			else:
+				program_variables.reactiveWells[reactive_type]["Volumes"][index_tube] = distribute_z_tracking_reservoir (optimal_pipette,
+																														 tiprack,
+																														 dict(zip(protocol.deck.keys(), protocol.deck.values())),
+																														 program_variables.reactiveWells[reactive_type]["Volumes"][index_tube],
+																														 program_variables.reactiveWells[reactive_type]["Volume Per Sample"],
+																														 program_variables.reactiveWells[reactive_type]["Positions"][index_tube],
+																														 wells_distribute_reactive[:tube],
+																														 protocol,
+																														 volume_max,
+																														 replace_tiprack = user_variables.replaceTiprack,
+																														 initial_tip_pip = starting_tip,
+																														 same_tiprack = program_variables.sameTiprack)
+			del wells_distribute_reactive[:tube]
 				
 		optimal_pipette.drop_tip()
 	
@@ -1332,48 +2062,57 @@ The columns and rows of the sheets with the values to compare for '{program_vari
 			tiprack = user_variables.APINameTipL
 			starting_tip = user_variables.startingTipPipL
 
-		wells_generator = []
-
-		# Create the possible positions generator
-		for final_plate in program_variables.finalPlates.values():
-			if final_plate["Source Plate"] == index_source:
-				wells_generator.append(generator_positions(final_plate["Opentrons Place"].wells()[final_plate["Index Well Start"]:final_plate["Index Well Start"]+final_plate["Number Samples"]]))
+		# Final plates that receive the colonies of this source plate
+		final_plates_source = [final_plate for final_plate in program_variables.finalPlates.values() if final_plate["Source Plate"] == index_source]
+		names_rows_source = list(source_plate["Accessors"]["Rows By Name"])
+		names_columns_source = list(source_plate["Accessors"]["Columns By Name"])
 		
-		for colony_transfer in source_plate["Selected Colonies"]: # each item is [index_rows, index_column]
-			check_tip_and_pick(optimal_pipette,
-							   tiprack,
+		for move in source_plate["Moves Colonies"]: # each move is a well or a group of wells of a column of the source plate
+			if len(move["Source Wells"]) > 1: # Fully selected group moved with the 8-channel pipette
+				pipette_move = program_variables.pipMulti
+				if pipette_move.mount == "right":
+					tiprack_move = user_variables.APINameTipR
+					starting_tip_move = user_variables.startingTipPipR
+				else:
+					tiprack_move = user_variables.APINameTipL
+					starting_tip_move = user_variables.startingTipPipL
+			else:
+				pipette_move = optimal_pipette
+				tiprack_move = tiprack
+				starting_tip_move = starting_tip
+			
+			check_tip_and_pick(pipette_move,
+							   tiprack_move,
 							   program_variables.deckPositions,
 							   protocol,
 							   replace_tiprack = user_variables.replaceTiprack,
-							   initial_tip = starting_tip,
+							   initial_tip = starting_tip_move,
 							   same_tiprack = program_variables.sameTiprack)
-			wells_final = []
-
-			# Create combination of final wells
-			for final_plate_wells in wells_generator:
-				wells_final.append(next(final_plate_wells))
-			well_source = list(source_plate["Opentrons Place"].rows_by_name())[colony_transfer[0]]+list(source_plate["Opentrons Place"].columns_by_name())[colony_transfer[1]]
+			
+			# The first well of the move is the one that the pipette goes to, with the 8-channel pipette it is the first row of the group (A or B in a 384-well plate)
+			well_source = names_rows_source[move["Source Wells"][0][0]]+names_columns_source[move["Source Wells"][0][1]]
+			wells_final = [final_plate["Accessors"]["Wells"][move["Index Final Wells"][0]] for final_plate in final_plates_source]
 			
 			# Distribute to all final wells
-			optimal_pipette.distribute(source_plate["Volume Transfer Sample"],
-									   source_plate["Opentrons Place"][well_source],
-									   wells_final,
-									   new_tip = "never",
-									   disposal_volume = 0)
+			pipette_move.distribute(source_plate["Volume Transfer Sample"],
+									source_plate["Accessors"]["Wells By Name"][well_source],
+									wells_final,
+									new_tip = "never",
+									disposal_volume = 0)
 			
-			optimal_pipette.drop_tip()
+			pipette_move.drop_tip()
 			
-			# Map in the source plate
-			source_plate["Map Selected Colonies"].assign_value(f"{well_source} {source_plate['Name Plate']}", wells_final[0]._core._row_name, wells_final[0]._core._column_name)
-	
-	# Export every map as a sheet in a final excel
-	writer = pd.ExcelWriter(f'/data/user_storage/{user_variables.finalMapName}.xlsx', engine='openpyxl')
-	# writer = pd.ExcelWriter(f'{user_variables.finalMapName}.xlsx', engine = 'openpyxl')
+			# Map in the source plate every well that has been moved
+			for index_well, colony_transfer in enumerate(move["Source Wells"]): # each item is [index_rows, index_column]
+				well_final = final_plates_source[0]["Accessors"]["Wells"][move["Index Final Wells"][index_well]]
+				source_plate["Map Selected Colonies"].assign_value(f"{names_rows_source[colony_transfer[0]]}{names_columns_source[colony_transfer[1]]} {source_plate['Name Plate']}", well_final._core._row_name, well_final._core._column_name)
 	
-	for final_plate in program_variables.samplePlates.values():
-		final_plate["Map Selected Colonies"].map.to_excel(writer, sheet_name = final_plate["Name Final Map"])
+	# Export every map in the formats of 'Format Final Maps', by default as a sheet in a final excel
+	maps_final = {final_plate["Name Final Map"]:final_plate["Map Selected Colonies"].to_dataframe() for final_plate in program_variables.samplePlates.values()}
+	volumes_final = {final_plate["Name Final Map"]:final_plate["Volume Transfer Sample"] for final_plate in program_variables.samplePlates.values()}
 	
-	writer.save()
+	export_maps(maps_final, f'/data/user_storage/{user_variables.finalMapName}', formats = user_variables.formatsFinalMaps, extra_columns = {"Volume Sample (uL)":volumes_final})
+	# export_maps(maps_final, f'{user_variables.finalMapName}', formats = user_variables.formatsFinalMaps, extra_columns = {"Volume Sample (uL)":volumes_final})
 
 	# Home the robot
 	protocol.home()
\ No newline at end of file
@@ -0,0 +1,198 @@
+# LAP-CustomReagentMixingMultiSinglePip-OT2-1.0.0
+
+# Python file destined to measure outside of the OT-2 the low and high optimization of the source columns of ScriptMixingReagents_v100.py
+# This code belongs to the entry of the LAP repository LAP-CustomReagentMixingMultiSinglePip-OT2-1.0.0 and it does not run any protocol
+
+# The script generates synthetic reagent and volume maps of plates created with a multi-channel pipette, with a controlled number of reagents per well,
+# number of different volumes and repetition of the reagents, and runs with them the 2 optimizations of the columns of the source plate (MultiChannelSourcePlates)
+# The reagents of the wells are chosen randomly or following the layouts of a factorial design or of all the combinations of a set of reagents
+
+# For every scenario and optimization it records the solving time, the peak of memory, the number of source columns used and the number of movements of the multi-channel pipette.
+# It also records the minimum number of source columns of each scenario, found with the search of the high optimization with a larger limit of steps, so the distance of the optimizations
+# to the minimum can be measured. If that search does not finish either, the minimum is left empty and only the number of source columns that the search proves to be needed is recorded
+# These results are written to a CSV file that can be used as a baseline to see the regressions and improvements of the optimizations when the script is modified.
+# If a previous CSV is given as baseline, its columns and time are added to the results to compare them
+
+# This file needs to be in the same folder as ScriptMixingReagents_v100.py and the packages of that script need to be installed
+# Usage: python BenchmarkSourceColumnsOptimization.py [-out PATH_CSV] [-baseline PATH_CSV_BASELINE] [-seed SEED] [-steps STEPS_MINIMUM]
+
+# Needed packages for the script to run correctly
+import argparse
+import copy
+import itertools
+import random
+import time
+import tracemalloc
+import pandas as pd
+import numpy as np
+# The protocol API needs to be imported before the script, which imports first a module of opentrons that cannot be imported before it (circular import)
+import opentrons.protocol_api
+from ScriptMixingReagents_v100 import MultiChannelSourcePlates
+
+# Scenarios that are benchmarked by default
+# Each one of them is going to be a set of plates with these characteristics:
+#   - Plates: number of plates created with the multi-channel pipette
+#   - Columns: number of columns of each plate
+#   - Reagents/Well: number of reagents that each well is going to have
+#   - Volumes: number of different volumes that are going to be transferred (every reagent of a well has one of these volumes)
+#   - Reagents Pool: number of different reagents, the lower it is the more repeated the reagents are between wells
+#   - Empty Wells: fraction of the wells of the map that are empty
+#   - Layout: how the reagents of the wells are chosen
+#       * Random: a random sample of the reagents pool for every well
+#       * Factorial: the wells of a row, of a column and of a plate have the same reagent, with the reagents of each row, column and plate being different
+#         (only up to 3 reagents per well and the reagents pool is not used)
+#       * Combinations: all the combinations of the reagents pool with the reagents per well placed column by column, the wells after the last combination are empty
+scenarios = [
+	{"Name":"1 reagent/well", "Plates":2, "Columns":12, "Reagents/Well":1, "Volumes":1, "Reagents Pool":6, "Empty Wells":0, "Layout":"Random"},
+	{"Name":"2 reagents/well, repeated", "Plates":2, "Columns":12, "Reagents/Well":2, "Volumes":1, "Reagents Pool":4, "Empty Wells":0, "Layout":"Random"},
+	{"Name":"2 reagents/well, repeated, 6 columns", "Plates":2, "Columns":6, "Reagents/Well":2, "Volumes":1, "Reagents Pool":4, "Empty Wells":0, "Layout":"Random"},
+	{"Name":"2 reagents/well, 2 volumes", "Plates":2, "Columns":12, "Reagents/Well":2, "Volumes":2, "Reagents Pool":8, "Empty Wells":0, "Layout":"Random"},
+	{"Name":"3 reagents/well, repeated", "Plates":2, "Columns":12, "Reagents/Well":3, "Volumes":1, "Reagents Pool":5, "Empty Wells":0, "Layout":"Random"},
+	{"Name":"3 reagents/well, varied", "Plates":2, "Columns":12, "Reagents/Well":3, "Volumes":1, "Reagents Pool":12, "Empty Wells":0.1, "Layout":"Random"},
+	{"Name":"4 reagents/well, repeated", "Plates":4, "Columns":12, "Reagents/Well":4, "Volumes":1, "Reagents Pool":8, "Empty Wells":0, "Layout":"Random"},
+	{"Name":"4 reagents/well, 2 volumes", "Plates":4, "Columns":12, "Reagents/Well":4, "Volumes":2, "Reagents Pool":10, "Empty Wells":0.1, "Layout":"Random"},
+	{"Name":"6 reagents/well, repeated", "Plates":2, "Columns":12, "Reagents/Well":6, "Volumes":2, "Reagents Pool":8, "Empty Wells":0, "Layout":"Random"},
+	{"Name":"factorial rows x columns x plates", "Plates":2, "Columns":12, "Reagents/Well":3, "Volumes":1, "Reagents Pool":0, "Empty Wells":0, "Layout":"Factorial"},
+	{"Name":"combinations of 3 reagents", "Plates":1, "Columns":12, "Reagents/Well":3, "Volumes":1, "Reagents Pool":9, "Empty Wells":0, "Layout":"Combinations"},
+	{"Name":"combinations of 2 reagents, 2 volumes", "Plates":2, "Columns":12, "Reagents/Well":2, "Volumes":2, "Reagents Pool":16, "Empty Wells":0, "Layout":"Combinations"}
+]
+
+def synthetic_maps (scenario, random_generator, number_rows = 8, number_columns = 12):
+	"""
+	Function that will create the reagent and volume maps of the plates of a scenario with the same format that they have in ScriptMixingReagents_v100.py
+	after reading them from the excel file (each cell is a list of reagents or volumes and the empty ones are NaN)
+
+	2 mandatory arguments and 2 optional are needed for this function
+	"""
+	reagents_pool = [f"Reagent {index_reagent+1}" for index_reagent in range(scenario["Reagents Pool"])]
+	volumes_pool = [float(5*(index_volume+1)) for index_volume in range(scenario["Volumes"])]
+	names_rows = [chr(ord("A")+index_row) for index_row in range(number_rows)]
+	names_columns = [str(index_column+1) for index_column in range(number_columns)]
+	combinations_pool = itertools.combinations(reagents_pool, scenario["Reagents/Well"])
+
+	maps_plates = {}
+	for index_plate in range(scenario["Plates"]):
+		map_reagents = pd.DataFrame(np.nan, index = names_rows, columns = names_columns, dtype = object)
+		map_volumes = pd.DataFrame(np.nan, index = names_rows, columns = names_columns, dtype = object)
+
+		for name_column in names_columns:
+			# Every well of a column needs the same volumes so it can be transferred with the multi-channel pipette
+			volumes_column = [random_generator.choice(volumes_pool) for reagent in range(scenario["Reagents/Well"])]
+			for name_row in names_rows:
+				if random_generator.random() < scenario["Empty Wells"]:
+					continue
+				if scenario["Layout"] == "Factorial":
+					reagents_well = [f"Reagent Row {name_row}", f"Reagent Column {name_column}", f"Reagent Plate {index_plate+1}"][:scenario["Reagents/Well"]]
+				elif scenario["Layout"] == "Combinations":
+					reagents_well = list(next(combinations_pool, []))
+					if len(reagents_well) == 0:
+						continue
+				else:
+					reagents_well = random_generator.sample(reagents_pool, scenario["Reagents/Well"])
+				map_reagents.at[name_row, name_column] = reagents_well
+				map_volumes.at[name_row, name_column] = list(volumes_column)
+
+		maps_plates[f"Plate {index_plate+1}"] = {"Map React":map_reagents, "Map Vol":map_volumes}
+
+	return maps_plates
+
+def run_optimization (maps_plates, optimization):
+	"""
+	Function that will find the source columns of the given maps with the same calls that assign_variables of SettedParameters performs for each optimization
+
+	It returns the object MultiChannelSourcePlates with the source columns, the time that it has taken and the peak of memory during the optimization
+	The optimization is run twice with copies of the maps, the time is measured in the first one and the peak of memory in the second one because tracing the memory slows it down
+
+	2 mandatory arguments are needed for this function
+	"""
+	def optimize (maps):
+		columns_source = MultiChannelSourcePlates(maps)
+		columns_source.initial_set()
+		if optimization == "high":
+			columns_source.high_opti_column_choosing()
+		else:
+			columns_source.low_opti_column_choosing()
+		return columns_source
+
+	maps_memory = copy.deepcopy(maps_plates)
+
+	start_time = time.perf_counter()
+	columns_source = optimize(maps_plates)
+	solving_time = time.perf_counter() - start_time
+
+	tracemalloc.start()
+	optimize(maps_memory)
+	peak_memory = tracemalloc.get_traced_memory()[1]
+	tracemalloc.stop()
+
+	return columns_source, solving_time, peak_memory
+
+def minimum_columns (maps_plates, limit_steps):
+	"""
+	Function that will search the minimum number of source columns of the given maps with the search of the high optimization and the given limit of steps,
+	which is usually larger than the one of the script
+
+	It returns the minimum number of source columns, or NaN if the search has reached its limit, and the number of source columns that the search has proven to be needed
+
+	2 mandatory arguments are needed for this function
+	"""
+	columns_source = MultiChannelSourcePlates(maps_plates)
+	columns_source.limitStepsSearch = limit_steps
+	columns_source.initial_set()
+	columns_source.high_opti_column_choosing()
+
+	if columns_source.minimumProven:
+		return columns_source.numberNeededColumnsSource, columns_source.lowerBoundColumnsSource
+	else:
+		return np.nan, columns_source.lowerBoundColumnsSource
+
+def benchmark (scenarios, seed, limit_steps_minimum):
+	"""
+	Function that will run the low and high optimization for every scenario and return a table with the results
+
+	3 mandatory arguments are needed for this function
+	"""
+	results = []
+	for scenario in scenarios:
+		# The same maps are used for both optimizations, the optimizations modify the reagents of the maps so each one receives its own copy
+		maps_plates = synthetic_maps(scenario, random.Random(seed), number_columns = scenario["Columns"])
+		minimum, lower_bound = minimum_columns(copy.deepcopy(maps_plates), limit_steps_minimum)
+		for optimization in ["low", "high"]:
+			columns_source, solving_time, peak_memory = run_optimization(copy.deepcopy(maps_plates), optimization)
+
+			results.append({"Scenario":scenario["Name"],
+							"Plates":scenario["Plates"],
+							"Columns":scenario["Columns"],
+							"Reagents/Well":scenario["Reagents/Well"],
+							"Volumes":scenario["Volumes"],
+							"Reagents Pool":scenario["Reagents Pool"],
+							"Empty Wells":scenario["Empty Wells"],
+							"Optimization":optimization,
+							"Source Columns":len(columns_source.sourceColumnsNeeded),
+							# Every final column that receives volume from a source column is a movement of the multi-channel pipette
+							"Multi-Channel Transfers":sum(len(final_columns) for values_column in columns_source.sourceColumnsNeeded.values() for final_columns in values_column["Final Columns"].values()),
+							"Minimum Source Columns":minimum,
+							"Lower Bound Source Columns":lower_bound,
+							"Time (s)":solving_time,
+							"Peak Memory (KiB)":peak_memory/1024})
+
+	return pd.DataFrame(results)
+
+if __name__ == "__main__":
+	parser = argparse.ArgumentParser(description = "Benchmark of the low and high optimization of the source columns of ScriptMixingReagents_v100.py with synthetic maps")
+	parser.add_argument("-out", dest = "path_output", default = "BenchmarkSourceColumnsOptimization.csv", help = "CSV file in which the results are going to be written. Default: BenchmarkSourceColumnsOptimization.csv")
+	parser.add_argument("-baseline", dest = "path_baseline", default = None, help = "CSV file of a previous run of this script to compare the results with")
+	parser.add_argument("-seed", dest = "seed", type = int, default = 1, help = "Seed of the generation of the synthetic maps. Default: 1")
+	parser.add_argument("-steps", dest = "steps_minimum", type = int, default = 2000000, help = "Limit of steps of the search of the minimum source columns of each scenario. Default: 2000000")
+	arguments = parser.parse_args()
+
+	table_results = benchmark(scenarios, arguments.seed, arguments.steps_minimum)
+
+	# Add the results of the baseline to see the changes in the number of columns and time
+	if arguments.path_baseline:
+		table_baseline = pd.read_csv(arguments.path_baseline)[["Scenario", "Optimization", "Source Columns", "Time (s)"]]
+		table_baseline.columns = ["Scenario", "Optimization", "Source Columns Baseline", "Time (s) Baseline"]
+		table_results = table_results.merge(table_baseline, on = ["Scenario", "Optimization"], how = "left")
+
+	table_results.to_csv(arguments.path_output, index = False)
+	print(table_results.to_string(index = False))
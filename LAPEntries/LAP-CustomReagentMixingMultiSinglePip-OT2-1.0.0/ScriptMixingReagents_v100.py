@@ -21,8 +21,10 @@
 # For plates created with an 8-channel pipette, the script offers two optimization options for column combinations of reagents:
 #  * Low Optimization: This approach sets the columns that must be present (e.g., a column with a single reagent-volume combination) first.
 #  Additional reagent-volume combinations are then matched to these initial columns if possible, and any remaining columns are set as per the provided maps.
-#  * High Optimization: This approach also starts by setting the mandatory columns. However, it then defines all possible reagent-volume combinations for the remaining sets.
-#  These combinations are scored based on their frequency of appearance in other columns or sets, allowing for a more compact and efficient arrangement of columns for dispensing into the final wells.
+#  * High Optimization: This approach also starts by setting the mandatory columns. However, it then searches the sets of columns of the remaining reagent-volume combinations that need
+#  the minimum number of different columns (branch and bound search that starts from a greedy selection of the columns that more combinations can create), allowing for a more compact
+#  and efficient arrangement of columns for dispensing into the final wells. The search has a limit of steps so the protocol is simulated in a short time. Maps with many reagents per well
+#  taken at random from a few reagents can reach it, then the fewest columns found are used and the protocol comments how many columns are proven to be needed
 
 # Needed packages for the script to run correctly
 import opentrons
@@ -30,10 +32,11 @@ import pandas as pd
 import numpy as np
 import math
 import random
-from itertools import permutations
+from collections import Counter
+from itertools import product
+from types import MappingProxyType
 from opentrons.motion_planning.deck_conflict import DeckConflictError
 from opentrons.protocol_api.labware import OutOfTipsError
-import time
 
 class UserVariables:
 	"""
@@ -559,11 +562,13 @@ class SettedParameters:
 				"Position":None,
 				"Label":user_variables.nameFinalPlates[index_plate],
 				"Opentrons Place":None,
+				"Accessors":None,
 				"Map React":user_variables.infoPagesWellsCombinatioMaps[user_variables.nameSheetReagents[index_plate]],
 				"Map Vol":user_variables.infoPagesWellsCombinatioMaps[user_variables.nameSheetVolumes[index_plate]],
 				"Pipette Creation":user_variables.pipetteCreationPlate[index_plate],
 				"Number Replicas": user_variables.numberReplicas[index_plate],
 				"Plates Replicas":{},
+				"Accessors Replicas":{},
 				"Last Column With Value": user_variables.infoPagesWellsCombinatioMaps[user_variables.nameSheetReagents[index_plate]].columns.tolist().index(user_variables.infoPagesWellsCombinatioMaps[user_variables.nameSheetReagents[index_plate]].apply(lambda col: col.last_valid_index()).last_valid_index()),
 				"Last Row With Value in Last Column": None,
 				"Wells Needed for the Plate Layout": None,
@@ -708,12 +713,10 @@ class SettedParameters:
 			if user_variables.dimensionsLabwareReservoir["row"] != 1 and user_variables.sourceOptimization == "high":
 				# Extract the columns that need to be there in a mandatory way because there is no combination of them
 				self.neededColumnsMulti.initial_set()
-				# Generate all the possible combinations of those columns or set within the columns that could be created
-				self.neededColumnsMulti.generation_sets()
-				# Score them in base of them matching with the columns in the initial_set and the other columns possibilities created in generation_sets
-				self.neededColumnsMulti.scoring_sets()
-				# The combination per set of possible columns per each final column is created until all final combination plates can be created with the columns defined in neededColumnsMulti
-				self.neededColumnsMulti.seleccion_update()
+				# Search the sets of columns of each final column that need the minimum number of columns in total, re-using the ones of the initial_set when possible
+				self.neededColumnsMulti.high_opti_column_choosing()
+				if not self.neededColumnsMulti.minimumProven:
+					protocol.comment(f"The search of the high optimization of the source columns has reached its limit of {self.neededColumnsMulti.limitStepsSearch} steps, the {self.neededColumnsMulti.numberNeededColumnsSource} source columns used are the fewest found and at least {self.neededColumnsMulti.lowerBoundColumnsSource} are needed")
 			else: # Either the optimization is set as low or the number of rows of the reservoir is 1, which makes the high optimization pointless because 1 column can only have 1 reagent
 				# Extract the columns that need to be there in a mandatory way because there is no combination of them
 				self.neededColumnsMulti.initial_set()
@@ -783,8 +786,8 @@ class SettedParameters:
 class MultiChannelSourcePlates():
 	"""
 	Class that will create an object that will find the needed source columns combinations to create the final plates, and depending on how
-	high the optimization is set for the script, generate all possible combinations to perform a search of the most commons columns to try to minimize
-	the use of columns in the reservoirs or just try to match the columns to the ones that are already set in the first mandatory set of columns
+	high the optimization is set for the script, search the combination of columns that minimizes the use of columns in the reservoirs
+	or just try to match the columns to the ones that are already set in the first mandatory set of columns
 
 	In both cases, it will have at the end a set of combinations of different columns with the final wells/columns that they will source volume from
 	when th eappropiate methods are called as it can be seen in the method assign_variables of the class SettedParameters
@@ -795,6 +798,11 @@ class MultiChannelSourcePlates():
 		self.combinationsPerFinalColumns = {} # This will hold all the possible set of column combinitions to score and select to add to sourceColumnsNeeded
 		self.numberNeededColumnsSource = 0
 		self.combinationsReactivesFinalMaps = 0
+		self.idsSourceColumns = {} # Index of the source columns by their reagents
+		self.limitStepsSearch = 100000 # Maximum number of steps of the search of the high optimization, shared by all the groups of final column types
+		self.stepsLeftSearch = 0
+		self.minimumProven = True # If the high optimization has proven that the source columns are the minimum
+		self.lowerBoundColumnsSource = 0 # Number of source columns that the high optimization has proven to be needed
 
 		for name_plate, maps_plate in dict_maps.items(): # Go through all the final plates that need to be created with a multi-channel
 			for name_column_reactives, name_column_volumes in zip(maps_plate["Map React"].columns, maps_plate["Map Vol"].columns): # Go through all the columns in this map
@@ -831,106 +839,383 @@ class MultiChannelSourcePlates():
 					self.combinationsPerFinalColumns[self.combinationsReactivesFinalMaps] = {"Reagents/Row": reagents,
 																							  "Plate Name": name_plate,
 																							  "Column Final Plate": name_column_reactives,
-																							  "Volume Transfer": volume_combinations,
-																							  "Sets": {},
-																							  "Max Score Combination":0,
-																							  "Name Combination Max Score":0}
+																							  "Volume Transfer": volume_combinations}
 					self.combinationsReactivesFinalMaps += 1
 
-	@staticmethod
-	def _generation_combination(reagents, start_time, all_sets, current_set = None, index = 0, memo = None, timeout = 20):
+	def initial_set (self):
 		"""
-		Create all the possible combination sets for a given combination of reagents in a column
-		Reagents is going to be a list in which each element of that list is going to be the possible reactives in each cell of tha column
-		With these combinations sets are going to be created because the combinations need to have all the reagents
-		Because this is a combinatorial problem that can take a lot of time, timeout cap is established
+		Function that will separate the columns that have to be in the source plate. In other words, if for 1 given volume there is only 1 ccolumn combination,
+		this columns needs to be in the source plate so it is directly assigned
 		"""
 
-		if memo is None:
-			memo = {}
+		id_movements_to_remove = []
+		for id_type_movement, values_type_movement in self.combinationsPerFinalColumns.items():
+			if all(len(values_well) == 1 for values_well in values_type_movement["Reagents/Row"]):
+				id_movements_to_remove.append(id_type_movement)
+				column_reagents_add = tuple(row[0] for row in values_type_movement["Reagents/Row"])
+				
+				# The column is added to the source columns or, if it is already in them, the final column is added to that source column
+				self._add_source_column(column_reagents_add, values_type_movement["Plate Name"], values_type_movement["Column Final Plate"], values_type_movement["Volume Transfer"])
+
+		for id in id_movements_to_remove:
+			del self.combinationsPerFinalColumns[id]
 
-		if current_set is None:
-			current_set = []
-			
-		if index == len(reagents):
-			frozen_set = frozenset(zip(*current_set))
-			if frozen_set in memo:
-				return
+	@staticmethod
+	def _best_shared_column (movements_reagent, ids_users, max_users, column = (), best = (1, None)):
+		"""
+		Depth-first search of the column, created with the reagents that are left in the final column types, that can be used by more final column types,
+		being ids_users the final column types that can use the reagents of column. Only the columns that at least 2 final column types can use are searched
+
+		The final column types that can use each reagent of a row are taken from the index movements_reagent, so they are found intersecting sets instead of going through
+		all the final column types. The reagents are expanded in decreasing order of final column types that can use them and the ones that cannot be used by more final column
+		types than the best column found are not expanded. The search stops when the best column can be used by max_users final column types, because no column can be used by more
+
+		It returns the number of final column types that can use the best column found and that column (None if no column can be shared)
+		"""
+		index_row = len(column)
+		if index_row == len(movements_reagent):
+			return (len(ids_users), column) if len(ids_users) > best[0] else best
+
+		users_reagents = []
+		for reagent, ids_reagent in movements_reagent[index_row].items():
+			ids_users_reagent = ids_users & ids_reagent
+			if len(ids_users_reagent) > best[0]:
+				users_reagents.append((reagent, ids_users_reagent))
+
+		for reagent, ids_users_reagent in sorted(users_reagents, key = lambda item: (-len(item[1]), str(item[0]))):
+			if len(ids_users_reagent) <= best[0] or best[0] >= max_users:
+				break
+			best = MultiChannelSourcePlates._best_shared_column(movements_reagent, ids_users_reagent, max_users, column + (reagent,), best)
+		
+		return best
+
+	def _add_source_column (self, column, plate, column_final, volume):
+		"""
+		Add the final column and volume to the source column that has the given reagents, if that source column does not exist yet, it is created
+		"""
+		if column in self.idsSourceColumns.keys():
+			id_selected_column = self.idsSourceColumns[column]
+			if plate in self.sourceColumnsNeeded[id_selected_column]["Final Columns"].keys():
+				self.sourceColumnsNeeded[id_selected_column]["Final Columns"][plate].append((column_final, volume))
 			else:
-				memo[frozen_set] = True
-				all_sets.append(list(zip(*current_set)))
+				self.sourceColumnsNeeded[id_selected_column]["Final Columns"][plate] = [(column_final, volume)]
 			return
+		
+		self.sourceColumnsNeeded[self.numberNeededColumnsSource] = {"Reagents":column,
+																	"Final Columns":{plate:[(column_final, volume)]},
+																	"Positions Opentrons":[],
+																	"Reactions/column":[],
+																	"Volumes/column":[],
+																	"Transfers/column":[]
+																	}
+		self.idsSourceColumns[column] = self.numberNeededColumnsSource
+		self.numberNeededColumnsSource += 1
+
+	def _greedy_column_sets (self):
+		"""
+		Greedy selection of the columns of the final column types that is used as the starting solution of the search of the high optimization
+
+		First, every final column type uses the columns assigned in initial_set that it can create. Then, the column that more final column types can still create
+		is selected and assigned to all of them, and this is repeated until no column can be used by 2 final column types. The reagents that are left in each final column type
+		are only for it, so they are set in columns in the order of their names
+
+		The final column types that still have each reagent in each row are kept in an index, so assigning a column only goes through the final column types that can use it
+		and only updates the reagents that they run out of
 
-		for permutation in permutations(reagents[index]):
-			elapsed_time = time.time() - start_time
-			if elapsed_time > timeout: # It is going ot be checked everytime it enters in the _generation_combination function but only with the start_time given in generation_sets 
-				raise TimeoutError(f"""One of the sets of a column in a plate created by a multi-channel pipette has too many reagents to combine for the high optimization and ha staken too long to create the combinations (>20 seconds).
-This time limit is set so protocols dont run for that long. Opentrons need to simulate and then execute the protocol and this is a preventite decision.
-This error does not mean the protocol cannot be done, try setting 'Optimization Space Source Plate Reagents Disposition' as 'low' or give less ragent-volume combinations per final well
-Sorry for the inconvenience""")
-			current_set.append(permutation)
-			MultiChannelSourcePlates._generation_combination(reagents, start_time, all_sets, current_set = current_set, index = index + 1, memo = memo)
-			current_set.pop()
-
-	def generation_sets(self):
+		It returns a dictionary with the columns that each final column type uses
 		"""
-		This method will set the item of all the final combinations given by generation_combination()
-		and create for each one the value for that set with the socres and dependencies associated
+		remaining = {id_movement:[Counter(row) for row in values_movement["Reagents/Row"]] for id_movement, values_movement in self.combinationsPerFinalColumns.items()}
+		sets_columns = {id_movement:[] for id_movement in remaining.keys()}
+		if len(remaining) == 0:
+			return sets_columns
+
+		# Index of the final column types that have each reagent left in each row
+		movements_reagent = [{} for row in next(iter(remaining.values()))]
+		for id_movement, rows in remaining.items():
+			for index_row, row in enumerate(rows):
+				for reagent in row.keys():
+					movements_reagent[index_row].setdefault(reagent, set()).add(id_movement)
+		ids_left = set(remaining.keys())
+
+		def assign_column (column):
+			# Every final column type that can create the column uses it as many times as it can
+			ids_users = set.intersection(*[movements_reagent[index_row].get(reagent, set()) for index_row, reagent in enumerate(column)])
+			for id_movement in ids_users:
+				rows = remaining[id_movement]
+				while all(rows[index_row][reagent] > 0 for index_row, reagent in enumerate(column)):
+					for index_row, reagent in enumerate(column):
+						rows[index_row][reagent] -= 1
+						if rows[index_row][reagent] == 0:
+							movements_reagent[index_row][reagent].discard(id_movement)
+							if len(movements_reagent[index_row][reagent]) == 0:
+								del movements_reagent[index_row][reagent]
+					sets_columns[id_movement].append(column)
+				if sum(rows[0].values()) == 0:
+					ids_left.discard(id_movement)
+			return len(ids_users)
+
+		for values_column in self.sourceColumnsNeeded.values():
+			assign_column(values_column["Reagents"])
+
+		# The final column types that can use a column only decrease, so the next column cannot be used by more final column types than the last one
+		max_users = len(ids_left)
+		while len(ids_left) > 1:
+			number_users, column = MultiChannelSourcePlates._best_shared_column(movements_reagent, ids_left, max_users)
+			if column == None:
+				break
+			max_users = assign_column(column)
+
+		# The reagents that are left can only be used by their final column type, so it does not matter how they are combined in columns
+		for id_movement in ids_left:
+			sets_columns[id_movement] += list(zip(*[sorted(row.elements(), key = str) for row in remaining[id_movement]]))
+
+		return sets_columns
+
+	@staticmethod
+	def _groups_final_column_types (rows_movements):
 		"""
-		for needed_movements_column_name, needed_movements_column_values in self.combinationsPerFinalColumns.items():
-			all_sets = []
+		Separate the final column types in groups that do not share any possible column: 2 final column types can create the same column only if they have a common reagent
+		in every row, and the ones that are connected this way, directly or through other final column types, are in the same group
 
-			MultiChannelSourcePlates._generation_combination(needed_movements_column_values["Reagents/Row"], time.time(), all_sets)
+		It returns a list with the ids of the final column types of each group
+		"""
+		reagents_movements = {id_movement:[set(row.keys()) for row in rows] for id_movement, rows in rows_movements.items()}
+		groups = []
+		ids_left = list(rows_movements.keys())
+		while len(ids_left) > 0:
+			group = [ids_left.pop(0)]
+			for id_movement in group: # The group grows while it is gone through
+				connected = [id_other for id_other in ids_left if all(row_movement & row_other for row_movement, row_other in zip(reagents_movements[id_movement], reagents_movements[id_other]))]
+				ids_left = [id_other for id_other in ids_left if id_other not in connected]
+				group += connected
+			groups.append(group)
+		
+		return groups
 
-			for index, set in enumerate(all_sets):
-				self.combinationsPerFinalColumns[needed_movements_column_name]["Sets"][index] = {"Combination":set, # Esta va a ser el set de combinaciones, por lo que estaran varias columnas
-																								 "Score Combination":0,
-																								 "Score Dependencies":{}
-																								}
+	def _shared_columns (self, movements_reagent, ids_group):
+		"""
+		Find the columns that at least 2 final column types of the group can create and the final column types that can create each one of them
+		The columns are built row by row intersecting the final column types that have each reagent in that row, so only the shared combinations of reagents are gone through
 
-	def initial_set (self):
+		Every column that is extended takes a step of the search. It returns None if the steps run out before all the shared columns are found
 		"""
-		Function that will separate the columns that have to be in the source plate. In other words, if for 1 given volume there is only 1 ccolumn combination,
-		this columns needs to be in the source plate so it is directly assigned
+		users_columns = {}
+
+		def extend_column (column, ids_users):
+			self.stepsLeftSearch -= 1
+			if self.stepsLeftSearch < 0:
+				return
+			if len(column) == len(movements_reagent):
+				users_columns[column] = ids_users
+				return
+			for reagent, ids_reagent in movements_reagent[len(column)].items():
+				ids_users_reagent = ids_users & ids_reagent
+				if len(ids_users_reagent) > 1:
+					extend_column(column + (reagent,), ids_users_reagent)
+
+		extend_column((), set(ids_group))
+		if self.stepsLeftSearch < 0:
+			return None
+		else:
+			return users_columns
+
+	def _search_group (self, rows_movements, ids_group, sets_greedy):
 		"""
+		Branch and bound search of the sets of columns of a group of final column types that need the minimum number of new source columns, the ones of initial_set are free
 
-		id_movements_to_remove = []
-		for id_type_movement, values_type_movement in self.combinationsPerFinalColumns.items():
-			if all(len(values_well) == 1 for values_well in values_type_movement["Reagents/Row"]):
-				id_movements_to_remove.append(id_type_movement)
-				column_reagents_add = tuple(row[0] for row in values_type_movement["Reagents/Row"])
+		The final column types are given a set of columns one by one. A set re-uses the columns already selected, takes new columns that the next final column types can create too
+		and puts the rest of the reagents in columns only for this final column type, which are formed in the order of the names of the reagents because it does not matter how.
+		The columns that a final column type can use more than once are also tried because they save columns. The sets of columns that add less new columns are tried first
+		and a set is skipped if its new columns are the ones of another set plus others, because each one of them costs 1 and can save at most 1 later
+
+		The lower bound of a final column type comes from its rows: every reagent of a row is in a different column, which counts 0 if it is already selected, 1/n if n final column types
+		can still create it and 1 if only this one can. The row that needs more gives the bound of the final column type and the sum of the bounds of the final column types that are left
+		is never more than the new columns that they need. A branch is pruned when the columns selected plus that lower bound are not less than the best solution found, which is at the start the greedy selection (sets_greedy)
+
+		It returns the columns of each final column type of the group (None if the greedy selection is not improved), the number of new columns that are proven to be needed
+		and if that number is the one of the columns returned, i.e., the search has not run out of steps
+		"""
+		columns_mandatory = set(self.idsSourceColumns.keys())
+		new_columns_greedy = len(set(column for id_movement in ids_group for column in sets_greedy[id_movement]) - columns_mandatory)
+
+		movements_reagent = [{} for row in rows_movements[ids_group[0]]]
+		for id_movement in ids_group:
+			for index_row, row in enumerate(rows_movements[id_movement]):
+				for reagent in row.keys():
+					movements_reagent[index_row].setdefault(reagent, set()).add(id_movement)
+
+		# Columns that each final column type can use and that can save columns: the ones of initial_set, the ones that it can use more than once and, later, the shared ones
+		options = {}
+		for id_movement in ids_group:
+			rows = rows_movements[id_movement]
+			options[id_movement] = [column for column in columns_mandatory if all(rows[index_row][reagent] > 0 for index_row, reagent in enumerate(column))]
+			options[id_movement] += [column for column in product(*[[reagent for reagent, count in row.items() if count > 1] for row in rows]) if column not in columns_mandatory]
+
+		# Until the shared columns are found, a reagent can be shared at most by all the final column types that have it in that row
+		users_columns = {}
+		users_left = {} # Number of final column types that can still take each shared column
+		weights_alone = [{reagent:1/len(ids_reagent) for reagent, ids_reagent in reagents_row.items()} for reagents_row in movements_reagent]
+		selected = set(columns_mandatory)
+		def weight (column):
+			if column in selected:
+				return 0
+			else:
+				return 1/users_left.get(column, 1)
+
+		def lower_bound_movement (id_movement):
+			self.stepsLeftSearch -= len(options[id_movement])
+			weights_rows = [{reagent:weights_alone[index_row][reagent] for reagent in row.keys()} for index_row, row in enumerate(rows_movements[id_movement])]
+			for column in options[id_movement]:
+				weight_column = weight(column)
+				for weights_reagents, reagent in zip(weights_rows, column):
+					if weight_column < weights_reagents[reagent]:
+						weights_reagents[reagent] = weight_column
+			return max(sum(weights_reagents.values()) for weights_reagents in weights_rows)
+
+		lower_bound = math.ceil(sum(lower_bound_movement(id_movement) for id_movement in ids_group) - 1e-9)
+		if new_columns_greedy <= lower_bound:
+			return None, new_columns_greedy, True
+
+		users_columns = self._shared_columns(movements_reagent, ids_group)
+		if users_columns == None:
+			return None, lower_bound, False
+		users_left = {column:len(ids_users) for column, ids_users in users_columns.items()}
+		for column, ids_users in users_columns.items():
+			for id_movement in ids_users:
+				rows = rows_movements[id_movement]
+				if column not in columns_mandatory and not all(rows[index_row][reagent] > 1 for index_row, reagent in enumerate(column)):
+					options[id_movement].append(column)
+		# With the shared columns, a reagent that is not in any of them is in a column only for its final column type
+		weights_alone = [dict.fromkeys(reagents_row.keys(), 1) for reagents_row in movements_reagent]
+		bounds = {id_movement:lower_bound_movement(id_movement) for id_movement in ids_group}
+		lower_bound = max(lower_bound, math.ceil(sum(bounds.values()) - 1e-9))
+		if new_columns_greedy <= lower_bound:
+			return None, new_columns_greedy, True
+
+		# The final column types with more options are given their columns first
+		order = sorted(ids_group, key = lambda id_movement: -len(options[id_movement]))
+		position = {id_movement:index_movement for index_movement, id_movement in enumerate(order)}
+		best = {"New Columns":new_columns_greedy, "Sets":None}
+		sets_search = {}
+
+		def sets_movement (id_movement):
+			# Sets of columns of the final column type with the options that are selected, that a next final column type can create or that it can use more than once
+			remaining = [Counter(row) for row in rows_movements[id_movement]]
+			options_set = sorted([column for column in options[id_movement] if column in selected or any(position[id_user] > position[id_movement] for id_user in users_columns.get(column, []))
+								  or all(remaining[index_row][reagent] > 1 for index_row, reagent in enumerate(column))], key = weight)
+			chosen = []
+			sets = []
+			def choose (index_start):
+				self.stepsLeftSearch -= 1 + len(options_set) - index_start
+				if self.stepsLeftSearch < 0:
+					return
+				sets.append(chosen + list(zip(*[sorted(row.elements(), key = str) for row in remaining])))
+				for index_option in range(index_start, len(options_set)):
+					column = options_set[index_option]
+					if all(remaining[index_row][reagent] > 0 for index_row, reagent in enumerate(column)):
+						for index_row, reagent in enumerate(column):
+							remaining[index_row][reagent] -= 1
+						chosen.append(column)
+						choose(index_option)
+						chosen.pop()
+						for index_row, reagent in enumerate(column):
+							remaining[index_row][reagent] += 1
+						if self.stepsLeftSearch < 0:
+							return
+			choose(0)
+			return sets
+
+		def search (index_movement, new_columns):
+			if self.stepsLeftSearch < 0 or best["New Columns"] <= lower_bound:
+				return
+			if index_movement == len(order):
+				if new_columns < best["New Columns"]:
+					best["New Columns"] = new_columns
+					best["Sets"] = dict(sets_search)
+				return
+			if new_columns + math.ceil(sum(bounds[id_movement] for id_movement in order[index_movement:]) - 1e-9) >= best["New Columns"]:
+				return
+
+			id_movement = order[index_movement]
+			# The sets with the same new columns lead to the same solutions and a set with all the new columns of another one and more is not tried,
+			# because each extra column costs 1 and it can save at most 1 column in the next final column types
+			sets_new_columns = {}
+			for column_set in sets_movement(id_movement):
+				sets_new_columns.setdefault(frozenset(column_set) - selected, column_set)
+			sets_tried = []
+			for columns_new in sorted(sets_new_columns.keys(), key = len):
+				self.stepsLeftSearch -= len(sets_tried)
+				if self.stepsLeftSearch < 0:
+					return
+				if not any(columns_tried < columns_new for columns_tried in sets_tried):
+					sets_tried.append(columns_new)
+
+			# The shared columns that this final column type does not take can only be taken by the next ones, so their lower bounds increase
+			columns_shared = [column for column in options[id_movement] if column in users_left.keys()]
+			for column in columns_shared:
+				users_left[column] -= 1
+			ids_sharing = set(id_user for column in columns_shared for id_user in users_columns[column] if position[id_user] > index_movement)
+			bounds_node = {id_sharing:bounds[id_sharing] for id_sharing in ids_sharing}
+			for id_sharing in ids_sharing:
+				bounds[id_sharing] = lower_bound_movement(id_sharing)
+
+			for columns_new in sets_tried:
+				column_set = sets_new_columns[columns_new]
+				if self.stepsLeftSearch < 0 or best["New Columns"] <= lower_bound:
+					break
+				# The lower bounds of the next final column types that can use the new columns decrease
+				ids_affected = set(id_user for column in columns_new for id_user in users_columns.get(column, []) if position[id_user] > index_movement)
+				bounds_before = {id_affected:bounds[id_affected] for id_affected in ids_affected}
+				selected.update(columns_new)
+				for id_affected in ids_affected:
+					bounds[id_affected] = lower_bound_movement(id_affected)
+				sets_search[id_movement] = column_set
 				
-				if len(self.sourceColumnsNeeded) == 0: # First time a column is going to be add
-					self.sourceColumnsNeeded[self.numberNeededColumnsSource] = {"Reagents":column_reagents_add,
-																				"Final Columns":{values_type_movement["Plate Name"]:[(values_type_movement["Column Final Plate"], values_type_movement["Volume Transfer"])]},
-																				"Positions Opentrons":[],
-																				"Reactions/column":[], # More than 1 column could be needed if the volume neded surpases the capacity of the well(s) in the source plate reservoir
-																				"Volumes/column":[] # Volume of each one of the columns, this is gong to be actually the volume of each well inside of the column
-																				}
-					self.numberNeededColumnsSource += 1
-				else:
-					for id_selected_column, values_selected_column in self.sourceColumnsNeeded.items():
-						if column_reagents_add == values_selected_column["Reagents"]:
-							if values_type_movement["Plate Name"] in values_selected_column["Final Columns"].keys():
-								self.sourceColumnsNeeded[id_selected_column]["Final Columns"][values_type_movement["Plate Name"]].append((values_type_movement["Column Final Plate"], values_type_movement["Volume Transfer"]))
-							else:
-								self.sourceColumnsNeeded[id_selected_column]["Final Columns"][values_type_movement["Plate Name"]] = [(values_type_movement["Column Final Plate"], values_type_movement["Volume Transfer"])]
-							selected_column_placed = True
-							break
-						else:
-							selected_column_placed = False
+				search(index_movement + 1, new_columns + len(columns_new))
+				
+				selected.difference_update(columns_new)
+				bounds.update(bounds_before)
 
-					if selected_column_placed == False:    
-						self.sourceColumnsNeeded[self.numberNeededColumnsSource] = {"Reagents":column_reagents_add,
-																					"Final Columns":{values_type_movement["Plate Name"]:[(values_type_movement["Column Final Plate"], values_type_movement["Volume Transfer"])]},
-																					"Positions Opentrons":[],
-																					"Reactions/column":[], # More than 1 column could be needed if the volume neded surpases the capacity of the well(s) in the source plate reservoir
-																					"Volumes/column":[] # Volume of each one of the columns, this is gong to be actually the volume of each well inside of the column
-																					}
-						self.numberNeededColumnsSource += 1
+			for column in columns_shared:
+				users_left[column] += 1
+			bounds.update(bounds_node)
 
-		for id in id_movements_to_remove:
-			del self.combinationsPerFinalColumns[id]
+		search(0, 0)
+		if self.stepsLeftSearch >= 0 or best["New Columns"] <= lower_bound:
+			return best["Sets"], best["New Columns"], True
+		else:
+			return best["Sets"], lower_bound, False
+
+	def high_opti_column_choosing (self):
+		"""
+		This is going to be used as the high optimization method of the columns. It finds the sets of columns of the final column types that need the minimum number
+		of source columns, re-using the columns assigned in initial_set
+
+		The final column types are separated in groups that cannot share any column (_groups_final_column_types) and the columns of each group are searched on their own
+		(_search_group), starting from the columns of a greedy selection (_greedy_column_sets). The smaller groups are searched first
+
+		All the searches share a limit of steps (limitStepsSearch) so the protocol does not take too long to be simulated. Layouts with many reagents per well taken at random
+		from a few reagents can reach it: then the fewest columns found are used, minimumProven is set to False and lowerBoundColumnsSource is the number of source columns that are
+		proven to be needed. Otherwise, lowerBoundColumnsSource is the number of source columns used
+		"""
+		rows_movements = {id_movement:[Counter(row) for row in values_movement["Reagents/Row"]] for id_movement, values_movement in self.combinationsPerFinalColumns.items()}
+		sets_columns = self._greedy_column_sets()
+		
+		self.stepsLeftSearch = self.limitStepsSearch
+		self.lowerBoundColumnsSource = len(self.sourceColumnsNeeded)
+		self.minimumProven = True
+		for ids_group in sorted(MultiChannelSourcePlates._groups_final_column_types(rows_movements), key = len):
+			sets_group, new_columns_group, proven_group = self._search_group(rows_movements, ids_group, sets_columns)
+			if sets_group != None:
+				sets_columns.update(sets_group)
+			self.lowerBoundColumnsSource += new_columns_group
+			self.minimumProven = self.minimumProven and proven_group
+
+		for id_movement, column_set in sets_columns.items():
+			for column in column_set:
+				self._add_source_column(column, self.combinationsPerFinalColumns[id_movement]["Plate Name"], self.combinationsPerFinalColumns[id_movement]["Column Final Plate"], self.combinationsPerFinalColumns[id_movement]["Volume Transfer"])
+		
+		self.combinationsPerFinalColumns = {}
 
 	def low_opti_column_choosing(self):
 		"""
@@ -960,142 +1245,48 @@ Sorry for the inconvenience""")
 				else:
 					break
 
+			# The columns that are left are added to the source columns, if one of them is already a source column it is re-used so it does not take another column of the reservoir
 			adding_columns = list(map(list, zip(*reagents)))
 			for column in adding_columns:
-				self.sourceColumnsNeeded[self.numberNeededColumnsSource] = {"Reagents":tuple(column),
-																			"Final Columns":{combination_mov["Plate Name"]:[(combination_mov["Column Final Plate"], combination_mov["Volume Transfer"])]},
-																			"Positions Opentrons":[],
-																			"Reactions/column":[],
-																			"Volumes/column":[]                               
-																			}
-				self.numberNeededColumnsSource += 1
-
-	def scoring_sets (self):
-		"""
-		Function that scores the sets of columns in a combination
-		This score is done adding how much that columsn appears in already selected columns and in the other combination sets by a ratio making a score of how much
-		the columns in this set are likely to be re-used for other columns in the final plate layout
-		For example, if 1 set has 3 columns and 1 of them is in the initial set and the other 2 appear in half of the other combination sets this set will have a score of
-		1 (appears in the already assigned source coluns) + 0.5 ( 1 column appears in half of the other sets) + 0.5 (1 column appears in half of the other sets)
-		As well, in which other column the set takes this score (dependency) is also tracked, so when all the combinations are updated, scores can be changed directly
-
-		This score is going to be used in the method seleccion update to select the best set, the one with the higher score and this method is going to be used only once for each object
-		it is created of this class
-		"""
-
-		# We need to loop for every set of columns of every type of volume movement is needed for the final plates layout to be created
-		for id_combination, combination_values in self.combinationsPerFinalColumns.items():
-			for id_set_combination, values_set in combination_values["Sets"].items():
-				for column_set in values_set["Combination"]: # We loop through all the columns because teh score is going to be additive
-					for id_combination_compare, values_combination_compare in self.combinationsPerFinalColumns.items(): # We loop through the other set so we can compare them to generate the score
-						if id_combination_compare == id_combination:
-							continue
-
-						score_dependecy_column = 0 # Initialize the score of this column to 0
-
-						for combination_compare in values_combination_compare["Sets"].values(): # Loop through the other sets
-							if column_set in combination_compare["Combination"]:
-								score_dependecy_column += 1
-
-						if score_dependecy_column > 0: # This column has dependencies with this set of combinations 
-							# Add the dependencies calculating the ratio so columns with more sets does not have an advantage over other that have less
-							if id_combination_compare in values_set["Score Dependencies"].keys():
-								self.combinationsPerFinalColumns[id_combination]["Sets"][id_set_combination]["Score Dependencies"][id_combination_compare] += score_dependecy_column/len(values_combination_compare["Sets"])
-							else:
-								self.combinationsPerFinalColumns[id_combination]["Sets"][id_set_combination]["Score Dependencies"][id_combination_compare] = score_dependecy_column/len(values_combination_compare["Sets"])
-
-							# Add the score of the column to the set we are doing the scores, again, we add the ratio
-							self.combinationsPerFinalColumns[id_combination]["Sets"][id_set_combination]["Score Combination"] += score_dependecy_column/len(values_combination_compare["Sets"])
-
-					for initial_set_column in self.sourceColumnsNeeded.values(): # Add the score of the columns being in the assigned source columns
-						if column_set == initial_set_column["Reagents"]:
-							self.combinationsPerFinalColumns[id_combination]["Sets"][id_set_combination]["Score Combination"] += 1
+				self._add_source_column(tuple(column), combination_mov["Plate Name"], combination_mov["Column Final Plate"], combination_mov["Volume Transfer"])
 
-				# We check if this set is the maximum scorer of this final column
-				if self.combinationsPerFinalColumns[id_combination]["Sets"][id_set_combination]["Score Combination"] > self.combinationsPerFinalColumns[id_combination]["Max Score Combination"]:
-					self.combinationsPerFinalColumns[id_combination]["Max Score Combination"] = self.combinationsPerFinalColumns[id_combination]["Sets"][id_set_combination]["Score Combination"]
-					self.combinationsPerFinalColumns[id_combination]["Name Combination Max Score"] = id_set_combination
-
-	def seleccion_update (self):
-		"""
-		Function that takes the initial scores of each set gave by scoring_set, picks the best one and updates the scores of other sets that have dependencies with the selected column
-		or set of columns.
-		This process is done recursivelly until every column of the final layout given by the user can be formed.
-		If more than one column have the same scores, being that one the max, the first one will be chosen
+	@staticmethod
+	def packing_volumes_columns (volumes, capacity_column):
 		"""
+		Function that distributes the volumes that are going to be transferred from a source column in the minimum number of columns of the reservoir,
+		being capacity_column the volume that can be used of each well of the columns (maximum volume minus the dead volume)
 
-		while len(self.combinationsPerFinalColumns) > 0: # Loop until no final column combinations are left
-			# Get the column with the set with the max score
-			columna_seleccionada = next(iter(sorted(self.combinationsPerFinalColumns, key = lambda x: self.combinationsPerFinalColumns[x]["Max Score Combination"], reverse = True))) # sort and then pick the first one
-			set_seleccionado = self.combinationsPerFinalColumns[columna_seleccionada]["Sets"][self.combinationsPerFinalColumns[columna_seleccionada]["Name Combination Max Score"]]["Combination"]
-
-			if len(self.sourceColumnsNeeded) == 0: # First time a column or set of columns is added to the source plate
-				for column_set_selected in set_seleccionado:
-					self.sourceColumnsNeeded[self.numberNeededColumnsSource] = {"Reagents":self.combinationsPerFinalColumns[columna_seleccionada]["Sets"][self.combinationsPerFinalColumns[columna_seleccionada]["Name Combination Max Score"]]["Combination"],
-																				"Final Columns":{self.combinationsPerFinalColumns[columna_seleccionada]["Plate Name"]:[(self.combinationsPerFinalColumns[columna_seleccionada]["Column Final Plate"], self.combinationsPerFinalColumns[columna_seleccionada]["Volume Transfer"])]},
-																				"Positions Opentrons":[],
-																				"Reactions/column":[], # More than 1 column can be needed for this combination because of volume capacity of the labware
-																				"Volumes/column":[] # Volumne of each column  
-																				}
-					self.numberNeededColumnsSource += 1
+		It returns a list with the indexes of the volumes that are going to be transferred from each one of the columns. The indexes inside of each column are sorted
+		so the final columns are reached in the same order as in the maps and the columns are sorted by their first final column, so the columns are consumed in order
+		The columns are filled sequentially unless a first fit decreasing packing of the volumes needs less columns
+		"""
+		# Sequential filling, each column feeds consecutive final columns
+		columns_sequential = []
+		volume_column = 0
+		for index_volume, volume in enumerate(volumes):
+			if len(columns_sequential) == 0 or volume_column + volume > capacity_column:
+				columns_sequential.append([])
+				volume_column = 0
+			columns_sequential[-1].append(index_volume)
+			volume_column += volume
+
+		# First fit decreasing, the biggest volumes are placed first in the first column where they fit
+		columns_packed = []
+		volumes_packed = []
+		for index_volume in sorted(range(len(volumes)), key = lambda index: volumes[index], reverse = True):
+			for index_column, volume_column in enumerate(volumes_packed):
+				if volume_column + volumes[index_volume] <= capacity_column:
+					columns_packed[index_column].append(index_volume)
+					volumes_packed[index_column] += volumes[index_volume]
+					break
 			else:
-				# Check that some of the columns are not already on the sourceColumnsNeeded
-				# If they are, just add the volume, else, just add the column with with the fields needed for the entry
-				# After tha addition, the scores are updated for the sets that have any of the columns selected in their own sets, either adding if it was selected or substract if other columns are selected
-
-				for column_set_selected in set_seleccionado:
-					for id_selected_column, values_selected_column in self.sourceColumnsNeeded.items():
-						if column_set_selected ==  values_selected_column["Reagents"]:
-							if self.combinationsPerFinalColumns[columna_seleccionada]["Plate Name"] in values_selected_column["Final Columns"].keys():
-								self.sourceColumnsNeeded[id_selected_column]["Final Columns"][self.combinationsPerFinalColumns[columna_seleccionada]["Plate Name"]].append((self.combinationsPerFinalColumns[columna_seleccionada]["Column Final Plate"], self.combinationsPerFinalColumns[columna_seleccionada]["Volume Transfer"]))
-							else:
-								self.sourceColumnsNeeded[id_selected_column]["Final Columns"][self.combinationsPerFinalColumns[columna_seleccionada]["Plate Name"]] = [(self.combinationsPerFinalColumns[columna_seleccionada]["Column Final Plate"], self.combinationsPerFinalColumns[columna_seleccionada]["Volume Transfer"])]
-							selected_column_placed = True
-							break
-						else:
-							selected_column_placed = False
-
-					if selected_column_placed == False:
-						self.sourceColumnsNeeded[self.numberNeededColumnsSource] = {"Reagents":column_set_selected,
-																					"Final Columns":{self.combinationsPerFinalColumns[columna_seleccionada]["Plate Name"]:[(self.combinationsPerFinalColumns[columna_seleccionada]["Column Final Plate"], self.combinationsPerFinalColumns[columna_seleccionada]["Volume Transfer"])]},
-																					"Positions Opentrons":[],
-																					"Reactions/column":[],
-																					"Volumes/column":[]    
-																					}
-						self.numberNeededColumnsSource += 1
-
-			# Delete all the sets of tha column because a set of columns are already selected and the scores are updated
-			del self.combinationsPerFinalColumns[columna_seleccionada]
-
-			# Update scores
-			for needed_type_movement in self.combinationsPerFinalColumns.keys():
-				# Reset the best score
-				self.combinationsPerFinalColumns[needed_type_movement]["Max Score Combination"] = 0
-				self.combinationsPerFinalColumns[needed_type_movement]["Name Combination Max Score"] = 0
-				for name_combination, combination in self.combinationsPerFinalColumns[needed_type_movement]["Sets"].items():
-					if columna_seleccionada in combination["Score Dependencies"].keys(): # Update the score if there is any dependencies with the column we have selected
-						# We substract the value it gave as a set and add the value that each column give
-						self.combinationsPerFinalColumns[needed_type_movement]["Sets"][name_combination]["Score Combination"] -= combination["Score Dependencies"][columna_seleccionada]
-						del self.combinationsPerFinalColumns[needed_type_movement]["Sets"][name_combination]["Score Dependencies"][columna_seleccionada]
-						number_common_columns = sum(1 for element in set_seleccionado if element in combination["Combination"])
-						self.combinationsPerFinalColumns[needed_type_movement]["Sets"][name_combination]["Score Combination"] += number_common_columns
-
-					# If the additions have made it the best one, it is updated the max score
-					if self.combinationsPerFinalColumns[needed_type_movement]["Sets"][name_combination]["Score Combination"] > self.combinationsPerFinalColumns[needed_type_movement]["Max Score Combination"]:
-						self.combinationsPerFinalColumns[needed_type_movement]["Max Score Combination"] = self.combinationsPerFinalColumns[needed_type_movement]["Sets"][name_combination]["Score Combination"]
-						self.combinationsPerFinalColumns[needed_type_movement]["Name Combination Max Score"] = name_combination
-
-class TimeoutError(Exception):
-	"""
-	Custom errordefined for errors in the object MultiChannelSourcePlates
+				columns_packed.append([index_volume])
+				volumes_packed.append(volumes[index_volume])
 
-	It is going to be used when the generation of combinations are taking too long and an exception will be raised
-	for the user to choose another set of options
-
-	This is a preventive measure taken just so the simulation of the protocol does not take too much time
-	"""
-
-	pass
+		if len(columns_packed) < len(columns_sequential):
+			return sorted([sorted(column) for column in columns_packed], key = lambda column: column[0])
+		else:
+			return columns_sequential
 
 class NotSuitablePipette(Exception):
 	"""
@@ -1189,6 +1380,57 @@ def setting_labware (number_labware, labware_name, positions, protocol, module =
 
 	return all_plates
 
+def distance_deck_slots (slot_1, slot_2):
+	"""
+	Function that will calculate the distance in mm between the centres of 2 slots of the OT-2 deck
+
+	The OT-2 deck is a grid of 3 columns and 4 rows in which slot 1 is the front left one and slot 12 the trash,
+	the slots are 132.5mm apart in the X axis and 90.5mm in the Y axis
+
+	2 mandatory arguments are needed for this function
+	"""
+	# Find out the column and row of each of the slots
+	column_1, row_1 = (int(slot_1)-1)%3, (int(slot_1)-1)//3
+	column_2, row_2 = (int(slot_2)-1)%3, (int(slot_2)-1)//3
+
+	return math.sqrt(((column_1-column_2)*132.5)**2 + ((row_1-row_2)*90.5)**2)
+
+def sort_positions_by_trips (positions, trips_slots):
+	"""
+	Function that will sort the deck positions from the one with the lowest gantry travel to the one with the highest for a labware
+	that is going to be visited together with labwares that are already placed in the deck
+
+	The argument trips_slots is a dictionary with the slots of the labwares already placed as keys and the number of trips expected
+	between them and the labware that is going to be placed as values. The travel of a position is the sum of those trips multiplied by the
+	distance between slots, so setting_labware and define_tiprack will try first the positions with the least travel and, in case of deck conflict, the next ones
+
+	Positions with the same travel keep their original order
+
+	2 mandatory arguments are needed for this function
+	"""
+	travel_positions = {}
+	for position in positions.keys():
+		travel_positions[position] = sum(trips*distance_deck_slots(position, slot) for slot, trips in trips_slots.items())
+	
+	return dict(sorted(positions.items(), key = lambda position: travel_positions[position[0]]))
+
+def labware_accessors (labware):
+	"""
+	Function that will build, once the labware is loaded, the tables of its wells so they do not need to be generated again every time
+	that a well, a column or a row is needed, as it happens with the methods wells(), columns(), rows() and wells_by_name() of the labware
+
+	The tables are immutable: the wells, columns and rows are tuples (in the same order as the labware returns them) and
+	the tables by name are read-only dictionaries, so they can be shared by all the parts of the script without being modified by mistake
+
+	1 mandatory argument is needed for this function
+	"""
+	return MappingProxyType({"Wells":tuple(labware.wells()),
+							 "Columns":tuple(tuple(column) for column in labware.columns()),
+							 "Rows":tuple(tuple(row) for row in labware.rows()),
+							 "Wells By Name":MappingProxyType(dict(labware.wells_by_name())),
+							 "Columns By Name":MappingProxyType({name_column:tuple(column) for name_column, column in labware.columns_by_name().items()}),
+							 "Rows By Name":MappingProxyType({name_row:tuple(row) for name_row, row in labware.rows_by_name().items()})})
+
 def generator_positions (labware_wells_name):
 	"""
 	Function that will return the next element everytime is called from a given list
@@ -1883,9 +2125,11 @@ def run(protocol:opentrons.protocol_api.ProtocolContext):
 										 label = labels) # Por ahora no le pondre labels
 
 		program_variables.finalPlates[name_plate]["Opentrons Place"] = list(final_labware.values())[0]
+		program_variables.finalPlates[name_plate]["Accessors"] = labware_accessors(list(final_labware.values())[0])
 
 		for position_labware, name_replica in zip(list(final_labware.values())[1:], items_plate["Plates Replicas"].keys()):
 			program_variables.finalPlates[name_plate]["Plates Replicas"][name_replica] = position_labware
+			program_variables.finalPlates[name_plate]["Accessors Replicas"][name_replica] = labware_accessors(position_labware)
 
 
 	# The needed columns and/or tube of reagents with the needed volume of each one is already calculated in program_variables.assign_variables
@@ -1977,7 +2221,8 @@ def run(protocol:opentrons.protocol_api.ProtocolContext):
 	
 	# Only if there is at least 1 plate that is going to be created with a multi channel pipette the reservoir labwares are going to be loaded
 	# The structures that we are using in this conditional are based on the ones used in LAP-MoCloAssembly-OT2-1.0.1
-	# It is not completly optimized the use of columns so it is something that it can be improved in the future
+	# The volumes of each source column are packed in the minimum number of reservoir columns and the reservoir columns that feed the same final plates are placed together in a reservoir
+	# that is set as close as possible to those final plates
 
 	if any(elem == 'multi' for elem in user_variables.pipetteCreationPlate[:user_variables.numberFinalPlates]):
 		vol_max_well = user_variables.maxVolumeWellReservoirPlate
@@ -2006,70 +2251,66 @@ def run(protocol:opentrons.protocol_api.ProtocolContext):
 							# Multiply the volume needed in each well of the final labware because all of them are going to be stored in 1 well of the reservoir 
 							volume_all_multi_plates.append(final_column_plate[1]*user_variables.dimensionsFinalLabware["row"])
 			
-			# Now that we have established how much volume is needed from each one of the final columns we sum them so we can distribute them into the reservoir columns
-			volume_column_needed = sum(volume_all_multi_plates)
-
-			# The final results is going to be that in the "Volumes/column" we are going to store the ammount of volume per well in the column taking in account
+			# Now that we have established how much volume is needed from each one of the final columns we check that each one of them fits in a column of the reservoir
 			if any(volume+(vol_max_well*0.05) > vol_max_well for volume in volume_all_multi_plates) == True:
 				raise Exception(f"""One of the volumes of the column {column_needed['Reagents']} does not fit in columns (adding pipetting extra volume which is the 0.05 of the maximum volume of the Labware), check combinations.
 Each individual volume of the reagents cannot be over the maximum volume of each well of the column of the source plate.
 If the final labware has only 1 row and the initial labware has 8 rows the final volume is going to be slit in 8 well so that splited volume is the one that it should not be major than the maximum capacity of the reservoir plate wells.
 The opposite case, in which the final labware has 8 rows and the reservoir plate has only 1 row has the opposite maximum volume, the sum of the volumes in the final labware should not be greater than the maximum capacity of the reservoir""")
 				
-			if volume_column_needed <= 0.95*vol_max_well: # Everything fits in 1 column so the assignment is straightworfard
-				program_variables.neededColumnsMulti.sourceColumnsNeeded[name_column_needed]["Volumes/column"] = [volume_column_needed]
-				program_variables.neededColumnsMulti.sourceColumnsNeeded[name_column_needed]["Reactions/column"] = [len(volume_all_multi_plates)]
-				total_columns += 1
-			else: # The volume does not fit in a single column so we need to find out how many final wells can feed each column
-				current_volume_column = 0
-				current_column_reactions = 0
-				for index_volume, volume in enumerate(volume_all_multi_plates):
-					# We check if the current column can fit the volume but no more than that or if it fits in the tube na dit is the last position
-					if (current_volume_column+volume == 0.95*vol_max_well) or (current_volume_column+volume < 0.95*vol_max_well and index_volume == len(volume_all_multi_plates) - 1):
-						program_variables.neededColumnsMulti.sourceColumnsNeeded[name_column_needed]["Volumes/column"].append(current_volume_column+volume)
-						program_variables.neededColumnsMulti.sourceColumnsNeeded[name_column_needed]["Reactions/column"].append(current_column_reactions+1)
-						total_columns += 1
-						# Restart the volume and reactions
-						current_volume_column = 0
-						current_column_reactions = 0
-					elif current_volume_column+volume > 0.95*vol_max_well:
-						# Record the information of the tube that is completed
-						program_variables.neededColumnsMulti.sourceColumnsNeeded[name_column_needed]["Volumes/column"].append(current_volume_column)
-						program_variables.neededColumnsMulti.sourceColumnsNeeded[name_column_needed]["Reactions/column"].append(current_column_reactions)
-						total_columns += 1
-						# Restart the new tube with the volume of the reaction that did not fit in the current one
-						current_volume_column = volume
-						current_column_reactions = 1
-						if index_volume == len(volume_all_multi_plates) - 1:
-							program_variables.neededColumnsMulti.sourceColumnsNeeded[name_column_needed]["Volumes/column"].append(current_volume_column)
-							program_variables.neededColumnsMulti.sourceColumnsNeeded[name_column_needed]["Reactions/column"].append(current_column_reactions)
-							total_columns += 1
-					else: # The volume fits, there is more space in the tube and it is not the last volume that needs to be added
-						current_volume_column += volume
-						current_column_reactions += 1
-
-		# We know now how many columns we need so we will just set the needed number of labwares
-		columns_reagents_labware = setting_labware(math.ceil(total_columns/user_variables.dimensionsLabwareReservoir["columns"]),
-												   user_variables.APINameReservoirPlate,
-												   dict(zip(protocol.deck.keys(), protocol.deck.values())),
-												   protocol,
-												   label = "Plates with Reagents to be Transferred with Multi-Channel Pipette(s)")
-	
-		# Lets set the place of each set of columns
-		positions_columns = []
-		for labware in columns_reagents_labware.values():
-			positions_columns += labware.columns()
-		generator_position_columns = generator_positions(positions_columns)
-
+			# The volumes are distributed in the columns of the reservoir leaving the 0.05 of the maximum volume of the wells as dead volume
+			# Each column records the indexes of the final columns it feeds so they are transferred from it in the order of the maps
+			transfers_columns = MultiChannelSourcePlates.packing_volumes_columns(volume_all_multi_plates, 0.95*vol_max_well)
+			program_variables.neededColumnsMulti.sourceColumnsNeeded[name_column_needed]["Transfers/column"] = transfers_columns
+			program_variables.neededColumnsMulti.sourceColumnsNeeded[name_column_needed]["Volumes/column"] = [sum(volume_all_multi_plates[index_transfer] for index_transfer in transfers_column) for transfers_column in transfers_columns]
+			program_variables.neededColumnsMulti.sourceColumnsNeeded[name_column_needed]["Reactions/column"] = [len(transfers_column) for transfers_column in transfers_columns]
+			total_columns += len(transfers_columns)
+
+		# Slot of every final plate, including the replicas, to place the reservoirs close to the final plates they feed
+		slots_final_plates = {}
+		for name_plate, values_plate in program_variables.finalPlates.items():
+			if values_plate["Opentrons Place"] != None:
+				slots_final_plates[name_plate] = values_plate["Opentrons Place"].parent
+				for name_replica, replica_labware in values_plate["Plates Replicas"].items():
+					slots_final_plates[name_replica] = replica_labware.parent
+		order_final_plates = list(slots_final_plates.keys())
+
+		# A column of the reservoir can only have 1 type of source column because each well has 1 reagent, but the columns of different types can share a reservoir
+		# The reservoir columns are sorted by the first final column that they feed, so each reservoir has the columns that the same final plates need
+		columns_reservoir = []
 		for name_column, values_column in program_variables.neededColumnsMulti.sourceColumnsNeeded.items():
-			for volume_column in values_column["Volumes/column"]:
-				column = next(generator_position_columns)
-				program_variables.neededColumnsMulti.sourceColumnsNeeded[name_column]["Positions Opentrons"].append(column)
+			final_columns_source = [(name_plate, column_final) for name_plate, values in values_column["Final Columns"].items() for column_final, volume in values]
+			values_column["Positions Opentrons"] = [None]*len(values_column["Transfers/column"])
+			for index_column, transfers_column in enumerate(values_column["Transfers/column"]):
+				plates_column = [final_columns_source[index_transfer][0] for index_transfer in transfers_column]
+				first_final_column = min((order_final_plates.index(final_columns_source[index_transfer][0]), int(final_columns_source[index_transfer][1])) for index_transfer in transfers_column)
+				columns_reservoir.append({"Source Column":name_column, "Index":index_column, "Plates":plates_column, "First Final Column":first_final_column})
+		columns_reservoir.sort(key = lambda column_reservoir: column_reservoir["First Final Column"])
+
+		# We know now how many columns we need so we set the reservoirs one by one in the free slot with less travel to the final plates that their columns feed
+		number_columns_labware = user_variables.dimensionsLabwareReservoir["columns"]
+		for index_labware in range(math.ceil(total_columns/number_columns_labware)):
+			columns_labware = columns_reservoir[index_labware*number_columns_labware:(index_labware+1)*number_columns_labware]
+			trips_slots = {}
+			for column_reservoir in columns_labware:
+				for name_plate in column_reservoir["Plates"]:
+					trips_slots[slots_final_plates[name_plate]] = trips_slots.get(slots_final_plates[name_plate], 0) + 1
+			
+			reservoir_labware = setting_labware(1,
+												user_variables.APINameReservoirPlate,
+												sort_positions_by_trips(dict(zip(protocol.deck.keys(), protocol.deck.values())), trips_slots),
+												protocol,
+												label = [f"Plate {index_labware+1} with Reagents to be Transferred with Multi-Channel Pipette(s)"])
+			
+			# Lets set the place of each set of columns
+			for column_reservoir, column in zip(columns_labware, list(reservoir_labware.values())[0].columns()):
+				values_column = program_variables.neededColumnsMulti.sourceColumnsNeeded[column_reservoir["Source Column"]]
+				values_column["Positions Opentrons"][column_reservoir["Index"]] = column
 				# Load liquid so the user knows how much volume it needs to have in each well
 				for index_well, well in enumerate(column):
 					if values_column["Reagents"][index_well] == "None":
 						continue
-					well.load_liquid(liquid = program_variables.color_info_reactives[values_column["Reagents"][index_well]]["Definition Liquid"], volume = volume_column)
+					well.load_liquid(liquid = program_variables.color_info_reactives[values_column["Reagents"][index_well]]["Definition Liquid"], volume = values_column["Volumes/column"][column_reservoir["Index"]])
 
 	# ------------------------------------------------------------------------------------------------------------------------
 	# We have already set every reagent and record where they are and the final wells that they need to transfer the liquid to
@@ -2086,18 +2327,18 @@ The opposite case, in which the final labware has 8 rows and the reservoir plate
 				for main_plate in program_variables.finalPlates.values(): # Now we check the plates in the replicas
 					if plate in main_plate['Plates Replicas']:
 						# Set which one is the plate
-						ot_labware = main_plate['Plates Replicas'][plate]
+						accessors_labware = main_plate['Accessors Replicas'][plate]
 						break # We have found the plate so we will just break this for loop
 			else: # The plate is one of the main ones that the user sets
 				# Set the plate
-				ot_labware = program_variables.finalPlates[plate]["Opentrons Place"]
+				accessors_labware = program_variables.finalPlates[plate]["Accessors"]
 			
 			# We add to the reagent volumes the ones that are from this plate correspondent to the reactive
 			volumes_reagent += values_reagents["Volumes/Position"][plate]
 			
 			# Now we loop through the names of the wells and store the wells themselves
 			for final_well in positions:
-				wells_reagent.append(ot_labware[final_well])
+				wells_reagent.append(accessors_labware["Wells By Name"][final_well])
 
 		# We have now the positions and the volumes for each final well that this reagents needs to be transferred
 		# Now we are going to loop through the tubes to dispense those volumes
@@ -2570,11 +2811,11 @@ The opposite case, in which the final labware has 8 rows and the reservoir plate
 					for main_plate in program_variables.finalPlates.values():
 						if name_plate in main_plate['Plates Replicas']:
 							# Define the plate
-							ot_labware = main_plate['Plates Replicas'][name_plate]
+							accessors_labware = main_plate['Accessors Replicas'][name_plate]
 							break # We have already found the plate os we break the loop
 				else: # If it goes inside of this loop it is a plate set by the user
 					# Define the plate
-					ot_labware = program_variables.finalPlates[name_plate]["Opentrons Place"]
+					accessors_labware = program_variables.finalPlates[name_plate]["Accessors"]
 
 				# Now we are going to transform the list of column names of that plate to the actual well positions thta we can work with
 				for name_column, volume_column in list_positions_volumes:
@@ -2585,18 +2826,22 @@ The opposite case, in which the final labware has 8 rows and the reservoir plate
 						all_volumes_transfer_source_column.append(volume_column)
 					
 					# We are only going to add to the list of positions the first well of that column because for opentrons when using a multi channel pipette is equivalent to say the whole column
-					all_columns_transfer_source_column.append(ot_labware.columns_by_name()[name_column][0])
+					all_columns_transfer_source_column.append(accessors_labware["Columns By Name"][name_column][0])
 
 			# Now that we have the complet list of final columns where this reagent column needs to be transferred to we will loop over all the columns that we have calculated previously
-			# and transfer them from the source columns. We dont need to control the volume because we know how many final wells we can transfer to without running out of volume
-			for reactions_column, position_column, volume_column in zip(values_column['Reactions/column'], values_column['Positions Opentrons'], values_column['Volumes/column']):
+			# and transfer them from the source columns. We dont need to control the volume because we know which final wells each column can feed without running out of volume
+			for transfers_column, position_column, volume_column in zip(values_column['Transfers/column'], values_column['Positions Opentrons'], values_column['Volumes/column']):
+				# Final columns and volumes that are going to be transferred from this column of the reservoir
+				volumes_transfer_column = [all_volumes_transfer_source_column[index_transfer] for index_transfer in transfers_column]
+				columns_transfer_column = [all_columns_transfer_source_column[index_transfer] for index_transfer in transfers_column]
+
 				# Define which pipette needs to transfer  which volumes
 				# We are goign to as well define the position where the volume shoudl be dispensed in the final wells (top, botoom or center)
 				# and in case the change tip is defined as aspirate, we are going to sort the volumes to try to minimize the movements the pipette will have to do
 
 				if (program_variables.pipL == None or program_variables.pipR == None) or ((program_variables.pipL != None and program_variables.pipL.channels == 8) and (program_variables.pipR != None and program_variables.pipR.channels == 8)):
-					volumes_distribute_pipR, positions_distribute_pipR, volumes_distribute_pipL, positions_distribute_pipL = vol_pipette_matcher (all_volumes_transfer_source_column[:reactions_column],
-																																				  all_columns_transfer_source_column[:reactions_column],
+					volumes_distribute_pipR, positions_distribute_pipR, volumes_distribute_pipL, positions_distribute_pipL = vol_pipette_matcher (volumes_transfer_column,
+																																				  columns_transfer_column,
 																																				  program_variables.pipR,
 																																				  program_variables.pipL
 																																				  )
@@ -2606,13 +2851,13 @@ The opposite case, in which the final labware has 8 rows and the reservoir plate
 				elif program_variables.pipL != None and program_variables.pipL.channels == 8:
 					volumes_distribute_pipR = []
 					positions_distribute_pipR = []
-					volumes_distribute_pipL = all_volumes_transfer_source_column[:reactions_column]
-					positions_distribute_pipL = all_columns_transfer_source_column[:reactions_column]
+					volumes_distribute_pipL = volumes_transfer_column
+					positions_distribute_pipL = columns_transfer_column
 					
 					positions_distribute_pipL, volumes_distribute_pipL = conversor_well_position_sorter (positions_distribute_pipL, user_variables.positionDistributeMedia, volumes = volumes_distribute_pipL, sort = sort)
 				elif program_variables.pipR != None and program_variables.pipR.channels == 8:
-					volumes_distribute_pipR = all_volumes_transfer_source_column[:reactions_column]
-					positions_distribute_pipR = all_columns_transfer_source_column[:reactions_column]
+					volumes_distribute_pipR = volumes_transfer_column
+					positions_distribute_pipR = columns_transfer_column
 					volumes_distribute_pipL = []
 					positions_distribute_pipL = []
 					
@@ -2890,10 +3135,6 @@ The opposite case, in which the final labware has 8 rows and the reservoir plate
 														  disposal_volume = 0,
 														  touch_tip = user_variables.touchTipDistributeMedia)
 
-				# We take from the list of final columns the ones that we have already transferred the volumes
-				del all_columns_transfer_source_column[:reactions_column]
-				del all_volumes_transfer_source_column[:reactions_column]
-
 			# Unless the change tip is never we will drop the tip to go to the next reagent
 			if user_variables.changeTipDistribute != "never":
 				if program_variables.pipR != None and program_variables.pipR.has_tip == True:
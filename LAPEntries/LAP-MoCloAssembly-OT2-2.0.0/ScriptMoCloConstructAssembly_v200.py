@@ -27,6 +27,9 @@ import pandas as pd
 import math
 import random
 import numpy as np
+import csv
+from types import MappingProxyType
+from openpyxl import Workbook
 from opentrons.motion_planning.deck_conflict import DeckConflictError
 from opentrons.protocol_api.labware import OutOfTipsError
 
@@ -36,7 +39,7 @@ class UserVariables:
 	Class that will contain the parameters setted in the variables csv and will process them to work easily in the rest of the protocol
 	The coding of this function is dependant of the variables in the Template of the protocol and the names have to be consistent with the rest of the code
 	"""
-	def __init__(self, general, each_plate, pipettes, reagents, modules, combinations, profile = None):
+	def __init__(self, general, each_plate, pipettes, reagents, modules, combinations, profile = None, mixing_profiles = None, liquid_classes = None, reagent_liquid_classes = None, incompatible_parts = None):
 		"""
 		This function will take the pandas dataframe that will be the table of the excel variable files
 		"""
@@ -45,8 +48,18 @@ class UserVariables:
 		self.APINameFinalPlate = general[general["Variable Names"] == "API Name Final Plate"]["Value"].values[0]
 		self.APINameEppendorfPlate = general[general["Variable Names"] == "API Name Labware Eppendorfs Reagents"]["Value"].values[0]
 		self.finalMapName = general[general["Variable Names"] == "Name File Final Constructs"]["Value"].values[0]
+		# Optional variable, files without this row will export the final maps only as an excel file
+		if "Format Final Maps" in general["Variable Names"].values:
+			self.formatsFinalMaps = general[general["Variable Names"] == "Format Final Maps"]["Value"].values[0]
+		else:
+			self.formatsFinalMaps = np.nan
 		self.wellStartFinalPlate = general[general["Variable Names"] == "Well Start Final Labware"]["Value"].values[0]
 		self.APINameSamplePlate = general[general["Variable Names"] == "API Name Labware DNA Constructs"]["Value"].values[0] # It is equivalent to the other protocols source plates
+		# Optional variable, files without this row will place the combinations in the final wells in the order of the sheet Combinations
+		if "Group Combinations By Parts" in general["Variable Names"].values:
+			self.groupCombinationsParts = general[general["Variable Names"] == "Group Combinations By Parts"]["Value"].values[0]
+		else:
+			self.groupCombinationsParts = False
 
 		# Module Variables sheet
 		self.presenceHS = modules[modules["Variable Names"] == "Presence Heater-Shaker"]["Value"].values[0]
@@ -59,6 +72,11 @@ class UserVariables:
 		self.pause = modules[modules["Variable Names"] == "Pause Before Temperature Program"]["Value"].values[0]
 		self.initialTemperatureBlock = modules[modules["Variable Names"] == "Initial Thermocycle Block Temperature"]["Value"].values[0]
 		self.volMaxMixTube = modules[modules["Variable Names"] == "Max Volume Per Mix Tube In Shaker"]["Value"].values[0]
+		# Optional variable, files without this row can only create the combinations that fit in the plate of the thermocycler
+		if "Thermocycler Batches" in modules["Variable Names"].values:
+			self.batchesTermo = modules[modules["Variable Names"] == "Thermocycler Batches"]["Value"].values[0]
+		else:
+			self.batchesTermo = False
 
 		# Reaction Variables Sheet
 		self.acceptorVolume = reagents[reagents["Variable Names"] == "Volume Acceptor Plasmid (uL)"]["Value"].values[0]
@@ -78,6 +96,11 @@ class UserVariables:
 		self.positionDistributeMix = reagents[reagents["Variable Names"] == "Position Distribute Reaction Mix"]["Value"].values[0]
 		self.changeTipDistributeMix = reagents[reagents["Variable Names"] == "Change Tip in Mix Distribution"]["Value"].values[0]
 		self.touchTipDistributeMix = reagents[reagents["Variable Names"] == "Touch Tip After Distributing Reaction Mix"]["Value"].values[0]
+		# Optional variable, files without this row will mix the reaction mix as a glycerol-enzyme liquid
+		if "Liquid Class Mix" in reagents["Variable Names"].values:
+			self.liquidClassMix = reagents[reagents["Variable Names"] == "Liquid Class Mix"]["Value"].values[0]
+		else:
+			self.liquidClassMix = np.nan
 		
 		# Pipette Variables Sheet
 		self.APINamePipL = pipettes[pipettes["Variable Names"] == "API Name Left Pipette"]["Value"].values[0]
@@ -94,6 +117,23 @@ class UserVariables:
 		else:
 			self.temperatureProfile = None
 
+		# Mixing profiles, in case the user defines their own liquid classes
+		if isinstance(mixing_profiles, pd.DataFrame):
+			self.mixingProfiles = mixing_profiles.dropna(how = "all")
+		else:
+			self.mixingProfiles = None
+		
+		# Liquid classes and the reagents that use them, in case the user defines them
+		if isinstance(liquid_classes, pd.DataFrame):
+			self.liquidClasses = liquid_classes.dropna(how = "all")
+		else:
+			self.liquidClasses = None
+		
+		if isinstance(reagent_liquid_classes, pd.DataFrame):
+			self.reagentLiquidClasses = reagent_liquid_classes.dropna(how = "all")
+		else:
+			self.reagentLiquidClasses = None
+
 		# Per Plate Variables Sheet
 		self.samplesPerPlate = list(each_plate[each_plate["Variable Names"] == "Number of Parts"].values[0][1:]) # Equivalent to Number of Samples
 		self.nameSheetMapParts = list(each_plate[each_plate["Variable Names"] == "Name Map DNA Parts"].values[0][1:])
@@ -101,6 +141,12 @@ class UserVariables:
 		# Combinations Sheet
 		self.combinations_dataframe = combinations.dropna(how = "all")
 
+		# Pairs of DNA parts that cannot be in the same combination, in case the combinations have cells with options
+		if isinstance(incompatible_parts, pd.DataFrame):
+			self.incompatibleParts = incompatible_parts.dropna(how = "all")
+		else:
+			self.incompatibleParts = None
+
 		return
 	
 	def check(self):
@@ -116,6 +162,14 @@ class UserVariables:
 		# First thing that we are going to check is that the minimum variables are present:
 		if pd.isna([self.APINameFinalPlate, self.APINameEppendorfPlate, self.finalMapName, self.wellStartFinalPlate, self.APINameSamplePlate, self.numberSourcePlates]).any():
 			raise Exception("None of the variables in the Sheet 'GeneralVariables' can be empty")
+		
+		# The final maps are exported by default only as an excel file
+		if pd.isna(self.formatsFinalMaps):
+			self.formatsFinalMaps = ["xlsx"]
+		else:
+			self.formatsFinalMaps = str(self.formatsFinalMaps).replace(" ","").lower().split(",")
+			if any(format_map not in ["xlsx", "csv", "tsv", "long"] for format_map in self.formatsFinalMaps):
+				raise Exception("The variable 'Format Final Maps' can only have the formats 'xlsx', 'csv', 'tsv' and 'long' separated by commas")
 		if pd.isna([self.presenceHS, self.presenceTermo]).any():
 			raise Exception("The variables 'Presence Thermocycler' and 'Presence Heater-Shaker' in the Sheet 'ModuleVariables' cannot be empty")
 		if pd.isna([self.acceptorVolume, self.moduleVolume, self.restrictionEnzymeVolume,self.ligaseVolume,self.bufferVolume,self.serumVolume,self.extraPipettingFactor,self.finalVolume]).any():
@@ -147,6 +201,13 @@ class UserVariables:
 		else:
 			raise Exception ("The variable 'Replace Tipracks' only accepts 2 values, True or False")
 
+		if pd.isna(self.groupCombinationsParts) or self.groupCombinationsParts in ["false", "FALSE", "False", 0, False]:
+			self.groupCombinationsParts = False
+		elif self.groupCombinationsParts in ["true", "TRUE", "True", 1, True]:
+			self.groupCombinationsParts = True
+		else:
+			raise Exception ("The variable 'Group Combinations By Parts' only accepts 2 values, True or False. If left empty, False will be assumed")
+
 		# Check that if the tipracks are the same, the initial tips should be ethe same as well
 		if not pd.isna(self.APINamePipL) and not pd.isna(self.APINamePipR):
 			if self.APINameTipL == self.APINameTipR:
@@ -172,6 +233,14 @@ class UserVariables:
 		else:
 			raise Exception ("The variable 'Presence Thermocycler' only accepts 2 values, True or False")
 		
+		# The batches only make sense if the thermocycler is present
+		if not self.presenceTermo or pd.isna(self.batchesTermo) or self.batchesTermo in ["false", "FALSE", "False", 0, False]:
+			self.batchesTermo = False
+		elif self.batchesTermo in ["true", "TRUE", "True", 1, True]:
+			self.batchesTermo = True
+		else:
+			raise Exception ("The variable 'Thermocycler Batches' only accepts 2 values, True or False. If left empty, False will be assumed")
+		
 		# Check the varaibles that are related to the thermocycler if needed
 		if self.presenceTermo:
 			if pd.isna(self.finalStateLid) or pd.isna(self.pause)  or pd.isna(self.temperatureLid):
@@ -190,7 +259,7 @@ class UserVariables:
 				self.pause = False
 			else:
 				raise Exception ("The variable 'Pause Before Temperature Program' only accepts 2 values, True or False")
-			
+
 			if not isinstance(self.temperatureProfile, pd.DataFrame):
 				raise Exception ("We do not have the Sheet 'TemperatureProfile' but we have the variable 'Presence of Thermocycler' set as True, that is incompatible")
 			else: # Let's check the values of the temperature profile dataframe are correct
@@ -348,15 +417,40 @@ class UserVariables:
 		if pd.Series(self.combinations_dataframe["Name"].values).is_unique == False:
 			raise Exception("Names on the Combinations Sheet have to be unique")
 		
-		# Check that there is no value on the map that is not being used
-		all_values_combinations = np.concatenate(self.combinations_dataframe.iloc[:, 1:].values).tolist()
+		# Check that there is no value on the map that is not being used, the cells with options, {part1|part2|...}, can use any of their parts
+		all_values_combinations = [option for value in np.concatenate(self.combinations_dataframe.iloc[:, 1:].values).tolist() for option in options_combination_cell(value)]
 		for element in unflat_values:
 			if element not in all_values_combinations:
 				raise Exception(f"The DNA part '{element}' is not used in any combination. Take it out of the map and run again")
 
-		# Check if the thermocycler is included if we need more than 1 final plate
-		if self.presenceTermo and len(self.combinations_dataframe["Name"].values) > len(definition_final_plate["wells"].keys()):
-			raise Exception("If the Thermocycler is present, only 1 final plate can be created and all of your combinations does not fit in the selected final labware")			
+		# Check the pairs of incompatible parts if they are given
+		if isinstance(self.incompatibleParts, pd.DataFrame):
+			if not all(item in list(self.incompatibleParts.columns) for item in ["Part 1", "Part 2"]):
+				raise Exception("The sheet 'IncompatibleParts' needs to have the columns 'Part 1' and 'Part 2'")
+			if self.incompatibleParts[["Part 1", "Part 2"]].isna().any().any():
+				raise Exception("The values of the columns 'Part 1' and 'Part 2' of the sheet 'IncompatibleParts' cannot be left empty")
+			for part in np.concatenate(self.incompatibleParts[["Part 1", "Part 2"]].values).tolist():
+				if part not in unflat_values:
+					raise Exception(f"The DNA part '{part}' of the sheet 'IncompatibleParts' is not in any of the DNA Parts Maps")
+
+		# The block of the thermocycler only holds 96-well plates, final plates with more wells (for example, 384-well plates) can only be used without it
+		if self.presenceTermo and len(definition_final_plate["wells"]) > 96:
+			raise Exception(f"The final plate {self.APINameFinalPlate} has {len(definition_final_plate['wells'])} wells and the thermocycler only holds 96-well plates. Set 'Presence Thermocycler' as False to use this final labware")
+		
+		# Check if the thermocycler is included if we need more than 1 final plate, counting the combinations after expanding the options and removing the incompatible ones
+		# The combinations are generated one by one, so the count stops as soon as they do not fit in the final plate
+		if self.presenceTermo and not self.batchesTermo:
+			if isinstance(self.incompatibleParts, pd.DataFrame):
+				incompatible_parts = self.incompatibleParts[["Part 1", "Part 2"]].values.tolist()
+			else:
+				incompatible_parts = None
+			number_combinations = 0
+			for combination in generator_combinations_table(self.combinations_dataframe, "Name", "Acceptor Plasmid", incompatible_parts = incompatible_parts):
+				number_combinations += 1
+				if number_combinations > len(definition_final_plate["wells"].keys()):
+					break
+		if self.presenceTermo and not self.batchesTermo and number_combinations > len(definition_final_plate["wells"].keys()):
+			raise Exception("If the Thermocycler is present, only 1 final plate can be created and all of your combinations does not fit in the selected final labware. Set 'Thermocycler Batches' as True to run the temperature profile in batches of 1 final plate")			
 		
 		# Check that all the reactives are actually numbers
 		if any(type(reactive) == str for reactive in [self.acceptorVolume, self.restrictionEnzymeVolume, self.ligaseVolume, self.bufferVolume, self.serumVolume, self.finalVolume, self.extraPipettingFactor, self.moduleVolume]):
@@ -375,7 +469,7 @@ class UserVariables:
 		vol_max_well = list(definition_final_plate["wells"].values())[0]["totalLiquidVolume"]
 
 		if self.finalVolume > vol_max_well:
-			return(f"The final volume exceeds the max volume of the wells in the labware {self.APINameFinalPlate}")
+			raise Exception(f"The final volume exceeds the max volume of the wells in the labware {self.APINameFinalPlate}")
 		
 		# We check the position that the dispense in the final wells is one of the accepted values
 		if pd.isna(self.positionTransferSample):
@@ -443,7 +537,27 @@ class UserVariables:
 				self.changeTipDistributeMix = "never"
 			elif self.changeTipDistributeMix not in ["never", "aspirate", "well", "tube"]:
 				raise Exception("The values of the variable 'Change Tip in Mix Distribution' has to be one of the following: never, aspirate, well, tube. If this cell is left empty, 'never' will be considered as the value of this cell.")
-			
+		
+		# Check the liquid class of the mix, the existence of the class is checked when the profiles are assigned
+		if pd.isna(self.liquidClassMix):
+			self.liquidClassMix = "glycerol-enzyme"
+		
+		# Check the sheet of mixing profiles if it has been given
+		if isinstance(self.mixingProfiles, pd.DataFrame):
+			if not all(item in list(self.mixingProfiles.columns) for item in ["Liquid Class", "Tube Turnovers", "Min Cycles Per Height", "Flow Rate Factor", "Touch Tip Rounds", "Cross Strokes"]):
+				raise Exception("'MixingProfiles' sheet table needs to have 6 columns: 'Liquid Class', 'Tube Turnovers', 'Min Cycles Per Height', 'Flow Rate Factor', 'Touch Tip Rounds' and 'Cross Strokes'")
+			if self.mixingProfiles[["Liquid Class", "Tube Turnovers", "Min Cycles Per Height", "Flow Rate Factor", "Touch Tip Rounds", "Cross Strokes"]].isna().any().any():
+				raise Exception("None of the cells of the sheet 'MixingProfiles' can be left empty")
+			if pd.Series(self.mixingProfiles["Liquid Class"].values).is_unique == False:
+				raise Exception("The values of the column 'Liquid Class' in the sheet 'MixingProfiles' have to be unique")
+			if (self.mixingProfiles["Tube Turnovers"] <= 0).any() or (self.mixingProfiles["Flow Rate Factor"] <= 0).any():
+				raise Exception("The values of the columns 'Tube Turnovers' and 'Flow Rate Factor' in the sheet 'MixingProfiles' have to be greater than 0")
+			if (self.mixingProfiles["Min Cycles Per Height"] < 1).any() or (self.mixingProfiles["Touch Tip Rounds"] < 0).any() or (self.mixingProfiles["Cross Strokes"] < 0).any():
+				raise Exception("In the sheet 'MixingProfiles' the column 'Min Cycles Per Height' needs to be at least 1 and the columns 'Touch Tip Rounds' and 'Cross Strokes' cannot be negative")
+		
+		# Check the sheet of liquid classes and the one that relates the reagents with them, if they have been given
+		self.liquidClasses, self.reagentLiquidClasses = liquid_classes_table_to_dict(self.liquidClasses, self.reagentLiquidClasses, ["Water", "Buffer", "RE", "Ligase", "Serum", "Mix", "DNA Parts"])
+		
 		return
 	
 class SettedParameters:
@@ -474,6 +588,17 @@ class SettedParameters:
 		self.wellsDistributeReactives = None # Initial
 		self.volMaxPipRTiprackR = 0
 		self.volMaxPipLTiprackL = 0
+		# Default mixing profiles of the 1.5mL eppendorfs, they can be overwritten or extended with the sheet MixingProfiles
+		# Both keep the cycles of the extensive mixing of the previous versions (7 per height, 21 when a third of the tube is mixed in each cycle, and 4 strokes between heights)
+		# 'aqueous' only does 1 round of touch tip instead of 9 and 'glycerol-enzyme' mixes at half of the default flow rate
+		self.mixingProfiles = {"aqueous":{"Tube Turnovers":7, "Min Cycles Per Height":7, "Flow Rate Factor":1, "Touch Tip Rounds":1, "Cross Strokes":4},
+							   "glycerol-enzyme":{"Tube Turnovers":7, "Min Cycles Per Height":7, "Flow Rate Factor":0.5, "Touch Tip Rounds":9, "Cross Strokes":4}}
+		# Default liquid classes, the rates are factors of the default flow rates of the pipettes or the maximum flow rate of the pipette (max) and the delays are the seconds waited after
+		# every aspiration and dispense. They can be overwritten or extended with the sheet LiquidClasses
+		self.liquidClasses = {"aqueous":{"Aspirate Rate":"max", "Dispense Rate":"max", "Blow Out Rate":"max", "Aspirate Delay":0, "Dispense Delay":0, "Touch Tip":None},
+							  "glycerol-enzyme":{"Aspirate Rate":0.2, "Dispense Rate":0.2, "Blow Out Rate":1, "Aspirate Delay":1, "Dispense Delay":1, "Touch Tip":None}}
+		self.reagentLiquidClasses = {"Water":"aqueous", "Buffer":"aqueous", "RE":"glycerol-enzyme", "Ligase":"glycerol-enzyme", "Serum":"aqueous", "Mix":"aqueous", "DNA Parts":"aqueous"} # Mix is the MoClo mix and DNA Parts the acceptors and modules
+		self.defaultFlowRates = {} # It will be filled when the pipettes are loaded
 		
 		return
 	
@@ -489,13 +614,42 @@ class SettedParameters:
 											  "Map Liquid Definitions":None,
 											  "Map Final Combinations":None}
 
-		self.combinations = combinations_table_to_dict(user_variables.combinations_dataframe, "Name", "Acceptor Plasmid", name_key_col_isolated = "acceptor", name_key_rest_columns = "modules")
+		# Maximum number of combinations that fit in the final wells, with the thermocycler only the plate in it can be used unless they are done in batches
+		# The rest of the final plates go in the free slots of the deck: the ones that the thermocycler does not occupy (7, 8, 10 and 11) minus the DNA plates, 1 tiprack for each different tiprack
+		# of the pipettes, at least 1 coldblock with the reagents and at least 1 heater-shaker if it is present. The coldblocks that are needed are checked again when they are loaded
+		number_wells_final_plate = len(opentrons.protocol_api.labware.get_labware_definition(user_variables.APINameFinalPlate)["wells"])
+		index_start_final_plate = opentrons.protocol_api.labware.get_labware_definition(user_variables.APINameFinalPlate)["groups"][0]["wells"].index(user_variables.wellStartFinalPlate)
+		tipracks_pipettes = set()
+		if pd.isna(user_variables.APINamePipR) == False:
+			tipracks_pipettes.add(user_variables.APINameTipR)
+		if pd.isna(user_variables.APINamePipL) == False:
+			tipracks_pipettes.add(user_variables.APINameTipL)
+		free_slots_final = len([position for position, labware in self.deckPositions.items() if labware == None]) - user_variables.numberSourcePlates - len(tipracks_pipettes) - 1
+		if user_variables.presenceHS:
+			free_slots_final -= 1
+		if user_variables.presenceTermo:
+			free_slots_final -= 4
+		
+		if user_variables.presenceTermo and user_variables.batchesTermo:
+			# The plate in the thermocycler and the ones in the free slots
+			max_final_wells = (1 + free_slots_final)*number_wells_final_plate - index_start_final_plate
+		elif user_variables.presenceTermo:
+			max_final_wells = number_wells_final_plate - index_start_final_plate
+		else:
+			max_final_wells = free_slots_final*number_wells_final_plate - index_start_final_plate
+		
+		if isinstance(user_variables.incompatibleParts, pd.DataFrame):
+			incompatible_parts = user_variables.incompatibleParts[["Part 1", "Part 2"]].values.tolist()
+		else:
+			incompatible_parts = None
+
+		# The combinations with options are generated one by one, so the generation stops as soon as they do not fit in the final wells
+		self.combinations = combinations_table_to_dict(user_variables.combinations_dataframe, "Name", "Acceptor Plasmid", name_key_col_isolated = "acceptor", name_key_rest_columns = "modules", incompatible_parts = incompatible_parts, max_combinations = max_final_wells)
 		self.sumSamples = len(self.combinations)
 		
 		# Final Plate Variables
 		# Lets find first how many final plates do we need
-		number_wells_final_plate = len(opentrons.protocol_api.labware.get_labware_definition(user_variables.APINameFinalPlate)["wells"])
-		number_final_needed = math.ceil((opentrons.protocol_api.labware.get_labware_definition(user_variables.APINameFinalPlate)["groups"][0]["wells"].index(user_variables.wellStartFinalPlate)+self.sumSamples)/number_wells_final_plate)
+		number_final_needed = math.ceil((index_start_final_plate+self.sumSamples)/number_wells_final_plate)
 		for index_final_plate in range(number_final_needed):
 			self.finalPlates[index_final_plate] = {"Position":None,
 											"Label":f"Combination Plate {index_final_plate+1}",
@@ -524,9 +678,41 @@ class SettedParameters:
 		self.volTotal = user_variables.restrictionEnzymeVolume+user_variables.ligaseVolume+user_variables.bufferVolume+user_variables.serumVolume
 		self.volTotalFactor = self.volTotal*(1+user_variables.extraPipettingFactor)
 		
+		# Mixing profiles defined by the user
+		if isinstance(user_variables.mixingProfiles, pd.DataFrame):
+			for index_row, row in user_variables.mixingProfiles.iterrows():
+				self.mixingProfiles[row["Liquid Class"]] = {"Tube Turnovers":row["Tube Turnovers"],
+															"Min Cycles Per Height":int(row["Min Cycles Per Height"]),
+															"Flow Rate Factor":row["Flow Rate Factor"],
+															"Touch Tip Rounds":int(row["Touch Tip Rounds"]),
+															"Cross Strokes":int(row["Cross Strokes"])}
+		
+		if user_variables.liquidClassMix not in self.mixingProfiles.keys():
+			raise Exception(f"The value of 'Liquid Class Mix' has to be one of the following liquid classes: {', '.join(self.mixingProfiles.keys())}. New classes can be defined in the sheet 'MixingProfiles'")
+		
+		# Liquid classes defined by the user and the reagents that use them
+		if user_variables.liquidClasses != None:
+			self.liquidClasses.update(user_variables.liquidClasses)
+		
+		if user_variables.reagentLiquidClasses != None:
+			self.reagentLiquidClasses.update(user_variables.reagentLiquidClasses)
+		
+		for reagent, liquid_class in self.reagentLiquidClasses.items():
+			if liquid_class not in self.liquidClasses.keys():
+				raise Exception(f"The liquid class '{liquid_class}' of the reagent '{reagent}' is not defined. The liquid classes defined are: {', '.join(self.liquidClasses.keys())}. New classes can be defined in the sheet 'LiquidClasses'")
+		
+		# The touch tip of a liquid class, if it is established, is the one performed with the reagents of that class
+		if self.liquidClasses[self.reagentLiquidClasses["Water"]]["Touch Tip"] != None:
+			user_variables.touchTipTransferWater = self.liquidClasses[self.reagentLiquidClasses["Water"]]["Touch Tip"]
+		if self.liquidClasses[self.reagentLiquidClasses["Mix"]]["Touch Tip"] != None:
+			user_variables.touchTipDistributeMix = self.liquidClasses[self.reagentLiquidClasses["Mix"]]["Touch Tip"]
+		if self.liquidClasses[self.reagentLiquidClasses["DNA Parts"]]["Touch Tip"] != None:
+			user_variables.touchTipTransferSample = self.liquidClasses[self.reagentLiquidClasses["DNA Parts"]]["Touch Tip"]
+		
 		# Pipette Variables
 		if pd.isna(user_variables.APINamePipL) == False:
 			self.pipL = protocol.load_instrument(user_variables.APINamePipL, mount = "left")
+			self.defaultFlowRates["left"] = {"Aspirate":self.pipL.flow_rate.aspirate, "Dispense":self.pipL.flow_rate.dispense, "Blow Out":self.pipL.flow_rate.blow_out}
 			def_tiprack_left = opentrons.protocol_api.labware.get_labware_definition(user_variables.APINameTipL)
 			volMaxTiprackL = def_tiprack_left['wells'][def_tiprack_left['ordering'][0][0]]['totalLiquidVolume']
 			if self.pipL.max_volume <= volMaxTiprackL:
@@ -540,6 +726,7 @@ class SettedParameters:
 
 		if pd.isna(user_variables.APINamePipR) == False:
 			self.pipR = protocol.load_instrument(user_variables.APINamePipR, mount = "right")
+			self.defaultFlowRates["right"] = {"Aspirate":self.pipR.flow_rate.aspirate, "Dispense":self.pipR.flow_rate.dispense, "Blow Out":self.pipR.flow_rate.blow_out}
 
 			def_tiprack_right = opentrons.protocol_api.labware.get_labware_definition(user_variables.APINameTipR)
 			volMaxTiprackR = def_tiprack_right['wells'][def_tiprack_right['ordering'][0][0]]['totalLiquidVolume']
@@ -564,23 +751,113 @@ class SettedParameters:
 
 		return
 	
-class MapLabware:
+class PlateGrid:
 	"""
-	Class that will create and store the layout of the final plates so they can be exported at the end
-	for the user
+	Class that will store a value for every well of a plate in an array with the shape of the plate instead of in a DataFrame, which is only created
+	when the map is exported, so setting the values of the wells during the protocol does not have the overhead of pandas
+
+	There are 3 kinds of grids:
+		- numeric: the values are numbers stored in a float array, empty wells are 0
+		- names: every different value is stored once and the array has the index of the value of each well, empty wells are -1
+		- lists: every well has its own list of values (e.g., the combinations a part goes to) and the array has the index of the list of each well, empty wells are -1
 	"""
-	def __init__(self, labware):
-		self.name_rows = list(labware.rows_by_name().keys())
-		self.name_columns = list(labware.columns_by_name().keys())
-		number_rows = len(self.name_rows)
-		number_columns = len(self.name_columns)
-		
-		self.map = pd.DataFrame(np.full((number_rows,number_columns),None),columns=self.name_columns,index=self.name_rows)
-		self.map.index.name = "Row/Column"
+	__slots__ = ("name_rows", "name_columns", "index_rows", "index_columns", "kind", "grid", "values", "index_values")
+
+	def __init__(self, name_rows, name_columns, kind = "names"):
+		if kind not in ["numeric", "names", "lists"]:
+			raise Exception(f"The kind of PlateGrid '{kind}' is not contemplated, only 'numeric', 'names' and 'lists' are")
+
+		self.name_rows = list(name_rows)
+		self.name_columns = [str(column) for column in name_columns]
+		self.index_rows = {name_row:index_row for index_row, name_row in enumerate(self.name_rows)}
+		self.index_columns = {name_column:index_column for index_column, name_column in enumerate(self.name_columns)}
+		self.kind = kind
+
+		if kind == "numeric":
+			self.grid = np.zeros((len(self.name_rows), len(self.name_columns)), dtype = float)
+		else:
+			self.grid = np.full((len(self.name_rows), len(self.name_columns)), -1, dtype = np.int32)
+
+		self.values = [] # Values (names) or lists referenced by the indexes of the array
+		self.index_values = {} # Index in self.values of every value, only used with names so each of them is stored once
+
+	def index_value(self, value):
+		# Index of the value in self.values, adding it if it is not there yet
+		try:
+			if value not in self.index_values:
+				self.index_values[value] = len(self.values)
+				self.values.append(value)
+			return self.index_values[value]
+		except TypeError: # Values that cannot be hashed are stored without checking if they are already stored
+			self.values.append(value)
+			return len(self.values)-1
 
 	def assign_value(self, value, row, column):
-		self.map.loc[row, column] = value
-		
+		if self.kind == "numeric":
+			self.grid[self.index_rows[row], self.index_columns[str(column)]] = value
+		elif self.kind == "names":
+			self.grid[self.index_rows[row], self.index_columns[str(column)]] = self.index_value(value)
+		else:
+			self.values.append(list(value))
+			self.grid[self.index_rows[row], self.index_columns[str(column)]] = len(self.values)-1
+
+	def assign_values(self, values, rows, columns):
+		# Assign at once the values to the cells (rows[i], columns[i]), if only 1 value is given it is assigned to all the cells
+		positions_rows = [self.index_rows[row] for row in rows]
+		positions_columns = [self.index_columns[str(column)] for column in columns]
+		if not isinstance(values, list):
+			values = [values]*len(positions_rows)
+
+		if self.kind == "numeric":
+			self.grid[positions_rows, positions_columns] = values
+		elif self.kind == "names":
+			self.grid[positions_rows, positions_columns] = [self.index_value(value) for value in values]
+		else:
+			for position_row, position_column, value in zip(positions_rows, positions_columns, values):
+				self.values.append(list(value))
+				self.grid[position_row, position_column] = len(self.values)-1
+
+	def add_value(self, value, row, column):
+		# Sum the value to the number of the cell or append it to its list
+		if self.kind == "numeric":
+			self.grid[self.index_rows[row], self.index_columns[str(column)]] += value
+		elif self.kind == "lists":
+			if self.grid[self.index_rows[row], self.index_columns[str(column)]] == -1:
+				self.assign_value([value], row, column)
+			else:
+				self.values[self.grid[self.index_rows[row], self.index_columns[str(column)]]].append(value)
+		else:
+			raise Exception("Values can only be added to PlateGrid of kind 'numeric' or 'lists'")
+
+	def get_value(self, row, column):
+		# Value of the cell, None if it is empty in the names and lists
+		value = self.grid[self.index_rows[row], self.index_columns[str(column)]]
+		if self.kind == "numeric":
+			return float(value)
+		elif value == -1:
+			return None
+		else:
+			return self.values[value]
+
+	def column_is_empty(self, column):
+		if self.kind == "numeric":
+			return bool((self.grid[:, self.index_columns[str(column)]] == 0).all())
+		else:
+			return bool((self.grid[:, self.index_columns[str(column)]] == -1).all())
+
+	def to_dataframe(self):
+		# The DataFrame is only created to export the map, with the same format that the maps had
+		if self.kind == "numeric":
+			cells = self.grid
+		else:
+			cells = np.full(self.grid.shape, None, dtype = object)
+			for index_row, index_column in zip(*np.nonzero(self.grid != -1)):
+				cells[index_row, index_column] = self.values[self.grid[index_row, index_column]]
+
+		map_plate = pd.DataFrame(cells, columns = self.name_columns, index = self.name_rows)
+		map_plate.index.name = "Row/Column"
+		return map_plate
+
 class NotSuitablePipette(Exception):
 	"Custom Error raised when there is no pipette that can transfer the volume"
 	def __init__(self, value):
@@ -638,6 +915,40 @@ def setting_labware (number_labware, labware_name, positions, protocol, module =
 
 	return all_plates
 
+def distance_deck_slots (slot_1, slot_2):
+	"""
+	Function that will calculate the distance in mm between the centres of 2 slots of the OT-2 deck
+
+	The OT-2 deck is a grid of 3 columns and 4 rows in which slot 1 is the front left one and slot 12 the trash,
+	the slots are 132.5mm apart in the X axis and 90.5mm in the Y axis
+
+	2 mandatory arguments are needed for this function
+	"""
+	# Find out the column and row of each of the slots
+	column_1, row_1 = (int(slot_1)-1)%3, (int(slot_1)-1)//3
+	column_2, row_2 = (int(slot_2)-1)%3, (int(slot_2)-1)//3
+
+	return math.sqrt(((column_1-column_2)*132.5)**2 + ((row_1-row_2)*90.5)**2)
+
+def sort_positions_by_trips (positions, trips_slots):
+	"""
+	Function that will sort the deck positions from the one with the lowest gantry travel to the one with the highest for a labware
+	that is going to be visited together with labwares that are already placed in the deck
+
+	The argument trips_slots is a dictionary with the slots of the labwares already placed as keys and the number of trips expected
+	between them and the labware that is going to be placed as values. The travel of a position is the sum of those trips multiplied by the
+	distance between slots, so setting_labware and define_tiprack will try first the positions with the least travel and, in case of deck conflict, the next ones
+
+	Positions with the same travel keep their original order
+
+	2 mandatory arguments are needed for this function
+	"""
+	travel_positions = {}
+	for position in positions.keys():
+		travel_positions[position] = sum(trips*distance_deck_slots(position, slot) for slot, trips in trips_slots.items())
+	
+	return dict(sorted(positions.items(), key = lambda position: travel_positions[position[0]]))
+
 def number_tubes_needed (vol_reactive_per_reaction_factor, number_reactions, vol_max_tube):
 	"""
 	Function that will return the number of tubes that is needed for a given number of reactions
@@ -671,6 +982,100 @@ def number_tubes_needed (vol_reactive_per_reaction_factor, number_reactions, vol
 	# When the volume can fit every tube (exit from the while loop) we return the number of tubes and the reactions that will fit in every tube
 	return (number_tubes, reactions_per_tube, volumes_tubes)
 
+def labware_accessors (labware):
+	"""
+	Function that will build, once the labware is loaded, the tables of its wells so they do not need to be generated again every time
+	that a well, a column or a row is needed, as it happens with the methods wells(), columns(), rows() and wells_by_name() of the labware
+
+	The tables are immutable: the wells, columns and rows are tuples (in the same order as the labware returns them) and
+	the tables by name are read-only dictionaries, so they can be shared by all the parts of the script without being modified by mistake
+
+	1 mandatory argument is needed for this function
+	"""
+	return MappingProxyType({"Wells":tuple(labware.wells()),
+							 "Columns":tuple(tuple(column) for column in labware.columns()),
+							 "Rows":tuple(tuple(row) for row in labware.rows()),
+							 "Wells By Name":MappingProxyType(dict(labware.wells_by_name())),
+							 "Columns By Name":MappingProxyType({name_column:tuple(column) for name_column, column in labware.columns_by_name().items()}),
+							 "Rows By Name":MappingProxyType({name_row:tuple(row) for name_row, row in labware.rows_by_name().items()})})
+
+def export_maps (maps, path_export, formats = ["xlsx"], name_values = "Sample", extra_columns = None, other_tables = None):
+	"""
+	Function that will export at once all the maps of the plates, DataFrames with the names of the rows and columns of the plate as index and columns,
+	in the given formats, so every map is read only once independently of the number of formats
+
+	The formats that can be given are:
+		- xlsx: 1 excel file with a sheet per map and per other table, written row by row with the write-only mode of openpyxl, faster and lighter than pandas.to_excel
+		- csv or tsv: 1 file per map and per other table, named with the path and the name of the map. The maps have the same format as the identity maps of LAPu
+		- long: 1 csv file with a row per filled well of all the maps and the columns Plate, Well, name_values and the extra columns
+
+	The values of extra_columns are dictionaries with the names of the maps as keys and, as values, a value for all the wells of that map or a DataFrame with a value for each well
+
+	It returns the list of files that have been written
+
+	2 mandatory arguments and 4 optional are needed for this function
+	"""
+	# Check that all the formats can be exported
+	formats_allowed = ["xlsx", "csv", "tsv", "long"]
+	if len(formats) == 0 or any(format_export not in formats_allowed for format_export in formats):
+		raise Exception(f"The formats of the maps to export need to be one or more of the following ones: {', '.join(formats_allowed)}. The ones given are: {', '.join(map(str, formats))}")
+
+	if extra_columns == None:
+		extra_columns = {}
+	if other_tables == None:
+		other_tables = {}
+
+	# Rows of every map and table, the maps keep the names of the rows in the first column and the empty wells (None or NaN, which is not equal to itself) are empty cells
+	rows_tables = {}
+	for name_map, map_plate in maps.items():
+		rows_tables[name_map] = [[map_plate.index.name if map_plate.index.name != None else ""] + [str(name_column) for name_column in map_plate.columns]]
+		for row_map in map_plate.itertuples(name = None):
+			rows_tables[name_map].append([None if value is None or value != value else value for value in row_map])
+	for name_table, table in other_tables.items():
+		rows_tables[name_table] = [list(table.columns)] + [list(row_table) for row_table in table.itertuples(index = False, name = None)]
+
+	files_exported = []
+
+	if "xlsx" in formats:
+		workbook = Workbook(write_only = True)
+		for name_table, rows_table in rows_tables.items():
+			sheet = workbook.create_sheet(title = name_table)
+			for row_table in rows_table:
+				sheet.append(row_table)
+		workbook.save(f"{path_export}.xlsx")
+		files_exported.append(f"{path_export}.xlsx")
+
+	for format_export, delimiter in [("csv", ","), ("tsv", "\t")]:
+		if format_export in formats:
+			for name_table, rows_table in rows_tables.items():
+				with open(f"{path_export}_{name_table}.{format_export}", "w", newline = "") as file_table:
+					csv.writer(file_table, delimiter = delimiter).writerows(rows_table)
+				files_exported.append(f"{path_export}_{name_table}.{format_export}")
+
+	if "long" in formats:
+		# The wells of each map are given in the same order as the labware, column by column
+		with open(f"{path_export}_long.csv", "w", newline = "") as file_long:
+			writer_long = csv.writer(file_long)
+			writer_long.writerow(["Plate", "Well", name_values] + list(extra_columns.keys()))
+			for name_map, map_plate in maps.items():
+				for name_column in map_plate.columns:
+					for name_row in map_plate.index:
+						value = map_plate.at[name_row, name_column]
+						if value is None or value != value:
+							continue
+
+						values_extra = []
+						for values_column in extra_columns.values():
+							value_extra = values_column.get(name_map)
+							if hasattr(value_extra, "at"): # A DataFrame with a value per well
+								value_extra = value_extra.at[name_row, name_column]
+							values_extra.append(value_extra)
+
+						writer_long.writerow([name_map, f"{name_row}{name_column}", value] + values_extra)
+		files_exported.append(f"{path_export}_long.csv")
+
+	return files_exported
+
 def generator_positions (labware_wells_name):
 	"""
 	Function that will return the next element everytime is called from a given list
@@ -888,13 +1293,193 @@ def z_positions_mix_15eppendorf (vol_mixing):
 	elif vol_mixing > 1250:
 		return [position_100, position_500, position_1250]
 
-def mixing_eppendorf_15 (location_tube, volume_tube, volume_mixing, pipette, protocol):
+def mixing_profile_15eppendorf (volume_tube, volume_mixing, liquid_class, mixing_profiles):
+	"""
+	Function that will establish how a 1.5mL eppendorf tube is going to be mixed according to the volume it contains,
+	the volume handled by the pipette in each movement and the type of liquid that is inside of the tube
+
+	The heights are the ones of the liquid level model of the 1.5mL eppendorfs (z_positions_mix_15eppendorf) and the number of cycles
+	is the minimum needed to move the content of the tube the number of times established in the liquid class, with at least 'Min Cycles Per Height' in each height
+
+	4 mandatory arguments are needed for this function
+	"""
+	# Check that the liquid class is one of the defined ones
+	if liquid_class not in mixing_profiles.keys():
+		raise Exception(f"The liquid class '{liquid_class}' does not have a mixing profile. The mixing profiles defined are: {', '.join(mixing_profiles.keys())}")
+
+	profile = mixing_profiles[liquid_class]
+
+	# Take the heights of the liquid level model without repeating them, mixing twice at the same height is only extra cycles
+	heights_mixing = sorted(set(z_positions_mix_15eppendorf (volume_tube)))
+
+	# Minimum number of aspirate/dispense cycles that move the whole content of the tube the times set by the liquid class
+	total_cycles = math.ceil(profile["Tube Turnovers"]*volume_tube/volume_mixing)
+	cycles_per_height = max(int(profile["Min Cycles Per Height"]), math.ceil(total_cycles/len(heights_mixing)))
+
+	# If there is only 1 height it makes no sense to move liquid from the bottom to the top
+	if len(heights_mixing) == 1:
+		cross_strokes = 0
+	else:
+		cross_strokes = int(profile["Cross Strokes"])
+
+	return {"Heights": heights_mixing,
+			"Cycles Per Height": cycles_per_height,
+			"Flow Rate Factor": profile["Flow Rate Factor"],
+			"Touch Tip Rounds": int(profile["Touch Tip Rounds"]),
+			"Cross Strokes": cross_strokes}
+
+def set_liquid_class (pipettes, liquid_class, liquid_classes, default_flow_rates, protocol):
+	"""
+	Function that will set the aspirate, dispense and blow out flow rates of the given pipettes to the ones of a liquid class
+	and the seconds that the pipettes wait after every aspiration and dispense
+
+	The rates of the liquid classes are factors of the default flow rates of each pipette, so the same liquid class can be used with any pipette,
+	or 'max' to use the maximum flow rate of the pipette. No rate is set higher than the maximum flow rate of the pipette
+	If the liquid class is None, the default flow rates of the pipettes are restored and the delays are removed
+
+	The delays replace the aspirate and dispense of the pipettes by ones that wait after them, which is only done in the versions of Opentrons
+	where it has been checked that the transfers, distributions and mixes call the aspirate and dispense of the pipette, so they also perform the delays
+
+	5 mandatory arguments are needed for this function
+	"""
+	# Maximum flow rates of aspiration, dispense and blow out, in uL/s, of the pipettes of the OT-2 as they are in their definitions
+	max_flow_rates = {"p10_single":[50, 50, 1000], "p10_multi":[50, 50, 1000], "p50_single":[100, 100, 1000], "p50_multi":[100, 100, 1000],
+					  "p300_single":[600, 600, 1000], "p300_multi":[600, 600, 1000], "p1000_single":[2000, 2000, 1000],
+					  "p20_single_gen2":[24, 24, 24], "p20_multi_gen2":[24, 24, 24], "p300_single_gen2":[275, 275, 275],
+					  "p300_multi_gen2":[275, 275, 275], "p1000_single_gen2":[812, 812, 812]}
+
+	# Check that the liquid class is one of the defined ones
+	if liquid_class != None and liquid_class not in liquid_classes.keys():
+		raise Exception(f"The liquid class '{liquid_class}' is not defined. The liquid classes defined are: {', '.join(liquid_classes.keys())}")
+
+	# Major versions of Opentrons in which the transfers, distributions and mixes call the aspirate and dispense of the pipette
+	versions_with_delays = [6, 7, 8]
+
+	if liquid_class == None:
+		factors_class = {"Aspirate Rate":1, "Dispense Rate":1, "Blow Out Rate":1, "Aspirate Delay":0, "Dispense Delay":0}
+	else:
+		factors_class = liquid_classes[liquid_class]
+
+	# Check that the delays will be performed in the complex commands of the installed version of Opentrons
+	if factors_class.get("Aspirate Delay", 0) > 0 or factors_class.get("Dispense Delay", 0) > 0:
+		import opentrons
+		version_opentrons = str(getattr(opentrons, "__version__", "unknown"))
+		if version_opentrons.split(".")[0] not in [str(version) for version in versions_with_delays]:
+			raise Exception(f"The liquid class '{liquid_class}' has delays, which can only be performed with the major versions {', '.join([str(version) for version in versions_with_delays])} of Opentrons and the installed one is {version_opentrons}. Set the delays of the liquid class to 0 or use one of those versions")
+
+	def with_delay (command, seconds):
+		# Command of the pipette that performs the given one and then waits the seconds of the liquid class
+		def command_and_delay (*args, **kwargs):
+			result_command = command(*args, **kwargs)
+			protocol.delay(seconds = seconds)
+			return result_command
+		return command_and_delay
+
+	# Set the rates and delays in all the pipettes that have been loaded
+	for pipette in pipettes:
+		if pipette == None:
+			continue
+
+		if pipette.name not in max_flow_rates.keys():
+			raise Exception(f"The maximum flow rates of the pipette '{pipette.name}' are not known, so a liquid class cannot be set in it. The pipettes contemplated are: {', '.join(max_flow_rates.keys())}")
+
+		rates_pipette = {}
+		for index_rate, name_rate in enumerate(["Aspirate", "Dispense", "Blow Out"]):
+			max_rate = max_flow_rates[pipette.name][index_rate]
+			if factors_class[f"{name_rate} Rate"] == "max":
+				rates_pipette[name_rate] = max_rate
+			else:
+				rates_pipette[name_rate] = min(default_flow_rates[pipette.mount][name_rate]*factors_class[f"{name_rate} Rate"], max_rate)
+		pipette.flow_rate.aspirate = rates_pipette["Aspirate"]
+		pipette.flow_rate.dispense = rates_pipette["Dispense"]
+		pipette.flow_rate.blow_out = rates_pipette["Blow Out"]
+
+		# The delays replace the aspirate and dispense of this pipette by ones that wait after them, the ones of a previous liquid class are removed first
+		pipette.__dict__.pop("aspirate", None)
+		pipette.__dict__.pop("dispense", None)
+		if factors_class.get("Aspirate Delay", 0) > 0:
+			pipette.aspirate = with_delay(pipette.aspirate, factors_class["Aspirate Delay"])
+		if factors_class.get("Dispense Delay", 0) > 0:
+			pipette.dispense = with_delay(pipette.dispense, factors_class["Dispense Delay"])
+
+	return
+
+def liquid_classes_table_to_dict (table_classes, table_reagents, reagents, touch_tip = True):
+	"""
+	Function that will check the sheets LiquidClasses and ReagentLiquidClasses of a variable file and return them as 2 dictionaries,
+	one with the liquid classes and their rates, delays and touch tip and another one with the liquid class of each reagent
+
+	The rates can be a factor of the default flow rate of the pipette or 'max', and the delays, in seconds, are 0 if left empty
+	The column 'Touch Tip' is only read if touch_tip is True. If it is left empty in a class, its value is None
+	If a table is not given (it is not a DataFrame), its dictionary is None
+
+	3 mandatory arguments are needed for this function and 1 optional
+	"""
+	columns_rates = ["Aspirate Rate", "Dispense Rate", "Blow Out Rate"]
+	columns_delays = ["Aspirate Delay", "Dispense Delay"]
+	values_true = ["true", "TRUE", "True", 1, True]
+	values_false = ["false", "FALSE", "False", 0, False]
+
+	liquid_classes = None
+	if isinstance(table_classes, pd.DataFrame):
+		if not all(item in list(table_classes.columns) for item in ["Liquid Class"] + columns_rates + (["Touch Tip"] if touch_tip else [])):
+			raise Exception(f"'LiquidClasses' sheet table needs to have the columns: {', '.join(['Liquid Class'] + columns_rates + (['Touch Tip'] if touch_tip else []))}. The columns {' and '.join(columns_delays)} are optional")
+		if table_classes[["Liquid Class"] + columns_rates].isna().any().any():
+			raise Exception(f"The columns {', '.join(['Liquid Class'] + columns_rates)} of the sheet 'LiquidClasses' cannot have empty cells")
+		if pd.Series(table_classes["Liquid Class"].values).is_unique == False:
+			raise Exception("The values of the column 'Liquid Class' in the sheet 'LiquidClasses' have to be unique")
+
+		liquid_classes = {}
+		for row in table_classes.to_dict("records"):
+			values_class = {}
+			for column in columns_rates:
+				if str(row[column]).strip().lower() == "max":
+					values_class[column] = "max"
+				elif pd.api.types.is_number(row[column]) and row[column] > 0:
+					values_class[column] = row[column]
+				else:
+					raise Exception(f"The values of the columns {', '.join(columns_rates)} in the sheet 'LiquidClasses' have to be greater than 0 or 'max'")
+			for column in columns_delays:
+				if column not in row.keys() or pd.isna(row[column]):
+					values_class[column] = 0
+				elif pd.api.types.is_number(row[column]) and row[column] >= 0:
+					values_class[column] = row[column]
+				else:
+					raise Exception(f"The values of the columns {' and '.join(columns_delays)} in the sheet 'LiquidClasses' are seconds and cannot be negative. If left empty, 0 is assumed")
+			if touch_tip:
+				if pd.isna(row["Touch Tip"]):
+					values_class["Touch Tip"] = None
+				elif row["Touch Tip"] in values_true + values_false:
+					values_class["Touch Tip"] = row["Touch Tip"] in values_true
+				else:
+					raise Exception("The column 'Touch Tip' of the sheet 'LiquidClasses' only accepts 2 values, True or False. If left empty, the touch tip variables of the protocol will be used")
+			liquid_classes[row["Liquid Class"]] = values_class
+
+	reagent_liquid_classes = None
+	if isinstance(table_reagents, pd.DataFrame):
+		if not all(item in list(table_reagents.columns) for item in ["Reagent", "Liquid Class"]):
+			raise Exception("'ReagentLiquidClasses' sheet table needs to have 2 columns: 'Reagent' and 'Liquid Class'")
+		if table_reagents[["Reagent", "Liquid Class"]].isna().any().any():
+			raise Exception("None of the cells of the sheet 'ReagentLiquidClasses' can be left empty")
+		if pd.Series(table_reagents["Reagent"].values).is_unique == False:
+			raise Exception("The values of the column 'Reagent' in the sheet 'ReagentLiquidClasses' have to be unique")
+		if not all(reagent in reagents for reagent in table_reagents["Reagent"].values):
+			raise Exception(f"The values of the column 'Reagent' in the sheet 'ReagentLiquidClasses' can only be: {', '.join(reagents)}")
+
+		reagent_liquid_classes = dict(zip(table_reagents["Reagent"].values, table_reagents["Liquid Class"].values))
+
+	return liquid_classes, reagent_liquid_classes
+
+def mixing_eppendorf_15 (location_tube, volume_tube, volume_mixing, pipette, protocol, mixing_profile = None):
 	"""
 	Function that will perform the mixing of a 1.5mL eppendorf tube iwth a given pipette
 
 	The pipette shoudl have a tip to perform this mixing
 
-	5 arguments are needed for this function
+	If a mixing profile (output of mixing_profile_15eppendorf) is given, the cycles, heights, flow rate, touch tips and strokes
+	will be the ones of the profile instead of the fixed extensive mixing
+
+	5 mandatory arguments and 1 optional are needed for this function
 	"""
 	# Check if the pipette has a tip
 	if not pipette.has_tip:
@@ -904,6 +1489,25 @@ def mixing_eppendorf_15 (location_tube, volume_tube, volume_mixing, pipette, pro
 	if pipette.min_volume > volume_mixing or pipette.max_volume < volume_mixing:
 		raise Exception(f"Volume of mixing, {volume_mixing}uL, should be a value between the {pipette} minimum and maximum aspiration/dispense volume which are {pipette.min_volume}uL and {pipette.max_volume}uL, respectively")
 	
+	# If there is a mixing profile we only perform the movements of the profile
+	if mixing_profile != None:
+		# Mix the cycles of the profile in each of the heights with the flow rate of the liquid class
+		for position in mixing_profile["Heights"]:
+			pipette.mix(mixing_profile["Cycles Per Height"], volume_mixing, location_tube.bottom(z = position), rate = mixing_profile["Flow Rate Factor"])
+		
+		for i in range(mixing_profile["Touch Tip Rounds"]):
+			pipette.touch_tip(location_tube, v_offset = -20, radius = 0.7, speed = 30)
+		
+		# Move liquid from the bottom to the top of the tube to homogenize the heights between them
+		for i in range(mixing_profile["Cross Strokes"]):
+			pipette.aspirate(volume_mixing, location_tube.bottom(z = mixing_profile["Heights"][0]), rate = mixing_profile["Flow Rate Factor"])
+			pipette.dispense(volume_mixing, location_tube.bottom(z = mixing_profile["Heights"][-1]), rate = mixing_profile["Flow Rate Factor"])
+		
+		# Finally we blow out in the centre of the tube any rests that have been left in the tip
+		pipette.blow_out(location_tube.center())
+		
+		return
+	
 	# Check the positions in which the mixing is going to be performed
 	positions_mixing = z_positions_mix_15eppendorf (volume_tube) # This is the part that is customized for the 1500uL eppendorfs
 	
@@ -1075,14 +1679,98 @@ def tube_to_tube_transfer (vol_transfer_reaction, positions_source_tubes, reacti
 
 	return
 
-def combinations_table_to_dict (table, column_key, column_isolated, name_key_col_isolated = "isolatedCol", name_key_rest_columns = "restCol"):
+def options_combination_cell (value):
+	"""
+	Function that will read a cell of a combinations table and return a list with the values that the cell can take
+
+	A cell written as {value1|value2|...} can take any of the values between the brackets, an empty cell does not take any value
+	and any other cell only takes its own value
+
+	1 mandatory argument is needed for this function
+	"""
+	# Empty cells do not give any value to the combination
+	if pd.isna(value):
+		return []
+	
+	# Cell with the options between brackets and separated by |
+	if isinstance(value, str) and value.strip().startswith("{") and value.strip().endswith("}"):
+		options = [option.strip() for option in value.strip()[1:-1].split("|")]
+		if "" in options:
+			raise Exception(f"The cell '{value}' has an empty option. The options of a cell have to be written as {{value1|value2|...}}")
+		return options
+	
+	return [value]
+
+def generator_combinations_table (table, column_key, column_isolated, incompatible_parts = None):
+	"""
+	Function that will go through the rows of a combinations table and will yield, one by one, the combinations defined by them
+	as (column_key_value, column_isolated_value, [value_col1, value_col2, ...])
+
+	The rows that have cells with several options (see options_combination_cell) are expanded to all the combinations of their options
+	without creating a table of all of them and those combinations are named with the value of column_key followed by _1, _2, ...
+	If a list of pairs of values is given in incompatible_parts, the combinations that have both values of a pair are not yielded, either they come from a row with options or not
+
+	3 mandatory arguments and 1 optional are needed for this function
+	"""
+	# Pairs of values that cannot be in the same combination, the order of the values in the pair does not matter
+	if incompatible_parts != None:
+		pairs_incompatible = set(frozenset(pair) for pair in incompatible_parts)
+	else:
+		pairs_incompatible = set()
+	
+	# Positions of the key, isolated and rest of the columns in the rows of the table
+	columns_table = list(table.columns)
+	index_key = columns_table.index(column_key)
+	index_isolated = columns_table.index(column_isolated)
+	indexes_rest = [index_column for index_column, column in enumerate(columns_table) if column not in [column_key, column_isolated]]
+
+	for row in table.itertuples(index = False, name = None):
+		# Options of the isolated column and of the rest of the columns that are not empty, the isolated one is always the first
+		options_slots = [options_combination_cell(row[index_isolated])] + [options for options in (options_combination_cell(row[index_column]) for index_column in indexes_rest) if len(options) > 0]
+
+		# Rows without options are yielded as they are unless they have a pair of incompatible values
+		if all(len(options) == 1 for options in options_slots):
+			values_row = [options[0] for options in options_slots]
+			if not any(frozenset([value, value_other]) in pairs_incompatible for index_value, value in enumerate(values_row) for value_other in values_row[index_value+1:]):
+				yield row[index_key], values_row[0], values_row[1:]
+			continue
+		
+		# Depth-first search of the options of the row, a branch is abandoned as soon as one of its values is incompatible with a value already chosen
+		number_combination = 0
+		values_chosen = []
+		iterators_slots = [iter(options_slots[0])]
+		while len(iterators_slots) > 0:
+			depth = len(iterators_slots) - 1
+			value = next(iterators_slots[-1], None)
+			
+			# All the options of this slot have been tried so we go back to the previous slot
+			if value == None:
+				iterators_slots.pop()
+				if len(values_chosen) > 0:
+					values_chosen.pop()
+				continue
+			
+			if any(frozenset([value, value_chosen]) in pairs_incompatible for value_chosen in values_chosen):
+				continue
+			
+			if depth == len(options_slots) - 1:
+				number_combination += 1
+				yield f"{row[index_key]}_{number_combination}", (values_chosen + [value])[0], (values_chosen + [value])[1:]
+			else:
+				values_chosen.append(value)
+				iterators_slots.append(iter(options_slots[depth + 1]))
+
+def combinations_table_to_dict (table, column_key, column_isolated, name_key_col_isolated = "isolatedCol", name_key_rest_columns = "restCol", incompatible_parts = None, max_combinations = None):
 	"""
 	Function that will take a table and turn it into a dictionary in which 1 column will be the key of the items and the values will be another dictionary.
 	In that items value will have 2 items, one that is going to be the value sof one column and another one that will be the values of the rest of the columns
 
 	It will return something similar to {column_key_value:{name_key_col_isolated:column_isolated_value, name_key_rest_columns:[value_col1, value_col2, ...]}, ...}
+
+	The cells with several options, {value1|value2|...}, are expanded to all their combinations with generator_combinations_table, excluding the ones with a pair
+	of incompatible_parts. If max_combinations is given, the function raises an error as soon as the table defines more combinations than that number
 	
-	This function needs 3 mandatory arguments and 2 optional
+	This function needs 3 mandatory arguments and 4 optional
 	"""
 	# Error control
 	if column_key not in table.columns:
@@ -1094,44 +1782,125 @@ def combinations_table_to_dict (table, column_key, column_isolated, name_key_col
 		raise Exception(f"The column {column_key} of the dataframe needs to have unique values, it cannot have duplicated values")
 	
 	combination_dict = {} # Initial
-	list_keys = list(table[column_key].values)
-
-	for name_row in list_keys: # Go through all the rows of the given table
-		# Set the value of the name and the isolated column
-		combination_dict[name_row] = {name_key_col_isolated: table.loc[table[column_key] == name_row, column_isolated].values[0], name_key_rest_columns:[]}
-		row_name = table[table[column_key] == name_row]
-		combination_dict[name_row][name_key_rest_columns] = [element for element in row_name.loc[:,~row_name.columns.isin([column_key,column_isolated])].values[0] if not pd.isna(element)]
-		combination_dict[name_row]["Position"] = None
+
+	for name_combination, value_isolated, values_rest in generator_combinations_table(table, column_key, column_isolated, incompatible_parts = incompatible_parts): # Go through all the combinations of the table
+		# The names of the expanded combinations could be repeated with other names of the table
+		if name_combination in combination_dict.keys():
+			raise Exception(f"The combination {name_combination} is defined more than once in the column {column_key}, the names need to be unique")
+		
+		# We stop before generating the rest of the combinations if they are not going to fit
+		if max_combinations != None and len(combination_dict) >= max_combinations:
+			raise Exception(f"The table defines more than {max_combinations} combinations, which is the maximum number of combinations that can be allocated")
+		
+		# Set the value of the name, the isolated column and the values of the rest of the columns that are not empty
+		combination_dict[name_combination] = {name_key_col_isolated: value_isolated, name_key_rest_columns: values_rest, "Position": None}
 	return combination_dict
 
-def find_well_by_value (value, possible_labwares):
+def order_combinations_by_parts (combinations, name_key_col_isolated, name_key_rest_columns, size_block = 1, number_positions = None, first_position = 0):
+	"""
+	Function that will order the combinations (output of combinations_table_to_dict) so the ones that share parts are placed in consecutive positions
+
+	The combinations are grouped by the value of name_key_col_isolated and, inside of each group, every combination is followed by the one that shares
+	more values of name_key_rest_columns with it. If size_block is greater than 1, the groups start at the beginning of a block of positions (a column of the labware)
+	as long as the empty positions that it creates do not make the combinations exceed number_positions
+
+	It returns a list with the names of the combinations in the order of the positions and None in the positions that are left empty
+
+	3 mandatory arguments and 3 optional are needed for this function
+	"""
+	# Group the combinations by the isolated value keeping the order in which the values appear
+	groups_isolated = {}
+	for name_combination, combination in combinations.items():
+		groups_isolated.setdefault(combination[name_key_col_isolated], []).append(name_combination)
+	
+	# The bigger groups go first so they are the ones that are more likely to start at a block
+	groups_sorted = sorted(groups_isolated.values(), key = lambda group: len(group), reverse = True)
+
+	order_positions = []
+	combinations_left = len(combinations)
+	for group in groups_sorted:
+		# Start the group in the next block if there is enough space for the rest of the combinations
+		if size_block > 1 and (first_position + len(order_positions))%size_block != 0:
+			empty_positions = size_block - (first_position + len(order_positions))%size_block
+			if number_positions == None or len(order_positions) + empty_positions + combinations_left <= number_positions:
+				order_positions += [None]*empty_positions
+		
+		# Chain the combinations of the group choosing each time the one that shares more parts with the last one placed
+		parts_group = {name_combination: set(combinations[name_combination][name_key_rest_columns]) for name_combination in group}
+		last_combination = group[0]
+		order_positions.append(last_combination)
+		del parts_group[last_combination]
+		while len(parts_group) > 0:
+			parts_last = set(combinations[last_combination][name_key_rest_columns])
+			# max returns the first combination with the highest number of shared parts, so the ties keep the order of the table
+			last_combination = max(parts_group.keys(), key = lambda name_combination: len(parts_group[name_combination] & parts_last))
+			order_positions.append(last_combination)
+			del parts_group[last_combination]
+		
+		combinations_left -= len(group)
+	
+	return order_positions
+
+def find_well_by_value (value, possible_labwares, index_values = None):
 	"""
 	Function that will read a table of names and a table of positions and will return a list of the well(s) in the labware that
 	the value given correspond in the maps (tables)
 
-	The function needs 2 arguments to work
+	If the index of the values of the tables (output of index_values_maps) is given, the cells of the value are taken from it instead of searching the tables
+
+	The function needs 2 arguments to work and 1 optional
 	"""
 	wells_value = []
 
-	for possible_labware in possible_labwares.values(): # Go through the given labwares
-		cell_pd_value = possible_labware["Map Names"][possible_labware["Map Names"].isin([value])].stack().index # stack() returns a pandas.Series in which the indexes are the (row, column) of the cells that the value is True
-		
-		if len(cell_pd_value) == 0: # The value is not in this map, go to the next one
-			continue
-		
-		for well in cell_pd_value: # Go through all the cells that have value
-			well_value = str(well[0])+str(well[1])
-			# See if that cell actually exists in the labware
-			try:
+	if index_values != None:
+		cells_value = [(possible_labwares[key_labware], row, column) for key_labware, row, column in index_values.get(value, [])]
+	else:
+		cells_value = []
+		for possible_labware in possible_labwares.values(): # Go through the given labwares
+			cell_pd_value = possible_labware["Map Names"][possible_labware["Map Names"].isin([value])].stack().index # stack() returns a pandas.Series in which the indexes are the (row, column) of the cells that the value is True
+			cells_value += [(possible_labware, well[0], well[1]) for well in cell_pd_value]
+	
+	for possible_labware, row, column in cells_value: # Go through all the cells that have value
+		well_value = str(row)+str(column)
+		# See if that cell actually exists in the labware, using the tables of the labware if they have been built when it was loaded
+		try:
+			if "Accessors" in possible_labware.keys():
+				wells_value.append(possible_labware["Accessors"]["Wells By Name"][well_value])
+			else:
 				wells_value.append(possible_labware["Opentrons Place"][well_value])
-			except KeyError:
-				raise Exception(f"The value '{value}' has been found in the map cell '{well_value}' but that well does not exist in the labware {possible_labware['Opentrons Place']}")
+		except KeyError:
+			raise Exception(f"The value '{value}' has been found in the map cell '{well_value}' but that well does not exist in the labware {possible_labware['Opentrons Place']}")
 	
 	if len(wells_value) == 0:
 		raise Exception(f"The value '{value}' cannot be found in the provied possible_labwares")
 	
 	return wells_value
 
+def index_values_maps (possible_labwares):
+	"""
+	Function that will read the table of names of each one of the labwares once and return a dictionary in which every value of the tables
+	has the list of cells where it is, each cell being a tuple (key of the labware in possible_labwares, row name, column name)
+
+	This way a value can be found in all the labwares with a dictionary look-up instead of searching it in every table
+
+	1 mandatory argument is needed for this function
+	"""
+	index_values = {}
+
+	for key_labware, possible_labware in possible_labwares.items(): # Go through the given labwares
+		columns_map = [str(column) for column in possible_labware["Map Names"].columns]
+		# The cells are read by rows, so the cells of a value are in the same order as if the table was searched
+		for row in possible_labware["Map Names"].itertuples(name = None):
+			for column, value in zip(columns_map, row[1:]):
+				if pd.isna(value):
+					continue
+				if value in index_values.keys():
+					index_values[value].append((key_labware, row[0], column))
+				else:
+					index_values[value] = [(key_labware, row[0], column)]
+	
+	return index_values
+
 def vol_pipette_matcher (volumes_distribute, positions_distribute, pip_r, pip_l):
 	"""
 	Function that taking 2 pipettes and a list of volumes it established which volume should be transfered with
@@ -1292,9 +2061,9 @@ def run(protocol:opentrons.protocol_api.ProtocolContext):
 		raise Exception("'Combinations' sheet table needs to have at least 2 columns: 'Name' and 'Acceptor Plasmid'")
 	
 	if "TemperatureProfile" in name_sheets:
-		user_variables = UserVariables(excel_variables.get("GeneralVariables"), excel_variables.get("PerPlateVariables"), excel_variables.get("PipetteVariables"),excel_variables.get("ReactionVariables"),excel_variables.get("ModuleVariables"),excel_variables.get("Combinations"),excel_variables.get("TemperatureProfile"))
+		user_variables = UserVariables(excel_variables.get("GeneralVariables"), excel_variables.get("PerPlateVariables"), excel_variables.get("PipetteVariables"),excel_variables.get("ReactionVariables"),excel_variables.get("ModuleVariables"),excel_variables.get("Combinations"),excel_variables.get("TemperatureProfile"), mixing_profiles = excel_variables.get("MixingProfiles"), liquid_classes = excel_variables.get("LiquidClasses"), reagent_liquid_classes = excel_variables.get("ReagentLiquidClasses"), incompatible_parts = excel_variables.get("IncompatibleParts"))
 	else:
-		user_variables = UserVariables(excel_variables.get("GeneralVariables"), excel_variables.get("PerPlateVariables"), excel_variables.get("PipetteVariables"),excel_variables.get("ReactionVariables"),excel_variables.get("ModuleVariables"),excel_variables.get("Combinations"))
+		user_variables = UserVariables(excel_variables.get("GeneralVariables"), excel_variables.get("PerPlateVariables"), excel_variables.get("PipetteVariables"),excel_variables.get("ReactionVariables"),excel_variables.get("ModuleVariables"),excel_variables.get("Combinations"), mixing_profiles = excel_variables.get("MixingProfiles"), liquid_classes = excel_variables.get("LiquidClasses"), reagent_liquid_classes = excel_variables.get("ReagentLiquidClasses"), incompatible_parts = excel_variables.get("IncompatibleParts"))
 
 	user_variables.check()
 	program_variables = SettedParameters(len(protocol.deck))
@@ -1315,6 +2084,20 @@ def run(protocol:opentrons.protocol_api.ProtocolContext):
 	except NotSuitablePipette:
 		raise Exception("Either the volume of the acceptor or the volume of the module cannot be picked by set pipettes")
 	
+	#----------------------------------------------------------------------------------------------------------------------------------------------------------------------------------------------------------------
+	# Expected trips of the transfer plan between labwares, they are used to place the labware in the slots where the gantry travels the least
+	# Every transfer ends dropping its tip in the trash (slot 12) after dispensing in the final plate
+	trips_parts = 0
+	for combination in program_variables.combinations.values():
+		if user_variables.acceptorVolume > 0:
+			trips_parts += 1
+		if user_variables.moduleVolume > 0:
+			trips_parts += len(combination["modules"])
+	if program_variables.volTotalFactor > 0:
+		trips_mix = program_variables.sumSamples
+	else:
+		trips_mix = 0
+	
 	#----------------------------------------------------------------------------------------------------------------------------------------------------------------------------------------------------------------
 	# Setting Labware
 	# Setting the HS needed because they have more restrictions in the OT-2 and cannot be done with the setting labware function because setting the HS in a position will not give errors but after it wont work
@@ -1337,7 +2120,11 @@ def run(protocol:opentrons.protocol_api.ProtocolContext):
 		
 		# You cannot put the HS in some position according to their documentation, even if the opentrons app doesnt raise errors
 		possible_positions_HS = {key: program_variables.deckPositions[key] for key in [1, 3, 4, 6, 7, 10]}
-
+		
+		# The mix is distributed to the final plate, so if it is in the thermocycler the HS will be as close as possible to it
+		if user_variables.presenceTermo:
+			possible_positions_HS = sort_positions_by_trips(possible_positions_HS, {7:trips_mix})
+		
 		# Establish the hs_mod if possible
 		hs_mods = setting_labware(number_hs,
 								  "heaterShakerModuleV1",
@@ -1362,25 +2149,98 @@ def run(protocol:opentrons.protocol_api.ProtocolContext):
 			program_variables.mixWells["Positions"].append(well_tube_eppendorf)
 			well_tube_eppendorf.load_liquid(liquid = program_variables.mixWells["Definition Liquid"], volume = 0)
 	
+	# Final Plates
+	# All the transfers are dispensed in the final plates, which are placed close to the trash and the mix tubes in the HS
+	trips_final = {12:trips_parts+program_variables.sumSamples+trips_mix}
+	for position_hs in program_variables.hs_mods.keys():
+		trips_final[position_hs] = trips_mix/len(program_variables.hs_mods)
+	if user_variables.presenceTermo:
+		program_variables.tc_mod.load_labware(user_variables.APINameFinalPlate, label = "Final Plate with Combinations Slot 7")
+		labware_final = {7: program_variables.tc_mod.labware}
+		
+		# The rest of the batches are created in plates of the deck and they are swapped into the thermocycler after the profile of the previous batch
+		if len(program_variables.finalPlates) > 1:
+			labels_batches = [f"Final Plate With Combinations Batch {index_batch+2}" for index_batch in range(len(program_variables.finalPlates)-1)]
+			labware_batches = setting_labware(len(program_variables.finalPlates)-1, user_variables.APINameFinalPlate, sort_positions_by_trips(program_variables.deckPositions, trips_final), protocol, label = labels_batches)
+			program_variables.deckPositions = {**program_variables.deckPositions , **labware_batches}
+			labware_final = {**labware_final, **labware_batches}
+	else:
+		labware_final = setting_labware(len(program_variables.finalPlates), user_variables.APINameFinalPlate, sort_positions_by_trips(program_variables.deckPositions, trips_final), protocol, label = "Final Plate With Combinations")
+		program_variables.deckPositions = {**program_variables.deckPositions , **labware_final}
+	
+	# Now we are going to assign to which final plates the samples from the source plates should go
+	for index_labware, labware in enumerate(labware_final.items()):
+		program_variables.finalPlates[index_labware]["Position"] = labware[0]
+		program_variables.finalPlates[index_labware]["Opentrons Place"] = labware[1]
+		program_variables.finalPlates[index_labware]["Accessors"] = labware_accessors(labware[1])
+		program_variables.finalPlates[index_labware]["Map Combinations"] = PlateGrid(program_variables.finalPlates[index_labware]["Accessors"]["Rows By Name"].keys(), program_variables.finalPlates[index_labware]["Accessors"]["Columns By Name"].keys())
+	
+	# Lets find now in which wells of the final plate we need to create the combinations
+	index_start_final_plate = opentrons.protocol_api.labware.get_labware_definition(user_variables.APINameFinalPlate)["groups"][0]["wells"].index(user_variables.wellStartFinalPlate)
+	wells_distribute = []
+	for final_labware in program_variables.finalPlates.values():
+		wells_distribute += final_labware["Accessors"]["Wells"]
+	
+	if user_variables.groupCombinationsParts:
+		# The combinations that share acceptor are placed together and starting in a new column if it does not need more final plates, inside of each acceptor
+		# the combinations that share modules go one after the other. This way each part is distributed to close wells of the final plates
+		order_positions = order_combinations_by_parts(program_variables.combinations,
+													  "acceptor",
+													  "modules",
+													  size_block = len(program_variables.finalPlates[0]["Accessors"]["Columns"][0]),
+													  number_positions = len(wells_distribute) - index_start_final_plate,
+													  first_position = index_start_final_plate)
+		# The combinations are iterated in the order of their wells, so the final wells of every part and the water volumes follow this order
+		program_variables.combinations = {name_combination: program_variables.combinations[name_combination] for name_combination in order_positions if name_combination != None}
+	else:
+		order_positions = list(program_variables.combinations.keys())
+	
+	program_variables.wellsDistributeReactives = []
+	
+	well_combination = generator_positions(wells_distribute[index_start_final_plate:])
+	
+	for name_combination in order_positions:
+		# Set the final well
+		well_final_combination = next(well_combination)
+
+		# Empty well between groups of combinations
+		if name_combination == None:
+			continue
+		program_variables.wellsDistributeReactives.append(well_final_combination)
+		
+		# Set its position in the dictionary
+		program_variables.combinations[name_combination]["Position"] = well_final_combination
+
+		# Map where is this combination but we are going to export the maps at the end
+		for index_final_plate, finalplate in program_variables.finalPlates.items():
+			if str(finalplate["Position"]) == str(well_final_combination).split(" ")[-1]:
+				finalplate["Map Combinations"].assign_value(name_combination, well_final_combination._core._row_name, well_final_combination._core._column_name)
+				program_variables.combinations[name_combination]["Final Plate"] = index_final_plate
+
 	# Setting the Labware that we already now the number of them
 	# Source plates
 	labels = []
 	for labware_source in list(program_variables.samplePlates.values()):
 		labels.append(labware_source['Label'])
-	labware_source = setting_labware(user_variables.numberSourcePlates, user_variables.APINameSamplePlate, program_variables.deckPositions, protocol, label = labels)
+	# The DNA parts go from the source plates to the final plates, so they are placed as close as possible to them
+	trips_source = {}
+	for final_plate in program_variables.finalPlates.values():
+		trips_source[final_plate["Position"]] = trips_parts/len(program_variables.finalPlates)
+	labware_source = setting_labware(user_variables.numberSourcePlates, user_variables.APINameSamplePlate, sort_positions_by_trips(program_variables.deckPositions, trips_source), protocol, label = labels)
 	program_variables.deckPositions = {**program_variables.deckPositions , **labware_source}
 	
 	# Now we assign each labware position to ther place in the SetteParameters class
 	for index_labware, labware in enumerate(labware_source.items()):
 		program_variables.samplePlates[index_labware]["Position"] = labware[0]
 		program_variables.samplePlates[index_labware]["Opentrons Place"] = labware[1]
+		program_variables.samplePlates[index_labware]["Accessors"] = labware_accessors(labware[1])
 		# We are going to establish som emaps that are going to contain the information of each place
 		program_variables.samplePlates[index_labware]['Map Names'] = pd.read_excel("/data/user_storage/VariablesMoCloAssembly.xlsx", sheet_name = user_variables.nameSheetMapParts[index_labware], index_col = 0, engine = "openpyxl")
 		# program_variables.samplePlates[index_labware]['Map Names'] = pd.read_excel("VariablesMoCloAssembly.xlsx", sheet_name = user_variables.nameSheetMapParts[index_labware], index_col = 0, engine = "openpyxl")
-		program_variables.samplePlates[index_labware]['Map Volumes'] = pd.DataFrame(0, index = list(program_variables.samplePlates[index_labware]["Opentrons Place"].rows_by_name().keys()), columns = list(program_variables.samplePlates[index_labware]["Opentrons Place"].columns_by_name().keys()))
-		program_variables.samplePlates[index_labware]['Map Liquid Definitions'] = pd.DataFrame(np.nan, index = list(program_variables.samplePlates[index_labware]["Opentrons Place"].rows_by_name().keys()), columns = list(program_variables.samplePlates[index_labware]["Opentrons Place"].columns_by_name().keys()))
-		program_variables.samplePlates[index_labware]['Map Final Combinations Acceptor'] = pd.DataFrame(np.nan, dtype = object, index = list(program_variables.samplePlates[index_labware]["Opentrons Place"].rows_by_name().keys()), columns = list(program_variables.samplePlates[index_labware]["Opentrons Place"].columns_by_name().keys()))
-		program_variables.samplePlates[index_labware]['Map Final Combinations Module'] = pd.DataFrame(np.nan, dtype = object, index = list(program_variables.samplePlates[index_labware]["Opentrons Place"].rows_by_name().keys()), columns = list(program_variables.samplePlates[index_labware]["Opentrons Place"].columns_by_name().keys()))
+		program_variables.samplePlates[index_labware]['Map Volumes'] = PlateGrid(program_variables.samplePlates[index_labware]["Accessors"]["Rows By Name"].keys(), program_variables.samplePlates[index_labware]["Accessors"]["Columns By Name"].keys(), kind = "numeric")
+		program_variables.samplePlates[index_labware]['Map Liquid Definitions'] = PlateGrid(program_variables.samplePlates[index_labware]["Accessors"]["Rows By Name"].keys(), program_variables.samplePlates[index_labware]["Accessors"]["Columns By Name"].keys(), kind = "names")
+		program_variables.samplePlates[index_labware]['Map Final Combinations Acceptor'] = PlateGrid(program_variables.samplePlates[index_labware]["Accessors"]["Rows By Name"].keys(), program_variables.samplePlates[index_labware]["Accessors"]["Columns By Name"].keys(), kind = "lists")
+		program_variables.samplePlates[index_labware]['Map Final Combinations Module'] = PlateGrid(program_variables.samplePlates[index_labware]["Accessors"]["Rows By Name"].keys(), program_variables.samplePlates[index_labware]["Accessors"]["Columns By Name"].keys(), kind = "lists")
 
 		# Let's check that the labware and map have the same names of the rows and columns
 		row_names = list(labware[1].rows_by_name().keys())
@@ -1399,109 +2259,72 @@ The columns and rows of the Maps of DNA Parts {user_variables.nameSheetMapParts[
 		 - Sheet Columns: {columns_map}
 		 - Sheet Rows: {rows_map}""")
 		
-		# Define volumes of each part, their liquid definition, the final constructs they are going to give volume to
-		for id_combination, combination in program_variables.combinations.items():
-			# Let's see if the acceptor of this combination is in the map of this labware
-			well = program_variables.samplePlates[index_labware]['Map Names'][program_variables.samplePlates[index_labware]['Map Names'].isin([combination["acceptor"]])].stack()
-			if len(well) > 0: # If it enters this loop, the acceptor is in this labware
-				row_well, column_well = well.index[0]
-				
-				# Add the volume of the acceptor to that well
-				program_variables.samplePlates[index_labware]['Map Volumes'].loc[row_well, str(column_well)] += user_variables.acceptorVolume
+	# Index of the cells of every DNA part in the source plates, it is created once and all the volumes, liquid definitions and final constructs of the parts are set with it
+	# If a part is more than once in a plate, only the first cell of that plate (by rows) is used
+	index_parts = {}
+	for dna_part, cells_part in index_values_maps(program_variables.samplePlates).items():
+		index_parts[dna_part] = []
+		for index_labware, row_well, column_well in cells_part:
+			if index_labware not in [cell[0] for cell in index_parts[dna_part]]:
+				index_parts[dna_part].append((index_labware, row_well, column_well))
+	
+	# Define volumes of each part, their liquid definition, the final constructs they are going to give volume to
+	for id_combination, combination in program_variables.combinations.items():
+		# Let's see in which labwares the acceptor of this combination is
+		for index_labware, row_well, column_well in index_parts.get(combination["acceptor"], []):
+			# Add the volume of the acceptor to that well
+			program_variables.samplePlates[index_labware]['Map Volumes'].add_value(user_variables.acceptorVolume, row_well, column_well)
+			
+			# Add that combination to the final wells where this acceptor is going to be transferred to
+			program_variables.samplePlates[index_labware]['Map Final Combinations Acceptor'].add_value(id_combination, row_well, column_well)
+
+			# Definition of acceptor liquid
+			if program_variables.samplePlates[index_labware]['Map Liquid Definitions'].get_value(row_well, column_well) == None:
+				while True:
+					color_liquid = f"#{random.randint(0, 0xFFFFFF):06x}"
+					if color_liquid.lower() not in program_variables.colors_mediums:
+						program_variables.samplePlates[index_labware]['Map Liquid Definitions'].assign_value(protocol.define_liquid(
+							name = combination["acceptor"],
+							description = f"",
+							display_color = color_liquid
+						), row_well, column_well)
+						program_variables.colors_mediums.append(color_liquid)
+						break
+		
+		for dna_module in combination["modules"]:
+			for index_labware, row_well, column_well in index_parts.get(dna_module, []):
+				# Add the volume of the module to that well
+				program_variables.samplePlates[index_labware]['Map Volumes'].add_value(user_variables.moduleVolume, row_well, column_well)
 				
-				# Add that combination to the final wells where this acceptor is going to be transferred to
-				if isinstance(program_variables.samplePlates[index_labware]['Map Final Combinations Acceptor'].loc[row_well, str(column_well)], list):
-					program_variables.samplePlates[index_labware]['Map Final Combinations Acceptor'].at[row_well, str(column_well)].append(id_combination)
-				else:
-					program_variables.samplePlates[index_labware]['Map Final Combinations Acceptor'].at[row_well, str(column_well)] = [id_combination]
+				# Add that combination to the final wells where this module is going to be transferred to
+				program_variables.samplePlates[index_labware]['Map Final Combinations Module'].add_value(id_combination, row_well, column_well)
 
-				# Definition of acceptor liquid
-				if pd.isna(program_variables.samplePlates[index_labware]['Map Liquid Definitions'].loc[row_well,str(column_well)]):
+				# Definition of liquid
+				if program_variables.samplePlates[index_labware]['Map Liquid Definitions'].get_value(row_well, column_well) == None:
 					while True:
 						color_liquid = f"#{random.randint(0, 0xFFFFFF):06x}"
 						if color_liquid.lower() not in program_variables.colors_mediums:
-							program_variables.samplePlates[index_labware]['Map Liquid Definitions'].at[row_well,str(column_well)] = protocol.define_liquid(
-								name = combination["acceptor"],
+							program_variables.samplePlates[index_labware]['Map Liquid Definitions'].assign_value(protocol.define_liquid(
+								name = dna_module,
 								description = f"",
 								display_color = color_liquid
-							)
+							), row_well, column_well)
 							program_variables.colors_mediums.append(color_liquid)
 							break
-			
-			for dna_module in combination["modules"]:
-				well = program_variables.samplePlates[index_labware]['Map Names'][program_variables.samplePlates[index_labware]['Map Names'].isin([dna_module])].stack()
-				if len(well) > 0:
-					row_well, column_well = well.index[0]
-
-					# Add the volume of the module to that well
-					program_variables.samplePlates[index_labware]['Map Volumes'].loc[row_well, str(column_well)] += user_variables.moduleVolume
-					
-					# Add that combination to the final wells where this module is going to be transferred to
-					if isinstance(program_variables.samplePlates[index_labware]['Map Final Combinations Module'].at[row_well, str(column_well)], list):
-						program_variables.samplePlates[index_labware]['Map Final Combinations Module'].loc[row_well, str(column_well)].append(id_combination)
-					else:
-						program_variables.samplePlates[index_labware]['Map Final Combinations Module'].loc[row_well, str(column_well)] = [id_combination]
-
-					# Definition of liquid
-					if pd.isna(program_variables.samplePlates[index_labware]['Map Liquid Definitions'].loc[row_well,str(column_well)]):
-						while True:
-							color_liquid = f"#{random.randint(0, 0xFFFFFF):06x}"
-							if color_liquid.lower() not in program_variables.colors_mediums:
-								program_variables.samplePlates[index_labware]['Map Liquid Definitions'].loc[row_well,str(column_well)] = protocol.define_liquid(
-									name = dna_module,
-									description = f"",
-									display_color = color_liquid
-								)
-								program_variables.colors_mediums.append(color_liquid)
-								break
-		
+	
+	for index_labware, labware in enumerate(labware_source.items()):
 		# Check volumes are not higher than vol max of well and load it
 		first_key = list(labware_context.get_labware_definition(user_variables.APINameSamplePlate)["wells"].keys())[0]
 		vol_max_tube = labware_context.get_labware_definition(user_variables.APINameSamplePlate)["wells"][first_key]["totalLiquidVolume"]
 		
-		if program_variables.samplePlates[index_labware]['Map Volumes'].ge(vol_max_tube*0.95).any().any():
+		if (program_variables.samplePlates[index_labware]['Map Volumes'].grid >= vol_max_tube*0.95).any():
 			raise Exception(f"There is one or more parts in the map {user_variables.nameSheetMapParts[index_labware]} excedes 0*95 max volume of {user_variables.APINameSamplePlate}, try another combination of variables")
 		
 		# Now we load the liquids in their wells
 		for row in program_variables.samplePlates[index_labware]['Map Names'].index:
 			for column in program_variables.samplePlates[index_labware]['Map Names'].columns:
 				if not pd.isna(program_variables.samplePlates[index_labware]['Map Names'].loc[row][column]):
-					labware[1].wells_by_name()[f"{row}{column}"].load_liquid(liquid = program_variables.samplePlates[index_labware]['Map Liquid Definitions'].loc[row, str(column)], volume = math.ceil(program_variables.samplePlates[index_labware]['Map Volumes'].loc[row,str(column)]))	
-
-	# Final Plates
-	if user_variables.presenceTermo:
-		program_variables.tc_mod.load_labware(user_variables.APINameFinalPlate, label = "Final Plate with Combinations Slot 7")
-		labware_final = {7: program_variables.tc_mod.labware}
-	else:
-		labware_final = setting_labware(len(program_variables.finalPlates), user_variables.APINameFinalPlate, program_variables.deckPositions, protocol, label = "Final Plate With Combinations")
-		program_variables.deckPositions = {**program_variables.deckPositions , **labware_final}
-	
-	# Now we are going to assign to which final plates the samples from the source plates should go
-	for index_labware, labware in enumerate(labware_final.items()):
-		program_variables.finalPlates[index_labware]["Position"] = labware[0]
-		program_variables.finalPlates[index_labware]["Opentrons Place"] = labware[1]
-		program_variables.finalPlates[index_labware]["Map Combinations"] = MapLabware(labware[1])
-	
-	# Lets find now in which wells of the final plate we need to create the combinations
-	index_start_final_plate = opentrons.protocol_api.labware.get_labware_definition(user_variables.APINameFinalPlate)["groups"][0]["wells"].index(user_variables.wellStartFinalPlate)
-	wells_distribute = []
-	for final_labware in program_variables.finalPlates.values():
-		wells_distribute += final_labware["Opentrons Place"].wells()
-	program_variables.wellsDistributeReactives = wells_distribute[index_start_final_plate:int(index_start_final_plate+program_variables.sumSamples)]
-	
-	well_combination = generator_positions(program_variables.wellsDistributeReactives)
-	
-	for name_combination in program_variables.combinations.keys():
-		# Set the final well
-		well_final_combination = next(well_combination)
-		
-		# Set its position in the dictionary
-		program_variables.combinations[name_combination]["Position"] = well_final_combination
-
-		# Map where is this combination but we are going to export the maps at the end
-		for finalplate in program_variables.finalPlates.values():
-			if str(finalplate["Position"]) == str(well_final_combination).split(" ")[-1]:
-				finalplate["Map Combinations"].assign_value(name_combination, well_final_combination._core._row_name, well_final_combination._core._column_name)
+					program_variables.samplePlates[index_labware]["Accessors"]["Wells By Name"][f"{row}{column}"].load_liquid(liquid = program_variables.samplePlates[index_labware]['Map Liquid Definitions'].get_value(row, column), volume = math.ceil(program_variables.samplePlates[index_labware]['Map Volumes'].get_value(row, column)))	
 
 	# Reactive plates and mix tubes (if Heater-Shaker is False)
 	#----------------------------------------------------------------------------------------------------------------------------------------------------------------------------------------------------------------
@@ -1579,13 +2402,45 @@ The columns and rows of the Maps of DNA Parts {user_variables.nameSheetMapParts[
 	
 	# Set the number of tubes in the coldblock
 	number_coldblocks = math.ceil(total_number_tubes/len(labware_context.get_labware_definition(user_variables.APINameEppendorfPlate)["wells"]))
+	# The water goes to the final wells and the reagents to the mix tubes, which are in the coldblocks themselves if there is no HS
+	trips_water = len([volume for volume in volume_water_every_well if volume > 0])
+	trips_reagents_mix = len([factor for factor in [program_variables.volLigaseFactor, program_variables.volREFactor, program_variables.volBufferFactor, program_variables.volSerumFactor] if factor > 0])*len(program_variables.mixWells["Volumes"])
+	trips_coldblocks = {}
+	for final_plate in program_variables.finalPlates.values():
+		if user_variables.presenceHS:
+			trips_coldblocks[final_plate["Position"]] = trips_water/len(program_variables.finalPlates)
+		else:
+			trips_coldblocks[final_plate["Position"]] = (trips_water+trips_mix)/len(program_variables.finalPlates)
+	for position_hs in program_variables.hs_mods.keys():
+		trips_coldblocks[position_hs] = trips_reagents_mix/len(program_variables.hs_mods)
+	
+	# All the final plates, DNA plates and heater-shakers are already in the deck, so the slots that are left need to hold the coldblocks and 1 tiprack of each different tiprack
+	free_slots = len([position for position, labware in program_variables.deckPositions.items() if labware == None])
+	number_tipracks = len(set(tiprack for tiprack, pipette in [(user_variables.APINameTipR, program_variables.pipR), (user_variables.APINameTipL, program_variables.pipL)] if pipette != None))
+	if number_coldblocks + number_tipracks > free_slots:
+		raise Exception(f"The {program_variables.sumSamples} combinations need {len(program_variables.finalPlates)} final plate(s), {user_variables.numberSourcePlates} DNA plate(s), {len(program_variables.hs_mods)} heater-shaker(s), {number_coldblocks} coldblock(s) and {number_tipracks} tiprack(s), and only {free_slots} slots are left for the coldblocks and tipracks. Try less combinations or another combination of variables")
+	
 	coldblocks = setting_labware(number_coldblocks,
 								 user_variables.APINameEppendorfPlate,
-								 dict(sorted(program_variables.deckPositions.items(), reverse=True)),
+								 sort_positions_by_trips(program_variables.deckPositions, trips_coldblocks),
 								 protocol,
-								 label = "Reagents") # We do the inverse deckPositions because it is less likely to have deck conflict error
+								 label = "Reagents") # In case of deck conflict the next closest position will be tried
 	program_variables.deckPositions = {**program_variables.deckPositions , **coldblocks}
 	
+	# The tip racks are defined when they are needed in the first free positions of deckPositions, so we sort them by the trips of the tips
+	# Every tip goes from the tip rack to the labware where the liquid is aspirated and after it is dropped in the trash
+	trips_tipracks = {12:trips_parts+trips_water+trips_mix+trips_reagents_mix}
+	for source_plate in program_variables.samplePlates.values():
+		trips_tipracks[source_plate["Position"]] = trips_parts/len(program_variables.samplePlates)
+	for position_coldblock in coldblocks.keys():
+		if user_variables.presenceHS:
+			trips_tipracks[position_coldblock] = (trips_water+trips_reagents_mix)/len(coldblocks)
+		else:
+			trips_tipracks[position_coldblock] = (trips_water+trips_reagents_mix+trips_mix)/len(coldblocks)
+	for position_hs in program_variables.hs_mods.keys():
+		trips_tipracks[position_hs] = trips_mix/len(program_variables.hs_mods)
+	program_variables.deckPositions = sort_positions_by_trips(program_variables.deckPositions, trips_tipracks)
+	
 	#----------------------------------------------------------------------------------------------------------------------------------------------------------------------------------------------------------------
 	# Set the places of the reagents and fill the dictionaries of the different kind of labwares
 	# Start with the coldblock(s) labware that for sure it is in it
@@ -1620,6 +2475,7 @@ The columns and rows of the Maps of DNA Parts {user_variables.nameSheetMapParts[
 	# Transfer the Water, that is a variable ammount depending on the well
 	# We are going to do it with every tube the same
 	well_start = 0
+	set_liquid_class([program_variables.pipR, program_variables.pipL], program_variables.reagentLiquidClasses["Water"], program_variables.liquidClasses, program_variables.defaultFlowRates, protocol)
 
 	for index_tube in range(len(program_variables.reactiveWells["Water"]["Positions"])):
 		# First, let's find the volumes that we have to distribute with the 2 pipettes
@@ -1978,20 +2834,12 @@ The columns and rows of the Maps of DNA Parts {user_variables.nameSheetMapParts[
 	
 	#----------------------------------------------------------------------------------------------------------------------------------------------------------------------------------------------------------------
 	# Create the mixes
-	# Lower the aspiration and dispense rate for the ligase and RE becaus ethey are in a very viscous medium
-	if program_variables.pipR != None:
-		default_values_pipR = [program_variables.pipR.flow_rate.aspirate, program_variables.pipR.flow_rate.dispense]
-		program_variables.pipR.flow_rate.aspirate = program_variables.pipR.min_volume
-		program_variables.pipR.flow_rate.dispense= program_variables.pipR.min_volume
-	if program_variables.pipL != None:
-		default_values_pipL = [program_variables.pipL.flow_rate.aspirate, program_variables.pipL.flow_rate.dispense]
-		program_variables.pipL.flow_rate.aspirate = program_variables.pipL.min_volume
-		program_variables.pipL.flow_rate.dispense= program_variables.pipL.min_volume
-	
+	# Each reagent is transferred with the flow rates of its liquid class, by default the ligase and RE are slower because they are in a very viscous medium
 	new_tip_value = "never" # Initial variable to control when does the intial tip needs to start being aspirate
 
 	# Transfer Ligase
 	if program_variables.volLigaseFactor > 0:
+		set_liquid_class([program_variables.pipR, program_variables.pipL], program_variables.reagentLiquidClasses["Ligase"], program_variables.liquidClasses, program_variables.defaultFlowRates, protocol)
 		try:
 			tube_to_tube_transfer(program_variables.volLigaseFactor,
 								program_variables.reactiveWells["Ligase"]["Positions"],
@@ -2012,6 +2860,7 @@ Possible ways to fix this error:
 
 	# Transfer RE
 	if program_variables.volREFactor > 0:
+		set_liquid_class([program_variables.pipR, program_variables.pipL], program_variables.reagentLiquidClasses["RE"], program_variables.liquidClasses, program_variables.defaultFlowRates, protocol)
 		try:
 			tube_to_tube_transfer(program_variables.volREFactor,
 								program_variables.reactiveWells["RE"]["Positions"],
@@ -2031,15 +2880,9 @@ Possible ways to fix this error:
 
 		new_tip_value = "aspirate" # We change it so we dont contaminate the rest of the reactives if this is the first reactive
 
-	if program_variables.pipR != None:
-		program_variables.pipR.flow_rate.aspirate = default_values_pipR[0]
-		program_variables.pipR.flow_rate.dispense= default_values_pipR[1]
-	if program_variables.pipL != None:
-		program_variables.pipL.flow_rate.aspirate = default_values_pipL[0]
-		program_variables.pipL.flow_rate.dispense=default_values_pipL[1]
-	
 	# Transfer Buffer
 	if program_variables.volBufferFactor > 0:
+		set_liquid_class([program_variables.pipR, program_variables.pipL], program_variables.reagentLiquidClasses["Buffer"], program_variables.liquidClasses, program_variables.defaultFlowRates, protocol)
 		try:
 			tube_to_tube_transfer(program_variables.volBufferFactor,
 								program_variables.reactiveWells["Buffer"]["Positions"],
@@ -2061,6 +2904,7 @@ Possible ways to fix this error:
 
 	# Transfer Serum
 	if program_variables.volSerumFactor > 0:
+		set_liquid_class([program_variables.pipR, program_variables.pipL], program_variables.reagentLiquidClasses["Serum"], program_variables.liquidClasses, program_variables.defaultFlowRates, protocol)
 		try:
 			tube_to_tube_transfer(program_variables.volSerumFactor,
 								program_variables.reactiveWells["Serum"]["Positions"],
@@ -2080,112 +2924,125 @@ Possible ways to fix this error:
 		
 		new_tip_value = "aspirate" # We change it so we dont contaminate the rest of the reactives if this is the first reactive
 
-	#----------------------------------------------------------------------------------------------------------------------------------------------------------------------------------------------------------------
-	# Mix and Distribute Sets
-	if program_variables.volTotal > 0:
-		optimal_pipette = give_me_optimal_pipette (program_variables.volTotal,
-												   program_variables.pipR,
-												   program_variables.pipL)
-		
-		if optimal_pipette.mount == "right":
-			tiprack = user_variables.APINameTipR
-			starting_tip = user_variables.startingTipPipR
-			max_volume_pip = program_variables.volMaxPipRTiprackR
+	# Export map(s) in the formats of 'Format Final Maps', by default in an excel
+	maps_final = {f"CombinationsSlot{final_plate['Position']}":final_plate["Map Combinations"].to_dataframe() for final_plate in program_variables.finalPlates.values()}
+	
+	# Export the layout of the deck so the operator knows in which slot every labware has been placed
+	layout_deck = []
+	for position, labware in sorted(program_variables.deckPositions.items()):
+		if labware == None:
+			layout_deck.append([position, "Empty"])
 		else:
-			tiprack = user_variables.APINameTipL
-			starting_tip = user_variables.startingTipPipL
-			max_volume_pip = program_variables.volMaxPipLTiprackL
-
-		wells_distribute_mix = program_variables.wellsDistributeReactives[:]
-
-		for index, tube in enumerate(program_variables.mixWells["Positions"]):
-			if user_variables.presenceHS == True:
-				# Find out in which HS is the tube and shake it
-				program_variables.hs_mods[int(str(tube).split(" ")[-1])].set_and_wait_for_shake_speed(user_variables.rpm)
-				protocol.delay(seconds = 15)
-				program_variables.hs_mods[int(str(tube).split(" ")[-1])].deactivate_shaker()
-			else: # Mix it with a pipette
-				vol_mixing = program_variables.mixWells["Volumes"][index] / 3
+			layout_deck.append([position, str(labware)])
+	layout_deck.append([12, "Trash"])
+	
+	volumes_final = {"Volume Acceptor (uL)":dict.fromkeys(maps_final, user_variables.acceptorVolume), "Volume Each Module (uL)":dict.fromkeys(maps_final, user_variables.moduleVolume), "Final Volume (uL)":dict.fromkeys(maps_final, user_variables.finalVolume)}
+	export_maps(maps_final, f'/data/user_storage/{user_variables.finalMapName}', formats = user_variables.formatsFinalMaps, name_values = "Construct", extra_columns = volumes_final, other_tables = {"DeckLayout":pd.DataFrame(layout_deck, columns = ["Slot", "Labware"])})
+	# export_maps(maps_final, f'{user_variables.finalMapName}', formats = user_variables.formatsFinalMaps, name_values = "Construct", extra_columns = volumes_final, other_tables = {"DeckLayout":pd.DataFrame(layout_deck, columns = ["Slot", "Labware"])})
+	
+	# Final wells that each mix tube gives the mix to and their final plates, the mix is given in the order of the combinations
+	wells_tubes_mix = []
+	final_plates_tubes_mix = []
+	final_plates_combinations = [combination["Final Plate"] for combination in program_variables.combinations.values()]
+	start_tube = 0
+	for reactions_tube in program_variables.mixWells["Reactions Per Tube"]:
+		wells_tubes_mix.append(program_variables.wellsDistributeReactives[start_tube:start_tube+reactions_tube])
+		final_plates_tubes_mix.append(final_plates_combinations[start_tube:start_tube+reactions_tube])
+		start_tube += reactions_tube
+	
+	# With batches, the mix and DNA parts of each final plate are distributed just before its temperature profile, so the reactions of a batch are not assembled
+	# while the profiles of the previous ones are run. Without batches all the final wells are assembled at once (None)
+	if user_variables.presenceTermo and user_variables.batchesTermo:
+		batches_final_plates = list(program_variables.finalPlates.keys())
+	else:
+		batches_final_plates = [None]
+	
+	for index_batch, batch_final_plate in enumerate(batches_final_plates):
+		#----------------------------------------------------------------------------------------------------------------------------------------------------------------------------------------------------------------
+		# Mix and Distribute Sets
+		if program_variables.volTotal > 0:
+			set_liquid_class([program_variables.pipR, program_variables.pipL], program_variables.reagentLiquidClasses["Mix"], program_variables.liquidClasses, program_variables.defaultFlowRates, protocol)
+			optimal_pipette = give_me_optimal_pipette (program_variables.volTotal,
+													   program_variables.pipR,
+													   program_variables.pipL)
+		
+			if optimal_pipette.mount == "right":
+				tiprack = user_variables.APINameTipR
+				starting_tip = user_variables.startingTipPipR
+				max_volume_pip = program_variables.volMaxPipRTiprackR
+			else:
+				tiprack = user_variables.APINameTipL
+				starting_tip = user_variables.startingTipPipL
+				max_volume_pip = program_variables.volMaxPipLTiprackL
+
+			for index, tube in enumerate(program_variables.mixWells["Positions"]):
+				# Final wells of the batch that is being assembled that receive the mix of this tube, the tube is mixed again in every batch that uses it
+				wells_tube = [well for well, index_final_plate in zip(wells_tubes_mix[index], final_plates_tubes_mix[index]) if batch_final_plate == None or index_final_plate == batch_final_plate]
+				if len(wells_tube) == 0:
+					continue
+			
+				if user_variables.presenceHS == True:
+					# Find out in which HS is the tube and shake it
+					program_variables.hs_mods[int(str(tube).split(" ")[-1])].set_and_wait_for_shake_speed(user_variables.rpm)
+					protocol.delay(seconds = 15)
+					program_variables.hs_mods[int(str(tube).split(" ")[-1])].deactivate_shaker()
+				else: # Mix it with a pipette
+					vol_mixing = program_variables.mixWells["Volumes"][index] / 3
 				
-				optimal_pipette_mixing = give_me_optimal_pipette(vol_mixing,
-																 program_variables.pipR,
-																 program_variables.pipL)
+					optimal_pipette_mixing = give_me_optimal_pipette(vol_mixing,
+																	 program_variables.pipR,
+																	 program_variables.pipL)
 				
-				if optimal_pipette_mixing.max_volume < vol_mixing:
-					vol_mixing = optimal_pipette_mixing.max_volume
+					if optimal_pipette_mixing.max_volume < vol_mixing:
+						vol_mixing = optimal_pipette_mixing.max_volume
 				
-				if optimal_pipette_mixing.mount == "right":
-					tiprack_mix = user_variables.APINameTipR
-					starting_tip_mix = user_variables.startingTipPipR
-				else:
-					tiprack_mix = user_variables.APINameTipL
-					starting_tip_mix = user_variables.startingTipPipL
+					if optimal_pipette_mixing.mount == "right":
+						tiprack_mix = user_variables.APINameTipR
+						starting_tip_mix = user_variables.startingTipPipR
+					else:
+						tiprack_mix = user_variables.APINameTipL
+						starting_tip_mix = user_variables.startingTipPipL
 
-				if optimal_pipette_mixing.has_tip == False:
-					check_tip_and_pick(optimal_pipette_mixing,
-									   tiprack_mix,
-									   program_variables.deckPositions,
-									   protocol,
-									   replace_tiprack = user_variables.replaceTiprack,
-									   initial_tip = starting_tip_mix,
-									   same_tiprack = program_variables.sameTipRack)
+					if optimal_pipette_mixing.has_tip == False:
+						check_tip_and_pick(optimal_pipette_mixing,
+										   tiprack_mix,
+										   program_variables.deckPositions,
+										   protocol,
+										   replace_tiprack = user_variables.replaceTiprack,
+										   initial_tip = starting_tip_mix,
+										   same_tiprack = program_variables.sameTipRack)
 				
-				# Now we mix with the pipette
-				mixing_eppendorf_15(tube, program_variables.mixWells["Volumes"][index], vol_mixing, optimal_pipette_mixing, protocol)
+					# Now we mix with the pipette using the minimum mixing for the volume and liquid class of the tube
+					mixing_profile = mixing_profile_15eppendorf(program_variables.mixWells["Volumes"][index], vol_mixing, user_variables.liquidClassMix, program_variables.mixingProfiles)
+					# The flow rate factor of the mixing profile is applied over the default flow rates, so the liquid class is set back after the mixing
+					set_liquid_class([program_variables.pipR, program_variables.pipL], None, program_variables.liquidClasses, program_variables.defaultFlowRates, protocol)
+					mixing_eppendorf_15(tube, program_variables.mixWells["Volumes"][index], vol_mixing, optimal_pipette_mixing, protocol, mixing_profile = mixing_profile)
+					set_liquid_class([program_variables.pipR, program_variables.pipL], program_variables.reagentLiquidClasses["Mix"], program_variables.liquidClasses, program_variables.defaultFlowRates, protocol)
 				
-			if user_variables.presenceHS == False and optimal_pipette != optimal_pipette_mixing:
-				optimal_pipette_mixing.drop_tip()
+				if user_variables.presenceHS == False and optimal_pipette != optimal_pipette_mixing:
+					optimal_pipette_mixing.drop_tip()
 			
-			if optimal_pipette.has_tip == False:
-				check_tip_and_pick (optimal_pipette,
-									tiprack,
-									program_variables.deckPositions,
-									protocol, initial_tip = starting_tip,
-									same_tiprack = program_variables.sameTipRack,
-									replace_tiprack = user_variables.replaceTiprack)
-
-			# We set the position of the final wells (top, bottom or center) according to the user variable
-			positions_distribute = []
-			for final_well in wells_distribute_mix[:program_variables.mixWells["Reactions Per Tube"][index]]:
-				if user_variables.positionDistributeMix == "top":
-					positions_distribute.append(final_well.top())
-				elif user_variables.positionDistributeMix == "center":
-					positions_distribute.append(final_well.center())
-				else:
-					positions_distribute.append(final_well)
-
-			if user_variables.changeTipDistributeMix == "well":
-				if optimal_pipette.max_volume >= program_variables.volTotal: # It will go to the final well only once
-					for final_well in positions_distribute:
-						if optimal_pipette.has_tip == False:
-							check_tip_and_pick (optimal_pipette,
-												tiprack,
-												program_variables.deckPositions,
-												protocol,
-												initial_tip = starting_tip,
-												same_tiprack = program_variables.sameTipRack,
-												replace_tiprack = user_variables.replaceTiprack)
-						optimal_pipette.transfer(program_variables.volTotal,
-												tube,
-												final_well,
-												new_tip = "never",
-												touch_tip = user_variables.touchTipDistributeMix)
-							
-						optimal_pipette.drop_tip()
-				else: # It will go to the final well more than once
-					# First we figure out how many movements do we need
-					min_full_movements, rest_volume = divmod(program_variables.volTotal, max_volume_pip)
-					# Now we establish the volumes of those movements making sure all of the movements can be done with this pipette
-					if rest_volume > 0 and rest_volume < optimal_pipette.min_volume: # All volume scna be transferred and the rest volume is 0
-						vol_transfer = int(min_full_movements-1)*[max_volume_pip]
-						vol_transfer += [(max_volume_pip/2)+rest_volume, max_volume_pip/2]
-					elif rest_volume == 0:
-						vol_transfer = int(min_full_movements)*[max_volume_pip]
-					else: # This means the rest_volume cannot be transferred with the pipette so we need to balance the volumes so it can be done
-						vol_transfer = int(min_full_movements)*[max_volume_pip]
-						vol_transfer.append(rest_volume)
-					for final_well in positions_distribute:
-						for volumen in vol_transfer:
+				if optimal_pipette.has_tip == False:
+					check_tip_and_pick (optimal_pipette,
+										tiprack,
+										program_variables.deckPositions,
+										protocol, initial_tip = starting_tip,
+										same_tiprack = program_variables.sameTipRack,
+										replace_tiprack = user_variables.replaceTiprack)
+
+				# We set the position of the final wells (top, bottom or center) according to the user variable
+				positions_distribute = []
+				for final_well in wells_tube:
+					if user_variables.positionDistributeMix == "top":
+						positions_distribute.append(final_well.top())
+					elif user_variables.positionDistributeMix == "center":
+						positions_distribute.append(final_well.center())
+					else:
+						positions_distribute.append(final_well)
+
+				if user_variables.changeTipDistributeMix == "well":
+					if optimal_pipette.max_volume >= program_variables.volTotal: # It will go to the final well only once
+						for final_well in positions_distribute:
 							if optimal_pipette.has_tip == False:
 								check_tip_and_pick (optimal_pipette,
 													tiprack,
@@ -2194,38 +3051,50 @@ Possible ways to fix this error:
 													initial_tip = starting_tip,
 													same_tiprack = program_variables.sameTipRack,
 													replace_tiprack = user_variables.replaceTiprack)
-
-							# Transfer the volumes aspirating with the proper height
-							optimal_pipette.transfer(volumen,
-													 tube,
-													 final_well,
-													 new_tip = "never",
-													 touch_tip = user_variables.touchTipDistributeMix)
-
+							optimal_pipette.transfer(program_variables.volTotal,
+													tube,
+													final_well,
+													new_tip = "never",
+													touch_tip = user_variables.touchTipDistributeMix)
+							
 							optimal_pipette.drop_tip()
-			elif user_variables.changeTipDistributeMix == "aspirate":
-				# If the tip is aspirate we need to calculate how many final wells we can transfer volume with 1 movement and do it until there are no more movements
-				# First, we calculate what is the max number of final wells that the combination pipette-tiprack can transfer
-				pos_max = int(max_volume_pip/program_variables.volTotal) # Maximum number of final wells the pipette can transfer to in 1 movement
-				if pos_max > 0:
-					if pos_max >= len(positions_distribute): # Check that this pos_max is not higher than the total ammount of positions we need to transfer
-						if optimal_pipette.has_tip == False:
-							check_tip_and_pick (optimal_pipette,
-												tiprack,
-												program_variables.deckPositions,
-												protocol, initial_tip = starting_tip,
-												same_tiprack = program_variables.sameTipRack,
-												replace_tiprack = user_variables.replaceTiprack)
-						optimal_pipette.distribute(program_variables.volTotal,
-												   tube,
-												   positions_distribute,
-												   new_tip = "never",
-												   disposal_volume = 0,
-												   touch_tip = user_variables.touchTipDistributeMix)
-						optimal_pipette.drop_tip()
-					else: # Means that more than 1 mov is needed
-						start_position = 0
-						while start_position < len(positions_distribute):
+					else: # It will go to the final well more than once
+						# First we figure out how many movements do we need
+						min_full_movements, rest_volume = divmod(program_variables.volTotal, max_volume_pip)
+						# Now we establish the volumes of those movements making sure all of the movements can be done with this pipette
+						if rest_volume > 0 and rest_volume < optimal_pipette.min_volume: # All volume scna be transferred and the rest volume is 0
+							vol_transfer = int(min_full_movements-1)*[max_volume_pip]
+							vol_transfer += [(max_volume_pip/2)+rest_volume, max_volume_pip/2]
+						elif rest_volume == 0:
+							vol_transfer = int(min_full_movements)*[max_volume_pip]
+						else: # This means the rest_volume cannot be transferred with the pipette so we need to balance the volumes so it can be done
+							vol_transfer = int(min_full_movements)*[max_volume_pip]
+							vol_transfer.append(rest_volume)
+						for final_well in positions_distribute:
+							for volumen in vol_transfer:
+								if optimal_pipette.has_tip == False:
+									check_tip_and_pick (optimal_pipette,
+														tiprack,
+														program_variables.deckPositions,
+														protocol,
+														initial_tip = starting_tip,
+														same_tiprack = program_variables.sameTipRack,
+														replace_tiprack = user_variables.replaceTiprack)
+
+								# Transfer the volumes aspirating with the proper height
+								optimal_pipette.transfer(volumen,
+														 tube,
+														 final_well,
+														 new_tip = "never",
+														 touch_tip = user_variables.touchTipDistributeMix)
+
+								optimal_pipette.drop_tip()
+				elif user_variables.changeTipDistributeMix == "aspirate":
+					# If the tip is aspirate we need to calculate how many final wells we can transfer volume with 1 movement and do it until there are no more movements
+					# First, we calculate what is the max number of final wells that the combination pipette-tiprack can transfer
+					pos_max = int(max_volume_pip/program_variables.volTotal) # Maximum number of final wells the pipette can transfer to in 1 movement
+					if pos_max > 0:
+						if pos_max >= len(positions_distribute): # Check that this pos_max is not higher than the total ammount of positions we need to transfer
 							if optimal_pipette.has_tip == False:
 								check_tip_and_pick (optimal_pipette,
 													tiprack,
@@ -2233,166 +3102,154 @@ Possible ways to fix this error:
 													protocol, initial_tip = starting_tip,
 													same_tiprack = program_variables.sameTipRack,
 													replace_tiprack = user_variables.replaceTiprack)
-							
 							optimal_pipette.distribute(program_variables.volTotal,
 													   tube,
-													   positions_distribute[start_position:start_position+pos_max],
+													   positions_distribute,
 													   new_tip = "never",
 													   disposal_volume = 0,
 													   touch_tip = user_variables.touchTipDistributeMix)
-							
 							optimal_pipette.drop_tip()
+						else: # Means that more than 1 mov is needed
+							start_position = 0
+							while start_position < len(positions_distribute):
+								if optimal_pipette.has_tip == False:
+									check_tip_and_pick (optimal_pipette,
+														tiprack,
+														program_variables.deckPositions,
+														protocol, initial_tip = starting_tip,
+														same_tiprack = program_variables.sameTipRack,
+														replace_tiprack = user_variables.replaceTiprack)
+							
+								optimal_pipette.distribute(program_variables.volTotal,
+														   tube,
+														   positions_distribute[start_position:start_position+pos_max],
+														   new_tip = "never",
+														   disposal_volume = 0,
+														   touch_tip = user_variables.touchTipDistributeMix)
 							
-							start_position += pos_max
-				else: # We can not transfer with the pipette not even 1 volTotal with 1 movement, so we need to figure how many movements per final well are needed
-					# First we figure out how many movements do we need
-					min_full_movements, rest_volume = divmod(program_variables.volTotal, max_volume_pip)
-					# Now we establish the volumes of those movements making sure all of the movements can be done with this pipette
-					if rest_volume > 0 and rest_volume < optimal_pipette.min_volume: # All volume scna be transferred and the rest volume is 0
-						vol_transfer = int(min_full_movements-1)*[max_volume_pip]
-						vol_transfer += [(max_volume_pip/2)+rest_volume, max_volume_pip/2]
-					elif rest_volume == 0:
-						vol_transfer = int(min_full_movements)*[max_volume_pip]
-					else: # This means the rest_volume cannot be transferred with the pipette so we need to balance the volumes so it can be done
-						vol_transfer = int(min_full_movements)*[max_volume_pip]
-						vol_transfer.append(rest_volume)
+								optimal_pipette.drop_tip()
+							
+								start_position += pos_max
+					else: # We can not transfer with the pipette not even 1 volTotal with 1 movement, so we need to figure how many movements per final well are needed
+						# First we figure out how many movements do we need
+						min_full_movements, rest_volume = divmod(program_variables.volTotal, max_volume_pip)
+						# Now we establish the volumes of those movements making sure all of the movements can be done with this pipette
+						if rest_volume > 0 and rest_volume < optimal_pipette.min_volume: # All volume scna be transferred and the rest volume is 0
+							vol_transfer = int(min_full_movements-1)*[max_volume_pip]
+							vol_transfer += [(max_volume_pip/2)+rest_volume, max_volume_pip/2]
+						elif rest_volume == 0:
+							vol_transfer = int(min_full_movements)*[max_volume_pip]
+						else: # This means the rest_volume cannot be transferred with the pipette so we need to balance the volumes so it can be done
+							vol_transfer = int(min_full_movements)*[max_volume_pip]
+							vol_transfer.append(rest_volume)
 				
-					# Transfer the volumes changing the tip every time
-					for well_dest in positions_distribute:
-						for volumen in vol_transfer:
-							if optimal_pipette.has_tip == False:
-								check_tip_and_pick (optimal_pipette,
-													tiprack,
-													program_variables.deckPositions,
-													protocol,
-													initial_tip = starting_tip,
-													same_tiprack = program_variables.sameTipRack,
-													replace_tiprack = user_variables.replaceTiprack)
-
-							# Transfer the volumes aspirating with the proper height
-							optimal_pipette.transfer(volumen,
-													 tube,
-													 well_dest,
-													 new_tip = "never",
-													 touch_tip = user_variables.touchTipDistributeMix)
+						# Transfer the volumes changing the tip every time
+						for well_dest in positions_distribute:
+							for volumen in vol_transfer:
+								if optimal_pipette.has_tip == False:
+									check_tip_and_pick (optimal_pipette,
+														tiprack,
+														program_variables.deckPositions,
+														protocol,
+														initial_tip = starting_tip,
+														same_tiprack = program_variables.sameTipRack,
+														replace_tiprack = user_variables.replaceTiprack)
 
-							optimal_pipette.drop_tip()
-			else: # It is going to be never or tube
-				if optimal_pipette.has_tip == False:
-					check_tip_and_pick(optimal_pipette,
-									   tiprack,
-									   program_variables.deckPositions,
-									   protocol,
-									   replace_tiprack = user_variables.replaceTiprack,
-									   initial_tip = starting_tip,
-									   same_tiprack = program_variables.sameTipRack)
+								# Transfer the volumes aspirating with the proper height
+								optimal_pipette.transfer(volumen,
+														 tube,
+														 well_dest,
+														 new_tip = "never",
+														 touch_tip = user_variables.touchTipDistributeMix)
+
+								optimal_pipette.drop_tip()
+				else: # It is going to be never or tube
+					if optimal_pipette.has_tip == False:
+						check_tip_and_pick(optimal_pipette,
+										   tiprack,
+										   program_variables.deckPositions,
+										   protocol,
+										   replace_tiprack = user_variables.replaceTiprack,
+										   initial_tip = starting_tip,
+										   same_tiprack = program_variables.sameTipRack)
 				
-				optimal_pipette.distribute(float(program_variables.volTotal),
-										   tube,
-										   positions_distribute,
-										   new_tip = "never",
-										   disposal_volume = 0,
-										   touch_tip = user_variables.touchTipDistributeMix)
-
-			del wells_distribute_mix[:program_variables.mixWells["Reactions Per Tube"][index]]
-			
-			if user_variables.changeTipDistributeMix != "never" and optimal_pipette.has_tip:
+					optimal_pipette.distribute(float(program_variables.volTotal),
+											   tube,
+											   positions_distribute,
+											   new_tip = "never",
+											   disposal_volume = 0,
+											   touch_tip = user_variables.touchTipDistributeMix)
+
+				if user_variables.changeTipDistributeMix != "never" and optimal_pipette.has_tip:
+					optimal_pipette.drop_tip()
+
+			# Let's drop the tip before we transfer the dna parts
+			if optimal_pipette.has_tip:
 				optimal_pipette.drop_tip()
 
-		# Let's drop the tip before we transfer the dna parts
-		if optimal_pipette.has_tip:
-			optimal_pipette.drop_tip()
-
-	#----------------------------------------------------------------------------------------------------------------------------------------------------------------------------------------------------------------
-	# Distribute DNA parts and acceptor module to the different final wells
-	# Check the optimal pipette for acceptor and modules
-	if user_variables.acceptorVolume > 0:
-		optimal_pipette_acceptor = give_me_optimal_pipette (user_variables.acceptorVolume, program_variables.pipR, program_variables.pipL)
-		
-		if optimal_pipette_acceptor.mount == "right":
-			tiprack_acceptor = user_variables.APINameTipR
-			starting_tip_acceptor = user_variables.startingTipPipR
-			max_volume_transfer_acceptor = program_variables.volMaxPipRTiprackR
+		#----------------------------------------------------------------------------------------------------------------------------------------------------------------------------------------------------------------
+		# Distribute DNA parts and acceptor module to the different final wells
+		set_liquid_class([program_variables.pipR, program_variables.pipL], program_variables.reagentLiquidClasses["DNA Parts"], program_variables.liquidClasses, program_variables.defaultFlowRates, protocol)
+		# Check the optimal pipette for acceptor and modules
+		if user_variables.acceptorVolume > 0:
+			optimal_pipette_acceptor = give_me_optimal_pipette (user_variables.acceptorVolume, program_variables.pipR, program_variables.pipL)
+		
+			if optimal_pipette_acceptor.mount == "right":
+				tiprack_acceptor = user_variables.APINameTipR
+				starting_tip_acceptor = user_variables.startingTipPipR
+				max_volume_transfer_acceptor = program_variables.volMaxPipRTiprackR
+			else:
+				tiprack_acceptor = user_variables.APINameTipL
+				starting_tip_acceptor = user_variables.startingTipPipL
+				max_volume_transfer_acceptor = program_variables.volMaxPipLTiprackL
 		else:
-			tiprack_acceptor = user_variables.APINameTipL
-			starting_tip_acceptor = user_variables.startingTipPipL
-			max_volume_transfer_acceptor = program_variables.volMaxPipLTiprackL
-	else:
-		optimal_pipette_acceptor = None
+			optimal_pipette_acceptor = None
 
-	# Distribute the acceptors in case it is needed
-	if user_variables.acceptorVolume > 0:
-		for source_plate in program_variables.samplePlates.values():
-			for col in source_plate['Map Final Combinations Acceptor'].columns:
+		# Distribute the acceptors in case it is needed
+		if user_variables.acceptorVolume > 0:
+			for source_plate in program_variables.samplePlates.values():
+				for col in source_plate['Map Final Combinations Acceptor'].name_columns:
 				
-				# Check if the whole column is empty
-				if source_plate['Map Final Combinations Acceptor'][col].isnull().all():
-					continue
-
-				for row in source_plate['Map Final Combinations Acceptor'].index:
-					if isinstance(source_plate['Map Final Combinations Acceptor'].at[row, col], list):
-						if optimal_pipette_acceptor.has_tip == False:
-							check_tip_and_pick(optimal_pipette_acceptor,
-											   tiprack_acceptor,
-											   program_variables.deckPositions,
-											   protocol,
-											   initial_tip = starting_tip_acceptor,
-											   same_tiprack = program_variables.sameTipRack,
-											   replace_tiprack = user_variables.replaceTiprack)
-
-						final_wells = []
-						for combination_with_part in source_plate['Map Final Combinations Acceptor'].at[row, col]:
-							if user_variables.positionTransferSample == "top":
-								final_wells.append(program_variables.combinations[combination_with_part]["Position"].top())
-							elif user_variables.positionTransferSample == "center":
-								final_wells.append(program_variables.combinations[combination_with_part]["Position"].center())
-							else:
-								final_wells.append(program_variables.combinations[combination_with_part]["Position"])
-						# Now we distribute to the final wells this scpecific acceptor taking in account the new_tip argument
-						if user_variables.changeTipDistribute in ["part", "never"]:
-							optimal_pipette_acceptor.distribute(user_variables.acceptorVolume,
-																source_plate["Opentrons Place"].wells_by_name()[str(row)+str(col)],
-																final_wells,
-																new_tip = "never",
-																disposal_volume = 0,
-																touch_tip = user_variables.touchTipTransferSample)
-							
-							if user_variables.changeTipDistribute == "part":
-								optimal_pipette_acceptor.drop_tip()
-						elif user_variables.changeTipDistribute == "well" and user_variables.acceptorVolume <= max_volume_transfer_acceptor:
-							for well_dest in final_wells:
-								if optimal_pipette_acceptor.has_tip == False:
-									check_tip_and_pick(optimal_pipette_acceptor,
-													   tiprack_acceptor,
-													   program_variables.deckPositions,
-													   protocol,
-													   initial_tip = starting_tip_acceptor,
-													   same_tiprack = program_variables.sameTipRack,
-													   replace_tiprack = user_variables.replaceTiprack)
-								
-								optimal_pipette_acceptor.transfer(user_variables.acceptorVolume,
-																  source_plate["Opentrons Place"].wells_by_name()[str(row)+str(col)],
-																  well_dest,
-																  new_tip = "never",
-																  touch_tip = user_variables.touchTipTransferSample)
-								
-								optimal_pipette_acceptor.drop_tip()
-						elif user_variables.changeTipDistribute == "well" and user_variables.acceptorVolume > max_volume_transfer_acceptor:
-							# Find out the movements with the volumes that need to be done for each final_well
-							min_full_movements, rest_volume = divmod(user_variables.acceptorVolume, max_volume_transfer_acceptor)
-							if rest_volume > 0 and rest_volume < optimal_pipette_acceptor.min_volume:
-								vol_transfer = int(min_full_movements-1)*[max_volume_transfer_acceptor]
-								vol_transfer += [(max_volume_transfer_acceptor/2)+rest_volume, max_volume_transfer_acceptor/2]
-							elif rest_volume == 0:
-								vol_transfer = int(min_full_movements)*[max_volume_transfer_acceptor]
-							else: # Esto significa que el rest_volume no es 0 yt s epuede tr5ansferir con la pipeta
-								vol_transfer = int(min_full_movements)*[max_volume_transfer_acceptor]
-								vol_transfer.append(rest_volume)
+					# Check if the whole column is empty
+					if source_plate['Map Final Combinations Acceptor'].column_is_empty(col):
+						continue
+
+					for row in source_plate['Map Final Combinations Acceptor'].name_rows:
+						# Only the combinations of the batch that is being assembled receive the part
+						if source_plate['Map Final Combinations Acceptor'].get_value(row, col) == None:
+							continue
+						combinations_part = [combination for combination in source_plate['Map Final Combinations Acceptor'].get_value(row, col) if batch_final_plate == None or program_variables.combinations[combination]["Final Plate"] == batch_final_plate]
+						if len(combinations_part) > 0:
+							if optimal_pipette_acceptor.has_tip == False:
+								check_tip_and_pick(optimal_pipette_acceptor,
+												   tiprack_acceptor,
+												   program_variables.deckPositions,
+												   protocol,
+												   initial_tip = starting_tip_acceptor,
+												   same_tiprack = program_variables.sameTipRack,
+												   replace_tiprack = user_variables.replaceTiprack)
+
+							final_wells = []
+							for combination_with_part in combinations_part:
+								if user_variables.positionTransferSample == "top":
+									final_wells.append(program_variables.combinations[combination_with_part]["Position"].top())
+								elif user_variables.positionTransferSample == "center":
+									final_wells.append(program_variables.combinations[combination_with_part]["Position"].center())
+								else:
+									final_wells.append(program_variables.combinations[combination_with_part]["Position"])
+							# Now we distribute to the final wells this scpecific acceptor taking in account the new_tip argument
+							if user_variables.changeTipDistribute in ["part", "never"]:
+								optimal_pipette_acceptor.distribute(user_variables.acceptorVolume,
+																	source_plate["Accessors"]["Wells By Name"][str(row)+str(col)],
+																	final_wells,
+																	new_tip = "never",
+																	disposal_volume = 0,
+																	touch_tip = user_variables.touchTipTransferSample)
 							
-							# When need to do this all this movements for each final well
-							for well_dest in final_wells:
-								# Transfer the volume(s) el volumen
-								for volumen in vol_transfer:
+								if user_variables.changeTipDistribute == "part":
+									optimal_pipette_acceptor.drop_tip()
+							elif user_variables.changeTipDistribute == "well" and user_variables.acceptorVolume <= max_volume_transfer_acceptor:
+								for well_dest in final_wells:
 									if optimal_pipette_acceptor.has_tip == False:
 										check_tip_and_pick(optimal_pipette_acceptor,
 														   tiprack_acceptor,
@@ -2401,40 +3258,15 @@ Possible ways to fix this error:
 														   initial_tip = starting_tip_acceptor,
 														   same_tiprack = program_variables.sameTipRack,
 														   replace_tiprack = user_variables.replaceTiprack)
-									
-									# We transfer the volumes aspirating at a correct height
-									optimal_pipette_acceptor.transfer(volumen,
-																	  source_plate["Opentrons Place"].wells_by_name()[str(row)+str(col)],
+								
+									optimal_pipette_acceptor.transfer(user_variables.acceptorVolume,
+																	  source_plate["Accessors"]["Wells By Name"][str(row)+str(col)],
 																	  well_dest,
 																	  new_tip = "never",
 																	  touch_tip = user_variables.touchTipTransferSample)
 								
 									optimal_pipette_acceptor.drop_tip()
-						else: # The new_tip is going to be 'aspirate' by the controls we have done before --> This would mean that needs to have the same behaviour as if the new_tip was 'well'
-							# First, we calculate what is the max number of final wells that the combination pipette-tiprack can transfer
-							# Then, we check with the maximum of the tube and choose the lower ammount
-							pos_max_aspirate = int(max_volume_transfer_acceptor/user_variables.acceptorVolume) # Maximum number of final wells the pipette can transfer to in 1 movement
-							if pos_max_aspirate >= 1: # This means that at least 1 final well can be trasnferred with only 1 aspiration
-								group_wells_aspirate = [final_wells[i:i+pos_max_aspirate] for i in range(0, len(final_wells), pos_max_aspirate)]
-								for destination_wells in group_wells_aspirate:
-									if optimal_pipette_acceptor.has_tip == False:
-										check_tip_and_pick(optimal_pipette_acceptor,
-														tiprack_acceptor,
-														program_variables.deckPositions,
-														protocol,
-														initial_tip = starting_tip_acceptor,
-														same_tiprack = program_variables.sameTipRack,
-														replace_tiprack = user_variables.replaceTiprack)
-									
-									optimal_pipette_acceptor.distribute(user_variables.acceptorVolume,
-																		source_plate["Opentrons Place"].wells_by_name()[str(row)+str(col)],
-																		destination_wells,
-																		new_tip = "never",
-																		disposal_volume = 0,
-																		touch_tip = user_variables.touchTipTransferSample)
-									
-									optimal_pipette_acceptor.drop_tip()
-							else: # This would mean that not even 1 final well can be done with 1 aspiration
+							elif user_variables.changeTipDistribute == "well" and user_variables.acceptorVolume > max_volume_transfer_acceptor:
 								# Find out the movements with the volumes that need to be done for each final_well
 								min_full_movements, rest_volume = divmod(user_variables.acceptorVolume, max_volume_transfer_acceptor)
 								if rest_volume > 0 and rest_volume < optimal_pipette_acceptor.min_volume:
@@ -2458,110 +3290,138 @@ Possible ways to fix this error:
 															   initial_tip = starting_tip_acceptor,
 															   same_tiprack = program_variables.sameTipRack,
 															   replace_tiprack = user_variables.replaceTiprack)
-										
+									
 										# We transfer the volumes aspirating at a correct height
 										optimal_pipette_acceptor.transfer(volumen,
-																		  source_plate["Opentrons Place"].wells_by_name()[str(row)+str(col)],
+																		  source_plate["Accessors"]["Wells By Name"][str(row)+str(col)],
 																		  well_dest,
 																		  new_tip = "never",
 																		  touch_tip = user_variables.touchTipTransferSample)
+								
+										optimal_pipette_acceptor.drop_tip()
+							else: # The new_tip is going to be 'aspirate' by the controls we have done before --> This would mean that needs to have the same behaviour as if the new_tip was 'well'
+								# First, we calculate what is the max number of final wells that the combination pipette-tiprack can transfer
+								# Then, we check with the maximum of the tube and choose the lower ammount
+								pos_max_aspirate = int(max_volume_transfer_acceptor/user_variables.acceptorVolume) # Maximum number of final wells the pipette can transfer to in 1 movement
+								if pos_max_aspirate >= 1: # This means that at least 1 final well can be trasnferred with only 1 aspiration
+									group_wells_aspirate = [final_wells[i:i+pos_max_aspirate] for i in range(0, len(final_wells), pos_max_aspirate)]
+									for destination_wells in group_wells_aspirate:
+										if optimal_pipette_acceptor.has_tip == False:
+											check_tip_and_pick(optimal_pipette_acceptor,
+															tiprack_acceptor,
+															program_variables.deckPositions,
+															protocol,
+															initial_tip = starting_tip_acceptor,
+															same_tiprack = program_variables.sameTipRack,
+															replace_tiprack = user_variables.replaceTiprack)
+									
+										optimal_pipette_acceptor.distribute(user_variables.acceptorVolume,
+																			source_plate["Accessors"]["Wells By Name"][str(row)+str(col)],
+																			destination_wells,
+																			new_tip = "never",
+																			disposal_volume = 0,
+																			touch_tip = user_variables.touchTipTransferSample)
 									
 										optimal_pipette_acceptor.drop_tip()
+								else: # This would mean that not even 1 final well can be done with 1 aspiration
+									# Find out the movements with the volumes that need to be done for each final_well
+									min_full_movements, rest_volume = divmod(user_variables.acceptorVolume, max_volume_transfer_acceptor)
+									if rest_volume > 0 and rest_volume < optimal_pipette_acceptor.min_volume:
+										vol_transfer = int(min_full_movements-1)*[max_volume_transfer_acceptor]
+										vol_transfer += [(max_volume_transfer_acceptor/2)+rest_volume, max_volume_transfer_acceptor/2]
+									elif rest_volume == 0:
+										vol_transfer = int(min_full_movements)*[max_volume_transfer_acceptor]
+									else: # Esto significa que el rest_volume no es 0 yt s epuede tr5ansferir con la pipeta
+										vol_transfer = int(min_full_movements)*[max_volume_transfer_acceptor]
+										vol_transfer.append(rest_volume)
+							
+									# When need to do this all this movements for each final well
+									for well_dest in final_wells:
+										# Transfer the volume(s) el volumen
+										for volumen in vol_transfer:
+											if optimal_pipette_acceptor.has_tip == False:
+												check_tip_and_pick(optimal_pipette_acceptor,
+																   tiprack_acceptor,
+																   program_variables.deckPositions,
+																   protocol,
+																   initial_tip = starting_tip_acceptor,
+																   same_tiprack = program_variables.sameTipRack,
+																   replace_tiprack = user_variables.replaceTiprack)
+										
+											# We transfer the volumes aspirating at a correct height
+											optimal_pipette_acceptor.transfer(volumen,
+																			  source_plate["Accessors"]["Wells By Name"][str(row)+str(col)],
+																			  well_dest,
+																			  new_tip = "never",
+																			  touch_tip = user_variables.touchTipTransferSample)
+									
+											optimal_pipette_acceptor.drop_tip()
 
-	if user_variables.moduleVolume > 0:
-		optimal_pipette_module = give_me_optimal_pipette (user_variables.moduleVolume,
-														  program_variables.pipR,
-														  program_variables.pipL)
-		
-		if optimal_pipette_module.mount == "right":
-			tiprack_module = user_variables.APINameTipR
-			starting_tip_module = user_variables.startingTipPipR
-			max_volume_transfer_module = program_variables.volMaxPipRTiprackR
+		if user_variables.moduleVolume > 0:
+			optimal_pipette_module = give_me_optimal_pipette (user_variables.moduleVolume,
+															  program_variables.pipR,
+															  program_variables.pipL)
+		
+			if optimal_pipette_module.mount == "right":
+				tiprack_module = user_variables.APINameTipR
+				starting_tip_module = user_variables.startingTipPipR
+				max_volume_transfer_module = program_variables.volMaxPipRTiprackR
+			else:
+				tiprack_module = user_variables.APINameTipL
+				starting_tip_module = user_variables.startingTipPipL
+				max_volume_transfer_module = program_variables.volMaxPipLTiprackL
 		else:
-			tiprack_module = user_variables.APINameTipL
-			starting_tip_module = user_variables.startingTipPipL
-			max_volume_transfer_module = program_variables.volMaxPipLTiprackL
-	else:
-		optimal_pipette_module = None
-
-	if user_variables.acceptorVolume > 0 and (user_variables.changeTipDistribute != "never" or optimal_pipette_acceptor != optimal_pipette_module):
-		if optimal_pipette_acceptor.has_tip:
-			optimal_pipette_acceptor.drop_tip()
-
-	# Distribute the modules if necessary
-	if user_variables.moduleVolume > 0:
-		for source_plate in program_variables.samplePlates.values():
-			for col in source_plate['Map Final Combinations Module'].columns:
-				# Check if the whole column is empty
-				if source_plate['Map Final Combinations Module'][col].isnull().all():
-					continue
+			optimal_pipette_module = None
 
-				for row in source_plate['Map Final Combinations Module'].index:
-					if isinstance(source_plate['Map Final Combinations Module'].at[row, col], list):
-						if optimal_pipette_module.has_tip == False:
-							check_tip_and_pick(optimal_pipette_module,
-											   tiprack_module,
-											   program_variables.deckPositions,
-											   protocol,
-											   initial_tip = starting_tip_module,
-											   same_tiprack = program_variables.sameTipRack,
-											   replace_tiprack = user_variables.replaceTiprack)
-
-						final_wells = []
-						for combination_with_part in source_plate['Map Final Combinations Module'].at[row, col]:
-							if user_variables.positionTransferSample == "top":
-								final_wells.append(program_variables.combinations[combination_with_part]["Position"].top())
-							elif user_variables.positionTransferSample == "center":
-								final_wells.append(program_variables.combinations[combination_with_part]["Position"].center())
-							else:
-								final_wells.append(program_variables.combinations[combination_with_part]["Position"])
+		if user_variables.acceptorVolume > 0 and (user_variables.changeTipDistribute != "never" or optimal_pipette_acceptor != optimal_pipette_module):
+			if optimal_pipette_acceptor.has_tip:
+				optimal_pipette_acceptor.drop_tip()
+
+		# Distribute the modules if necessary
+		if user_variables.moduleVolume > 0:
+			for source_plate in program_variables.samplePlates.values():
+				for col in source_plate['Map Final Combinations Module'].name_columns:
+					# Check if the whole column is empty
+					if source_plate['Map Final Combinations Module'].column_is_empty(col):
+						continue
+
+					for row in source_plate['Map Final Combinations Module'].name_rows:
+						# Only the combinations of the batch that is being assembled receive the part
+						if source_plate['Map Final Combinations Module'].get_value(row, col) == None:
+							continue
+						combinations_part = [combination for combination in source_plate['Map Final Combinations Module'].get_value(row, col) if batch_final_plate == None or program_variables.combinations[combination]["Final Plate"] == batch_final_plate]
+						if len(combinations_part) > 0:
+							if optimal_pipette_module.has_tip == False:
+								check_tip_and_pick(optimal_pipette_module,
+												   tiprack_module,
+												   program_variables.deckPositions,
+												   protocol,
+												   initial_tip = starting_tip_module,
+												   same_tiprack = program_variables.sameTipRack,
+												   replace_tiprack = user_variables.replaceTiprack)
+
+							final_wells = []
+							for combination_with_part in combinations_part:
+								if user_variables.positionTransferSample == "top":
+									final_wells.append(program_variables.combinations[combination_with_part]["Position"].top())
+								elif user_variables.positionTransferSample == "center":
+									final_wells.append(program_variables.combinations[combination_with_part]["Position"].center())
+								else:
+									final_wells.append(program_variables.combinations[combination_with_part]["Position"])
 						
-						# Now we distribute to the final wells this scpecific module taking in account the new_tip argument
-						if user_variables.changeTipDistribute in ["part", "never"]:
-							optimal_pipette_module.distribute(user_variables.moduleVolume,
-															  source_plate["Opentrons Place"].wells_by_name()[str(row)+str(col)],
-															  final_wells,
-															  new_tip = "never",
-															  disposal_volume = 0,
-															  touch_tip = user_variables.touchTipTransferSample)
-							
-							if user_variables.changeTipDistribute == "part":
-								optimal_pipette_module.drop_tip()
-						elif user_variables.changeTipDistribute == "well" and user_variables.moduleVolume <= max_volume_transfer_module:
-							for well_dest in final_wells:
-								if optimal_pipette_module.has_tip == False:
-									check_tip_and_pick(optimal_pipette_module,
-													   tiprack_module,
-													   program_variables.deckPositions,
-													   protocol,
-													   initial_tip = starting_tip_module,
-													   same_tiprack = program_variables.sameTipRack,
-													   replace_tiprack = user_variables.replaceTiprack)
-								
-								optimal_pipette_module.transfer(user_variables.moduleVolume,
-																source_plate["Opentrons Place"].wells_by_name()[str(row)+str(col)],
-																well_dest,
-																new_tip = "never",
-																touch_tip = user_variables.touchTipTransferSample)
-								
-								optimal_pipette_module.drop_tip()
-						elif user_variables.changeTipDistribute == "well" and user_variables.moduleVolume > max_volume_transfer_module:
-							# Find out the movements with the volumes that need to be done for each final_well
-							min_full_movements, rest_volume = divmod(user_variables.moduleVolume, max_volume_transfer_module)
-
-							if rest_volume > 0 and rest_volume < optimal_pipette_module.min_volume:
-								vol_transfer = int(min_full_movements-1)*[max_volume_transfer_module]
-								vol_transfer += [(max_volume_transfer_module/2)+rest_volume, max_volume_transfer_module/2]
-							elif rest_volume == 0:
-								vol_transfer = int(min_full_movements)*[max_volume_transfer_module]
-							else: # Esto significa que el rest_volume no es 0 yt s epuede tr5ansferir con la pipeta
-								vol_transfer = int(min_full_movements)*[max_volume_transfer_module]
-								vol_transfer.append(rest_volume)
+							# Now we distribute to the final wells this scpecific module taking in account the new_tip argument
+							if user_variables.changeTipDistribute in ["part", "never"]:
+								optimal_pipette_module.distribute(user_variables.moduleVolume,
+																  source_plate["Accessors"]["Wells By Name"][str(row)+str(col)],
+																  final_wells,
+																  new_tip = "never",
+																  disposal_volume = 0,
+																  touch_tip = user_variables.touchTipTransferSample)
 							
-							# When need to do this all this movements for each final well
-							for well_dest in final_wells:
-								# Transfer the volume(s) el volumen
-								for volumen in vol_transfer:
+								if user_variables.changeTipDistribute == "part":
+									optimal_pipette_module.drop_tip()
+							elif user_variables.changeTipDistribute == "well" and user_variables.moduleVolume <= max_volume_transfer_module:
+								for well_dest in final_wells:
 									if optimal_pipette_module.has_tip == False:
 										check_tip_and_pick(optimal_pipette_module,
 														   tiprack_module,
@@ -2570,44 +3430,18 @@ Possible ways to fix this error:
 														   initial_tip = starting_tip_module,
 														   same_tiprack = program_variables.sameTipRack,
 														   replace_tiprack = user_variables.replaceTiprack)
-									
-									# We transfer the volumes aspirating at a correct height
-									optimal_pipette_module.transfer(volumen,
-																	source_plate["Opentrons Place"].wells_by_name()[str(row)+str(col)],
+								
+									optimal_pipette_module.transfer(user_variables.moduleVolume,
+																	source_plate["Accessors"]["Wells By Name"][str(row)+str(col)],
 																	well_dest,
 																	new_tip = "never",
 																	touch_tip = user_variables.touchTipTransferSample)
 								
 									optimal_pipette_module.drop_tip()
-						else: # The new_tip is going to be 'aspirate' by the controls we have done before
-							# First, we calculate what is the max number of final wells that the combination pipette-tiprack can transfer
-							# Then, we check with the maximum of the tube and choose the lower ammount
-							pos_max_aspirate = int(max_volume_transfer_module/user_variables.moduleVolume) # Maximum number of final wells the pipette can transfer to in 1 movement
-							if pos_max_aspirate >= 1: # This means that at least 1 final well can be transferred with only 1 aspiration
-								group_wells_aspirate = [final_wells[i:i+pos_max_aspirate] for i in range(0, len(final_wells), pos_max_aspirate)]
-								for destination_wells in group_wells_aspirate:
-									
-									if optimal_pipette_module.has_tip == False:
-										check_tip_and_pick(optimal_pipette_module,
-														   tiprack_module,
-														   program_variables.deckPositions,
-														   protocol,
-														   initial_tip = starting_tip_module,
-														   same_tiprack = program_variables.sameTipRack,
-														   replace_tiprack = user_variables.replaceTiprack)
-									
-									optimal_pipette_module.distribute(user_variables.moduleVolume,
-																	  source_plate["Opentrons Place"].wells_by_name()[str(row)+str(col)],
-																	  destination_wells,
-																	  new_tip = "never",
-																	  disposal_volume = 0,
-																	  touch_tip = user_variables.touchTipTransferSample)
-									
-									optimal_pipette_module.drop_tip()
-							else: # This would mean that not even 1 final well can be done with 1 aspiration
+							elif user_variables.changeTipDistribute == "well" and user_variables.moduleVolume > max_volume_transfer_module:
 								# Find out the movements with the volumes that need to be done for each final_well
 								min_full_movements, rest_volume = divmod(user_variables.moduleVolume, max_volume_transfer_module)
-								
+
 								if rest_volume > 0 and rest_volume < optimal_pipette_module.min_volume:
 									vol_transfer = int(min_full_movements-1)*[max_volume_transfer_module]
 									vol_transfer += [(max_volume_transfer_module/2)+rest_volume, max_volume_transfer_module/2]
@@ -2629,38 +3463,93 @@ Possible ways to fix this error:
 															   initial_tip = starting_tip_module,
 															   same_tiprack = program_variables.sameTipRack,
 															   replace_tiprack = user_variables.replaceTiprack)
-										
+									
 										# We transfer the volumes aspirating at a correct height
 										optimal_pipette_module.transfer(volumen,
-																		source_plate["Opentrons Place"].wells_by_name()[str(row)+str(col)],
+																		source_plate["Accessors"]["Wells By Name"][str(row)+str(col)],
 																		well_dest,
 																		new_tip = "never",
 																		touch_tip = user_variables.touchTipTransferSample)
-										
+								
 										optimal_pipette_module.drop_tip()
-
-	# Export map(s) in an excel
-	writer = pd.ExcelWriter(f'/data/user_storage/{user_variables.finalMapName}.xlsx', engine='openpyxl')
-	# writer = pd.ExcelWriter(f'{user_variables.finalMapName}.xlsx', engine='openpyxl')
-	
-	for final_plate in program_variables.finalPlates.values():
-		final_plate["Map Combinations"].map.to_excel(writer, sheet_name = f"CombinationsSlot{final_plate['Position']}")
-	
-	writer.save()
-	
-	# Perform PCR profile
-	if user_variables.presenceTermo:
-		if user_variables.pause:
-			protocol.pause("Protocol is pause so plate in thermocyler can be mixed and/or user can put caps on it")
-		
-		program_variables.tc_mod.close_lid()
-		run_program_thermocycler(program_variables.tc_mod,
-								 user_variables.temperatureProfile,
-								 user_variables.temperatureLid,
-								 user_variables.finalVolume,
-								 protocol,
-								 final_lid_state = user_variables.finalStateLid,
-								 final_block_state = user_variables.finalTemperatureBlock)
+							else: # The new_tip is going to be 'aspirate' by the controls we have done before
+								# First, we calculate what is the max number of final wells that the combination pipette-tiprack can transfer
+								# Then, we check with the maximum of the tube and choose the lower ammount
+								pos_max_aspirate = int(max_volume_transfer_module/user_variables.moduleVolume) # Maximum number of final wells the pipette can transfer to in 1 movement
+								if pos_max_aspirate >= 1: # This means that at least 1 final well can be transferred with only 1 aspiration
+									group_wells_aspirate = [final_wells[i:i+pos_max_aspirate] for i in range(0, len(final_wells), pos_max_aspirate)]
+									for destination_wells in group_wells_aspirate:
+									
+										if optimal_pipette_module.has_tip == False:
+											check_tip_and_pick(optimal_pipette_module,
+															   tiprack_module,
+															   program_variables.deckPositions,
+															   protocol,
+															   initial_tip = starting_tip_module,
+															   same_tiprack = program_variables.sameTipRack,
+															   replace_tiprack = user_variables.replaceTiprack)
+									
+										optimal_pipette_module.distribute(user_variables.moduleVolume,
+																		  source_plate["Accessors"]["Wells By Name"][str(row)+str(col)],
+																		  destination_wells,
+																		  new_tip = "never",
+																		  disposal_volume = 0,
+																		  touch_tip = user_variables.touchTipTransferSample)
+									
+										optimal_pipette_module.drop_tip()
+								else: # This would mean that not even 1 final well can be done with 1 aspiration
+									# Find out the movements with the volumes that need to be done for each final_well
+									min_full_movements, rest_volume = divmod(user_variables.moduleVolume, max_volume_transfer_module)
+								
+									if rest_volume > 0 and rest_volume < optimal_pipette_module.min_volume:
+										vol_transfer = int(min_full_movements-1)*[max_volume_transfer_module]
+										vol_transfer += [(max_volume_transfer_module/2)+rest_volume, max_volume_transfer_module/2]
+									elif rest_volume == 0:
+										vol_transfer = int(min_full_movements)*[max_volume_transfer_module]
+									else: # Esto significa que el rest_volume no es 0 yt s epuede tr5ansferir con la pipeta
+										vol_transfer = int(min_full_movements)*[max_volume_transfer_module]
+										vol_transfer.append(rest_volume)
+							
+									# When need to do this all this movements for each final well
+									for well_dest in final_wells:
+										# Transfer the volume(s) el volumen
+										for volumen in vol_transfer:
+											if optimal_pipette_module.has_tip == False:
+												check_tip_and_pick(optimal_pipette_module,
+																   tiprack_module,
+																   program_variables.deckPositions,
+																   protocol,
+																   initial_tip = starting_tip_module,
+																   same_tiprack = program_variables.sameTipRack,
+																   replace_tiprack = user_variables.replaceTiprack)
+										
+											# We transfer the volumes aspirating at a correct height
+											optimal_pipette_module.transfer(volumen,
+																			source_plate["Accessors"]["Wells By Name"][str(row)+str(col)],
+																			well_dest,
+																			new_tip = "never",
+																			touch_tip = user_variables.touchTipTransferSample)
+										
+											optimal_pipette_module.drop_tip()
+		
+		# Perform PCR profile
+		if user_variables.presenceTermo:
+			if index_batch == 0:
+				if user_variables.pause:
+					protocol.pause("Protocol is pause so plate in thermocyler can be mixed and/or user can put caps on it")
+			else:
+				# The lid needs to be open to swap the plates
+				program_variables.tc_mod.open_lid()
+				protocol.pause(f"Batch {index_batch+1} has been assembled in the plate of the slot {program_variables.finalPlates[batch_final_plate]['Position']}. Take out the plate of the thermocycler (batch {index_batch}), which has finished its temperature profile, and put in it the plate of batch {index_batch+1}, it can be mixed and/or capped before resuming")
+			
+			program_variables.tc_mod.close_lid()
+			run_program_thermocycler(program_variables.tc_mod,
+									 user_variables.temperatureProfile,
+									 user_variables.temperatureLid,
+									 user_variables.finalVolume,
+									 protocol,
+									 final_lid_state = user_variables.finalStateLid,
+									 final_block_state = user_variables.finalTemperatureBlock)
 	
 	# Final home
 	protocol.home()
\ No newline at end of file
@@ -16,10 +16,14 @@
 
 ## Packages needed for the running of the protocol
 import opentrons
+import re
 import pandas as pd
 import math
 import random
 import numpy as np
+import csv
+from types import MappingProxyType
+from openpyxl import Workbook
 from opentrons.motion_planning.deck_conflict import DeckConflictError
 from opentrons.protocol_api.labware import OutOfTipsError
 
@@ -37,6 +41,11 @@ class UserVariables:
 		self.firstWellSamplePerPlate = list(each_plate[each_plate["Variable Names"] == "First Well Consider Take"].values[0][1:])
 		self.volumesSamplesPerPlate = list(each_plate[each_plate["Variable Names"] == "Volume Transfer Sample (uL)"].values[0][1:])
 		self.finalMapName = general[general["Variable Names"] == "Name File Final Map"]["Value"].values[0]
+		# Optional variable, files without this row will export the final maps only as an excel file
+		if "Format Final Maps" in general["Variable Names"].values:
+			self.formatsFinalMaps = general[general["Variable Names"] == "Format Final Maps"]["Value"].values[0]
+		else:
+			self.formatsFinalMaps = np.nan
 		self.wellStartFinalPlate = general[general["Variable Names"] == "Well Start Final Plate"]["Value"].values[0]
 		self.volumeReactive = general[general["Variable Names"] == "Volume Reactive Transfer (uL)"]["Value"].values[0]
 		self.APINameSamplePlate = general[general["Variable Names"] == "API Name Source Plate"]["Value"].values[0]
@@ -59,6 +68,12 @@ class UserVariables:
 		self.numberSamplesTake = list(each_plate[each_plate["Variable Names"] == "Number Samples Pick"].values[0][1:])
 		self.sampleSelection = list(each_plate[each_plate["Variable Names"] == "Type of Sample Selection"].values[0][1:])
 		
+		# Optional variable, if a plate has a selection expression it is used instead of the type of selection and the number of samples to pick
+		if "Selection Expression" in each_plate["Variable Names"].values:
+			self.selectionExpression = list(each_plate[each_plate["Variable Names"] == "Selection Expression"].values[0][1:])
+		else:
+			self.selectionExpression = [np.nan]*len(self.sampleSelection)
+		
 		self.nameSourcePlates = list(each_plate.columns)
 		self.nameSourcePlates.remove("Variable Names")
 		
@@ -75,6 +90,14 @@ class UserVariables:
 		# Check is that the minimum variables are present
 		if pd.isna([self.finalMapName, self.wellStartFinalPlate, self.APINameSamplePlate, self.APINameFinalPlate]).any():
 			raise Exception("Only the variable 'Volume Reactive Transfer (uL)' and 'API Name Rack Falcon Reactives' can be empty in the Sheet 'GeneralVariables'")
+		
+		# The final maps are exported by default only as an excel file
+		if pd.isna(self.formatsFinalMaps):
+			self.formatsFinalMaps = ["xlsx"]
+		else:
+			self.formatsFinalMaps = str(self.formatsFinalMaps).replace(" ","").lower().split(",")
+			if any(format_map not in ["xlsx", "csv", "tsv", "long"] for format_map in self.formatsFinalMaps):
+				raise Exception("The variable 'Format Final Maps' can only have the formats 'xlsx', 'csv', 'tsv' and 'long' separated by commas")
 
 		if (pd.isna(self.volumeReactive) == False and self.volumeReactive > 0) and pd.isna(self.APINameFalconPlate):
 			raise Exception("If the variable 'Volume Reactive Transfer (uL)' has a value, the variable 'API Name Rack Falcon Reactives' needs a value as well")
@@ -177,14 +200,18 @@ class UserVariables:
 		if any(pd.isna(elem) == True for elem in self.nameSheetNameSamples[:self.numberSourcePlates]) or any(pd.isna(elem) == False for elem in self.nameSheetNameSamples[self.numberSourcePlates:]):
 			raise Exception("The values of 'Name Sheet Map Identifiers' need to be as many as the 'Number of Source Plates' and be in consecutive columns")
 		
-		if any(pd.isna(elem) == True for elem in self.sampleSelection[:self.numberSourcePlates]) or any(pd.isna(elem) == False for elem in self.sampleSelection[self.numberSourcePlates:]):
-			raise Exception("The values of 'Type of Sample Selection' need to be as many as the 'Number of Source Plates' and be in consecutive columns")
+		if any(pd.isna(elem) == False for elem in self.selectionExpression[self.numberSourcePlates:]):
+			raise Exception("The values of 'Selection Expression' cannot be more than the 'Number of Source Plates'")
+		
+		# The type of selection and the number of samples are only needed in the plates that do not have a selection expression
+		if any(pd.isna(elem) == True and pd.isna(expression) == True for elem, expression in zip(self.sampleSelection[:self.numberSourcePlates], self.selectionExpression[:self.numberSourcePlates])) or any(pd.isna(elem) == False for elem in self.sampleSelection[self.numberSourcePlates:]):
+			raise Exception("The values of 'Type of Sample Selection' need to be as many as the 'Number of Source Plates' that do not have a 'Selection Expression' and be in consecutive columns")
 		
 		if any(pd.isna(elem) == True for elem in self.firstWellSamplePerPlate[:self.numberSourcePlates]) or any(pd.isna(elem) == False for elem in self.firstWellSamplePerPlate[self.numberSourcePlates:]):
 			raise Exception("The values of 'First Well Consider Take' need to be as many as the 'Number of Source Plates' and be in consecutive columns")
 		
-		if any(pd.isna(elem) == True for elem in self.numberSamplesTake[:self.numberSourcePlates]) or any(pd.isna(elem) == False for elem in self.numberSamplesTake[self.numberSourcePlates:]):
-			raise Exception("The values of 'Number Samples Pick' need to be as many as the 'Number of Source Plates' and be in consecutive columns")
+		if any(pd.isna(elem) == True and pd.isna(expression) == True for elem, expression in zip(self.numberSamplesTake[:self.numberSourcePlates], self.selectionExpression[:self.numberSourcePlates])) or any(pd.isna(elem) == False for elem in self.numberSamplesTake[self.numberSourcePlates:]):
+			raise Exception("The values of 'Number Samples Pick' need to be as many as the 'Number of Source Plates' that do not have a 'Selection Expression' and be in consecutive columns")
 		
 		if any(pd.isna(elem) == True for elem in self.volumeSample[:self.numberSourcePlates]) or any(pd.isna(elem) == False for elem in self.volumeSample[self.numberSourcePlates:]):
 			raise Exception("The values of 'Volume Transfer Sample (uL)' need to be as many as the 'Number of Source Plates' and be in consecutive columns")
@@ -192,7 +219,7 @@ class UserVariables:
 			raise Exception("No volume of 'Volume Transfer Sample (uL)' cannot be equal or lower to 0")
 		
 		# Check if the type of selection variable is one of the established ones
-		if any(type_selection.lower() not in ["random", "first", "last"] for type_selection in self.sampleSelection[:self.numberSourcePlates]):
+		if any(type_selection.lower() not in ["random", "first", "last"] for type_selection, expression in zip(self.sampleSelection[:self.numberSourcePlates], self.selectionExpression[:self.numberSourcePlates]) if pd.isna(expression)):
 			raise Exception("One of the 'Type of Sample Selection' not recognised as a valid option. Options are 'random', 'first' and 'last'")
 			
 		# Check if the number of elements in samples per plate is the same as number of source plates, because if we are not going to take from it, it doesnt make sense to have it in the deck
@@ -221,8 +248,8 @@ class UserVariables:
 				raise Exception (f"The 'Volume Transfer Sample (uL)' of Plate {index_plate+1} + the 'Volume Reactive Transfer (uL)' is greater than the max volume of the final plate")
 		
 		for index_plate, first_well in enumerate(self.firstWellSamplePerPlate[:self.numberSourcePlates]):
-			# Check the first well + number samples to take is not > number wells
-			if (definition_source_plate["groups"][0]["wells"].index(first_well) + self.numberSamplesTake[index_plate] > len(definition_source_plate["wells"])):
+			# Check the first well + number samples to take is not > number wells, with a selection expression the number of samples is the one of the selected wells
+			if pd.isna(self.selectionExpression[index_plate]) and (definition_source_plate["groups"][0]["wells"].index(first_well) + self.numberSamplesTake[index_plate] > len(definition_source_plate["wells"])):
 				raise Exception(f"Plate {index_plate + 1} cannot start with {first_well} and take {self.numberSamplesTake[index_plate]} samples")
 		
 		# Check the provided map sheets exist
@@ -237,6 +264,25 @@ class UserVariables:
 			if map_names.shape[0] != len(definition_source_plate["ordering"][0]) or map_names.shape[1] != len(definition_source_plate["ordering"]):
 				raise Exception(f"The Sheet '{map_name}' needs to have the same columns and rows as the labware '{self.APINameSamplePlate}'. If there is no part in a position, leave cell empty.\nThe name of the rows and columns should be included in the sheet.")
 		
+		# Check the selection expressions and the sheets of the maps of values that they use
+		for index_plate, expression in enumerate(self.selectionExpression[:self.numberSourcePlates]):
+			if pd.isna(expression):
+				continue
+			self.selectionExpression[index_plate] = parse_selection_expression(expression)
+			
+			for map_name in self.selectionExpression[index_plate]["Maps"]:
+				try:
+					map_values = pd.read_excel("/data/user_storage/VariablesMergeSamples.xlsx", engine = "openpyxl", sheet_name = map_name, index_col=0)
+					# map_values = pd.read_excel("VariablesMergeSamples.xlsx", engine = "openpyxl", sheet_name = map_name, index_col=0)
+				except ValueError: # Error that appears when the sheet 'map_name' does not exist in the excel file
+					raise Exception(f"Sheet name of the Map {map_name} used in the 'Selection Expression' of '{self.nameSourcePlates[index_plate]}' does not exist in the excel")
+				
+				if map_values.shape[0] != len(definition_source_plate["ordering"][0]) or map_values.shape[1] != len(definition_source_plate["ordering"]):
+					raise Exception(f"The Sheet '{map_name}' needs to have the same columns and rows as the labware '{self.APINameSamplePlate}'. If there is no value in a position, leave cell empty.\nThe name of the rows and columns should be included in the sheet.")
+				
+				if not pd.api.types.is_numeric_dtype(map_values.to_numpy()):
+					raise Exception(f"The Sheet '{map_name}' used in the 'Selection Expression' of '{self.nameSourcePlates[index_plate]}' has a value that is not a number")
+		
 		return
 
 class SettedParameters:
@@ -257,6 +303,7 @@ class SettedParameters:
 		self.liquid_samples = None # Initial
 		self.liquid_reactive = None # Initial
 		self.sameTipRack = None
+		self.wavesSourcePlates = None
 		
 		return
 	
@@ -290,9 +337,46 @@ class SettedParameters:
 		else:
 			self.sameTipRack = False
 
+		# Source Plates Definition
+		definition_source_plate = opentrons.protocol_api.labware.get_labware_definition(user_variables.APINameSamplePlate)
+		for index_plate in range(user_variables.numberSourcePlates):
+			self.samplePlates[index_plate] = {"Number Samples Transfer":user_variables.numberSamplesTake[index_plate],
+											  "Position":None,
+											  "Label":f"Source Plate '{user_variables.nameSourcePlates[index_plate]}'",
+											  "Opentrons Place":None,
+											  "First Well Name":user_variables.firstWellSamplePerPlate[index_plate],
+											  "Index First Well Sample": definition_source_plate["groups"][0]["wells"].index(user_variables.firstWellSamplePerPlate[index_plate]),
+											  "Map Identities": pd.read_excel("/data/user_storage/VariablesMergeSamples.xlsx", sheet_name = user_variables.nameSheetNameSamples[index_plate], engine = "openpyxl", index_col=0),
+											#   "Map Identities": pd.read_excel("VariablesMergeSamples.xlsx", sheet_name = user_variables.nameSheetNameSamples[index_plate], engine = "openpyxl", index_col = 0),
+											  "Selected Samples": [], # When we define the labware we will fill this value
+											  "Type Selection": None,
+											  "Selection Expression": None,
+											  "Volume Sample Transfer":user_variables.volumeSample[index_plate]}
+			
+			if pd.isna(user_variables.selectionExpression[index_plate]):
+				self.samplePlates[index_plate]["Type Selection"] = user_variables.sampleSelection[index_plate].lower()
+			else:
+				# With a selection expression the selected wells are found now as [index row, index column] and they are converted to wells when the labware is loaded
+				self.samplePlates[index_plate]["Selection Expression"] = user_variables.selectionExpression[index_plate]
+				maps_values = {}
+				for map_name in user_variables.selectionExpression[index_plate]["Maps"]:
+					maps_values[map_name] = pd.read_excel("/data/user_storage/VariablesMergeSamples.xlsx", sheet_name = map_name, engine = "openpyxl", index_col = 0)
+					# maps_values[map_name] = pd.read_excel("VariablesMergeSamples.xlsx", sheet_name = map_name, engine = "openpyxl", index_col = 0)
+				
+				# Only the wells with an identifier from the first well to consider can be selected, the index of the wells goes column by column as the labware
+				number_rows = len(definition_source_plate["ordering"][0])
+				number_columns = len(definition_source_plate["ordering"])
+				index_wells = np.arange(number_rows*number_columns).reshape(number_columns, number_rows).T
+				wells_available = self.samplePlates[index_plate]["Map Identities"].notnull().to_numpy() & (index_wells >= self.samplePlates[index_plate]["Index First Well Sample"])
+				
+				self.samplePlates[index_plate]["Selected Samples"] = selection_expression_wells(user_variables.selectionExpression[index_plate], maps_values, wells_available = wells_available)
+				if len(self.samplePlates[index_plate]["Selected Samples"]) == 0:
+					raise Exception(f"The Source Plate '{user_variables.nameSourcePlates[index_plate]}' does not have any sample that fulfills its 'Selection Expression'")
+				self.samplePlates[index_plate]["Number Samples Transfer"] = len(self.samplePlates[index_plate]["Selected Samples"])
+		
 		# Reactive Variables, if needed
 		# First we find out how many samples are needed to establish that number for taht reactive if it is needed
-		self.sumSamples = sum(user_variables.numberSamplesTake[:user_variables.numberSourcePlates])
+		self.sumSamples = sum(source_plate["Number Samples Transfer"] for source_plate in self.samplePlates.values())
 		
 		# Now we establish the color and the information for it if reactive is going to be transferred
 		if pd.isna(user_variables.volumeReactive) == False or user_variables.volumeReactive != 0:
@@ -314,43 +398,50 @@ class SettedParameters:
 											"Position":None,
 											"Label":f"Selected Samples ({index_plate+1})",
 											"Opentrons Place":None,
-											"Map Selected Samples":None # We will create this map when we establish the final plate
+											"Map Selected Samples":None, # We will create this map when we establish the final plate
+											"Map Volumes":None # Volume of sample transferred to every well, exported with the map
 											}
 		
-		# Source Plates Definition
-		for index_plate in range(user_variables.numberSourcePlates):
-			self.samplePlates[index_plate] = {"Number Samples Transfer":user_variables.numberSamplesTake[index_plate],
-											  "Position":None,
-											  "Label":f"Source Plate '{user_variables.nameSourcePlates[index_plate]}'",
-											  "Opentrons Place":None,
-											  "First Well Name":user_variables.firstWellSamplePerPlate[index_plate],
-											  "Index First Well Sample": opentrons.protocol_api.labware.get_labware_definition(user_variables.APINameSamplePlate)["groups"][0]["wells"].index(user_variables.firstWellSamplePerPlate[index_plate]),
-											  "Map Identities": pd.read_excel("/data/user_storage/VariablesMergeSamples.xlsx", sheet_name = user_variables.nameSheetNameSamples[index_plate], engine = "openpyxl", index_col=0),
-											#   "Map Identities": pd.read_excel("VariablesMergeSamples.xlsx", sheet_name = user_variables.nameSheetNameSamples[index_plate], engine = "openpyxl", index_col = 0),
-											  "Selected Samples": [], # When we define the labware we will fill this value
-											  "Type Selection": user_variables.sampleSelection[index_plate].lower(),
-											  "Volume Sample Transfer":user_variables.volumeSample[index_plate]}
-		
 		return
 	
-class MapLabware:
-
+class PlateGrid:
 	"""
-	Class that will create and store the layout of the final plates so they can be exported at the end
-	for the user
+	Class that will store a value for every well of a plate in an array with the shape of the plate instead of in a DataFrame, which is only created
+	when the map is exported, so setting the values of the wells during the protocol does not have the overhead of pandas
+
+	There are 2 kinds of grids:
+		- numeric: the values are numbers stored in a float array, empty wells are 0
+		- names: the array has a reference to the value of each well, empty wells are None
 	"""
+	__slots__ = ("index_rows", "index_columns", "kind", "grid")
 
-	def __init__(self, labware):
-		self.name_rows = list(labware.rows_by_name().keys())
-		self.name_columns = list(labware.columns_by_name().keys())
-		number_rows = len(self.name_rows)
-		number_columns = len(self.name_columns)
-		
-		self.map = pd.DataFrame(np.full((number_rows,number_columns),None), columns = self.name_columns, index = self.name_rows)
-		self.map.index.name = "Row/Column"
+	def __init__(self, name_rows, name_columns, kind = "names"):
+		if kind not in ["numeric", "names"]:
+			raise Exception(f"The kind of PlateGrid '{kind}' is not contemplated, only 'numeric' and 'names' are")
+
+		self.index_rows = {name_row:index_row for index_row, name_row in enumerate(name_rows)}
+		self.index_columns = {str(name_column):index_column for index_column, name_column in enumerate(name_columns)}
+		self.kind = kind
+
+		if kind == "numeric":
+			self.grid = np.zeros((len(self.index_rows), len(self.index_columns)), dtype = float)
+		else:
+			self.grid = np.full((len(self.index_rows), len(self.index_columns)), None, dtype = object)
 
 	def assign_value(self, value, row, column):
-		self.map.loc[row, column] = value
+		self.grid[self.index_rows[row], self.index_columns[str(column)]] = value
+
+	def assign_values(self, values, rows, columns):
+		# Assign at once the values to the cells (rows[i], columns[i]), if only 1 value is given it is assigned to all the cells
+		positions_rows = [self.index_rows[row] for row in rows]
+		positions_columns = [self.index_columns[str(column)] for column in columns]
+		self.grid[positions_rows, positions_columns] = values
+
+	def to_dataframe(self):
+		# The DataFrame is only created to export the map, with the same format that the maps had
+		map_plate = pd.DataFrame(self.grid, columns = list(self.index_columns.keys()), index = list(self.index_rows.keys()))
+		map_plate.index.name = "Row/Column"
+		return map_plate
 
 class NotSuitablePipette(Exception):
 	"Custom Error raised when there is no pipette that can transfer the volume"
@@ -410,6 +501,30 @@ def setting_labware (number_labware, labware_name, positions, protocol, module =
 
 	return all_plates
 
+def plate_swap_waves (number_plates, positions_free, number_positions_reserved = 0):
+	"""
+	Function that will split the plates that need to be in the deck in waves that fit in the free positions of the deck,
+	leaving some of these positions free for labware that is loaded later, for example, the tip racks
+
+	All the waves use the same positions, so between waves the plates of one wave are swapped by the ones of the next wave
+	Each wave is a dictionary with the positions as keys and the index of the plate that is placed in each of them as values
+
+	2 mandatory arguments and 1 optional are needed for this function
+	"""
+	# Positions that the plates can use in every wave
+	positions_plates = list(positions_free)[:len(positions_free)-number_positions_reserved]
+
+	if number_plates > 0 and len(positions_plates) == 0:
+		raise Exception(f"There is not enough space in the deck for the plates, there are {len(positions_free)} free positions and {number_positions_reserved} of them are needed for other labware")
+
+	# Fill the positions with consecutive plates, the last wave can have less plates than positions
+	waves = []
+	for index_first_plate in range(0, number_plates, max(len(positions_plates), 1)):
+		plates_wave = range(index_first_plate, min(index_first_plate+len(positions_plates), number_plates))
+		waves.append(dict(zip(positions_plates, plates_wave)))
+
+	return waves
+
 def number_tubes_needed (vol_reactive_per_reaction_factor, number_reactions, vol_max_tube):
 	"""
 	Function that will return the number of tubes that is needed for a given number of reactions
@@ -443,6 +558,100 @@ def number_tubes_needed (vol_reactive_per_reaction_factor, number_reactions, vol
 	# When the volume can fit every tube (exit from the while loop) we return the number of tubes and the reactions that will fit in every tube
 	return (number_tubes, reactions_per_tube, volumes_tubes)
 
+def labware_accessors (labware):
+	"""
+	Function that will build, once the labware is loaded, the tables of its wells so they do not need to be generated again every time
+	that a well, a column or a row is needed, as it happens with the methods wells(), columns(), rows() and wells_by_name() of the labware
+
+	The tables are immutable: the wells, columns and rows are tuples (in the same order as the labware returns them) and
+	the tables by name are read-only dictionaries, so they can be shared by all the parts of the script without being modified by mistake
+
+	1 mandatory argument is needed for this function
+	"""
+	return MappingProxyType({"Wells":tuple(labware.wells()),
+							 "Columns":tuple(tuple(column) for column in labware.columns()),
+							 "Rows":tuple(tuple(row) for row in labware.rows()),
+							 "Wells By Name":MappingProxyType(dict(labware.wells_by_name())),
+							 "Columns By Name":MappingProxyType({name_column:tuple(column) for name_column, column in labware.columns_by_name().items()}),
+							 "Rows By Name":MappingProxyType({name_row:tuple(row) for name_row, row in labware.rows_by_name().items()})})
+
+def export_maps (maps, path_export, formats = ["xlsx"], name_values = "Sample", extra_columns = None, other_tables = None):
+	"""
+	Function that will export at once all the maps of the plates, DataFrames with the names of the rows and columns of the plate as index and columns,
+	in the given formats, so every map is read only once independently of the number of formats
+
+	The formats that can be given are:
+		- xlsx: 1 excel file with a sheet per map and per other table, written row by row with the write-only mode of openpyxl, faster and lighter than pandas.to_excel
+		- csv or tsv: 1 file per map and per other table, named with the path and the name of the map. The maps have the same format as the identity maps of LAPu
+		- long: 1 csv file with a row per filled well of all the maps and the columns Plate, Well, name_values and the extra columns
+
+	The values of extra_columns are dictionaries with the names of the maps as keys and, as values, a value for all the wells of that map or a DataFrame with a value for each well
+
+	It returns the list of files that have been written
+
+	2 mandatory arguments and 4 optional are needed for this function
+	"""
+	# Check that all the formats can be exported
+	formats_allowed = ["xlsx", "csv", "tsv", "long"]
+	if len(formats) == 0 or any(format_export not in formats_allowed for format_export in formats):
+		raise Exception(f"The formats of the maps to export need to be one or more of the following ones: {', '.join(formats_allowed)}. The ones given are: {', '.join(map(str, formats))}")
+
+	if extra_columns == None:
+		extra_columns = {}
+	if other_tables == None:
+		other_tables = {}
+
+	# Rows of every map and table, the maps keep the names of the rows in the first column and the empty wells (None or NaN, which is not equal to itself) are empty cells
+	rows_tables = {}
+	for name_map, map_plate in maps.items():
+		rows_tables[name_map] = [[map_plate.index.name if map_plate.index.name != None else ""] + [str(name_column) for name_column in map_plate.columns]]
+		for row_map in map_plate.itertuples(name = None):
+			rows_tables[name_map].append([None if value is None or value != value else value for value in row_map])
+	for name_table, table in other_tables.items():
+		rows_tables[name_table] = [list(table.columns)] + [list(row_table) for row_table in table.itertuples(index = False, name = None)]
+
+	files_exported = []
+
+	if "xlsx" in formats:
+		workbook = Workbook(write_only = True)
+		for name_table, rows_table in rows_tables.items():
+			sheet = workbook.create_sheet(title = name_table)
+			for row_table in rows_table:
+				sheet.append(row_table)
+		workbook.save(f"{path_export}.xlsx")
+		files_exported.append(f"{path_export}.xlsx")
+
+	for format_export, delimiter in [("csv", ","), ("tsv", "\t")]:
+		if format_export in formats:
+			for name_table, rows_table in rows_tables.items():
+				with open(f"{path_export}_{name_table}.{format_export}", "w", newline = "") as file_table:
+					csv.writer(file_table, delimiter = delimiter).writerows(rows_table)
+				files_exported.append(f"{path_export}_{name_table}.{format_export}")
+
+	if "long" in formats:
+		# The wells of each map are given in the same order as the labware, column by column
+		with open(f"{path_export}_long.csv", "w", newline = "") as file_long:
+			writer_long = csv.writer(file_long)
+			writer_long.writerow(["Plate", "Well", name_values] + list(extra_columns.keys()))
+			for name_map, map_plate in maps.items():
+				for name_column in map_plate.columns:
+					for name_row in map_plate.index:
+						value = map_plate.at[name_row, name_column]
+						if value is None or value != value:
+							continue
+
+						values_extra = []
+						for values_column in extra_columns.values():
+							value_extra = values_column.get(name_map)
+							if hasattr(value_extra, "at"): # A DataFrame with a value per well
+								value_extra = value_extra.at[name_row, name_column]
+							values_extra.append(value_extra)
+
+						writer_long.writerow([name_map, f"{name_row}{name_column}", value] + values_extra)
+		files_exported.append(f"{path_export}_long.csv")
+
+	return files_exported
+
 def generator_positions (labware_wells_name):
 	"""
 	Function that will return the next element everytime is called from a given list
@@ -1043,6 +1252,253 @@ def give_me_optimal_pipette (aVolume, pipette_r = None, pipette_l = None):
 	else: # This will be the case if there is 1 pipette attached but it can take the volume
 		raise NotSuitablePipette(aVolume)
 
+def parse_selection_expression (expression):
+	"""
+	Function that will read a selection expression of wells and return its parts so they can be evaluated with selection_expression_wells
+
+	The expression has the structure [WHERE] condition [ORDER BY value [ASC|DESC], ...] [LIMIT number], for example,
+	GFP/OD600 > 2 AND OD600 > 0.3 ORDER BY GFP DESC LIMIT 24, where GFP and OD600 are the names of the maps of values (sheets) of the plate
+	Names of maps with spaces or with the name of a keyword need to be written between quotes, for example, 'OD 600'
+
+	The condition admits the operators +, -, *, /, >, >=, <, <=, =, !=, AND, OR, NOT and parentheses, the condition can be omitted to select all the wells
+
+	1 mandatory argument is needed for this function
+	"""
+	# Split the expression in tokens, each one is (type, value)
+	pattern_tokens = re.compile(r"\s*(?:(?P<number>(?:\d+\.?\d*|\.\d+)(?:[eE][-+]?\d+)?)|'(?P<quoted_single>[^']*)'|\"(?P<quoted_double>[^\"]*)\"|(?P<word>[A-Za-z_][A-Za-z0-9_.]*)|(?P<operator>>=|<=|==|!=|<>|>|<|=|\+|-|\*|/|\(|\)|,))")
+	keywords = ["WHERE", "AND", "OR", "NOT", "ORDER", "BY", "ASC", "DESC", "LIMIT"]
+
+	tokens = []
+	position = 0
+	expression = str(expression).strip()
+	while position < len(expression):
+		token = pattern_tokens.match(expression, position)
+		if token == None:
+			index_character = len(expression) - len(expression[position:].lstrip())
+			raise Exception(f"The selection expression '{expression}' has a character that is not recognised in the position {index_character+1}: '{expression[index_character]}'")
+		position = token.end()
+
+		if token.group("number") != None:
+			tokens.append(("number", float(token.group("number"))))
+		elif token.group("quoted_single") != None or token.group("quoted_double") != None:
+			tokens.append(("map", token.group("quoted_single") if token.group("quoted_single") != None else token.group("quoted_double")))
+		elif token.group("word") != None and token.group("word").upper() in keywords:
+			tokens.append(("keyword", token.group("word").upper()))
+		elif token.group("word") != None:
+			tokens.append(("map", token.group("word")))
+		else:
+			tokens.append(("operator", {"==":"=", "<>":"!="}.get(token.group("operator"), token.group("operator"))))
+	tokens.append(("end", None))
+
+	# Recursive descent through the tokens, each part of the condition is returned as a tuple (type of node, values of the node)
+	index_token = [0]
+	maps_used = []
+
+	def next_is (type_token, value_token = None):
+		return tokens[index_token[0]][0] == type_token and (value_token == None or tokens[index_token[0]][1] == value_token)
+
+	def take (type_token, value_token = None):
+		if not next_is(type_token, value_token):
+			found = tokens[index_token[0]][1] if tokens[index_token[0]][0] != "end" else "the end of the expression"
+			expected = value_token if value_token != None else {"end":"the end of the expression", "number":"a number", "map":"a map name"}.get(type_token, type_token)
+			raise Exception(f"The selection expression '{expression}' expected {expected} and found {found}")
+		index_token[0] += 1
+		return tokens[index_token[0]-1][1]
+
+	def read_or ():
+		node = read_and()
+		while next_is("keyword", "OR"):
+			take("keyword", "OR")
+			node = ("OR", node, read_and())
+		return node
+
+	def read_and ():
+		node = read_not()
+		while next_is("keyword", "AND"):
+			take("keyword", "AND")
+			node = ("AND", node, read_not())
+		return node
+
+	def read_not ():
+		if next_is("keyword", "NOT"):
+			take("keyword", "NOT")
+			return ("NOT", read_not())
+		return read_comparison()
+
+	def read_comparison ():
+		node = read_sum()
+		if next_is("operator") and tokens[index_token[0]][1] in [">", ">=", "<", "<=", "=", "!="]:
+			operator = take("operator")
+			node = (operator, node, read_sum())
+		return node
+
+	def read_sum ():
+		node = read_product()
+		while next_is("operator", "+") or next_is("operator", "-"):
+			operator = take("operator")
+			node = (operator, node, read_product())
+		return node
+
+	def read_product ():
+		node = read_unary()
+		while next_is("operator", "*") or next_is("operator", "/"):
+			operator = take("operator")
+			node = (operator, node, read_unary())
+		return node
+
+	def read_unary ():
+		if next_is("operator", "-"):
+			take("operator", "-")
+			return ("NEGATIVE", read_unary())
+		if next_is("number"):
+			return ("NUMBER", take("number"))
+		if next_is("map"):
+			name_map = take("map")
+			if name_map not in maps_used:
+				maps_used.append(name_map)
+			return ("MAP", name_map)
+		if next_is("operator", "("):
+			take("operator", "(")
+			node = read_or()
+			take("operator", ")")
+			return node
+		found = tokens[index_token[0]][1] if tokens[index_token[0]][0] != "end" else "the end of the expression"
+		raise Exception(f"The selection expression '{expression}' expected a number, a map name or '(' and found {found}")
+
+	# Condition, if there is one
+	if next_is("keyword", "WHERE"):
+		take("keyword", "WHERE")
+		condition = read_or()
+	elif next_is("keyword", "ORDER") or next_is("keyword", "LIMIT") or next_is("end"):
+		condition = None
+	else:
+		condition = read_or()
+
+	# Order of the selected wells, if there is one
+	order = []
+	if next_is("keyword", "ORDER"):
+		take("keyword", "ORDER")
+		take("keyword", "BY")
+		while True:
+			value_order = read_sum()
+			descending = False
+			if next_is("keyword", "DESC"):
+				take("keyword", "DESC")
+				descending = True
+			elif next_is("keyword", "ASC"):
+				take("keyword", "ASC")
+			order.append((value_order, descending))
+			if not next_is("operator", ","):
+				break
+			take("operator", ",")
+
+	# Max number of wells selected, if there is one
+	limit = None
+	if next_is("keyword", "LIMIT"):
+		take("keyword", "LIMIT")
+		limit = take("number")
+		if limit != int(limit) or limit < 1:
+			raise Exception(f"The LIMIT of the selection expression '{expression}' needs to be an integer greater than 0")
+		limit = int(limit)
+
+	take("end")
+
+	return {"Expression":expression, "Condition":condition, "Order":order, "Limit":limit, "Maps":maps_used}
+
+def selection_expression_wells (selection_expression, maps_values, wells_available = None):
+	"""
+	Function that will select the wells of a plate that fulfill a selection expression (output of parse_selection_expression)
+	evaluating it at once over all the maps of values of the plate
+
+	The selected wells are returned as [index_row, index_column] sorted as the ORDER BY of the expression establishes and, when the values are the same or there is no order,
+	in the order of the wells in the labware (column by column). Wells with an empty value in any map of the expression are never selected and, if wells_available is given, neither the ones that are False in it
+
+	2 mandatory arguments and 1 optional are needed for this function
+	"""
+	# Check that all the maps needed are given and that they have the same dimensions
+	for name_map in selection_expression["Maps"]:
+		if name_map not in maps_values.keys():
+			raise Exception(f"The map of values '{name_map}' of the selection expression '{selection_expression['Expression']}' has not been provided")
+
+	arrays_maps = {name_map:np.asarray(maps_values[name_map], dtype = float) for name_map in selection_expression["Maps"]}
+	if wells_available is not None:
+		shape_plate = np.asarray(wells_available).shape
+	elif len(arrays_maps) > 0:
+		shape_plate = list(arrays_maps.values())[0].shape
+	else:
+		raise Exception(f"The selection expression '{selection_expression['Expression']}' needs at least 1 map of values or the available wells to know the dimensions of the plate")
+
+	if any(array_map.shape != shape_plate for array_map in arrays_maps.values()):
+		raise Exception(f"The maps of values of the selection expression '{selection_expression['Expression']}' need to have the same dimensions")
+
+	def evaluate (node):
+		# Every node is evaluated in the whole plate, the result is an array with the dimensions of the plate
+		if node[0] == "NUMBER":
+			return np.full(shape_plate, node[1])
+		if node[0] == "MAP":
+			return arrays_maps[node[1]]
+		if node[0] == "NEGATIVE":
+			return -evaluate(node[1])
+		if node[0] == "NOT":
+			return ~logical(node[1])
+		if node[0] in ["AND", "OR"]:
+			return logical(node[1]) & logical(node[2]) if node[0] == "AND" else logical(node[1]) | logical(node[2])
+
+		left = numerical(node[1])
+		right = numerical(node[2])
+		# Empty values or divisions by 0 give NaN and these ones never fulfill a comparison
+		with np.errstate(divide = "ignore", invalid = "ignore"):
+			return {"+":np.add, "-":np.subtract, "*":np.multiply, "/":np.divide,
+					">":np.greater, ">=":np.greater_equal, "<":np.less, "<=":np.less_equal, "=":np.equal, "!=":np.not_equal}[node[0]](left, right)
+
+	def logical (node):
+		result = evaluate(node)
+		if result.dtype != bool:
+			raise Exception(f"The selection expression '{selection_expression['Expression']}' uses a value where a condition is needed, for example, after AND, OR, NOT or as the whole condition")
+		return result
+
+	def numerical (node):
+		result = evaluate(node)
+		if result.dtype == bool:
+			raise Exception(f"The selection expression '{selection_expression['Expression']}' uses a condition where a value is needed, for example, in an arithmetic operation or in ORDER BY")
+		return result
+
+	# Wells that fulfill the condition, if there is one
+	if selection_expression["Condition"] != None:
+		mask_selected = logical(selection_expression["Condition"])
+	else:
+		mask_selected = np.ones(shape_plate, dtype = bool)
+
+	if wells_available is not None:
+		mask_selected = mask_selected & np.asarray(wells_available, dtype = bool)
+
+	# Wells with an empty value in any map of the expression are never selected, not even through NOT, != or an ORDER BY without condition
+	for array_map in arrays_maps.values():
+		mask_selected = mask_selected & ~np.isnan(array_map)
+
+	# Neither the wells in which a value of ORDER BY cannot be calculated, e.g., a division 0/0, because they cannot be sorted
+	values_order = []
+	for value_order, descending in selection_expression["Order"]:
+		with np.errstate(divide = "ignore", invalid = "ignore"):
+			values_order.append([numerical(value_order), descending])
+		mask_selected = mask_selected & ~np.isnan(values_order[-1][0])
+
+	# Index of the selected wells going through the plate column by column, which is the order of the wells in the labware
+	index_wells = np.flatnonzero(mask_selected.T)
+
+	# Sort the wells by the values of ORDER BY, lexsort is stable so wells with the same values keep the labware order
+	if len(values_order) > 0:
+		keys_order = [index_wells]
+		for values_plate, descending in reversed(values_order):
+			values_wells = values_plate.T.ravel()[index_wells]
+			keys_order.append(-values_wells if descending else values_wells)
+		index_wells = index_wells[np.lexsort(keys_order)]
+
+	if selection_expression["Limit"] != None:
+		index_wells = index_wells[:selection_expression["Limit"]]
+
+	return [[int(index_well % shape_plate[0]), int(index_well // shape_plate[0])] for index_well in index_wells]
+
 def wells_selection (list_wells, number_samples_take, type_selection):
 	"""
 	Function that will select in a specific way elements from a given list
@@ -1120,21 +1576,7 @@ def run(protocol:opentrons.protocol_api.ProtocolContext):
 	program_variables.assign_variables(user_variables, protocol)
 	
 	#----------------------------------------------------------------------------------------------------------------------------------------------------------------------------------------------------------------
-	# Assign the source and final plates into the deck
-	labware_source = setting_labware(user_variables.numberSourcePlates,
-									 user_variables.APINameSamplePlate,
-									 dict(zip(protocol.deck.keys(), protocol.deck.values())),
-									 protocol,
-									 label = [plate['Label'] for plate in program_variables.samplePlates.values()])
-
-	for index_labware, labware in enumerate(labware_source.items()):
-		program_variables.samplePlates[index_labware]["Position"] = labware[0]
-		program_variables.samplePlates[index_labware]["Opentrons Place"] = labware[1]
-	
-		# Assign the correct column names and axis to the 'Map Identifiers' after having check that the dimensions are correct with user_variables.check()
-		program_variables.samplePlates[index_labware]["Map Identities"].columns = list(labware[1].columns_by_name().keys())[:program_variables.samplePlates[index_labware]["Map Identities"].shape[1]]
-		program_variables.samplePlates[index_labware]["Map Identities"].index = list(labware[1].rows_by_name().keys())[:program_variables.samplePlates[index_labware]["Map Identities"].shape[0]]
-	
+	# Assign the final plates into the deck, the source plates are placed after the final plates and the falcon racks in the positions that are left
 	labware_final = setting_labware(len(program_variables.finalPlates),
 									user_variables.APINameFinalPlate,
 									dict(zip(protocol.deck.keys(), protocol.deck.values())),
@@ -1144,37 +1586,12 @@ def run(protocol:opentrons.protocol_api.ProtocolContext):
 	for index_labware, labware in enumerate(labware_final.items()):
 		program_variables.finalPlates[index_labware]["Position"] = labware[0]
 		program_variables.finalPlates[index_labware]["Opentrons Place"] = labware[1]
+		program_variables.finalPlates[index_labware]["Accessors"] = labware_accessors(labware[1])
 	
-	#----------------------------------------------------------------------------------------------------------------------------------------------------------------------------------------------------------------
-	# Set some variables that needed the previous labware loading
-	# Set the samples we are transfering from each source plate
-	for index_initial_plate, source_plate in program_variables.samplePlates.items():
-		# Obtain the list of possible wells to select from
-		list_wells_possible_selection = source_plate["Opentrons Place"].wells()[source_plate["Index First Well Sample"]:]
-		# Obtain the list of well we cannot select from, which are the ones that have the "-" character
-		wells_not_take = source_plate['Map Identities'].isnull().stack()
-
-		# Remove from list_wells_possible_selection the list wells_not_take
-		for well in wells_not_take.index:
-			if wells_not_take[well] and source_plate["Opentrons Place"].wells_by_name()[f"{well[0]}{well[1]}"] in list_wells_possible_selection:
-				list_wells_possible_selection.remove(source_plate["Opentrons Place"].wells_by_name()[f"{well[0]}{well[1]}"])
-		
-		if len(list_wells_possible_selection) < source_plate["Number Samples Transfer"]:
-			raise Exception (f"Not enough wells in '{user_variables.nameSourcePlates[index_initial_plate]}' to transfer {source_plate['Number Samples Transfer']} samples starting from {source_plate['First Well Name']} including this one")
-		
-		source_plate["Selected Samples"] = wells_selection(list(list_wells_possible_selection), source_plate["Number Samples Transfer"], source_plate["Type Selection"])
-
-		# Let's put volume in the wells that have somethign in the cell
-		all_wells_with_samples = ~source_plate['Map Identities'].isnull().stack()
-		for well in all_wells_with_samples.index:
-			if all_wells_with_samples[well]:
-				source_plate["Opentrons Place"][f"{well[0]}{well[1]}"].load_liquid(liquid = program_variables.liquid_samples,
-																				   volume = 0.9*list(labware_context.get_labware_definition(user_variables.APINameSamplePlate)["wells"].values())[0]['totalLiquidVolume'])
-
-
 	# Set the maps of the final labware
 	for final_plate in program_variables.finalPlates.values():
-		final_plate["Map Selected Samples"] = MapLabware(final_plate["Opentrons Place"])
+		final_plate["Map Selected Samples"] = PlateGrid(final_plate["Accessors"]["Rows By Name"].keys(), final_plate["Accessors"]["Columns By Name"].keys())
+		final_plate["Map Volumes"] = PlateGrid(final_plate["Accessors"]["Rows By Name"].keys(), final_plate["Accessors"]["Columns By Name"].keys(), kind = "numeric")
 	
 	#----------------------------------------------------------------------------------------------------------------------------------------------------------------------------------------------------------------
 	# Set Falcon Rack if needed
@@ -1207,13 +1624,102 @@ def run(protocol:opentrons.protocol_api.ProtocolContext):
 			program_variables.reactiveWells["Positions"].append(well_tube_falcon)
 			well_tube_falcon.load_liquid(liquid = program_variables.reactiveWells["Definition Liquid"], volume = volume_tube)
 	
+	#----------------------------------------------------------------------------------------------------------------------------------------------------------------------------------------------------------------
+	# Assign the source plates into the deck
+	# If they do not fit at once they are processed in waves that use the same positions, keeping free the positions of the tip racks that are going to be needed
+	# Find out how many tips each pipette is going to use, 1 to distribute the reactive and 1 per sample transferred
+	tips_needed = {"right":0, "left":0}
+	if user_variables.volumeReactive != 0:
+		tips_needed[give_me_optimal_pipette(user_variables.volumeReactive, program_variables.pipR, program_variables.pipL).mount] += 1
+	for source_plate in program_variables.samplePlates.values():
+		tips_needed[give_me_optimal_pipette(source_plate["Volume Sample Transfer"], program_variables.pipR, program_variables.pipL).mount] += source_plate["Number Samples Transfer"]
+	
+	# Find out how many tip racks are going to be placed in the deck
+	if program_variables.sameTipRack:
+		tipracks_pipettes = [(tips_needed["right"]+tips_needed["left"], user_variables.APINameTipR, user_variables.startingTipPipR if program_variables.pipR != None else user_variables.startingTipPipL)]
+	else:
+		tipracks_pipettes = [(tips_needed["right"], user_variables.APINameTipR, user_variables.startingTipPipR), (tips_needed["left"], user_variables.APINameTipL, user_variables.startingTipPipL)]
+	
+	tipracks_needed = 0
+	for number_tips, tiprack, starting_tip in tipracks_pipettes:
+		if number_tips == 0:
+			continue
+		if user_variables.replaceTiprack: # The same position is used for all the tip racks of that pipette
+			tipracks_needed += 1
+		else:
+			definition_tiprack = labware_context.get_labware_definition(tiprack)
+			tipracks_needed += math.ceil((definition_tiprack["groups"][0]["wells"].index(starting_tip)+number_tips)/len(definition_tiprack["wells"]))
+	
+	positions_free = [position for position, labware in dict(zip(protocol.deck.keys(), protocol.deck.values())).items() if labware == None]
+	if len(positions_free) <= tipracks_needed:
+		raise Exception(f"There is not enough space in the deck for the source plates, {tipracks_needed} of the {len(positions_free)} free positions are needed for the tip racks. Try to replace the tip racks or less final plates")
+	
+	number_plates_wave = min(user_variables.numberSourcePlates, len(positions_free)-tipracks_needed)
+	if number_plates_wave == user_variables.numberSourcePlates:
+		labels_source = [plate['Label'] for plate in program_variables.samplePlates.values()]
+	else: # The labware of each position will hold several source plates
+		labels_source = "Source Plate"
+	
+	labware_source = setting_labware(number_plates_wave,
+									 user_variables.APINameSamplePlate,
+									 dict(zip(protocol.deck.keys(), protocol.deck.values())),
+									 protocol,
+									 label = labels_source)
+	
+	# All the plates of a wave are in the deck at the same time and they are swapped by the ones of the next wave with a pause
+	program_variables.wavesSourcePlates = plate_swap_waves(user_variables.numberSourcePlates, list(labware_source.keys()))
+	
+	# The plates of every wave use the same labware of the position, so the tables of its wells are built only once
+	accessors_source = {position:labware_accessors(labware) for position, labware in labware_source.items()}
+	
+	for wave in program_variables.wavesSourcePlates:
+		for position, index_labware in wave.items():
+			program_variables.samplePlates[index_labware]["Position"] = position
+			program_variables.samplePlates[index_labware]["Opentrons Place"] = labware_source[position]
+			program_variables.samplePlates[index_labware]["Accessors"] = accessors_source[position]
+		
+			# Assign the correct column names and axis to the 'Map Identifiers' after having check that the dimensions are correct with user_variables.check()
+			program_variables.samplePlates[index_labware]["Map Identities"].columns = list(accessors_source[position]["Columns By Name"].keys())[:program_variables.samplePlates[index_labware]["Map Identities"].shape[1]]
+			program_variables.samplePlates[index_labware]["Map Identities"].index = list(accessors_source[position]["Rows By Name"].keys())[:program_variables.samplePlates[index_labware]["Map Identities"].shape[0]]
+	
+	#----------------------------------------------------------------------------------------------------------------------------------------------------------------------------------------------------------------
+	# Set some variables that needed the previous labware loading
+	# Set the samples we are transfering from each source plate
+	for index_initial_plate, source_plate in program_variables.samplePlates.items():
+		if source_plate["Selection Expression"] != None:
+			# The wells have been already selected with the expression as [index row, index column]
+			source_plate["Selected Samples"] = [source_plate["Accessors"]["Columns"][index_column][index_row] for index_row, index_column in source_plate["Selected Samples"]]
+		else:
+			# Obtain the list of possible wells to select from
+			list_wells_possible_selection = list(source_plate["Accessors"]["Wells"][source_plate["Index First Well Sample"]:])
+			# Obtain the list of well we cannot select from, which are the ones that have the "-" character
+			wells_not_take = source_plate['Map Identities'].isnull().stack()
+
+			# Remove from list_wells_possible_selection the list wells_not_take
+			for well in wells_not_take.index:
+				if wells_not_take[well] and source_plate["Accessors"]["Wells By Name"][f"{well[0]}{well[1]}"] in list_wells_possible_selection:
+					list_wells_possible_selection.remove(source_plate["Accessors"]["Wells By Name"][f"{well[0]}{well[1]}"])
+			
+			if len(list_wells_possible_selection) < source_plate["Number Samples Transfer"]:
+				raise Exception (f"Not enough wells in '{user_variables.nameSourcePlates[index_initial_plate]}' to transfer {source_plate['Number Samples Transfer']} samples starting from {source_plate['First Well Name']} including this one")
+			
+			source_plate["Selected Samples"] = wells_selection(list(list_wells_possible_selection), source_plate["Number Samples Transfer"], source_plate["Type Selection"])
+
+		# Let's put volume in the wells that have somethign in the cell
+		all_wells_with_samples = ~source_plate['Map Identities'].isnull().stack()
+		for well in all_wells_with_samples.index:
+			if all_wells_with_samples[well]:
+				source_plate["Accessors"]["Wells By Name"][f"{well[0]}{well[1]}"].load_liquid(liquid = program_variables.liquid_samples,
+																							  volume = 0.9*list(labware_context.get_labware_definition(user_variables.APINameSamplePlate)["wells"].values())[0]['totalLiquidVolume'])
+
+
 	#----------------------------------------------------------------------------------------------------------------------------------------------------------------------------------------------------------------
 	# Transfer reactives, if neccessary and samples
 	
 	# First we create the possible final wells where to distribute the reactives and samples
 	final_wells = []
 	for plate in list(program_variables.finalPlates.values()):
-		final_wells += plate["Opentrons Place"].wells()
+		final_wells += plate["Accessors"]["Wells"]
 	
 	# Get the first well that is free in the final plate
 	index_start_well_final_plate = labware_context.get_labware_definition(user_variables.APINameFinalPlate)["groups"][0]["wells"].index(user_variables.wellStartFinalPlate)
@@ -1271,48 +1777,53 @@ def run(protocol:opentrons.protocol_api.ProtocolContext):
 	
 	wells_transfer_samples = generator_positions(final_wells[index_start_well_final_plate:index_start_well_final_plate+program_variables.sumSamples])
 
-	for plate in list(program_variables.samplePlates.values()):
-
-		optimal_pipette = give_me_optimal_pipette (plate["Volume Sample Transfer"], program_variables.pipR, program_variables.pipL)
-		
-		if optimal_pipette.mount == "right":
-			tiprack = user_variables.APINameTipR
-			starting_tip = user_variables.startingTipPipR
-		else:
-			tiprack = user_variables.APINameTipL
-			starting_tip = user_variables.startingTipPipL
+	for index_wave, wave in enumerate(program_variables.wavesSourcePlates):
+		if index_wave > 0:
+			# Careful with this part if you are traspassing this script into jupyter because this will crash your jupyter (will wait until resume and it does not exist)
+			swaps_wave = [f"Slot {position}: {program_variables.samplePlates[index_plate]['Label']}" for position, index_plate in wave.items()]
+			protocol.pause(f"Replace The Source Plates As Follows And Press Resume In OT-App. {', '.join(swaps_wave)}")
 		
-		for sample_well in plate["Selected Samples"]:
-			check_tip_and_pick(optimal_pipette,
-							   tiprack,
-							   dict(zip(protocol.deck.keys(), protocol.deck.values())),
-							   protocol,
-							   replace_tiprack = user_variables.replaceTiprack,
-							   initial_tip = starting_tip,
-							   same_tiprack = program_variables.sameTipRack)
+		for plate in [program_variables.samplePlates[index_plate] for index_plate in wave.values()]:
+			optimal_pipette = give_me_optimal_pipette (plate["Volume Sample Transfer"], program_variables.pipR, program_variables.pipL)
 			
-			final_well = next(wells_transfer_samples)
-
-			optimal_pipette.transfer(plate["Volume Sample Transfer"], sample_well, final_well, new_tip = "never")
+			if optimal_pipette.mount == "right":
+				tiprack = user_variables.APINameTipR
+				starting_tip = user_variables.startingTipPipR
+			else:
+				tiprack = user_variables.APINameTipL
+				starting_tip = user_variables.startingTipPipL
 			
-			# Map the transfer
-			source_well_name = plate["Map Identities"].iloc[list(plate["Opentrons Place"].rows_by_name().keys()).index(sample_well._core._row_name),list(plate["Opentrons Place"].columns_by_name().keys()).index(sample_well._core._column_name)]
+			for sample_well in plate["Selected Samples"]:
+				check_tip_and_pick(optimal_pipette,
+								   tiprack,
+								   dict(zip(protocol.deck.keys(), protocol.deck.values())),
+								   protocol,
+								   replace_tiprack = user_variables.replaceTiprack,
+								   initial_tip = starting_tip,
+								   same_tiprack = program_variables.sameTipRack)
+				
+				final_well = next(wells_transfer_samples)
 
-			for final_plate in list(program_variables.finalPlates.values()):
-				if final_plate["Opentrons Place"] == final_well._parent:
-					final_plate["Map Selected Samples"].assign_value(source_well_name, final_well._core._row_name, final_well._core._column_name)
-			
-			# Drop tip
-			optimal_pipette.drop_tip()
-			
-	# Export map(s) in an excel
-	writer = pd.ExcelWriter(f'/data/user_storage/{user_variables.finalMapName}.xlsx', engine = 'openpyxl')
-	# writer = pd.ExcelWriter(f'{user_variables.finalMapName}.xlsx', engine = 'openpyxl')
-	
-	for final_plate in program_variables.finalPlates.values():
-		final_plate["Map Selected Samples"].map.to_excel(writer, sheet_name = f"FinalMapSlot{final_plate['Position']}")
+				optimal_pipette.transfer(plate["Volume Sample Transfer"], sample_well, final_well, new_tip = "never")
+				
+				# Map the transfer
+				# The rows and columns of the map have the names of the ones of the labware, so the cell can be accessed directly by the name of the well
+				source_well_name = plate["Map Identities"].at[sample_well._core._row_name, sample_well._core._column_name]
+
+				for final_plate in list(program_variables.finalPlates.values()):
+					if final_plate["Opentrons Place"] == final_well._parent:
+						final_plate["Map Selected Samples"].assign_value(source_well_name, final_well._core._row_name, final_well._core._column_name)
+						final_plate["Map Volumes"].assign_value(plate["Volume Sample Transfer"], final_well._core._row_name, final_well._core._column_name)
+				
+				# Drop tip
+				optimal_pipette.drop_tip()
+				
+	# Export map(s) in the formats of 'Format Final Maps', by default in an excel
+	maps_final = {f"FinalMapSlot{final_plate['Position']}":final_plate["Map Selected Samples"].to_dataframe() for final_plate in program_variables.finalPlates.values()}
+	volumes_final = {f"FinalMapSlot{final_plate['Position']}":final_plate["Map Volumes"].to_dataframe() for final_plate in program_variables.finalPlates.values()}
 	
-	writer.save()
+	export_maps(maps_final, f'/data/user_storage/{user_variables.finalMapName}', formats = user_variables.formatsFinalMaps, extra_columns = {"Volume Sample (uL)":volumes_final, "Volume Reactive (uL)":dict.fromkeys(maps_final, user_variables.volumeReactive)})
+	# export_maps(maps_final, f'{user_variables.finalMapName}', formats = user_variables.formatsFinalMaps, extra_columns = {"Volume Sample (uL)":volumes_final, "Volume Reactive (uL)":dict.fromkeys(maps_final, user_variables.volumeReactive)})
 	
 	# Final homing
 	protocol.home()
\ No newline at end of file
@@ -24,11 +24,14 @@ import pandas as pd
 import random
 import math
 import numpy as np
+import csv
+from types import MappingProxyType
+from openpyxl import Workbook
 from opentrons.motion_planning.deck_conflict import DeckConflictError
 from opentrons.protocol_api.labware import OutOfTipsError
 
 class UserVariables:
-	def __init__(self, general, each_plate, pipettes, reagents, modules, profile = None):
+	def __init__(self, general, each_plate, pipettes, reagents, modules, profile = None, mixing_profiles = None, liquid_classes = None, reagent_liquid_classes = None):
 		"""
 		Class that will contain the parameters setted in the variables csv and will process them to work easily in the rest of the protocol
 		The coding of this function is dependant of the variables in the Template of the protocol and the names have to be consistent with the rest of the code
@@ -36,6 +39,11 @@ class UserVariables:
 		self.numberSourcePlates = general[general["Variable Name"] == "Number of Source Plates"]["Value"].values[0]
 		self.volumesSamplesPerPlate = reagents[reagents["Variable Name"] == "Volume sample DNA Template (uL)"]["Value"].values[0]
 		self.finalMapName = general[general["Variable Name"] == "Final Map Name"]["Value"].values[0]
+		# Optional variable, files without this row will export the final maps only as an excel file
+		if "Format Final Maps" in general["Variable Name"].values:
+			self.formatsFinalMaps = general[general["Variable Name"] == "Format Final Maps"]["Value"].values[0]
+		else:
+			self.formatsFinalMaps = np.nan
 		self.wellStartFinalPlate = general[general["Variable Name"] == "Well Start Final PCR Plate"]["Value"].values[0]
 		
 		self.sets = reagents[reagents["Variable Name"] == "Number sets"]["Value"].values[0]
@@ -44,6 +52,16 @@ class UserVariables:
 		self.primer = reagents[reagents["Variable Name"] == "Volume each primer (uL)"]["Value"].values[0]
 		self.finalVolume = reagents[reagents["Variable Name"] == "Final volume (uL)"]["Value"].values[0]
 		self.extraPipettingFactor = reagents[reagents["Variable Name"] == "Extra Pipetting Factor"]["Value"].values[0]
+		# Optional variable, files without this row will mix the set tubes as a glycerol-enzyme liquid
+		if "Liquid Class Sets" in reagents["Variable Name"].values:
+			self.liquidClassSets = reagents[reagents["Variable Name"] == "Liquid Class Sets"]["Value"].values[0]
+		else:
+			self.liquidClassSets = np.nan
+		# Optional variable, files without this row will transfer each sample to the well of every set with a different aspiration and tip
+		if "Multi-Dispense Samples" in reagents["Variable Name"].values:
+			self.multiDispenseSamples = reagents[reagents["Variable Name"] == "Multi-Dispense Samples"]["Value"].values[0]
+		else:
+			self.multiDispenseSamples = False
 		
 		self.APINamePipL = pipettes[pipettes["Variable Name"] == "API Name Left Pipette"]["Value"].values[0]
 		self.APINamePipR = pipettes[pipettes["Variable Name"] == "API Name Right Pipette"]["Value"].values[0]
@@ -80,6 +98,23 @@ class UserVariables:
 		else:
 			self.temperatureProfile = None
 		
+		# Mixing profiles, in case the user defines their own liquid classes
+		if isinstance(mixing_profiles, pd.DataFrame):
+			self.mixingProfiles = mixing_profiles.dropna(how="all")
+		else:
+			self.mixingProfiles = None
+		
+		# Liquid classes and the reagents that use them, in case the user defines them
+		if isinstance(liquid_classes, pd.DataFrame):
+			self.liquidClasses = liquid_classes.dropna(how="all")
+		else:
+			self.liquidClasses = None
+		
+		if isinstance(reagent_liquid_classes, pd.DataFrame):
+			self.reagentLiquidClasses = reagent_liquid_classes.dropna(how="all")
+		else:
+			self.reagentLiquidClasses = None
+		
 	def check(self):
 		"""
 		Function that will check the variables of the Template and will raise errors that will crash the OT run
@@ -94,6 +129,14 @@ class UserVariables:
 		if pd.isna([self.numberSourcePlates, self.finalMapName, self.wellStartFinalPlate, self.APINameSamplePlate, self.APINameFinalPlate, self.APINameEppendorfPlate]).any():
 			raise Exception("No variable in the sheet 'GeneralVariables' can be left empty")
 		
+		# The final maps are exported by default only as an excel file
+		if pd.isna(self.formatsFinalMaps):
+			self.formatsFinalMaps = ["xlsx"]
+		else:
+			self.formatsFinalMaps = str(self.formatsFinalMaps).replace(" ","").lower().split(",")
+			if any(format_map not in ["xlsx", "csv", "tsv", "long"] for format_map in self.formatsFinalMaps):
+				raise Exception("The variable 'Format Final Maps' can only have the formats 'xlsx', 'csv', 'tsv' and 'long' separated by commas")
+		
 		if pd.isna([self.sets, self.numberPrimerSet, self.polymerase, self.primer, self.finalVolume, self.extraPipettingFactor, self.volumesSamplesPerPlate]).any():
 			raise Exception("No variable in the sheet 'ReagentsPerReaction' can be left empty")
 		
@@ -280,6 +323,14 @@ class UserVariables:
 		if len(definition_final_plate["groups"]) > 1:
 			raise Exception("The final plate needs to have only 1 type of well, i.e, the labware needs to be homogeneous")
 		
+		# The block of the thermocycler only holds 96-well plates, final plates with more wells (for example, 384-well plates) can only be used without it
+		if self.presenceTermo and len(definition_final_plate["wells"]) > 96:
+			raise Exception(f"The final plate {self.APINameFinalPlate} has {len(definition_final_plate['wells'])} wells and the thermocycler only holds 96-well plates. Set 'Presence Thermocycler' as False to use this final labware")
+		
+		# Check that the final volume of the reaction fits in the wells of the final plate, which is more limiting with plates of higher density
+		if self.finalVolume > list(definition_final_plate["wells"].values())[0]["totalLiquidVolume"]:
+			raise Exception(f"The final volume of the reaction, {self.finalVolume}uL, exceeds the max volume of the wells in the labware {self.APINameFinalPlate}")
+		
 		if len(definition_rack["groups"]) > 1:
 			raise Exception("The eppendorf rack needs to have only 1 type of tube, i.e, the labware needs to be homogeneous")
 		
@@ -412,6 +463,34 @@ In this case, the number of wells available for samples (to take and not take) a
 				if map_rows != len(definition_source_plate["ordering"][0]) or map_columns != len(definition_source_plate["ordering"]):
 					raise Exception(f"The Sheet '{map_name}' needs to have the same columns and rows as the labware '{self.APINameSamplePlate}'. The names of columns and rows should be included in the sheet")
 		
+		# Check the way the samples are transferred to the wells of the sets
+		if pd.isna(self.multiDispenseSamples) or self.multiDispenseSamples in ["false", "FALSE", "False", 0, False]:
+			self.multiDispenseSamples = False
+		elif self.multiDispenseSamples in ["true", "TRUE", "True", 1, True]:
+			self.multiDispenseSamples = True
+		else:
+			raise Exception("The variable 'Multi-Dispense Samples' only accepts 2 values, True or False. If left empty, False will be assumed")
+		
+		# Check the liquid class of the set tubes, the existence of the class is checked when the profiles are assigned
+		if pd.isna(self.liquidClassSets):
+			self.liquidClassSets = "glycerol-enzyme"
+		
+		# Check the sheet of mixing profiles if it has been given
+		if isinstance(self.mixingProfiles, pd.DataFrame):
+			if not all(item in list(self.mixingProfiles.columns) for item in ["Liquid Class", "Tube Turnovers", "Min Cycles Per Height", "Flow Rate Factor", "Touch Tip Rounds", "Cross Strokes"]):
+				raise Exception("'MixingProfiles' sheet table needs to have 6 columns: 'Liquid Class', 'Tube Turnovers', 'Min Cycles Per Height', 'Flow Rate Factor', 'Touch Tip Rounds' and 'Cross Strokes'")
+			if self.mixingProfiles[["Liquid Class", "Tube Turnovers", "Min Cycles Per Height", "Flow Rate Factor", "Touch Tip Rounds", "Cross Strokes"]].isna().any().any():
+				raise Exception("None of the cells of the sheet 'MixingProfiles' can be left empty")
+			if pd.Series(self.mixingProfiles["Liquid Class"].values).is_unique == False:
+				raise Exception("The values of the column 'Liquid Class' in the sheet 'MixingProfiles' have to be unique")
+			if (self.mixingProfiles["Tube Turnovers"] <= 0).any() or (self.mixingProfiles["Flow Rate Factor"] <= 0).any():
+				raise Exception("The values of the columns 'Tube Turnovers' and 'Flow Rate Factor' in the sheet 'MixingProfiles' have to be greater than 0")
+			if (self.mixingProfiles["Min Cycles Per Height"] < 1).any() or (self.mixingProfiles["Touch Tip Rounds"] < 0).any() or (self.mixingProfiles["Cross Strokes"] < 0).any():
+				raise Exception("In the sheet 'MixingProfiles' the column 'Min Cycles Per Height' needs to be at least 1 and the columns 'Touch Tip Rounds' and 'Cross Strokes' cannot be negative")
+		
+		# Check the sheet of liquid classes and the one that relates the reagents with them, if they have been given
+		self.liquidClasses, self.reagentLiquidClasses = liquid_classes_table_to_dict(self.liquidClasses, self.reagentLiquidClasses, ["Water", "Primers", "Polymerase", "Mix", "Samples"], touch_tip = False)
+		
 		return
 	
 class SettedParameters:
@@ -429,6 +508,9 @@ class SettedParameters:
 		self.finalPlates = {}
 		self.reactiveWells = {}
 		self.setsWells = {}
+		self.masterMixWells = {"Positions":[], "Reactions Per Tube":[], "Reactions Filled Per Tube":[], "Volumes":[], "Definition Liquid":None} # Tubes with the water and polymerase of all the sets
+		self.masterMix = False
+		self.volMasterMix = 0
 		self.volPolymeraseFactor = 0
 		self.volPrimerFactor = 0
 		self.volTotal = 0
@@ -436,10 +518,22 @@ class SettedParameters:
 		self.volWaterFactor = 0
 		self.volWater = 0
 		self.tc_mod = None
-		self.colors_mediums = ["#ffbb51", "#10D21B", "#3d85c6", "#d3cfcf", "#ff5151", "#783f04"] # Initial filled with the one color of the sample: sample, polymerase, water, mix, not pick samples, controls
+		self.colors_mediums = ["#ffbb51", "#10D21B", "#3d85c6", "#d3cfcf", "#ff5151", "#783f04", "#76a5af"] # Initial filled with the one color of the sample: sample, polymerase, water, mix, not pick samples, controls, master mix
 		self.liquid_samples = None # Initial
 		self.liquid_control = None # Initial
 		self.liquid_notpick = None # Initial
+		# Default mixing profiles of the 1.5mL eppendorfs, they can be overwritten or extended with the sheet MixingProfiles
+		# Both keep the cycles of the extensive mixing of the previous versions (7 per height, 21 when a third of the tube is mixed in each cycle, and 4 strokes between heights)
+		# 'aqueous' only does 1 round of touch tip instead of 9 and 'glycerol-enzyme' mixes at half of the default flow rate
+		self.mixingProfiles = {"aqueous":{"Tube Turnovers":7, "Min Cycles Per Height":7, "Flow Rate Factor":1, "Touch Tip Rounds":1, "Cross Strokes":4},
+							   "glycerol-enzyme":{"Tube Turnovers":7, "Min Cycles Per Height":7, "Flow Rate Factor":0.5, "Touch Tip Rounds":9, "Cross Strokes":4}}
+		# Default liquid classes, the rates are factors of the default flow rates of the pipettes or the maximum flow rate of the pipette (max) and the delays are the seconds waited after
+		# every aspiration and dispense. They can be overwritten or extended with the sheet LiquidClasses
+		self.liquidClasses = {"aqueous":{"Aspirate Rate":"max", "Dispense Rate":"max", "Blow Out Rate":"max", "Aspirate Delay":0, "Dispense Delay":0},
+							  "glycerol-enzyme":{"Aspirate Rate":0.2, "Dispense Rate":0.2, "Blow Out Rate":1, "Aspirate Delay":1, "Dispense Delay":1}}
+		self.reagentLiquidClasses = {"Water":"aqueous", "Primers":"aqueous", "Polymerase":"glycerol-enzyme", "Mix":"aqueous", "Samples":"aqueous"} # Mix is the content of the set tubes and Samples the DNA templates
+		self.defaultFlowRates = {} # It will be filled when the pipettes are loaded
+		self.tripsTipracks = {} # Expected trips of the tips from the tip racks to other slots, it will be filled after setting the labware
 		
 		return
 	
@@ -473,11 +567,40 @@ class SettedParameters:
 		self.volWater = self.volTotal-user_variables.polymerase-(user_variables.primer*user_variables.numberPrimerSet)
 		self.volWaterFactor = self.volWater*(1+user_variables.extraPipettingFactor)
 		
+		# Water and polymerase are the same for all the sets, so if there is more than 1 set they can be mixed once in master mix tubes that are split after into the set tubes
+		# The volumes of water and polymerase per reaction already have the extra pipetting factor, so the factor is not applied again to the master mix
+		self.masterMix = user_variables.sets > 1 and self.volWaterFactor > 0 and self.volPolymeraseFactor > 0
+		self.volMasterMix = self.volWaterFactor + self.volPolymeraseFactor
+		
+		# Mixing profiles defined by the user
+		if isinstance(user_variables.mixingProfiles, pd.DataFrame):
+			for index_row, row in user_variables.mixingProfiles.iterrows():
+				self.mixingProfiles[row["Liquid Class"]] = {"Tube Turnovers":row["Tube Turnovers"],
+															"Min Cycles Per Height":int(row["Min Cycles Per Height"]),
+															"Flow Rate Factor":row["Flow Rate Factor"],
+															"Touch Tip Rounds":int(row["Touch Tip Rounds"]),
+															"Cross Strokes":int(row["Cross Strokes"])}
+		
+		if user_variables.liquidClassSets not in self.mixingProfiles.keys():
+			raise Exception(f"The value of 'Liquid Class Sets' has to be one of the following liquid classes: {', '.join(self.mixingProfiles.keys())}. New classes can be defined in the sheet 'MixingProfiles'")
+		
+		# Liquid classes defined by the user and the reagents that use them
+		if user_variables.liquidClasses != None:
+			self.liquidClasses.update(user_variables.liquidClasses)
+		
+		if user_variables.reagentLiquidClasses != None:
+			self.reagentLiquidClasses.update(user_variables.reagentLiquidClasses)
+		
+		for reagent, liquid_class in self.reagentLiquidClasses.items():
+			if liquid_class not in self.liquidClasses.keys():
+				raise Exception(f"The liquid class '{liquid_class}' of the reagent '{reagent}' is not defined. The liquid classes defined are: {', '.join(self.liquidClasses.keys())}. New classes can be defined in the sheet 'LiquidClasses'")
+		
 		self.hs_mods = {} # It will be filled during the run of the protocol ans will contain the heater-shakers
 		
 		# Pipette Variables
 		if pd.isna(user_variables.APINamePipL) == False:
 			self.pipL = protocol.load_instrument(user_variables.APINamePipL, mount = "left")
+			self.defaultFlowRates["left"] = {"Aspirate":self.pipL.flow_rate.aspirate, "Dispense":self.pipL.flow_rate.dispense, "Blow Out":self.pipL.flow_rate.blow_out}
 		else:
 			# Establish all the variables set to the left pipette as none
 			user_variables.APINameTipL = None
@@ -485,6 +608,7 @@ class SettedParameters:
 			
 		if pd.isna(user_variables.APINamePipR) == False:
 			self.pipR = protocol.load_instrument(user_variables.APINamePipR, mount = "right")
+			self.defaultFlowRates["right"] = {"Aspirate":self.pipR.flow_rate.aspirate, "Dispense":self.pipR.flow_rate.dispense, "Blow Out":self.pipR.flow_rate.blow_out}
 		else:
 			# Establish all the variables set to the left pipette as none
 			user_variables.APINameTipR = None
@@ -597,26 +721,66 @@ class SettedParameters:
 			for primer in range(int(index_set*user_variables.numberPrimerSet), int((index_set*user_variables.numberPrimerSet)+user_variables.numberPrimerSet)):
 				self.setsWells[f"Set {index_set+1}"]["Set Primers"].append(f"Primer {primer+1}")
 		
+		# The master mix is only prepared if it saves tips. Without it the polymerase is transferred to every set tube with a new tip for each aspiration,
+		# with it the polymerase is transferred to the master mix tubes with 1 tip and another one mixes them and splits them into the set tubes
+		if self.masterMix:
+			if user_variables.presenceHS:
+				vol_max_tube_set = user_variables.volMaxMixTube
+			else:
+				definition_tubes = opentrons.protocol_api.labware.get_labware_definition(user_variables.APINameEppendorfPlate)
+				vol_max_tube_set = 0.9*list(definition_tubes["wells"].values())[0]["totalLiquidVolume"]
+			reactions_tubes_set = number_tubes_needed(self.volTotalFactor, self.sumSamples, vol_max_tube_set)[1]
+			tips_polymerase_sets = 0
+			for reactions_tube in reactions_tubes_set:
+				volume_polymerase_tube = self.volPolymeraseFactor*reactions_tube
+				tips_polymerase_sets += math.ceil(volume_polymerase_tube/give_me_optimal_pipette(volume_polymerase_tube, self.pipR, self.pipL).max_volume)
+			self.masterMix = tips_polymerase_sets*user_variables.sets > 2
+		
+		if self.masterMix:
+			self.masterMixWells["Definition Liquid"] = protocol.define_liquid(name = "Master Mix",
+																			  description = "Eppendorf with the water and polymerase of all the sets. Leave empty!",
+																			  display_color = "#76a5af")
+		
 		return
 	
-class MapLabware:
+class PlateGrid:
 	"""
-	Class that will create and store the layout of the final plates so they can be exported at the end
-	for the user
+	Class that will store a value for every well of a plate in an array with the shape of the plate instead of in a DataFrame, which is only created
+	when the map is exported, so setting the values of the wells during the protocol does not have the overhead of pandas
+
+	There are 2 kinds of grids:
+		- numeric: the values are numbers stored in a float array, empty wells are 0
+		- names: the array has a reference to the value of each well, empty wells are None
 	"""
-	
-	def __init__(self, labware):
+	__slots__ = ("index_rows", "index_columns", "kind", "grid")
 
-		self.name_rows = list(labware.rows_by_name().keys())
-		self.name_columns = list(labware.columns_by_name().keys())
-		number_rows = len(self.name_rows)
-		number_columns = len(self.name_columns)
-		
-		self.map = pd.DataFrame(np.full((number_rows,number_columns),None),columns=self.name_columns,index=self.name_rows)
-		self.map.index.name = "Row/Column"
+	def __init__(self, name_rows, name_columns, kind = "names"):
+		if kind not in ["numeric", "names"]:
+			raise Exception(f"The kind of PlateGrid '{kind}' is not contemplated, only 'numeric' and 'names' are")
+
+		self.index_rows = {name_row:index_row for index_row, name_row in enumerate(name_rows)}
+		self.index_columns = {str(name_column):index_column for index_column, name_column in enumerate(name_columns)}
+		self.kind = kind
+
+		if kind == "numeric":
+			self.grid = np.zeros((len(self.index_rows), len(self.index_columns)), dtype = float)
+		else:
+			self.grid = np.full((len(self.index_rows), len(self.index_columns)), None, dtype = object)
 
 	def assign_value(self, value, row, column):
-		self.map.loc[row, column] = value
+		self.grid[self.index_rows[row], self.index_columns[str(column)]] = value
+
+	def assign_values(self, values, rows, columns):
+		# Assign at once the values to the cells (rows[i], columns[i]), if only 1 value is given it is assigned to all the cells
+		positions_rows = [self.index_rows[row] for row in rows]
+		positions_columns = [self.index_columns[str(column)] for column in columns]
+		self.grid[positions_rows, positions_columns] = values
+
+	def to_dataframe(self):
+		# The DataFrame is only created to export the map, with the same format that the maps had
+		map_plate = pd.DataFrame(self.grid, columns = list(self.index_columns.keys()), index = list(self.index_rows.keys()))
+		map_plate.index.name = "Row/Column"
+		return map_plate
 
 class NotSuitablePipette(Exception):
 	"""
@@ -678,6 +842,40 @@ def setting_labware (number_labware, labware_name, positions, protocol, module =
 
 	return all_plates
 
+def distance_deck_slots (slot_1, slot_2):
+	"""
+	Function that will calculate the distance in mm between the centres of 2 slots of the OT-2 deck
+
+	The OT-2 deck is a grid of 3 columns and 4 rows in which slot 1 is the front left one and slot 12 the trash,
+	the slots are 132.5mm apart in the X axis and 90.5mm in the Y axis
+
+	2 mandatory arguments are needed for this function
+	"""
+	# Find out the column and row of each of the slots
+	column_1, row_1 = (int(slot_1)-1)%3, (int(slot_1)-1)//3
+	column_2, row_2 = (int(slot_2)-1)%3, (int(slot_2)-1)//3
+
+	return math.sqrt(((column_1-column_2)*132.5)**2 + ((row_1-row_2)*90.5)**2)
+
+def sort_positions_by_trips (positions, trips_slots):
+	"""
+	Function that will sort the deck positions from the one with the lowest gantry travel to the one with the highest for a labware
+	that is going to be visited together with labwares that are already placed in the deck
+
+	The argument trips_slots is a dictionary with the slots of the labwares already placed as keys and the number of trips expected
+	between them and the labware that is going to be placed as values. The travel of a position is the sum of those trips multiplied by the
+	distance between slots, so setting_labware and define_tiprack will try first the positions with the least travel and, in case of deck conflict, the next ones
+
+	Positions with the same travel keep their original order
+
+	2 mandatory arguments are needed for this function
+	"""
+	travel_positions = {}
+	for position in positions.keys():
+		travel_positions[position] = sum(trips*distance_deck_slots(position, slot) for slot, trips in trips_slots.items())
+	
+	return dict(sorted(positions.items(), key = lambda position: travel_positions[position[0]]))
+
 def number_tubes_needed (vol_reactive_per_reaction_factor, number_reactions, vol_max_tube):
 	"""
 	Function that will return the number of tubes that is needed for a given number of reactions
@@ -711,6 +909,100 @@ def number_tubes_needed (vol_reactive_per_reaction_factor, number_reactions, vol
 	# When the volume can fit every tube (exit from the while loop) we return the number of tubes and the reactions that will fit in every tube
 	return (number_tubes, reactions_per_tube, volumes_tubes)
 
+def labware_accessors (labware):
+	"""
+	Function that will build, once the labware is loaded, the tables of its wells so they do not need to be generated again every time
+	that a well, a column or a row is needed, as it happens with the methods wells(), columns(), rows() and wells_by_name() of the labware
+
+	The tables are immutable: the wells, columns and rows are tuples (in the same order as the labware returns them) and
+	the tables by name are read-only dictionaries, so they can be shared by all the parts of the script without being modified by mistake
+
+	1 mandatory argument is needed for this function
+	"""
+	return MappingProxyType({"Wells":tuple(labware.wells()),
+							 "Columns":tuple(tuple(column) for column in labware.columns()),
+							 "Rows":tuple(tuple(row) for row in labware.rows()),
+							 "Wells By Name":MappingProxyType(dict(labware.wells_by_name())),
+							 "Columns By Name":MappingProxyType({name_column:tuple(column) for name_column, column in labware.columns_by_name().items()}),
+							 "Rows By Name":MappingProxyType({name_row:tuple(row) for name_row, row in labware.rows_by_name().items()})})
+
+def export_maps (maps, path_export, formats = ["xlsx"], name_values = "Sample", extra_columns = None, other_tables = None):
+	"""
+	Function that will export at once all the maps of the plates, DataFrames with the names of the rows and columns of the plate as index and columns,
+	in the given formats, so every map is read only once independently of the number of formats
+
+	The formats that can be given are:
+		- xlsx: 1 excel file with a sheet per map and per other table, written row by row with the write-only mode of openpyxl, faster and lighter than pandas.to_excel
+		- csv or tsv: 1 file per map and per other table, named with the path and the name of the map. The maps have the same format as the identity maps of LAPu
+		- long: 1 csv file with a row per filled well of all the maps and the columns Plate, Well, name_values and the extra columns
+
+	The values of extra_columns are dictionaries with the names of the maps as keys and, as values, a value for all the wells of that map or a DataFrame with a value for each well
+
+	It returns the list of files that have been written
+
+	2 mandatory arguments and 4 optional are needed for this function
+	"""
+	# Check that all the formats can be exported
+	formats_allowed = ["xlsx", "csv", "tsv", "long"]
+	if len(formats) == 0 or any(format_export not in formats_allowed for format_export in formats):
+		raise Exception(f"The formats of the maps to export need to be one or more of the following ones: {', '.join(formats_allowed)}. The ones given are: {', '.join(map(str, formats))}")
+
+	if extra_columns == None:
+		extra_columns = {}
+	if other_tables == None:
+		other_tables = {}
+
+	# Rows of every map and table, the maps keep the names of the rows in the first column and the empty wells (None or NaN, which is not equal to itself) are empty cells
+	rows_tables = {}
+	for name_map, map_plate in maps.items():
+		rows_tables[name_map] = [[map_plate.index.name if map_plate.index.name != None else ""] + [str(name_column) for name_column in map_plate.columns]]
+		for row_map in map_plate.itertuples(name = None):
+			rows_tables[name_map].append([None if value is None or value != value else value for value in row_map])
+	for name_table, table in other_tables.items():
+		rows_tables[name_table] = [list(table.columns)] + [list(row_table) for row_table in table.itertuples(index = False, name = None)]
+
+	files_exported = []
+
+	if "xlsx" in formats:
+		workbook = Workbook(write_only = True)
+		for name_table, rows_table in rows_tables.items():
+			sheet = workbook.create_sheet(title = name_table)
+			for row_table in rows_table:
+				sheet.append(row_table)
+		workbook.save(f"{path_export}.xlsx")
+		files_exported.append(f"{path_export}.xlsx")
+
+	for format_export, delimiter in [("csv", ","), ("tsv", "\t")]:
+		if format_export in formats:
+			for name_table, rows_table in rows_tables.items():
+				with open(f"{path_export}_{name_table}.{format_export}", "w", newline = "") as file_table:
+					csv.writer(file_table, delimiter = delimiter).writerows(rows_table)
+				files_exported.append(f"{path_export}_{name_table}.{format_export}")
+
+	if "long" in formats:
+		# The wells of each map are given in the same order as the labware, column by column
+		with open(f"{path_export}_long.csv", "w", newline = "") as file_long:
+			writer_long = csv.writer(file_long)
+			writer_long.writerow(["Plate", "Well", name_values] + list(extra_columns.keys()))
+			for name_map, map_plate in maps.items():
+				for name_column in map_plate.columns:
+					for name_row in map_plate.index:
+						value = map_plate.at[name_row, name_column]
+						if value is None or value != value:
+							continue
+
+						values_extra = []
+						for values_column in extra_columns.values():
+							value_extra = values_column.get(name_map)
+							if hasattr(value_extra, "at"): # A DataFrame with a value per well
+								value_extra = value_extra.at[name_row, name_column]
+							values_extra.append(value_extra)
+
+						writer_long.writerow([name_map, f"{name_row}{name_column}", value] + values_extra)
+		files_exported.append(f"{path_export}_long.csv")
+
+	return files_exported
+
 def generator_positions (labware_wells_name):
 	"""
 	Function that will return the next element everytime is called from a given list
@@ -928,13 +1220,193 @@ def z_positions_mix_15eppendorf (vol_mixing):
 	elif vol_mixing > 1250:
 		return [position_100, position_500, position_1250]
 
-def mixing_eppendorf_15 (location_tube, volume_tube, volume_mixing, pipette):
+def mixing_profile_15eppendorf (volume_tube, volume_mixing, liquid_class, mixing_profiles):
+	"""
+	Function that will establish how a 1.5mL eppendorf tube is going to be mixed according to the volume it contains,
+	the volume handled by the pipette in each movement and the type of liquid that is inside of the tube
+
+	The heights are the ones of the liquid level model of the 1.5mL eppendorfs (z_positions_mix_15eppendorf) and the number of cycles
+	is the minimum needed to move the content of the tube the number of times established in the liquid class, with at least 'Min Cycles Per Height' in each height
+
+	4 mandatory arguments are needed for this function
+	"""
+	# Check that the liquid class is one of the defined ones
+	if liquid_class not in mixing_profiles.keys():
+		raise Exception(f"The liquid class '{liquid_class}' does not have a mixing profile. The mixing profiles defined are: {', '.join(mixing_profiles.keys())}")
+
+	profile = mixing_profiles[liquid_class]
+
+	# Take the heights of the liquid level model without repeating them, mixing twice at the same height is only extra cycles
+	heights_mixing = sorted(set(z_positions_mix_15eppendorf (volume_tube)))
+
+	# Minimum number of aspirate/dispense cycles that move the whole content of the tube the times set by the liquid class
+	total_cycles = math.ceil(profile["Tube Turnovers"]*volume_tube/volume_mixing)
+	cycles_per_height = max(int(profile["Min Cycles Per Height"]), math.ceil(total_cycles/len(heights_mixing)))
+
+	# If there is only 1 height it makes no sense to move liquid from the bottom to the top
+	if len(heights_mixing) == 1:
+		cross_strokes = 0
+	else:
+		cross_strokes = int(profile["Cross Strokes"])
+
+	return {"Heights": heights_mixing,
+			"Cycles Per Height": cycles_per_height,
+			"Flow Rate Factor": profile["Flow Rate Factor"],
+			"Touch Tip Rounds": int(profile["Touch Tip Rounds"]),
+			"Cross Strokes": cross_strokes}
+
+def set_liquid_class (pipettes, liquid_class, liquid_classes, default_flow_rates, protocol):
+	"""
+	Function that will set the aspirate, dispense and blow out flow rates of the given pipettes to the ones of a liquid class
+	and the seconds that the pipettes wait after every aspiration and dispense
+
+	The rates of the liquid classes are factors of the default flow rates of each pipette, so the same liquid class can be used with any pipette,
+	or 'max' to use the maximum flow rate of the pipette. No rate is set higher than the maximum flow rate of the pipette
+	If the liquid class is None, the default flow rates of the pipettes are restored and the delays are removed
+
+	The delays replace the aspirate and dispense of the pipettes by ones that wait after them, which is only done in the versions of Opentrons
+	where it has been checked that the transfers, distributions and mixes call the aspirate and dispense of the pipette, so they also perform the delays
+
+	5 mandatory arguments are needed for this function
+	"""
+	# Maximum flow rates of aspiration, dispense and blow out, in uL/s, of the pipettes of the OT-2 as they are in their definitions
+	max_flow_rates = {"p10_single":[50, 50, 1000], "p10_multi":[50, 50, 1000], "p50_single":[100, 100, 1000], "p50_multi":[100, 100, 1000],
+					  "p300_single":[600, 600, 1000], "p300_multi":[600, 600, 1000], "p1000_single":[2000, 2000, 1000],
+					  "p20_single_gen2":[24, 24, 24], "p20_multi_gen2":[24, 24, 24], "p300_single_gen2":[275, 275, 275],
+					  "p300_multi_gen2":[275, 275, 275], "p1000_single_gen2":[812, 812, 812]}
+
+	# Check that the liquid class is one of the defined ones
+	if liquid_class != None and liquid_class not in liquid_classes.keys():
+		raise Exception(f"The liquid class '{liquid_class}' is not defined. The liquid classes defined are: {', '.join(liquid_classes.keys())}")
+
+	# Major versions of Opentrons in which the transfers, distributions and mixes call the aspirate and dispense of the pipette
+	versions_with_delays = [6, 7, 8]
+
+	if liquid_class == None:
+		factors_class = {"Aspirate Rate":1, "Dispense Rate":1, "Blow Out Rate":1, "Aspirate Delay":0, "Dispense Delay":0}
+	else:
+		factors_class = liquid_classes[liquid_class]
+
+	# Check that the delays will be performed in the complex commands of the installed version of Opentrons
+	if factors_class.get("Aspirate Delay", 0) > 0 or factors_class.get("Dispense Delay", 0) > 0:
+		import opentrons
+		version_opentrons = str(getattr(opentrons, "__version__", "unknown"))
+		if version_opentrons.split(".")[0] not in [str(version) for version in versions_with_delays]:
+			raise Exception(f"The liquid class '{liquid_class}' has delays, which can only be performed with the major versions {', '.join([str(version) for version in versions_with_delays])} of Opentrons and the installed one is {version_opentrons}. Set the delays of the liquid class to 0 or use one of those versions")
+
+	def with_delay (command, seconds):
+		# Command of the pipette that performs the given one and then waits the seconds of the liquid class
+		def command_and_delay (*args, **kwargs):
+			result_command = command(*args, **kwargs)
+			protocol.delay(seconds = seconds)
+			return result_command
+		return command_and_delay
+
+	# Set the rates and delays in all the pipettes that have been loaded
+	for pipette in pipettes:
+		if pipette == None:
+			continue
+
+		if pipette.name not in max_flow_rates.keys():
+			raise Exception(f"The maximum flow rates of the pipette '{pipette.name}' are not known, so a liquid class cannot be set in it. The pipettes contemplated are: {', '.join(max_flow_rates.keys())}")
+
+		rates_pipette = {}
+		for index_rate, name_rate in enumerate(["Aspirate", "Dispense", "Blow Out"]):
+			max_rate = max_flow_rates[pipette.name][index_rate]
+			if factors_class[f"{name_rate} Rate"] == "max":
+				rates_pipette[name_rate] = max_rate
+			else:
+				rates_pipette[name_rate] = min(default_flow_rates[pipette.mount][name_rate]*factors_class[f"{name_rate} Rate"], max_rate)
+		pipette.flow_rate.aspirate = rates_pipette["Aspirate"]
+		pipette.flow_rate.dispense = rates_pipette["Dispense"]
+		pipette.flow_rate.blow_out = rates_pipette["Blow Out"]
+
+		# The delays replace the aspirate and dispense of this pipette by ones that wait after them, the ones of a previous liquid class are removed first
+		pipette.__dict__.pop("aspirate", None)
+		pipette.__dict__.pop("dispense", None)
+		if factors_class.get("Aspirate Delay", 0) > 0:
+			pipette.aspirate = with_delay(pipette.aspirate, factors_class["Aspirate Delay"])
+		if factors_class.get("Dispense Delay", 0) > 0:
+			pipette.dispense = with_delay(pipette.dispense, factors_class["Dispense Delay"])
+
+	return
+
+def liquid_classes_table_to_dict (table_classes, table_reagents, reagents, touch_tip = True):
+	"""
+	Function that will check the sheets LiquidClasses and ReagentLiquidClasses of a variable file and return them as 2 dictionaries,
+	one with the liquid classes and their rates, delays and touch tip and another one with the liquid class of each reagent
+
+	The rates can be a factor of the default flow rate of the pipette or 'max', and the delays, in seconds, are 0 if left empty
+	The column 'Touch Tip' is only read if touch_tip is True. If it is left empty in a class, its value is None
+	If a table is not given (it is not a DataFrame), its dictionary is None
+
+	3 mandatory arguments are needed for this function and 1 optional
+	"""
+	columns_rates = ["Aspirate Rate", "Dispense Rate", "Blow Out Rate"]
+	columns_delays = ["Aspirate Delay", "Dispense Delay"]
+	values_true = ["true", "TRUE", "True", 1, True]
+	values_false = ["false", "FALSE", "False", 0, False]
+
+	liquid_classes = None
+	if isinstance(table_classes, pd.DataFrame):
+		if not all(item in list(table_classes.columns) for item in ["Liquid Class"] + columns_rates + (["Touch Tip"] if touch_tip else [])):
+			raise Exception(f"'LiquidClasses' sheet table needs to have the columns: {', '.join(['Liquid Class'] + columns_rates + (['Touch Tip'] if touch_tip else []))}. The columns {' and '.join(columns_delays)} are optional")
+		if table_classes[["Liquid Class"] + columns_rates].isna().any().any():
+			raise Exception(f"The columns {', '.join(['Liquid Class'] + columns_rates)} of the sheet 'LiquidClasses' cannot have empty cells")
+		if pd.Series(table_classes["Liquid Class"].values).is_unique == False:
+			raise Exception("The values of the column 'Liquid Class' in the sheet 'LiquidClasses' have to be unique")
+
+		liquid_classes = {}
+		for row in table_classes.to_dict("records"):
+			values_class = {}
+			for column in columns_rates:
+				if str(row[column]).strip().lower() == "max":
+					values_class[column] = "max"
+				elif pd.api.types.is_number(row[column]) and row[column] > 0:
+					values_class[column] = row[column]
+				else:
+					raise Exception(f"The values of the columns {', '.join(columns_rates)} in the sheet 'LiquidClasses' have to be greater than 0 or 'max'")
+			for column in columns_delays:
+				if column not in row.keys() or pd.isna(row[column]):
+					values_class[column] = 0
+				elif pd.api.types.is_number(row[column]) and row[column] >= 0:
+					values_class[column] = row[column]
+				else:
+					raise Exception(f"The values of the columns {' and '.join(columns_delays)} in the sheet 'LiquidClasses' are seconds and cannot be negative. If left empty, 0 is assumed")
+			if touch_tip:
+				if pd.isna(row["Touch Tip"]):
+					values_class["Touch Tip"] = None
+				elif row["Touch Tip"] in values_true + values_false:
+					values_class["Touch Tip"] = row["Touch Tip"] in values_true
+				else:
+					raise Exception("The column 'Touch Tip' of the sheet 'LiquidClasses' only accepts 2 values, True or False. If left empty, the touch tip variables of the protocol will be used")
+			liquid_classes[row["Liquid Class"]] = values_class
+
+	reagent_liquid_classes = None
+	if isinstance(table_reagents, pd.DataFrame):
+		if not all(item in list(table_reagents.columns) for item in ["Reagent", "Liquid Class"]):
+			raise Exception("'ReagentLiquidClasses' sheet table needs to have 2 columns: 'Reagent' and 'Liquid Class'")
+		if table_reagents[["Reagent", "Liquid Class"]].isna().any().any():
+			raise Exception("None of the cells of the sheet 'ReagentLiquidClasses' can be left empty")
+		if pd.Series(table_reagents["Reagent"].values).is_unique == False:
+			raise Exception("The values of the column 'Reagent' in the sheet 'ReagentLiquidClasses' have to be unique")
+		if not all(reagent in reagents for reagent in table_reagents["Reagent"].values):
+			raise Exception(f"The values of the column 'Reagent' in the sheet 'ReagentLiquidClasses' can only be: {', '.join(reagents)}")
+
+		reagent_liquid_classes = dict(zip(table_reagents["Reagent"].values, table_reagents["Liquid Class"].values))
+
+	return liquid_classes, reagent_liquid_classes
+
+def mixing_eppendorf_15 (location_tube, volume_tube, volume_mixing, pipette, mixing_profile = None):
 	"""
 	Function that will perform the mixing of a 1.5mL eppendorf tube with a given pipette
 
 	The pipette shoudl have a tip to perform this mixing
 
-	5 arguments are needed for this function
+	If a mixing profile (output of mixing_profile_15eppendorf) is given, the cycles, heights, flow rate, touch tips and strokes
+	will be the ones of the profile instead of the fixed extensive mixing
+
+	4 mandatory arguments and 1 optional are needed for this function
 	"""
 
 	# Check if the pipette has a tip
@@ -945,6 +1417,25 @@ def mixing_eppendorf_15 (location_tube, volume_tube, volume_mixing, pipette):
 	if pipette.min_volume > volume_mixing or pipette.max_volume < volume_mixing:
 		raise Exception(f"Volume of mixing, {volume_mixing}uL, should be a value between the {pipette} minimum and maximum aspiration/dispense volume which are {pipette.min_volume}uL and {pipette.max_volume}uL, respectively")
 	
+	# If there is a mixing profile we only perform the movements of the profile
+	if mixing_profile != None:
+		# Mix the cycles of the profile in each of the heights with the flow rate of the liquid class
+		for position in mixing_profile["Heights"]:
+			pipette.mix(mixing_profile["Cycles Per Height"], volume_mixing, location_tube.bottom(z = position), rate = mixing_profile["Flow Rate Factor"])
+		
+		for i in range(mixing_profile["Touch Tip Rounds"]):
+			pipette.touch_tip(location_tube, v_offset = -20, radius = 0.7, speed = 30)
+		
+		# Move liquid from the bottom to the top of the tube to homogenize the heights between them
+		for i in range(mixing_profile["Cross Strokes"]):
+			pipette.aspirate(volume_mixing, location_tube.bottom(z = mixing_profile["Heights"][0]), rate = mixing_profile["Flow Rate Factor"])
+			pipette.dispense(volume_mixing, location_tube.bottom(z = mixing_profile["Heights"][-1]), rate = mixing_profile["Flow Rate Factor"])
+		
+		# Finally we blow out in the centre of the tube any rests that have been left in the tip
+		pipette.blow_out(location_tube.center())
+		
+		return
+	
 	# Check the positions in which the mixing is going to be performed
 	positions_mixing = z_positions_mix_15eppendorf (volume_tube) # This is the part that is customized for the 1500uL eppendorfs
 	
@@ -1053,7 +1544,7 @@ def tube_to_tube_transfer (vol_transfer_reaction, positions_source_tubes, reacti
 
 			# Pick a tip in case the pipette that is going to transfer the volume does not have it
 			if pipette_use.has_tip == False:
-				check_tip_and_pick (optimal_pipette, tiprack, dict(zip(protocol.deck.keys(), protocol.deck.values())), protocol, replace_tiprack = user_variables.replaceTiprack, initial_tip = first_tip, same_tiprack = tipracks_same)
+				check_tip_and_pick (optimal_pipette, tiprack, sort_positions_by_trips(dict(zip(protocol.deck.keys(), protocol.deck.values())), program_variables.tripsTipracks), protocol, replace_tiprack = user_variables.replaceTiprack, initial_tip = first_tip, same_tiprack = tipracks_same)
 
 			# Transfer volume
 			if new_tip != "aspirate": # If it is not aspirate, we are not going to change any tube in this transfer, so we directly do the action
@@ -1075,7 +1566,7 @@ def tube_to_tube_transfer (vol_transfer_reaction, positions_source_tubes, reacti
 				# Now we transfer chnaging the tip for every movement
 				for volume in volumes_transfer:
 					if pipette_use.has_tip == False:
-						check_tip_and_pick(pipette_use, tiprack, dict(zip(protocol.deck.keys(), protocol.deck.values())), protocol, replace_tiprack = user_variables.replaceTiprack, initial_tip = first_tip, same_tiprack = tipracks_same)
+						check_tip_and_pick(pipette_use, tiprack, sort_positions_by_trips(dict(zip(protocol.deck.keys(), protocol.deck.values())), program_variables.tripsTipracks), protocol, replace_tiprack = user_variables.replaceTiprack, initial_tip = first_tip, same_tiprack = tipracks_same)
 					pipette_use.transfer(volume, current_source_tube[0], final_tube, new_tip = "never")
 					pipette_use.drop_tip()
 
@@ -1164,14 +1655,23 @@ def run(protocol:opentrons.protocol_api.ProtocolContext):
 
 	if "TemperatureProfile" in name_sheets:
 		temperature_variables = excel_variables.get("TemperatureProfile")
-		user_variables = UserVariables(general_variables, plate_variables, pip_variables, reagents_variables, module_variables, temperature_variables)
+		user_variables = UserVariables(general_variables, plate_variables, pip_variables, reagents_variables, module_variables, temperature_variables, mixing_profiles = excel_variables.get("MixingProfiles"), liquid_classes = excel_variables.get("LiquidClasses"), reagent_liquid_classes = excel_variables.get("ReagentLiquidClasses"))
 	else:
-		user_variables = UserVariables(general_variables, plate_variables, pip_variables, reagents_variables, module_variables)
+		user_variables = UserVariables(general_variables, plate_variables, pip_variables, reagents_variables, module_variables, mixing_profiles = excel_variables.get("MixingProfiles"), liquid_classes = excel_variables.get("LiquidClasses"), reagent_liquid_classes = excel_variables.get("ReagentLiquidClasses"))
 
 	user_variables.check()
 	program_variables = SettedParameters()
 	program_variables.assign_variables(user_variables, protocol)
 	
+	#----------------------------------------------------------------------------------------------------------------------------------------------------------------------------------------------------------------
+	# Expected trips of the transfer plan between labwares, they are used to place the labware in the slots where the gantry travels the least
+	# Every sample and every well of mix is transferred to the final plates and its tip is dropped after in the trash (slot 12)
+	if user_variables.multiDispenseSamples:
+		trips_samples = program_variables.sumSamples
+	else:
+		trips_samples = program_variables.sumSamples*int(user_variables.sets)
+	trips_mix = program_variables.sumSamples*int(user_variables.sets)
+	
 	#----------------------------------------------------------------------------------------------------------------------------------------------------------------------------------------------------------------
 	# Setting the HS needed because they have more restrictions in the OT-2 and cannot be done with the setting labware function because setting the HS in a position will not give errors but after it wont work
 	# First let's find how many tubes we need of mixes in case we have the HS
@@ -1188,7 +1688,11 @@ def run(protocol:opentrons.protocol_api.ProtocolContext):
 		
 		# You cannot put the HS in some positions, even if the opentrons app doesnt raise errors
 		possible_positions_HS = {key: protocol.deck[key] for key in [1, 3, 4, 6, 7, 10]}
-
+		
+		# The sets are distributed to the final plate, so if it is in the thermocycler the HS will be as close as possible to it
+		if user_variables.presenceTermo:
+			possible_positions_HS = sort_positions_by_trips(possible_positions_HS, {7:trips_mix})
+		
 		number_hs = math.ceil(number_tubes_mix_hs*user_variables.numberPrimerSet/number_wells_labware)
 		
 		# Establish the hs_mod if possible
@@ -1204,6 +1708,30 @@ def run(protocol:opentrons.protocol_api.ProtocolContext):
 			module.load_labware(user_variables.APINameLabwareHS, label = f"Eppendorf Rack with Mix Slot {position}")
 			program_variables.hs_mods[position] = module
 
+	#----------------------------------------------------------------------------------------------------------------------------------------------------------------------------------------------------------------
+	# Final Plate(s)
+	# Set the final plates which number has been calculates in the assign_variables method of the clas SettedParameters
+	if user_variables.presenceTermo: # If there is a thermocycler attach we need to load the labware into the module
+		program_variables.tc_mod.load_labware(user_variables.APINameFinalPlate, label = f"Final PCR Plate Slot 7")
+		labware_final = {7: program_variables.tc_mod.labware}
+	else: # The final plates are going to be in slots,not in modules
+		# All the transfers are dispensed in the final plates, which are placed close to the trash and the sets in the HS
+		trips_final = {12:trips_samples+trips_mix}
+		for position_hs in program_variables.hs_mods.keys():
+			trips_final[position_hs] = trips_mix/len(program_variables.hs_mods)
+		labware_final = setting_labware(len(program_variables.finalPlates),
+										user_variables.APINameFinalPlate,
+										sort_positions_by_trips(dict(zip(protocol.deck.keys(), protocol.deck.values())), trips_final),
+										protocol,
+										label = "Final Plate")
+	
+	# Now we are going to assign to which final plates the samples from the source plates should go
+	for index_labware, labware in enumerate(labware_final.items()):
+		program_variables.finalPlates[index_labware]["Position"] = labware[0]
+		program_variables.finalPlates[index_labware]["Opentrons Place"] = labware[1]
+		program_variables.finalPlates[index_labware]["Accessors"] = labware_accessors(labware[1])
+		program_variables.finalPlates[index_labware]["Map Samples with Sets"] = PlateGrid(program_variables.finalPlates[index_labware]["Accessors"]["Rows By Name"].keys(), program_variables.finalPlates[index_labware]["Accessors"]["Columns By Name"].keys())
+
 	#----------------------------------------------------------------------------------------------------------------------------------------------------------------------------------------------------------------
 	# Source Plates
 	# We start setting the source labware which number has been provided
@@ -1212,10 +1740,13 @@ def run(protocol:opentrons.protocol_api.ProtocolContext):
 	for name_plate in user_variables.nameSourcePlates[:user_variables.numberSourcePlates]:
 		labels.append(f"Source Plate '{name_plate}'")
 
-	# Set the labware
+	# Set the labware as close as possible to the final plates, where all the samples are transferred
+	trips_source = {}
+	for final_plate in program_variables.finalPlates.values():
+		trips_source[final_plate["Position"]] = trips_samples/len(program_variables.finalPlates)
 	labware_source = setting_labware(user_variables.numberSourcePlates,
 									 user_variables.APINameSamplePlate,
-									 dict(zip(protocol.deck.keys(), protocol.deck.values())),
+									 sort_positions_by_trips(dict(zip(protocol.deck.keys(), protocol.deck.values())), trips_source),
 									 protocol,
 									 label = labels)
 
@@ -1225,6 +1756,7 @@ def run(protocol:opentrons.protocol_api.ProtocolContext):
 	for index_labware, labware in enumerate(labware_source.items()):
 		program_variables.samplePlates[index_labware]["Position"] = labware[0]
 		program_variables.samplePlates[index_labware]["Opentrons Place"] = labware[1]
+		program_variables.samplePlates[index_labware]["Accessors"] = labware_accessors(labware[1])
 		
 		# Establish the maps of the source plate
 		if not pd.isna(user_variables.mapID[index_labware]):# There is a map of IDs attach so we need to establish it and check that the dimensions are equivalent
@@ -1233,8 +1765,8 @@ def run(protocol:opentrons.protocol_api.ProtocolContext):
 			program_variables.samplePlates[index_labware]["Map Names"].columns = program_variables.samplePlates[index_labware]["Map Names"].columns.map(str)
 
 			# Let's check that the labware and map have the same names of the rows and columns
-			row_names = list(labware[1].rows_by_name().keys())
-			columns_names = list(labware[1].columns_by_name().keys())
+			row_names = list(program_variables.samplePlates[index_labware]["Accessors"]["Rows By Name"].keys())
+			columns_names = list(program_variables.samplePlates[index_labware]["Accessors"]["Columns By Name"].keys())
 			
 			rows_map = list(program_variables.samplePlates[index_labware]['Map Names'].index.values)
 			columns_map = list(map(str, list(program_variables.samplePlates[index_labware]['Map Names'].columns.values)))
@@ -1249,17 +1781,17 @@ The columns and rows of the Maps of DNA Parts {user_variables.mapID[index_labwar
 		- Sheet Columns: {columns_map}
 		- Sheet Rows: {rows_map}""")
 		else: # If there is not a map of IDs attached we just create one empty 
-			program_variables.samplePlates[index_labware]["Map Names"] = pd.DataFrame(np.nan, index = list(labware[1].rows_by_name().keys()), columns = list(labware[1].columns_by_name().keys()))
+			program_variables.samplePlates[index_labware]["Map Names"] = pd.DataFrame(np.nan, index = list(program_variables.samplePlates[index_labware]["Accessors"]["Rows By Name"].keys()), columns = list(program_variables.samplePlates[index_labware]["Accessors"]["Columns By Name"].keys()))
 		
 		# Let's find out th elist of wells with samples
-		list_wells_samples = program_variables.samplePlates[index_labware]["Opentrons Place"].wells()
+		list_wells_samples = list(program_variables.samplePlates[index_labware]["Accessors"]["Wells"])
 		for name_well in program_variables.samplePlates[index_labware]["Control Positions"]:
-			list_wells_samples.remove(program_variables.samplePlates[index_labware]["Opentrons Place"][name_well])
+			list_wells_samples.remove(program_variables.samplePlates[index_labware]["Accessors"]["Wells By Name"][name_well])
 		# Now this list will include the samples to pick and not to pick as a DNA template
 		list_wells_samples = list_wells_samples[program_variables.samplePlates[index_labware]["Index First Well Sample"]:(program_variables.samplePlates[index_labware]["Index First Well Sample"]+program_variables.samplePlates[index_labware]["Number Samples"])]
 
 		# Set the liquid of samples for each position that will have samples
-		for well in program_variables.samplePlates[index_labware]["Opentrons Place"].wells():
+		for well in program_variables.samplePlates[index_labware]["Accessors"]["Wells"]:
 			if well._core._name in program_variables.samplePlates[index_labware]["Control Positions"]:
 				well.load_liquid(program_variables.liquid_control, volume = 0.9*vol_max_well_source_labware)
 			elif well._core._name in program_variables.samplePlates[index_labware]["Positions Not Perform PCR"]:
@@ -1267,25 +1799,6 @@ The columns and rows of the Maps of DNA Parts {user_variables.mapID[index_labwar
 			elif well in list_wells_samples: # It will only get into this conditional if it is not a NOT PICK sample
 				well.load_liquid(program_variables.liquid_samples, volume = 0.9*vol_max_well_source_labware)
 	
-	#----------------------------------------------------------------------------------------------------------------------------------------------------------------------------------------------------------------
-	# Final Plate(s)
-	# Set the final plates which number has been calculates in the assign_variables method of the clas SettedParameters
-	if user_variables.presenceTermo: # If there is a thermocycler attach we need to load the labware into the module
-		program_variables.tc_mod.load_labware(user_variables.APINameFinalPlate, label = f"Final PCR Plate Slot 7")
-		labware_final = {7: program_variables.tc_mod.labware}
-	else: # The final plates are going to be in slots,not in modules
-		labware_final = setting_labware(len(program_variables.finalPlates),
-										user_variables.APINameFinalPlate,
-										dict(zip(protocol.deck.keys(), protocol.deck.values())),
-										protocol,
-										label = "Final Plate")
-	
-	# Now we are going to assign to which final plates the samples from the source plates should go
-	for index_labware, labware in enumerate(labware_final.items()):
-		program_variables.finalPlates[index_labware]["Position"] = labware[0]
-		program_variables.finalPlates[index_labware]["Opentrons Place"] = labware[1]
-		program_variables.finalPlates[index_labware]["Map Samples with Sets"] = MapLabware(labware[1])
-
 	#----------------------------------------------------------------------------------------------------------------------------------------------------------------------------------------------------------------
 	# Setting the coldblocks that we need for the reactives
 	# Let's find how many tubes we need for all the reactives
@@ -1294,15 +1807,27 @@ The columns and rows of the Maps of DNA Parts {user_variables.mapID[index_labwar
 	
 	total_number_tubes = 0
 	
+	# Master mix of water and polymerase for all the sets
+	# Each master mix tube is filled with 1 reaction more than the ones it gives to the set tubes, so the last aspiration does not reach the bottom of the tube
+	reactions_water_polymerase = program_variables.sumSamples*int(user_variables.sets)
+	if program_variables.masterMix:
+		number_tubes_master_mix, program_variables.masterMixWells["Reactions Per Tube"], program_variables.masterMixWells["Volumes"] = number_tubes_needed (program_variables.volMasterMix,
+																																	   reactions_water_polymerase,
+																																	   vol_max_tube*0.9-program_variables.volMasterMix)
+		program_variables.masterMixWells["Reactions Filled Per Tube"] = [reactions_tube+1 for reactions_tube in program_variables.masterMixWells["Reactions Per Tube"]]
+		program_variables.masterMixWells["Volumes"] = [program_variables.volMasterMix*reactions_tube for reactions_tube in program_variables.masterMixWells["Reactions Filled Per Tube"]]
+		reactions_water_polymerase += number_tubes_master_mix
+		total_number_tubes += number_tubes_master_mix
+	
 	# Water
 	number_tubes_water, program_variables.reactiveWells["Water"]["Reactions Per Tube"], program_variables.reactiveWells["Water"]["Volumes"] = number_tubes_needed (program_variables.volWaterFactor,
-																																								   program_variables.sumSamples*int(user_variables.sets),
+																																								   reactions_water_polymerase,
 																																								   vol_max_tube*0.9)
 	total_number_tubes += number_tubes_water
 
 	# Polymerase
 	number_tubes_poly, program_variables.reactiveWells["Polymerase"]["Reactions Per Tube"], program_variables.reactiveWells["Polymerase"]["Volumes"]  = number_tubes_needed (program_variables.volPolymeraseFactor,
-																																											 program_variables.sumSamples*int(user_variables.sets),
+																																											 reactions_water_polymerase,
 																																											 vol_max_tube*0.9)
 	total_number_tubes += number_tubes_poly
 
@@ -1325,12 +1850,38 @@ The columns and rows of the Maps of DNA Parts {user_variables.mapID[index_labwar
 	
 	# Set the number of tubes in the coldblock
 	number_coldblocks = math.ceil (total_number_tubes/len(labware_context.get_labware_definition(user_variables.APINameEppendorfPlate)["wells"]))
+	# The reagents go to the tubes of the sets, which are in the coldblocks themselves if there is no HS
+	number_tubes_sets = sum(len(set_primers["Volumes"]) for set_primers in program_variables.setsWells.values())
+	if program_variables.masterMix:
+		# Water and polymerase go to the master mix tubes, which are split once into the set tubes
+		trips_reagents_mix = 2*len(program_variables.masterMixWells["Volumes"]) + number_tubes_sets*(1 + int(user_variables.numberPrimerSet)*int(program_variables.volPrimerFactor > 0))
+	else:
+		trips_reagents_mix = number_tubes_sets*(int(program_variables.volWaterFactor > 0) + int(program_variables.volPolymeraseFactor > 0) + int(user_variables.numberPrimerSet)*int(program_variables.volPrimerFactor > 0))
+	trips_coldblocks = {}
+	if user_variables.presenceHS == False:
+		for final_plate in program_variables.finalPlates.values():
+			trips_coldblocks[final_plate["Position"]] = trips_mix/len(program_variables.finalPlates)
+	for position_hs in program_variables.hs_mods.keys():
+		trips_coldblocks[position_hs] = trips_reagents_mix/len(program_variables.hs_mods)
+	
 	coldblocks = setting_labware (number_coldblocks,
 								  user_variables.APINameEppendorfPlate,
-								  dict(zip(protocol.deck.keys(), protocol.deck.values())),
+								  sort_positions_by_trips(dict(zip(protocol.deck.keys(), protocol.deck.values())), trips_coldblocks),
 								  protocol,
 								  label = "Reagents")
 	
+	# The tip racks are defined when they are needed, so we only establish the trips of the tips for them to be placed close to the labware where the liquids are aspirated and the trash
+	program_variables.tripsTipracks[12] = trips_samples+trips_mix+trips_reagents_mix
+	for source_plate in program_variables.samplePlates.values():
+		program_variables.tripsTipracks[source_plate["Position"]] = trips_samples/len(program_variables.samplePlates)
+	for position_coldblock in coldblocks.keys():
+		if user_variables.presenceHS:
+			program_variables.tripsTipracks[position_coldblock] = trips_reagents_mix/len(coldblocks)
+		else:
+			program_variables.tripsTipracks[position_coldblock] = (trips_reagents_mix+trips_mix)/len(coldblocks)
+	for position_hs in program_variables.hs_mods.keys():
+		program_variables.tripsTipracks[position_hs] = trips_mix/len(program_variables.hs_mods)
+	
 	#----------------------------------------------------------------------------------------------------------------------------------------------------------------------------------------------------------------
 	# Set the places of the reagents and fill the dictionaries of the different kind of labwares
 	# Start with the coldblock(s) labware that for sure it is in it
@@ -1349,6 +1900,12 @@ The columns and rows of the Maps of DNA Parts {user_variables.mapID[index_labwar
 			program_variables.reactiveWells[reagent_type]["Positions"].append(well_tube_eppendorf)
 			well_tube_eppendorf.load_liquid(liquid = program_variables.reactiveWells[reagent_type]["Definition Liquid"], volume = math.ceil(volume_tube))
 
+	# The master mix tubes are always in the coldblock
+	for volume_tube in program_variables.masterMixWells["Volumes"]:
+		well_tube_eppendorf = next(generator_positions_reagents)
+		program_variables.masterMixWells["Positions"].append(well_tube_eppendorf)
+		well_tube_eppendorf.load_liquid(liquid = program_variables.masterMixWells["Definition Liquid"], volume = 0)
+
 	# Now we state the mix tubes, which can go in the HS or the Coldblock
 	if user_variables.presenceHS == False: # They go in the coldblock
 		for index_set in range(int(user_variables.sets)):
@@ -1375,17 +1932,124 @@ The columns and rows of the Maps of DNA Parts {user_variables.mapID[index_labwar
 		tubes_sets += set_primers["Positions"]
 		reactions_tubes += set_primers["Reactions Per Tube"]
 	
-	# Transfer Water
-	if program_variables.volWaterFactor > 0:
+	if program_variables.masterMix:
+		# Water and polymerase are transferred once to the master mix tubes, mixed and split into the set tubes, only then the primers of each set are added
+		set_liquid_class([program_variables.pipR, program_variables.pipL], program_variables.reagentLiquidClasses["Water"], program_variables.liquidClasses, program_variables.defaultFlowRates, protocol)
 		tube_to_tube_transfer(program_variables.volWaterFactor,
 							  program_variables.reactiveWells["Water"]["Positions"],
 							  program_variables.reactiveWells["Water"]["Reactions Per Tube"],
-							  tubes_sets,
-							  reactions_tubes[:],
+							  program_variables.masterMixWells["Positions"],
+							  program_variables.masterMixWells["Reactions Filled Per Tube"][:],
 							  program_variables,
 							  user_variables, protocol)
-
-	# Transfer Primers
+		
+		set_liquid_class([program_variables.pipR, program_variables.pipL], program_variables.reagentLiquidClasses["Polymerase"], program_variables.liquidClasses, program_variables.defaultFlowRates, protocol)
+		tube_to_tube_transfer(program_variables.volPolymeraseFactor,
+							  program_variables.reactiveWells["Polymerase"]["Positions"],
+							  program_variables.reactiveWells["Polymerase"]["Reactions Per Tube"],
+							  program_variables.masterMixWells["Positions"],
+							  program_variables.masterMixWells["Reactions Filled Per Tube"][:],
+							  program_variables,
+							  user_variables,
+							  protocol)
+		
+		# Mix the master mix tubes with the mixing profile of the polymerase, all of them have the same content so the same tip is used
+		for index_tube, tube in enumerate(program_variables.masterMixWells["Positions"]):
+			vol_mixing = program_variables.masterMixWells["Volumes"][index_tube] / 3
+			optimal_pipette_mixing = give_me_optimal_pipette(vol_mixing, program_variables.pipR, program_variables.pipL)
+			if optimal_pipette_mixing.max_volume < vol_mixing:
+				vol_mixing = optimal_pipette_mixing.max_volume
+			
+			if optimal_pipette_mixing.mount == "right":
+				tiprack_mix = user_variables.APINameTipR
+				starting_tip_mix = user_variables.startingTipPipR
+			else:
+				tiprack_mix = user_variables.APINameTipL
+				starting_tip_mix = user_variables.startingTipPipL
+			
+			for pipette in [program_variables.pipR, program_variables.pipL]:
+				if pipette != None and pipette != optimal_pipette_mixing and pipette.has_tip:
+					pipette.drop_tip()
+			
+			if optimal_pipette_mixing.has_tip == False:
+				check_tip_and_pick(optimal_pipette_mixing,
+								   tiprack_mix,
+								   sort_positions_by_trips(dict(zip(protocol.deck.keys(), protocol.deck.values())), program_variables.tripsTipracks),
+								   protocol,
+								   replace_tiprack = user_variables.replaceTiprack,
+								   initial_tip = starting_tip_mix,
+								   same_tiprack = program_variables.sameTiprack)
+			
+			mixing_profile = mixing_profile_15eppendorf(program_variables.masterMixWells["Volumes"][index_tube],
+														vol_mixing,
+														program_variables.reagentLiquidClasses["Polymerase"],
+														program_variables.mixingProfiles)
+			set_liquid_class([program_variables.pipR, program_variables.pipL], None, program_variables.liquidClasses, program_variables.defaultFlowRates, protocol)
+			mixing_eppendorf_15(tube,
+								program_variables.masterMixWells["Volumes"][index_tube],
+								vol_mixing,
+								optimal_pipette_mixing,
+								mixing_profile = mixing_profile)
+		
+		# Split the master mix into the set tubes, each master mix tube is distributed at once to all the set tubes that it fills
+		splits_master_mix = []
+		master_mix_tubes = zip(program_variables.masterMixWells["Positions"], program_variables.masterMixWells["Reactions Per Tube"])
+		master_mix_tube, reactions_master_mix_tube = next(master_mix_tubes)
+		for tube_set, reactions_set in zip(tubes_sets, reactions_tubes):
+			while reactions_set > 0:
+				if reactions_master_mix_tube == 0:
+					master_mix_tube, reactions_master_mix_tube = next(master_mix_tubes)
+				reactions_split = min(reactions_set, reactions_master_mix_tube)
+				reactions_set -= reactions_split
+				reactions_master_mix_tube -= reactions_split
+				if len(splits_master_mix) == 0 or splits_master_mix[-1]["Source Tube"] != master_mix_tube:
+					splits_master_mix.append({"Source Tube":master_mix_tube, "Final Tubes":[], "Volumes":[]})
+				splits_master_mix[-1]["Final Tubes"].append(tube_set)
+				splits_master_mix[-1]["Volumes"].append(program_variables.volMasterMix*reactions_split)
+		
+		# All the set tubes receive the same liquid that has been mixed, so the same pipette does the whole split and keeps the tip of the mixing if it was the one that mixed
+		pipette_split = give_me_optimal_pipette(min(volume for split in splits_master_mix for volume in split["Volumes"]), program_variables.pipR, program_variables.pipL)
+		if optimal_pipette_mixing != pipette_split:
+			optimal_pipette_mixing.drop_tip()
+		
+		if pipette_split.mount == "right":
+			tiprack_split = user_variables.APINameTipR
+			starting_tip_split = user_variables.startingTipPipR
+		else:
+			tiprack_split = user_variables.APINameTipL
+			starting_tip_split = user_variables.startingTipPipL
+		
+		if pipette_split.has_tip == False:
+			check_tip_and_pick(pipette_split,
+							   tiprack_split,
+							   sort_positions_by_trips(dict(zip(protocol.deck.keys(), protocol.deck.values())), program_variables.tripsTipracks),
+							   protocol,
+							   replace_tiprack = user_variables.replaceTiprack,
+							   initial_tip = starting_tip_split,
+							   same_tiprack = program_variables.sameTiprack)
+		
+		set_liquid_class([program_variables.pipR, program_variables.pipL], program_variables.reagentLiquidClasses["Polymerase"], program_variables.liquidClasses, program_variables.defaultFlowRates, protocol)
+		for split in splits_master_mix:
+			pipette_split.distribute(split["Volumes"],
+									 split["Source Tube"],
+									 split["Final Tubes"],
+									 new_tip = "never",
+									 disposal_volume = 0)
+		pipette_split.drop_tip()
+	else:
+		# Transfer Water
+		if program_variables.volWaterFactor > 0:
+			set_liquid_class([program_variables.pipR, program_variables.pipL], program_variables.reagentLiquidClasses["Water"], program_variables.liquidClasses, program_variables.defaultFlowRates, protocol)
+			tube_to_tube_transfer(program_variables.volWaterFactor,
+								  program_variables.reactiveWells["Water"]["Positions"],
+								  program_variables.reactiveWells["Water"]["Reactions Per Tube"],
+								  tubes_sets,
+								  reactions_tubes[:],
+								  program_variables,
+								  user_variables, protocol)
+
+	# Transfer Primers, after the water in the set tubes or after the split of the master mix
+	set_liquid_class([program_variables.pipR, program_variables.pipL], program_variables.reagentLiquidClasses["Primers"], program_variables.liquidClasses, program_variables.defaultFlowRates, protocol)
 	for set_primers in program_variables.setsWells.values():
 		for primer in set_primers["Set Primers"]:
 			tube_to_tube_transfer(program_variables.volPrimerFactor,
@@ -1397,44 +2061,99 @@ The columns and rows of the Maps of DNA Parts {user_variables.mapID[index_labwar
 								  protocol,
 								  new_tip = "aspirate")
 
-	# Transfer Polymerase
-	# Lower the aspiration and dispense rate
-	if program_variables.pipR != None:
-		default_values_pipR = [program_variables.pipR.flow_rate.aspirate, program_variables.pipR.flow_rate.dispense]
-		program_variables.pipR.flow_rate.aspirate = program_variables.pipR.min_volume
-		program_variables.pipR.flow_rate.dispense= program_variables.pipR.min_volume
-	if program_variables.pipL != None:
-		default_values_pipL = [program_variables.pipL.flow_rate.aspirate, program_variables.pipL.flow_rate.dispense]
-		program_variables.pipL.flow_rate.aspirate = program_variables.pipL.min_volume
-		program_variables.pipL.flow_rate.dispense = program_variables.pipL.min_volume
-
-	tube_to_tube_transfer(program_variables.volPolymeraseFactor,
-						  program_variables.reactiveWells["Polymerase"]["Positions"],
-						  program_variables.reactiveWells["Polymerase"]["Reactions Per Tube"],
-						  tubes_sets,
-						  reactions_tubes[:],
-						  program_variables,
-						  user_variables,
-						  protocol,
-						  new_tip="aspirate")
-	
-	# Take back the aspirate and dispense speed values of the pipette(s)
-	if program_variables.pipR != None:
-		program_variables.pipR.flow_rate.aspirate = default_values_pipR[0]
-		program_variables.pipR.flow_rate.dispense= default_values_pipR[1]
-	if program_variables.pipL != None:
-		program_variables.pipL.flow_rate.aspirate = default_values_pipL[0]
-		program_variables.pipL.flow_rate.dispense = default_values_pipL[1]
+	if not program_variables.masterMix:
+		# Transfer Polymerase
+		# By default its liquid class has lower aspiration and dispense rates
+		set_liquid_class([program_variables.pipR, program_variables.pipL], program_variables.reagentLiquidClasses["Polymerase"], program_variables.liquidClasses, program_variables.defaultFlowRates, protocol)
 
-	#----------------------------------------------------------------------------------------------------------------------------------------------------------------------------------------------------------------
-	# Mix and Distribute Sets
+		tube_to_tube_transfer(program_variables.volPolymeraseFactor,
+							  program_variables.reactiveWells["Polymerase"]["Positions"],
+							  program_variables.reactiveWells["Polymerase"]["Reactions Per Tube"],
+							  tubes_sets,
+							  reactions_tubes[:],
+							  program_variables,
+							  user_variables,
+							  protocol,
+							  new_tip="aspirate")
 
+	#----------------------------------------------------------------------------------------------------------------------------------------------------------------------------------------------------------------
+	# Final wells of the sets and samples that are going to be transferred to them
 	index_start_final_plate = opentrons.protocol_api.labware.get_labware_definition(user_variables.APINameFinalPlate)["groups"][0]["wells"].index(user_variables.wellStartFinalPlate)
 	wells_distribute = []
 
 	for final_labware in program_variables.finalPlates.values():
-		wells_distribute += final_labware["Opentrons Place"].wells()
+		wells_distribute += final_labware["Accessors"]["Wells"]
+
+	# Take the wells that we are not going to pick up and move the controls to the end
+	all_samples_transfer = []
+	control_wells = []
+	
+	# Go throught all the source plates to transfer the samples to the final plates
+	for source_plate in program_variables.samplePlates.values():
+		# We get the list of all the wells of a source plate from the initial plate
+		wells = list(source_plate["Accessors"]["Wells"][source_plate["Index First Well Sample"]:])
+
+		# We ar egoing to transfer the controls at the end so we take them out of this list in case they are
+		for control in source_plate["Control Positions"]:
+			try:
+				wells.remove(source_plate["Accessors"]["Wells By Name"][control])
+			except ValueError: # The value of the list source_plate["Control Positions"] is not in the list wells but exists in the labware (we checked that before in the script)
+				pass
+			
+			# We add the controls to the list of control_wells that are going to be transferred at the end
+			control_wells.append(source_plate["Accessors"]["Wells By Name"][control])
+
+		# Now that we have taken out the controls we take out the not wanted wells
+		wells = wells[:source_plate["Number Samples"]]
+		for notPCR in source_plate["Positions Not Perform PCR"]:
+			try:
+				wells.remove(source_plate["Accessors"]["Wells By Name"][notPCR])
+			except ValueError: # The value of the list source_plate["Positions Not Perform PCR"] is not in the list wells but exists in the labware (we checked that before in the script)
+				pass
+		all_samples_transfer += wells
+
+	all_samples_transfer += control_wells
+
+	# Create the generator of wells to distribute
+	final_wells = generator_positions(wells_distribute[index_start_final_plate:int(index_start_final_plate+user_variables.sets*program_variables.sumSamples)])
+	# Source and final well of every sample in each set, all the samples of a set are placed before the ones of the next set
+	transfers_sets = [[(well_source, next(final_wells)) for well_source in all_samples_transfer] for number_set in range(int(user_variables.sets))]
+	
+	# Set the optimal pipette to transfer the samples
+	pipette_samples = give_me_optimal_pipette (user_variables.volumesSamplesPerPlate, program_variables.pipR, program_variables.pipL)
+	if pipette_samples.mount == "right":
+		tiprack_samples = user_variables.APINameTipR
+		starting_tip_samples = user_variables.startingTipPipR
+	else:
+		tiprack_samples = user_variables.APINameTipL
+		starting_tip_samples = user_variables.startingTipPipL
 	
+	multi_dispense_samples = user_variables.multiDispenseSamples and len(transfers_sets) > 1
+
+	#----------------------------------------------------------------------------------------------------------------------------------------------------------------------------------------------------------------
+	# Transfer Samples to the empty final wells
+	if multi_dispense_samples:
+		# Each sample is aspirated once for all the sets and dispensed in the bottom of its well of every set, the tip only touches 1 sample
+		# The final wells do not have the mixes yet, so the tip does not carry the primers of a set to the wells of another one
+		# If the volume of all the sets does not fit in the tip, distribute splits it in several aspirations
+		set_liquid_class([program_variables.pipR, program_variables.pipL], program_variables.reagentLiquidClasses["Samples"], program_variables.liquidClasses, program_variables.defaultFlowRates, protocol)
+		for index_sample, well_source in enumerate(all_samples_transfer):
+			check_tip_and_pick (pipette_samples,
+								tiprack_samples,
+								sort_positions_by_trips(dict(zip(protocol.deck.keys(), protocol.deck.values())), program_variables.tripsTipracks),
+								protocol, replace_tiprack = user_variables.replaceTiprack,
+								initial_tip = starting_tip_samples,
+								same_tiprack = program_variables.sameTiprack)
+			pipette_samples.distribute(float(user_variables.volumesSamplesPerPlate),
+									   well_source,
+									   [transfers_set[index_sample][1] for transfers_set in transfers_sets],
+									   new_tip = "never")
+			pipette_samples.drop_tip()
+
+	#----------------------------------------------------------------------------------------------------------------------------------------------------------------------------------------------------------------
+	# Mix and Distribute Sets
+	set_liquid_class([program_variables.pipR, program_variables.pipL], program_variables.reagentLiquidClasses["Mix"], program_variables.liquidClasses, program_variables.defaultFlowRates, protocol)
+
 	wells_distribute_free = wells_distribute[index_start_final_plate:int(index_start_final_plate+user_variables.sets*program_variables.sumSamples)]
 	
 	# Set the optimal pipette to distribute the volume to every well
@@ -1449,6 +2168,11 @@ The columns and rows of the Maps of DNA Parts {user_variables.mapID[index_labwar
 	for set_primer in program_variables.setsWells.values():
 		# Mix and distribute every tube of the set
 		for index, tube in enumerate(set_primer["Positions"]):
+			# If the samples are already in the final wells, the mix is dispensed from their top so the tip does not carry a sample to the next well
+			wells_mix = wells_distribute_free[:set_primer["Reactions Per Tube"][index]]
+			if multi_dispense_samples:
+				wells_mix = [well.top() for well in wells_mix]
+			
 			if user_variables.presenceHS == True:
 				# Find out in which HS is the tube and shake it
 				program_variables.hs_mods[int(str(tube).split(" ")[-1])].set_and_wait_for_shake_speed(user_variables.rpm)
@@ -1457,14 +2181,14 @@ The columns and rows of the Maps of DNA Parts {user_variables.mapID[index_labwar
 				if optimal_pipette.has_tip == False:
 					check_tip_and_pick (optimal_pipette,
 										tiptack_distribution,
-										dict(zip(protocol.deck.keys(), protocol.deck.values())),
+										sort_positions_by_trips(dict(zip(protocol.deck.keys(), protocol.deck.values())), program_variables.tripsTipracks),
 										protocol,
 										initial_tip = strating_tip_distribution,
 										replace_tiprack = user_variables.replaceTiprack,
 										same_tiprack = program_variables.sameTiprack)
 				optimal_pipette.distribute(float(program_variables.volTotal),
 										   tube,
-										   wells_distribute_free[:set_primer["Reactions Per Tube"][index]],
+										   wells_mix,
 										   new_tip = "never",
 										   disposal_volume = 0)
 			else:# Mix it with a pipette
@@ -1493,37 +2217,45 @@ The columns and rows of the Maps of DNA Parts {user_variables.mapID[index_labwar
 				if optimal_pipette_mixing.has_tip == False:
 					check_tip_and_pick(optimal_pipette_mixing,
 									   tiprack_mix,
-									   dict(zip(protocol.deck.keys(), protocol.deck.values())),
+									   sort_positions_by_trips(dict(zip(protocol.deck.keys(), protocol.deck.values())), program_variables.tripsTipracks),
 									   protocol,
 									   replace_tiprack = user_variables.replaceTiprack,
 									   initial_tip = starting_tip_mix,
 									   same_tiprack = program_variables.sameTiprack)
 
-				# Mixing
+				# Mixing with the minimum mixing for the volume and liquid class of the tube
+				mixing_profile = mixing_profile_15eppendorf(set_primer["Volumes"][index],
+															vol_mixing,
+															user_variables.liquidClassSets,
+															program_variables.mixingProfiles)
+				# The flow rate factor of the mixing profile is applied over the default flow rates, so the liquid class is set back after the mixing
+				set_liquid_class([program_variables.pipR, program_variables.pipL], None, program_variables.liquidClasses, program_variables.defaultFlowRates, protocol)
 				mixing_eppendorf_15(tube,
 									set_primer["Volumes"][index],
 									vol_mixing,
-									optimal_pipette_mixing)
+									optimal_pipette_mixing,
+									mixing_profile = mixing_profile)
+				set_liquid_class([program_variables.pipR, program_variables.pipL], program_variables.reagentLiquidClasses["Mix"], program_variables.liquidClasses, program_variables.defaultFlowRates, protocol)
 				
 				# Distribute
 				if optimal_pipette == optimal_pipette_mixing:
 					optimal_pipette.distribute(float(program_variables.volTotal),
 											   tube,
-											   wells_distribute_free[:set_primer["Reactions Per Tube"][index]],
+											   wells_mix,
 											   new_tip = "never",
 											   disposal_volume = 0)
 				else:
 					optimal_pipette_mixing.drop_tip()
 					check_tip_and_pick (optimal_pipette,
 										tiptack_distribution,
-										dict(zip(protocol.deck.keys(), protocol.deck.values())),
+										sort_positions_by_trips(dict(zip(protocol.deck.keys(), protocol.deck.values())), program_variables.tripsTipracks),
 										protocol,
 										replace_tiprack = user_variables.replaceTiprack,
 										initial_tip = strating_tip_distribution,
 										same_tiprack = program_variables.sameTiprack)
 					optimal_pipette.distribute(float(program_variables.volTotal),
 											   tube,
-											   wells_distribute_free[:set_primer["Reactions Per Tube"][index]],
+											   wells_mix,
 											   new_tip="never",
 											   disposal_volume = 0)
 					
@@ -1533,62 +2265,28 @@ The columns and rows of the Maps of DNA Parts {user_variables.mapID[index_labwar
 		optimal_pipette.drop_tip()
 
 	#----------------------------------------------------------------------------------------------------------------------------------------------------------------------------------------------------------------
-	# Transfer Ssmples to final wells
-	optimal_pipette = give_me_optimal_pipette (user_variables.volumesSamplesPerPlate, program_variables.pipR, program_variables.pipL)
-	if optimal_pipette.mount == "right":
-		tiprack = user_variables.APINameTipR
-		starting_tip = user_variables.startingTipPipR
-	else:
-		tiprack = user_variables.APINameTipL
-		starting_tip = user_variables.startingTipPipL
-
-	# Take the wells that we are not going to pick up and move the controls to the end
-	all_samples_transfer = []
-	control_wells = []
+	# Transfer Samples to final wells
+	if not multi_dispense_samples:
+		# Every sample is transferred to every well with a new tip
+		set_liquid_class([program_variables.pipR, program_variables.pipL], program_variables.reagentLiquidClasses["Samples"], program_variables.liquidClasses, program_variables.defaultFlowRates, protocol)
+		for transfers_set in transfers_sets:
+			for well_source, well_pcr in transfers_set:
+				check_tip_and_pick (pipette_samples,
+									tiprack_samples,
+									sort_positions_by_trips(dict(zip(protocol.deck.keys(), protocol.deck.values())), program_variables.tripsTipracks),
+									protocol, replace_tiprack = user_variables.replaceTiprack,
+									initial_tip = starting_tip_samples,
+									same_tiprack = program_variables.sameTiprack)
+				pipette_samples.transfer(float(user_variables.volumesSamplesPerPlate),
+										 well_source,
+										 well_pcr,
+										 new_tip = "never")
+				pipette_samples.drop_tip()
 	
-	# Go throught all the source plates to transfer the samples to the final plates
-	for source_plate in program_variables.samplePlates.values():
-		# We get the list of all the wells of a source plate from the initial plate
-		wells = source_plate["Opentrons Place"].wells()[source_plate["Index First Well Sample"]:]
-
-		# We ar egoing to transfer the controls at the end so we take them out of this list in case they are
-		for control in source_plate["Control Positions"]:
-			try:
-				wells.remove(source_plate["Opentrons Place"][control])
-			except ValueError: # The value of the list source_plate["Control Positions"] is not in the list wells but exists in the labware (we checked that before in the script)
-				pass
-			
-			# We add the controls to the list of control_wells that are going to be transferred at the end
-			control_wells.append(source_plate["Opentrons Place"][control])
-
-		# Now that we have taken out the controls we take out the not wanted wells
-		wells = wells[:source_plate["Number Samples"]]
-		for notPCR in source_plate["Positions Not Perform PCR"]:
-			try:
-				wells.remove(source_plate["Opentrons Place"][notPCR])
-			except ValueError: # The value of the list source_plate["Positions Not Perform PCR"] is not in the list wells but exists in the labware (we checked that before in the script)
-				pass
-		all_samples_transfer += wells
-
-	all_samples_transfer += control_wells
-
-	# Create the generator of wells to distribute
-	final_wells = generator_positions(wells_distribute[index_start_final_plate:int(index_start_final_plate+user_variables.sets*program_variables.sumSamples)])
-	for number_set in range(int(user_variables.sets)):
-		for well_source in all_samples_transfer:
-			well_pcr = next(final_wells)
-			check_tip_and_pick (optimal_pipette,
-								tiprack,
-								dict(zip(protocol.deck.keys(), protocol.deck.values())),
-								protocol, replace_tiprack = user_variables.replaceTiprack,
-								initial_tip = starting_tip,
-								same_tiprack = program_variables.sameTiprack)
-			optimal_pipette.transfer(float(user_variables.volumesSamplesPerPlate),
-									 well_source,
-									 well_pcr,
-									 new_tip = "never")
-			optimal_pipette.drop_tip()
-			
+	# The values of every final plate are collected and assigned to its map at once
+	values_maps = {index_plate:{"Values":[], "Rows":[], "Columns":[]} for index_plate in program_variables.finalPlates.keys()}
+	for number_set, transfers_set in enumerate(transfers_sets):
+		for well_source, well_pcr in transfers_set:
 			# Map it
 			for sampleplate in program_variables.samplePlates.values():
 				if str(sampleplate["Position"]) == str(well_source).split(" ")[-1]:
@@ -1599,19 +2297,32 @@ The columns and rows of the Maps of DNA Parts {user_variables.mapID[index_labwar
 					else:
 						value_map = f"{value_map_source_well} Slot {str(well_source).split(' ')[-1]} with Set {number_set+1}"
 					
-					# Assign it to the place of the final well in its dataframe
-					for finalplate in program_variables.finalPlates.values():
+					# Store it with the place of the final well in its map
+					for index_plate, finalplate in program_variables.finalPlates.items():
 						if str(finalplate["Position"]) == str(well_pcr).split(" ")[-1]:
-							finalplate["Map Samples with Sets"].assign_value(value_map, well_pcr._core._row_name, well_pcr._core._column_name)
+							values_maps[index_plate]["Values"].append(value_map)
+							values_maps[index_plate]["Rows"].append(well_pcr._core._row_name)
+							values_maps[index_plate]["Columns"].append(well_pcr._core._column_name)
 	
-	# Export map(s) in an excel
-	writer = pd.ExcelWriter(f'/data/user_storage/{user_variables.finalMapName}.xlsx', engine='openpyxl')
-	# writer = pd.ExcelWriter(f'{user_variables.finalMapName}.xlsx', engine='openpyxl')
+	for index_plate, values_map in values_maps.items():
+		program_variables.finalPlates[index_plate]["Map Samples with Sets"].assign_values(values_map["Values"], values_map["Rows"], values_map["Columns"])
 	
-	for final_plate in program_variables.finalPlates.values():
-		final_plate["Map Samples with Sets"].map.to_excel(writer, sheet_name = f"FinalMapSlot{final_plate['Position']}")
+	# Export map(s) in the formats of 'Format Final Maps', by default in an excel
+	maps_final = {f"FinalMapSlot{final_plate['Position']}":final_plate["Map Samples with Sets"].to_dataframe() for final_plate in program_variables.finalPlates.values()}
+	
+	# Export the layout of the deck so the operator knows in which slot every labware has been placed
+	layout_deck = []
+	for position, labware in protocol.deck.items():
+		if labware == None and user_variables.presenceTermo and position in [8, 10, 11]: # Slots covered by the thermocycler
+			layout_deck.append([position, str(program_variables.tc_mod)])
+		elif labware == None:
+			layout_deck.append([position, "Empty"])
+		else:
+			layout_deck.append([position, str(labware)])
 	
-	writer.save()
+	volumes_final = {"Volume Sample (uL)":dict.fromkeys(maps_final, user_variables.volumesSamplesPerPlate), "Final Volume (uL)":dict.fromkeys(maps_final, user_variables.finalVolume)}
+	export_maps(maps_final, f'/data/user_storage/{user_variables.finalMapName}', formats = user_variables.formatsFinalMaps, extra_columns = volumes_final, other_tables = {"DeckLayout":pd.DataFrame(layout_deck, columns = ["Slot", "Labware"])})
+	# export_maps(maps_final, f'{user_variables.finalMapName}', formats = user_variables.formatsFinalMaps, extra_columns = volumes_final, other_tables = {"DeckLayout":pd.DataFrame(layout_deck, columns = ["Slot", "Labware"])})
 	
 	# Perform PCR profile
 	if user_variables.presenceTermo:
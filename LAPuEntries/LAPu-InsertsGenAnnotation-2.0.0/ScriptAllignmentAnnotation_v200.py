@@ -57,7 +57,7 @@ epilog_message = """
 parser = argparse.ArgumentParser(description = description_message,
                                  epilog = epilog_message,
                                  formatter_class=argparse.RawTextHelpFormatter,
-                                 usage = "%(prog)s [-h] [-q | -v] [-sm] [-out PATH_OUTPUT] [-f {table,all}] [-t THRESHOLD_RANGE] [-identity MAP_PLATE_IDENTITIES] [-cb FILE_NAMES_COLUMNS_BLAST] [-ca FILE_NAMES_COLUMNS_ANNOTATION] [-quality [QUALITY_FILE_EXTENSION] [-seq]] [-seq [TYPE_SEQENCING]] directoryReads extensionReads genomeSequence genomeAnnotation")
+                                 usage = "%(prog)s [-h] [-q | -v] [-sm] [-out PATH_OUTPUT] [-f {table,all}] [-t THRESHOLD_RANGE] [-identity MAP_PLATE_IDENTITIES] [-ip IDENTITY_PLATE] [-cb FILE_NAMES_COLUMNS_BLAST] [-ca FILE_NAMES_COLUMNS_ANNOTATION] [-quality [QUALITY_FILE_EXTENSION] [-seq]] [-seq [TYPE_SEQENCING]] directoryReads extensionReads genomeSequence genomeAnnotation")
 
 group = parser.add_mutually_exclusive_group()
 # Positional arguments
@@ -124,6 +124,13 @@ it has been sequenced from (the identifier between + and _ or _ _).
 Remeber to also put the name of the columns and the rows in the file
 In case the identifiers are numbers, only 96-well plates sequenced plates are allowed counting from 1 to 96 top to bottom and left to right, i.e, the identifier 1 will be A1,
 the identifier 2 will be B1 and the identifier 96 will be H12
+The long tables exported by the LAP entries (columns Plate, Well and the identity of the sample) can also be provided, if they have more than 1 plate
+the one that has been sequenced needs to be given with -ip
+                    """)
+parser.add_argument("-ip","--identityPlate", metavar = "IDENTITY_PLATE",
+                    help = """
+Name of the plate (column Plate) of the long table given in -identity that has been sequenced
+It is only needed if the long table has more than 1 plate
                     """)
 parser.add_argument("-cb","--columnsBLAST", metavar = "FILE_NAMES_COLUMNS_BLAST",
                help = """
@@ -597,6 +604,21 @@ if args.identity != None:
     else:
         raise Exception(f"-identity map file {args.identity} extension is {extension} and only csv and xlsx files are accepted for this argument") 
 
+    # The long tables exported by the LAP entries have a row per well (columns Plate, Well and the identity) so they are converted to a map of the plate
+    if "Well" in map_identities.columns and "Row/Column" not in map_identities.columns:
+        if "Plate" in map_identities.columns:
+            if args.identityPlate != None:
+                map_identities = map_identities[map_identities["Plate"].astype(str) == args.identityPlate]
+                if len(map_identities) == 0:
+                    raise Exception(f"The plate {args.identityPlate} given in -ip is not in the column Plate of {args.identity}")
+            elif map_identities["Plate"].nunique() > 1:
+                raise Exception(f"The long table {args.identity} has more than 1 plate, provide the name of the sequenced one with -ip")
+        name_column_identity = [column for column in map_identities.columns if column not in ["Plate", "Well"]][0]
+        wells_identities = map_identities["Well"].astype(str).str.extract(r"^([a-zA-Z]+)(\d+)$")
+        map_identities = pd.DataFrame({"Row/Column":wells_identities[0].values,
+                                       "Column":[str(int(column)) for column in wells_identities[1].values],
+                                       "Identity":map_identities[name_column_identity].values}).pivot(index = "Row/Column", columns = "Column", values = "Identity").reset_index()
+
     
     # Prepare the column we are going to analyze and create the others that we are going to add
     position_plate_seq = []
@@ -0,0 +1,21 @@
+def channel_groups_columns (columns, number_channels = 8):
+	"""
+	Function that will return the groups of wells of the given columns that the channels of a multi-channel pipette reach at once
+
+	In a labware with as many rows as channels every column is a group. In a labware with a multiple of them, for example a 384-well plate with 16 rows and an 8-channel pipette,
+	the channels are separated by several rows, so every column has one group for each of its first rows (A1 and B1 in a 384-well plate) and the groups are interleaved
+
+	The groups are returned column by column and, inside every column, by their first row. The first element of every group is the well in which the pipette is placed
+
+	1 mandatory argument and 1 optional are needed for this function
+	"""
+	groups = []
+	for column in columns:
+		if len(column) % number_channels != 0:
+			raise Exception(f"The columns of the labware have {len(column)} wells, so they cannot be reached by the {number_channels} channels of the pipette. The number of rows of the labware needs to be a multiple of the channels")
+
+		rows_between_channels = len(column) // number_channels
+		for first_row in range(rows_between_channels):
+			groups.append(column[first_row::rows_between_channels])
+
+	return groups
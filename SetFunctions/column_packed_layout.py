@@ -0,0 +1,58 @@
+def column_packed_layout (selected_wells, number_rows_source, index_start_final, number_rows_final, number_channels = 8):
+	"""
+	Function that will plan the moves of selected wells of a source plate to consecutive wells of a final plate grouping them by source column,
+	so the columns of the source plate that are selected completely can be moved at once with a multi-channel pipette
+
+	The fully selected columns are placed in whole columns of the final plate and the rest of wells, moved one by one, are placed before them
+	until the first column of the final plate starts and after them. If there are no fully selected columns the wells are placed in the same order they are given
+
+	The index of the wells are the ones of the labware, i.e., going through the plate column by column
+
+	4 mandatory arguments and 1 optional are needed for this function
+	"""
+	# Find the groups of wells of the source columns that the channels of the pipette reach at once (channel_groups_columns) and are fully selected,
+	# only possible if the columns of both plates have a multiple of the channels as wells. In 384-well plates every column has 2 interleaved groups, the one of A1 and the one of B1
+	full_groups = []
+	if number_channels > 1 and number_rows_source % number_channels == 0 and number_rows_final % number_channels == 0:
+		wells_selected = set(map(tuple, selected_wells))
+		columns_selected = list(dict.fromkeys(index_column for index_row, index_column in selected_wells))
+		for group in channel_groups_columns([[(index_row, index_column) for index_row in range(number_rows_source)] for index_column in columns_selected], number_channels):
+			if all(well in wells_selected for well in group):
+				full_groups.append(group)
+	
+	wells_full_groups = set(well for group in full_groups for well in group)
+	single_wells = [well for well in selected_wells if tuple(well) not in wells_full_groups]
+
+	moves = []
+	index_final = index_start_final
+	# Wells of the columns of the groups that are left empty by them, the wells moved one by one are placed there first
+	wells_left_groups = []
+
+	if len(full_groups) > 0:
+		# Wells moved one by one until the next column of the final plate starts, if there are not enough these positions are left empty
+		while index_final % number_rows_final != 0 and len(single_wells) > 0:
+			moves.append({"Source Wells":[single_wells.pop(0)], "Index Final Wells":[index_final]})
+			index_final += 1
+		if index_final % number_rows_final != 0:
+			index_final += number_rows_final - index_final % number_rows_final
+
+		# Groups moved at once in the groups of the final columns, so with a 384-well final plate 2 groups fill a column
+		first_column_final = index_final // number_rows_final
+		groups_final = channel_groups_columns([list(range(index_column*number_rows_final, (index_column+1)*number_rows_final)) for index_column in range(first_column_final, first_column_final+len(full_groups))], number_channels)
+		for group_source, group_final in zip(full_groups, groups_final):
+			moves.append({"Source Wells":[list(well) for well in group_source], "Index Final Wells":group_final})
+		
+		wells_groups_final = set(index_well for move in moves[-len(full_groups):] for index_well in move["Index Final Wells"])
+		index_end_groups = (max(wells_groups_final) // number_rows_final + 1)*number_rows_final
+		wells_left_groups = [index_well for index_well in range(index_final, index_end_groups) if index_well not in wells_groups_final]
+		index_final = index_end_groups
+
+	# The rest of the wells are moved one by one after the groups
+	for well in single_wells:
+		if len(wells_left_groups) > 0:
+			moves.append({"Source Wells":[well], "Index Final Wells":[wells_left_groups.pop(0)]})
+		else:
+			moves.append({"Source Wells":[well], "Index Final Wells":[index_final]})
+			index_final += 1
+
+	return moves
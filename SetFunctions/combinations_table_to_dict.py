@@ -1,13 +1,16 @@
 import pandas as pd
 
-def combinations_table_to_dict (table, column_key, column_isolated, name_key_col_isolated = "isolatedCol", name_key_rest_columns = "restCol"):
+def combinations_table_to_dict (table, column_key, column_isolated, name_key_col_isolated = "isolatedCol", name_key_rest_columns = "restCol", incompatible_parts = None, max_combinations = None):
 	"""
 	Function that will take a table and turn it into a dictionary in which 1 column will be the key of the items and the values will be another dictionary.
 	In that items value will have 2 items, one that is going to be the value sof one column and another one that will be the values of the rest of the columns
 
 	It will return something similar to {column_key_value:{name_key_col_isolated:column_isolated_value, name_key_rest_columns:[value_col1, value_col2, ...]}, ...}
+
+	The cells with several options, {value1|value2|...}, are expanded to all their combinations with generator_combinations_table, excluding the ones with a pair
+	of incompatible_parts. If max_combinations is given, the function raises an error as soon as the table defines more combinations than that number
 	
-	This function needs 3 mandatory arguments and 2 optional
+	This function needs 3 mandatory arguments and 4 optional
 	"""
 	# Error control
 	if column_key not in table.columns:
@@ -19,11 +22,16 @@ def combinations_table_to_dict (table, column_key, column_isolated, name_key_col
 		raise Exception(f"The column {column_key} of the dataframe needs to have unique values, it cannot have duplicated values")
 	
 	combination_dict = {} # Initial
-	list_keys = list(table[column_key].values)
 
-	for name_row in list_keys: # Go through all the rows of the given table
-		# Set the value of the name and the isolated column
-		combination_dict[name_row] = {name_key_col_isolated: table.loc[table[column_key] == name_row, column_isolated].values[0], name_key_rest_columns:[]}
-		row_name = table[table[column_key] == name_row]
-		combination_dict[name_row][name_key_rest_columns] = [element for element in row_name.loc[:,~row_name.columns.isin([column_key,column_isolated])].values[0] if not pd.isna(element)]
+	for name_combination, value_isolated, values_rest in generator_combinations_table(table, column_key, column_isolated, incompatible_parts = incompatible_parts): # Go through all the combinations of the table
+		# The names of the expanded combinations could be repeated with other names of the table
+		if name_combination in combination_dict.keys():
+			raise Exception(f"The combination {name_combination} is defined more than once in the column {column_key}, the names need to be unique")
+		
+		# We stop before generating the rest of the combinations if they are not going to fit
+		if max_combinations != None and len(combination_dict) >= max_combinations:
+			raise Exception(f"The table defines more than {max_combinations} combinations, which is the maximum number of combinations that can be allocated")
+		
+		# Set the value of the name, the isolated column and the values of the rest of the columns that are not empty
+		combination_dict[name_combination] = {name_key_col_isolated: value_isolated, name_key_rest_columns: values_rest}
 	return combination_dict
\ No newline at end of file
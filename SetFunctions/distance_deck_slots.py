@@ -0,0 +1,14 @@
+def distance_deck_slots (slot_1, slot_2):
+	"""
+	Function that will calculate the distance in mm between the centres of 2 slots of the OT-2 deck
+
+	The OT-2 deck is a grid of 3 columns and 4 rows in which slot 1 is the front left one and slot 12 the trash,
+	the slots are 132.5mm apart in the X axis and 90.5mm in the Y axis
+
+	2 mandatory arguments are needed for this function
+	"""
+	# Find out the column and row of each of the slots
+	column_1, row_1 = (int(slot_1)-1)%3, (int(slot_1)-1)//3
+	column_2, row_2 = (int(slot_2)-1)%3, (int(slot_2)-1)//3
+
+	return math.sqrt(((column_1-column_2)*132.5)**2 + ((row_1-row_2)*90.5)**2)
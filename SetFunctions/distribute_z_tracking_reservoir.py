@@ -0,0 +1,66 @@
+def distribute_z_tracking_reservoir (pipette_used, tip_rack_pipette, deck_situation, vol_source, vol_distribute_well, pos_source, pos_final, protocol, vol_max_transfer, new_tip = "never", replace_tiprack = False, initial_tip_pip = "A1", same_tiprack = False, touch_tip = False):
+	"""
+	Function that will distribute with a pipette (pipette_used) the same volume (vol_distribute_well) from 1 reservoir well (pos_source) to a list of 1 or more final positions (pos_final) tracking the height of aspiration
+	in the reservoir well by tracking its current volume.
+
+	With a multi-channel pipette the final positions are the first well of each final column and every channel takes vol_distribute_well from the reservoir well, so the well needs to be reached by all the channels, for example, the troughs of a reservoir
+
+	For that purpose is needed to provide different information to the function:
+		- pipette_used: pipette that is going to be used to transfer the volumes
+		- tip_rack_pipette: the API name of the tiprack that is going to be defined in case that the pipette is out of tips
+		- deck_situation: dictionary that represents the slot as keys and the loaded labware that is in each of them as values. It is used in case a tiprack needs to be defined
+		- vol_source: initial volume of the reservoir well
+		- vol_distribute_well: volume that is going to be transferred to each one of the final wells
+		- pos_source: reservoir well with the volume to distribute
+		- pos_final: list of final positions to distribute the volume to
+		- protocol: the opentrons protocol context of the script
+		- vol_max_transfer: the maximum volume that can be transferred with pipette_used in 1 aspiration, for example, the max of the pipette or the maximum of the tips attached to the pipette
+		- new_tip: optional argument that establish when the tip should be changed. It can be every time it aspirates (aspirate), every time the pipette goes to the final position (well) or never (never). By default is set as never
+		- replace_tiprack: optional argument that establish that once a tip rack is empty, if this one should be replaced or 1 additional tip rack should be added to the protocol deck. By default is set as False
+		- initial_tip_pip: optional argument that establish in case that a tiprack is defined for the first time this will set which tip should be picked first, by default is set as "A1"
+		- same_tiprack: optional argument that establish defines that both pipettes set during the protocol have the same tip rack attached. By default is set as False
+		- touch_tip: optional argument that establish that during the transfer there would be a touch tip in the source and final position
+
+	The function returns the volume left in the reservoir well
+	"""
+
+	# Check that the new_tip argument has a correct value
+	if new_tip not in ["never", "aspirate", "well"]:
+		raise Exception("The argument new_tip only accepts 3 values: never, aspirate, well")
+
+	# Check if actually the pipette can transfer vol_distribute_well
+	if vol_distribute_well < pipette_used.min_volume:
+		raise Exception(f"The pipette {pipette_used} cannot transfer the volume assigned for each well, {vol_distribute_well}ul")
+	
+	# Every channel of the pipette takes the volume from the same reservoir well
+	# Because we are using floats and there is the problem of the error caused when doing floating-point arithmetic we are going to give a range of error in the substractions
+	if vol_source - len(pos_final)*vol_distribute_well*pipette_used.channels < -0.001:
+		raise Exception(f"Not enough volume in the source reservoir well, {vol_source}uL, to distribute {vol_distribute_well}uL to {len(pos_final)} positions with {pipette_used.channels} channel(s)")
+	
+	# Number of final positions that are distributed with 1 aspiration, if the volume does not fit in 1 aspiration the distribute splits it
+	if new_tip == "well" or vol_distribute_well > vol_max_transfer:
+		number_pos_distr = 1
+	else:
+		number_pos_distr = int(vol_max_transfer/vol_distribute_well)
+	
+	for start_position in range(0, len(pos_final), number_pos_distr):
+		position_distribute = pos_final[start_position:start_position+number_pos_distr]
+		
+		# It wont have a tip if the new_tip is aspirate or well or if it is the first time it gets into the function
+		if not pipette_used.has_tip:
+			check_tip_and_pick (pipette_used,
+								tip_rack_pipette,
+								deck_situation,
+								protocol,
+								replace_tiprack = replace_tiprack,
+								initial_tip = initial_tip_pip,
+								same_tiprack = same_tiprack)
+		
+		# The height of aspiration is the one of the volume that is left after the aspiration so the tips are in the liquid until the end of it
+		vol_source = vol_source - len(position_distribute)*vol_distribute_well*pipette_used.channels
+		pipette_used.distribute(vol_distribute_well, find_safe_reservoir_height(vol_source, pos_source), position_distribute, new_tip = "never", disposal_volume = 0, touch_tip = touch_tip)
+		
+		if new_tip != "never":
+			pipette_used.drop_tip()
+	
+	return vol_source
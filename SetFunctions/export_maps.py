@@ -0,0 +1,79 @@
+import csv
+from openpyxl import Workbook
+
+def export_maps (maps, path_export, formats = ["xlsx"], name_values = "Sample", extra_columns = None, other_tables = None):
+	"""
+	Function that will export at once all the maps of the plates, DataFrames with the names of the rows and columns of the plate as index and columns,
+	in the given formats, so every map is read only once independently of the number of formats
+
+	The formats that can be given are:
+		- xlsx: 1 excel file with a sheet per map and per other table, written row by row with the write-only mode of openpyxl, faster and lighter than pandas.to_excel
+		- csv or tsv: 1 file per map and per other table, named with the path and the name of the map. The maps have the same format as the identity maps of LAPu
+		- long: 1 csv file with a row per filled well of all the maps and the columns Plate, Well, name_values and the extra columns
+
+	The values of extra_columns are dictionaries with the names of the maps as keys and, as values, a value for all the wells of that map or a DataFrame with a value for each well
+
+	It returns the list of files that have been written
+
+	2 mandatory arguments and 4 optional are needed for this function
+	"""
+	# Check that all the formats can be exported
+	formats_allowed = ["xlsx", "csv", "tsv", "long"]
+	if len(formats) == 0 or any(format_export not in formats_allowed for format_export in formats):
+		raise Exception(f"The formats of the maps to export need to be one or more of the following ones: {', '.join(formats_allowed)}. The ones given are: {', '.join(map(str, formats))}")
+
+	if extra_columns == None:
+		extra_columns = {}
+	if other_tables == None:
+		other_tables = {}
+
+	# Rows of every map and table, the maps keep the names of the rows in the first column and the empty wells (None or NaN, which is not equal to itself) are empty cells
+	rows_tables = {}
+	for name_map, map_plate in maps.items():
+		rows_tables[name_map] = [[map_plate.index.name if map_plate.index.name != None else ""] + [str(name_column) for name_column in map_plate.columns]]
+		for row_map in map_plate.itertuples(name = None):
+			rows_tables[name_map].append([None if value is None or value != value else value for value in row_map])
+	for name_table, table in other_tables.items():
+		rows_tables[name_table] = [list(table.columns)] + [list(row_table) for row_table in table.itertuples(index = False, name = None)]
+
+	files_exported = []
+
+	if "xlsx" in formats:
+		workbook = Workbook(write_only = True)
+		for name_table, rows_table in rows_tables.items():
+			sheet = workbook.create_sheet(title = name_table)
+			for row_table in rows_table:
+				sheet.append(row_table)
+		workbook.save(f"{path_export}.xlsx")
+		files_exported.append(f"{path_export}.xlsx")
+
+	for format_export, delimiter in [("csv", ","), ("tsv", "\t")]:
+		if format_export in formats:
+			for name_table, rows_table in rows_tables.items():
+				with open(f"{path_export}_{name_table}.{format_export}", "w", newline = "") as file_table:
+					csv.writer(file_table, delimiter = delimiter).writerows(rows_table)
+				files_exported.append(f"{path_export}_{name_table}.{format_export}")
+
+	if "long" in formats:
+		# The wells of each map are given in the same order as the labware, column by column
+		with open(f"{path_export}_long.csv", "w", newline = "") as file_long:
+			writer_long = csv.writer(file_long)
+			writer_long.writerow(["Plate", "Well", name_values] + list(extra_columns.keys()))
+			for name_map, map_plate in maps.items():
+				for name_column in map_plate.columns:
+					for name_row in map_plate.index:
+						value = map_plate.at[name_row, name_column]
+						if value is None or value != value:
+							continue
+
+						values_extra = []
+						for values_column in extra_columns.values():
+							value_extra = values_column.get(name_map)
+							if hasattr(value_extra, "at"): # A DataFrame with a value per well
+								value_extra = value_extra.at[name_row, name_column]
+							values_extra.append(value_extra)
+
+						writer_long.writerow([name_map, f"{name_row}{name_column}", value] + values_extra)
+		files_exported.append(f"{path_export}_long.csv")
+
+	return files_exported
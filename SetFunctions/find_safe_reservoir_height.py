@@ -0,0 +1,22 @@
+import math
+
+def find_safe_reservoir_height (vol_well, theory_position):
+	"""
+	This function will return the height in which the pipette should aspirate the volume of a reservoir well without getting the tips too wet but in the liquid
+
+	The height of the liquid is calculated with the volume and the area of the well, so it works with rectangular (troughs) and circular wells of straight walls
+
+	This function takes 2 inputs, the reservoir well and the volume it has and will return the same position with the according height
+	"""
+
+	# Area of the well, in mm2, from its dimensions
+	if theory_position.diameter != None:
+		area_well = math.pi*(theory_position.diameter/2)**2
+	else:
+		area_well = theory_position.length*theory_position.width
+	
+	# The tips go 2mm under the surface of the liquid and never lower than 1mm from the bottom
+	height_liquid = vol_well/area_well # The volumes are in uL, i.e., mm3
+	final_position = theory_position.bottom(z = max(height_liquid-2, 1))
+	
+	return final_position
@@ -1,25 +1,32 @@
-def find_well_by_value (value, possible_labwares):
+def find_well_by_value (value, possible_labwares, index_values = None):
 	"""
 	Function that will read a table of names and a table of positions and will return a list of the well(s) in the labware that
 	the value given correspond in the maps (tables)
 
-	The function needs 2 arguments to work
+	If the index of the values of the tables (output of index_values_maps) is given, the cells of the value are taken from it instead of searching the tables
+
+	The function needs 2 arguments to work and 1 optional
 	"""
 	wells_value = []
 
-	for possible_labware in possible_labwares.values(): # Go through the given labwares
-		cell_pd_value = possible_labware["Map Names"][possible_labware["Map Names"].isin([value])].stack().index # stack() returns a pandas.Series in which the indexes are the (row, column) of the cells that the value is True
-		
-		if len(cell_pd_value) == 0: # The value is not in this map, go to the next one
-			continue
-		
-		for well in cell_pd_value: # Go through all the cells that have value
-			well_value = str(well[0])+str(well[1])
-			# See if that cell actually exists in the labware
-			try:
+	if index_values != None:
+		cells_value = [(possible_labwares[key_labware], row, column) for key_labware, row, column in index_values.get(value, [])]
+	else:
+		cells_value = []
+		for possible_labware in possible_labwares.values(): # Go through the given labwares
+			cell_pd_value = possible_labware["Map Names"][possible_labware["Map Names"].isin([value])].stack().index # stack() returns a pandas.Series in which the indexes are the (row, column) of the cells that the value is True
+			cells_value += [(possible_labware, well[0], well[1]) for well in cell_pd_value]
+	
+	for possible_labware, row, column in cells_value: # Go through all the cells that have value
+		well_value = str(row)+str(column)
+		# See if that cell actually exists in the labware, using the tables of the labware if they have been built when it was loaded
+		try:
+			if "Accessors" in possible_labware.keys():
+				wells_value.append(possible_labware["Accessors"]["Wells By Name"][well_value])
+			else:
 				wells_value.append(possible_labware["Opentrons Place"][well_value])
-			except KeyError:
-				raise Exception(f"The value '{value}' has been found in the map cell '{well_value}' but that well does not exist in the labware {possible_labware['Opentrons Place']}")
+		except KeyError:
+			raise Exception(f"The value '{value}' has been found in the map cell '{well_value}' but that well does not exist in the labware {possible_labware['Opentrons Place']}")
 	
 	if len(wells_value) == 0:
 		raise Exception(f"The value '{value}' cannot be found in the provied possible_labwares")
@@ -0,0 +1,58 @@
+def generator_combinations_table (table, column_key, column_isolated, incompatible_parts = None):
+	"""
+	Function that will go through the rows of a combinations table and will yield, one by one, the combinations defined by them
+	as (column_key_value, column_isolated_value, [value_col1, value_col2, ...])
+
+	The rows that have cells with several options (see options_combination_cell) are expanded to all the combinations of their options
+	without creating a table of all of them and those combinations are named with the value of column_key followed by _1, _2, ...
+	If a list of pairs of values is given in incompatible_parts, the combinations that have both values of a pair are not yielded, either they come from a row with options or not
+
+	3 mandatory arguments and 1 optional are needed for this function
+	"""
+	# Pairs of values that cannot be in the same combination, the order of the values in the pair does not matter
+	if incompatible_parts != None:
+		pairs_incompatible = set(frozenset(pair) for pair in incompatible_parts)
+	else:
+		pairs_incompatible = set()
+	
+	# Positions of the key, isolated and rest of the columns in the rows of the table
+	columns_table = list(table.columns)
+	index_key = columns_table.index(column_key)
+	index_isolated = columns_table.index(column_isolated)
+	indexes_rest = [index_column for index_column, column in enumerate(columns_table) if column not in [column_key, column_isolated]]
+
+	for row in table.itertuples(index = False, name = None):
+		# Options of the isolated column and of the rest of the columns that are not empty, the isolated one is always the first
+		options_slots = [options_combination_cell(row[index_isolated])] + [options for options in (options_combination_cell(row[index_column]) for index_column in indexes_rest) if len(options) > 0]
+
+		# Rows without options are yielded as they are unless they have a pair of incompatible values
+		if all(len(options) == 1 for options in options_slots):
+			values_row = [options[0] for options in options_slots]
+			if not any(frozenset([value, value_other]) in pairs_incompatible for index_value, value in enumerate(values_row) for value_other in values_row[index_value+1:]):
+				yield row[index_key], values_row[0], values_row[1:]
+			continue
+		
+		# Depth-first search of the options of the row, a branch is abandoned as soon as one of its values is incompatible with a value already chosen
+		number_combination = 0
+		values_chosen = []
+		iterators_slots = [iter(options_slots[0])]
+		while len(iterators_slots) > 0:
+			depth = len(iterators_slots) - 1
+			value = next(iterators_slots[-1], None)
+			
+			# All the options of this slot have been tried so we go back to the previous slot
+			if value == None:
+				iterators_slots.pop()
+				if len(values_chosen) > 0:
+					values_chosen.pop()
+				continue
+			
+			if any(frozenset([value, value_chosen]) in pairs_incompatible for value_chosen in values_chosen):
+				continue
+			
+			if depth == len(options_slots) - 1:
+				number_combination += 1
+				yield f"{row[index_key]}_{number_combination}", (values_chosen + [value])[0], (values_chosen + [value])[1:]
+			else:
+				values_chosen.append(value)
+				iterators_slots.append(iter(options_slots[depth + 1]))
@@ -0,0 +1,24 @@
+def index_values_maps (possible_labwares):
+	"""
+	Function that will read the table of names of each one of the labwares once and return a dictionary in which every value of the tables
+	has the list of cells where it is, each cell being a tuple (key of the labware in possible_labwares, row name, column name)
+
+	This way a value can be found in all the labwares with a dictionary look-up instead of searching it in every table
+
+	1 mandatory argument is needed for this function
+	"""
+	index_values = {}
+
+	for key_labware, possible_labware in possible_labwares.items(): # Go through the given labwares
+		columns_map = [str(column) for column in possible_labware["Map Names"].columns]
+		# The cells are read by rows, so the cells of a value are in the same order as if the table was searched
+		for row in possible_labware["Map Names"].itertuples(name = None):
+			for column, value in zip(columns_map, row[1:]):
+				if pd.isna(value):
+					continue
+				if value in index_values.keys():
+					index_values[value].append((key_labware, row[0], column))
+				else:
+					index_values[value] = [(key_labware, row[0], column)]
+	
+	return index_values
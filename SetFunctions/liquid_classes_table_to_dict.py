@@ -0,0 +1,67 @@
+import pandas as pd
+
+def liquid_classes_table_to_dict (table_classes, table_reagents, reagents, touch_tip = True):
+	"""
+	Function that will check the sheets LiquidClasses and ReagentLiquidClasses of a variable file and return them as 2 dictionaries,
+	one with the liquid classes and their rates, delays and touch tip and another one with the liquid class of each reagent
+
+	The rates can be a factor of the default flow rate of the pipette or 'max', and the delays, in seconds, are 0 if left empty
+	The column 'Touch Tip' is only read if touch_tip is True. If it is left empty in a class, its value is None
+	If a table is not given (it is not a DataFrame), its dictionary is None
+
+	3 mandatory arguments are needed for this function and 1 optional
+	"""
+	columns_rates = ["Aspirate Rate", "Dispense Rate", "Blow Out Rate"]
+	columns_delays = ["Aspirate Delay", "Dispense Delay"]
+	values_true = ["true", "TRUE", "True", 1, True]
+	values_false = ["false", "FALSE", "False", 0, False]
+
+	liquid_classes = None
+	if isinstance(table_classes, pd.DataFrame):
+		if not all(item in list(table_classes.columns) for item in ["Liquid Class"] + columns_rates + (["Touch Tip"] if touch_tip else [])):
+			raise Exception(f"'LiquidClasses' sheet table needs to have the columns: {', '.join(['Liquid Class'] + columns_rates + (['Touch Tip'] if touch_tip else []))}. The columns {' and '.join(columns_delays)} are optional")
+		if table_classes[["Liquid Class"] + columns_rates].isna().any().any():
+			raise Exception(f"The columns {', '.join(['Liquid Class'] + columns_rates)} of the sheet 'LiquidClasses' cannot have empty cells")
+		if pd.Series(table_classes["Liquid Class"].values).is_unique == False:
+			raise Exception("The values of the column 'Liquid Class' in the sheet 'LiquidClasses' have to be unique")
+
+		liquid_classes = {}
+		for row in table_classes.to_dict("records"):
+			values_class = {}
+			for column in columns_rates:
+				if str(row[column]).strip().lower() == "max":
+					values_class[column] = "max"
+				elif pd.api.types.is_number(row[column]) and row[column] > 0:
+					values_class[column] = row[column]
+				else:
+					raise Exception(f"The values of the columns {', '.join(columns_rates)} in the sheet 'LiquidClasses' have to be greater than 0 or 'max'")
+			for column in columns_delays:
+				if column not in row.keys() or pd.isna(row[column]):
+					values_class[column] = 0
+				elif pd.api.types.is_number(row[column]) and row[column] >= 0:
+					values_class[column] = row[column]
+				else:
+					raise Exception(f"The values of the columns {' and '.join(columns_delays)} in the sheet 'LiquidClasses' are seconds and cannot be negative. If left empty, 0 is assumed")
+			if touch_tip:
+				if pd.isna(row["Touch Tip"]):
+					values_class["Touch Tip"] = None
+				elif row["Touch Tip"] in values_true + values_false:
+					values_class["Touch Tip"] = row["Touch Tip"] in values_true
+				else:
+					raise Exception("The column 'Touch Tip' of the sheet 'LiquidClasses' only accepts 2 values, True or False. If left empty, the touch tip variables of the protocol will be used")
+			liquid_classes[row["Liquid Class"]] = values_class
+
+	reagent_liquid_classes = None
+	if isinstance(table_reagents, pd.DataFrame):
+		if not all(item in list(table_reagents.columns) for item in ["Reagent", "Liquid Class"]):
+			raise Exception("'ReagentLiquidClasses' sheet table needs to have 2 columns: 'Reagent' and 'Liquid Class'")
+		if table_reagents[["Reagent", "Liquid Class"]].isna().any().any():
+			raise Exception("None of the cells of the sheet 'ReagentLiquidClasses' can be left empty")
+		if pd.Series(table_reagents["Reagent"].values).is_unique == False:
+			raise Exception("The values of the column 'Reagent' in the sheet 'ReagentLiquidClasses' have to be unique")
+		if not all(reagent in reagents for reagent in table_reagents["Reagent"].values):
+			raise Exception(f"The values of the column 'Reagent' in the sheet 'ReagentLiquidClasses' can only be: {', '.join(reagents)}")
+
+		reagent_liquid_classes = dict(zip(table_reagents["Reagent"].values, table_reagents["Liquid Class"].values))
+
+	return liquid_classes, reagent_liquid_classes
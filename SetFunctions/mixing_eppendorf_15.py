@@ -1,10 +1,13 @@
-def mixing_eppendorf_15 (location_tube, volume_tube, volume_mixing, pipette):
+def mixing_eppendorf_15 (location_tube, volume_tube, volume_mixing, pipette, mixing_profile = None):
 	"""
 	Function that will perform the mixing of a 1.5mL eppendorf tube iwth a given pipette
 
 	The pipette shoudl have a tip to perform this mixing
 
-	5 arguments are needed for this function
+	If a mixing profile (output of mixing_profile_15eppendorf) is given, the cycles, heights, flow rate, touch tips and strokes
+	will be the ones of the profile instead of the fixed extensive mixing
+
+	4 mandatory arguments and 1 optional are needed for this function
 	"""
 	# Check if the pipette has a tip
 	if not pipette.has_tip:
@@ -14,6 +17,25 @@ def mixing_eppendorf_15 (location_tube, volume_tube, volume_mixing, pipette):
 	if pipette.min_volume > volume_mixing or pipette.max_volume < volume_mixing:
 		raise Exception(f"Volume of mixing, {volume_mixing}uL, should be a value between the {pipette} minimum and maximum aspiration/dispense volume which are {pipette.min_volume}uL and {pipette.max_volume}uL, respectively")
 	
+	# If there is a mixing profile we only perform the movements of the profile
+	if mixing_profile != None:
+		# Mix the cycles of the profile in each of the heights with the flow rate of the liquid class
+		for position in mixing_profile["Heights"]:
+			pipette.mix(mixing_profile["Cycles Per Height"], volume_mixing, location_tube.bottom(z = position), rate = mixing_profile["Flow Rate Factor"])
+		
+		for i in range(mixing_profile["Touch Tip Rounds"]):
+			pipette.touch_tip(location_tube, v_offset = -20, radius = 0.7, speed = 30)
+		
+		# Move liquid from the bottom to the top of the tube to homogenize the heights between them
+		for i in range(mixing_profile["Cross Strokes"]):
+			pipette.aspirate(volume_mixing, location_tube.bottom(z = mixing_profile["Heights"][0]), rate = mixing_profile["Flow Rate Factor"])
+			pipette.dispense(volume_mixing, location_tube.bottom(z = mixing_profile["Heights"][-1]), rate = mixing_profile["Flow Rate Factor"])
+		
+		# Finally we blow out in the centre of the tube any rests that have been left in the tip
+		pipette.blow_out(location_tube.center())
+		
+		return
+	
 	# Check the positions in which the mixing is going to be performed
 	positions_mixing = z_positions_mix_15eppendorf (volume_tube) # This is the part that is customized for the 1500uL eppendorfs
 	
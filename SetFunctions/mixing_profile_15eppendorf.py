@@ -0,0 +1,34 @@
+def mixing_profile_15eppendorf (volume_tube, volume_mixing, liquid_class, mixing_profiles):
+	"""
+	Function that will establish how a 1.5mL eppendorf tube is going to be mixed according to the volume it contains,
+	the volume handled by the pipette in each movement and the type of liquid that is inside of the tube
+
+	The heights are the ones of the liquid level model of the 1.5mL eppendorfs (z_positions_mix_15eppendorf) and the number of cycles
+	is the minimum needed to move the content of the tube the number of times established in the liquid class, with at least 'Min Cycles Per Height' in each height
+
+	4 mandatory arguments are needed for this function
+	"""
+	# Check that the liquid class is one of the defined ones
+	if liquid_class not in mixing_profiles.keys():
+		raise Exception(f"The liquid class '{liquid_class}' does not have a mixing profile. The mixing profiles defined are: {', '.join(mixing_profiles.keys())}")
+
+	profile = mixing_profiles[liquid_class]
+
+	# Take the heights of the liquid level model without repeating them, mixing twice at the same height is only extra cycles
+	heights_mixing = sorted(set(z_positions_mix_15eppendorf (volume_tube)))
+
+	# Minimum number of aspirate/dispense cycles that move the whole content of the tube the times set by the liquid class
+	total_cycles = math.ceil(profile["Tube Turnovers"]*volume_tube/volume_mixing)
+	cycles_per_height = max(int(profile["Min Cycles Per Height"]), math.ceil(total_cycles/len(heights_mixing)))
+
+	# If there is only 1 height it makes no sense to move liquid from the bottom to the top
+	if len(heights_mixing) == 1:
+		cross_strokes = 0
+	else:
+		cross_strokes = int(profile["Cross Strokes"])
+
+	return {"Heights": heights_mixing,
+			"Cycles Per Height": cycles_per_height,
+			"Flow Rate Factor": profile["Flow Rate Factor"],
+			"Touch Tip Rounds": int(profile["Touch Tip Rounds"]),
+			"Cross Strokes": cross_strokes}
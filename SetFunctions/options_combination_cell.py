@@ -0,0 +1,23 @@
+import pandas as pd
+
+def options_combination_cell (value):
+	"""
+	Function that will read a cell of a combinations table and return a list with the values that the cell can take
+
+	A cell written as {value1|value2|...} can take any of the values between the brackets, an empty cell does not take any value
+	and any other cell only takes its own value
+
+	1 mandatory argument is needed for this function
+	"""
+	# Empty cells do not give any value to the combination
+	if pd.isna(value):
+		return []
+	
+	# Cell with the options between brackets and separated by |
+	if isinstance(value, str) and value.strip().startswith("{") and value.strip().endswith("}"):
+		options = [option.strip() for option in value.strip()[1:-1].split("|")]
+		if "" in options:
+			raise Exception(f"The cell '{value}' has an empty option. The options of a cell have to be written as {{value1|value2|...}}")
+		return options
+	
+	return [value]
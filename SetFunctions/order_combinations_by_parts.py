@@ -0,0 +1,44 @@
+def order_combinations_by_parts (combinations, name_key_col_isolated, name_key_rest_columns, size_block = 1, number_positions = None, first_position = 0):
+	"""
+	Function that will order the combinations (output of combinations_table_to_dict) so the ones that share parts are placed in consecutive positions
+
+	The combinations are grouped by the value of name_key_col_isolated and, inside of each group, every combination is followed by the one that shares
+	more values of name_key_rest_columns with it. If size_block is greater than 1, the groups start at the beginning of a block of positions (a column of the labware)
+	as long as the empty positions that it creates do not make the combinations exceed number_positions
+
+	It returns a list with the names of the combinations in the order of the positions and None in the positions that are left empty
+
+	3 mandatory arguments and 3 optional are needed for this function
+	"""
+	# Group the combinations by the isolated value keeping the order in which the values appear
+	groups_isolated = {}
+	for name_combination, combination in combinations.items():
+		groups_isolated.setdefault(combination[name_key_col_isolated], []).append(name_combination)
+	
+	# The bigger groups go first so they are the ones that are more likely to start at a block
+	groups_sorted = sorted(groups_isolated.values(), key = lambda group: len(group), reverse = True)
+
+	order_positions = []
+	combinations_left = len(combinations)
+	for group in groups_sorted:
+		# Start the group in the next block if there is enough space for the rest of the combinations
+		if size_block > 1 and (first_position + len(order_positions))%size_block != 0:
+			empty_positions = size_block - (first_position + len(order_positions))%size_block
+			if number_positions == None or len(order_positions) + empty_positions + combinations_left <= number_positions:
+				order_positions += [None]*empty_positions
+		
+		# Chain the combinations of the group choosing each time the one that shares more parts with the last one placed
+		parts_group = {name_combination: set(combinations[name_combination][name_key_rest_columns]) for name_combination in group}
+		last_combination = group[0]
+		order_positions.append(last_combination)
+		del parts_group[last_combination]
+		while len(parts_group) > 0:
+			parts_last = set(combinations[last_combination][name_key_rest_columns])
+			# max returns the first combination with the highest number of shared parts, so the ties keep the order of the table
+			last_combination = max(parts_group.keys(), key = lambda name_combination: len(parts_group[name_combination] & parts_last))
+			order_positions.append(last_combination)
+			del parts_group[last_combination]
+		
+		combinations_left -= len(group)
+	
+	return order_positions
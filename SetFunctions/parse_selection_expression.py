@@ -0,0 +1,154 @@
+import re
+
+def parse_selection_expression (expression):
+	"""
+	Function that will read a selection expression of wells and return its parts so they can be evaluated with selection_expression_wells
+
+	The expression has the structure [WHERE] condition [ORDER BY value [ASC|DESC], ...] [LIMIT number], for example,
+	GFP/OD600 > 2 AND OD600 > 0.3 ORDER BY GFP DESC LIMIT 24, where GFP and OD600 are the names of the maps of values (sheets) of the plate
+	Names of maps with spaces or with the name of a keyword need to be written between quotes, for example, 'OD 600'
+
+	The condition admits the operators +, -, *, /, >, >=, <, <=, =, !=, AND, OR, NOT and parentheses, the condition can be omitted to select all the wells
+
+	1 mandatory argument is needed for this function
+	"""
+	# Split the expression in tokens, each one is (type, value)
+	pattern_tokens = re.compile(r"\s*(?:(?P<number>(?:\d+\.?\d*|\.\d+)(?:[eE][-+]?\d+)?)|'(?P<quoted_single>[^']*)'|\"(?P<quoted_double>[^\"]*)\"|(?P<word>[A-Za-z_][A-Za-z0-9_.]*)|(?P<operator>>=|<=|==|!=|<>|>|<|=|\+|-|\*|/|\(|\)|,))")
+	keywords = ["WHERE", "AND", "OR", "NOT", "ORDER", "BY", "ASC", "DESC", "LIMIT"]
+
+	tokens = []
+	position = 0
+	expression = str(expression).strip()
+	while position < len(expression):
+		token = pattern_tokens.match(expression, position)
+		if token == None:
+			index_character = len(expression) - len(expression[position:].lstrip())
+			raise Exception(f"The selection expression '{expression}' has a character that is not recognised in the position {index_character+1}: '{expression[index_character]}'")
+		position = token.end()
+
+		if token.group("number") != None:
+			tokens.append(("number", float(token.group("number"))))
+		elif token.group("quoted_single") != None or token.group("quoted_double") != None:
+			tokens.append(("map", token.group("quoted_single") if token.group("quoted_single") != None else token.group("quoted_double")))
+		elif token.group("word") != None and token.group("word").upper() in keywords:
+			tokens.append(("keyword", token.group("word").upper()))
+		elif token.group("word") != None:
+			tokens.append(("map", token.group("word")))
+		else:
+			tokens.append(("operator", {"==":"=", "<>":"!="}.get(token.group("operator"), token.group("operator"))))
+	tokens.append(("end", None))
+
+	# Recursive descent through the tokens, each part of the condition is returned as a tuple (type of node, values of the node)
+	index_token = [0]
+	maps_used = []
+
+	def next_is (type_token, value_token = None):
+		return tokens[index_token[0]][0] == type_token and (value_token == None or tokens[index_token[0]][1] == value_token)
+
+	def take (type_token, value_token = None):
+		if not next_is(type_token, value_token):
+			found = tokens[index_token[0]][1] if tokens[index_token[0]][0] != "end" else "the end of the expression"
+			expected = value_token if value_token != None else {"end":"the end of the expression", "number":"a number", "map":"a map name"}.get(type_token, type_token)
+			raise Exception(f"The selection expression '{expression}' expected {expected} and found {found}")
+		index_token[0] += 1
+		return tokens[index_token[0]-1][1]
+
+	def read_or ():
+		node = read_and()
+		while next_is("keyword", "OR"):
+			take("keyword", "OR")
+			node = ("OR", node, read_and())
+		return node
+
+	def read_and ():
+		node = read_not()
+		while next_is("keyword", "AND"):
+			take("keyword", "AND")
+			node = ("AND", node, read_not())
+		return node
+
+	def read_not ():
+		if next_is("keyword", "NOT"):
+			take("keyword", "NOT")
+			return ("NOT", read_not())
+		return read_comparison()
+
+	def read_comparison ():
+		node = read_sum()
+		if next_is("operator") and tokens[index_token[0]][1] in [">", ">=", "<", "<=", "=", "!="]:
+			operator = take("operator")
+			node = (operator, node, read_sum())
+		return node
+
+	def read_sum ():
+		node = read_product()
+		while next_is("operator", "+") or next_is("operator", "-"):
+			operator = take("operator")
+			node = (operator, node, read_product())
+		return node
+
+	def read_product ():
+		node = read_unary()
+		while next_is("operator", "*") or next_is("operator", "/"):
+			operator = take("operator")
+			node = (operator, node, read_unary())
+		return node
+
+	def read_unary ():
+		if next_is("operator", "-"):
+			take("operator", "-")
+			return ("NEGATIVE", read_unary())
+		if next_is("number"):
+			return ("NUMBER", take("number"))
+		if next_is("map"):
+			name_map = take("map")
+			if name_map not in maps_used:
+				maps_used.append(name_map)
+			return ("MAP", name_map)
+		if next_is("operator", "("):
+			take("operator", "(")
+			node = read_or()
+			take("operator", ")")
+			return node
+		found = tokens[index_token[0]][1] if tokens[index_token[0]][0] != "end" else "the end of the expression"
+		raise Exception(f"The selection expression '{expression}' expected a number, a map name or '(' and found {found}")
+
+	# Condition, if there is one
+	if next_is("keyword", "WHERE"):
+		take("keyword", "WHERE")
+		condition = read_or()
+	elif next_is("keyword", "ORDER") or next_is("keyword", "LIMIT") or next_is("end"):
+		condition = None
+	else:
+		condition = read_or()
+
+	# Order of the selected wells, if there is one
+	order = []
+	if next_is("keyword", "ORDER"):
+		take("keyword", "ORDER")
+		take("keyword", "BY")
+		while True:
+			value_order = read_sum()
+			descending = False
+			if next_is("keyword", "DESC"):
+				take("keyword", "DESC")
+				descending = True
+			elif next_is("keyword", "ASC"):
+				take("keyword", "ASC")
+			order.append((value_order, descending))
+			if not next_is("operator", ","):
+				break
+			take("operator", ",")
+
+	# Max number of wells selected, if there is one
+	limit = None
+	if next_is("keyword", "LIMIT"):
+		take("keyword", "LIMIT")
+		limit = take("number")
+		if limit != int(limit) or limit < 1:
+			raise Exception(f"The LIMIT of the selection expression '{expression}' needs to be an integer greater than 0")
+		limit = int(limit)
+
+	take("end")
+
+	return {"Expression":expression, "Condition":condition, "Order":order, "Limit":limit, "Maps":maps_used}
@@ -0,0 +1,23 @@
+def plate_swap_waves (number_plates, positions_free, number_positions_reserved = 0):
+	"""
+	Function that will split the plates that need to be in the deck in waves that fit in the free positions of the deck,
+	leaving some of these positions free for labware that is loaded later, for example, the tip racks
+
+	All the waves use the same positions, so between waves the plates of one wave are swapped by the ones of the next wave
+	Each wave is a dictionary with the positions as keys and the index of the plate that is placed in each of them as values
+
+	2 mandatory arguments and 1 optional are needed for this function
+	"""
+	# Positions that the plates can use in every wave
+	positions_plates = list(positions_free)[:len(positions_free)-number_positions_reserved]
+
+	if number_plates > 0 and len(positions_plates) == 0:
+		raise Exception(f"There is not enough space in the deck for the plates, there are {len(positions_free)} free positions and {number_positions_reserved} of them are needed for other labware")
+
+	# Fill the positions with consecutive plates, the last wave can have less plates than positions
+	waves = []
+	for index_first_plate in range(0, number_plates, max(len(positions_plates), 1)):
+		plates_wave = range(index_first_plate, min(index_first_plate+len(positions_plates), number_plates))
+		waves.append(dict(zip(positions_plates, plates_wave)))
+
+	return waves
@@ -0,0 +1,95 @@
+import numpy as np
+
+def selection_expression_wells (selection_expression, maps_values, wells_available = None):
+	"""
+	Function that will select the wells of a plate that fulfill a selection expression (output of parse_selection_expression)
+	evaluating it at once over all the maps of values of the plate
+
+	The selected wells are returned as [index_row, index_column] sorted as the ORDER BY of the expression establishes and, when the values are the same or there is no order,
+	in the order of the wells in the labware (column by column). Wells with an empty value in any map of the expression are never selected and, if wells_available is given, neither the ones that are False in it
+
+	2 mandatory arguments and 1 optional are needed for this function
+	"""
+	# Check that all the maps needed are given and that they have the same dimensions
+	for name_map in selection_expression["Maps"]:
+		if name_map not in maps_values.keys():
+			raise Exception(f"The map of values '{name_map}' of the selection expression '{selection_expression['Expression']}' has not been provided")
+
+	arrays_maps = {name_map:np.asarray(maps_values[name_map], dtype = float) for name_map in selection_expression["Maps"]}
+	if wells_available is not None:
+		shape_plate = np.asarray(wells_available).shape
+	elif len(arrays_maps) > 0:
+		shape_plate = list(arrays_maps.values())[0].shape
+	else:
+		raise Exception(f"The selection expression '{selection_expression['Expression']}' needs at least 1 map of values or the available wells to know the dimensions of the plate")
+
+	if any(array_map.shape != shape_plate for array_map in arrays_maps.values()):
+		raise Exception(f"The maps of values of the selection expression '{selection_expression['Expression']}' need to have the same dimensions")
+
+	def evaluate (node):
+		# Every node is evaluated in the whole plate, the result is an array with the dimensions of the plate
+		if node[0] == "NUMBER":
+			return np.full(shape_plate, node[1])
+		if node[0] == "MAP":
+			return arrays_maps[node[1]]
+		if node[0] == "NEGATIVE":
+			return -evaluate(node[1])
+		if node[0] == "NOT":
+			return ~logical(node[1])
+		if node[0] in ["AND", "OR"]:
+			return logical(node[1]) & logical(node[2]) if node[0] == "AND" else logical(node[1]) | logical(node[2])
+
+		left = numerical(node[1])
+		right = numerical(node[2])
+		# Empty values or divisions by 0 give NaN and these ones never fulfill a comparison
+		with np.errstate(divide = "ignore", invalid = "ignore"):
+			return {"+":np.add, "-":np.subtract, "*":np.multiply, "/":np.divide,
+					">":np.greater, ">=":np.greater_equal, "<":np.less, "<=":np.less_equal, "=":np.equal, "!=":np.not_equal}[node[0]](left, right)
+
+	def logical (node):
+		result = evaluate(node)
+		if result.dtype != bool:
+			raise Exception(f"The selection expression '{selection_expression['Expression']}' uses a value where a condition is needed, for example, after AND, OR, NOT or as the whole condition")
+		return result
+
+	def numerical (node):
+		result = evaluate(node)
+		if result.dtype == bool:
+			raise Exception(f"The selection expression '{selection_expression['Expression']}' uses a condition where a value is needed, for example, in an arithmetic operation or in ORDER BY")
+		return result
+
+	# Wells that fulfill the condition, if there is one
+	if selection_expression["Condition"] != None:
+		mask_selected = logical(selection_expression["Condition"])
+	else:
+		mask_selected = np.ones(shape_plate, dtype = bool)
+
+	if wells_available is not None:
+		mask_selected = mask_selected & np.asarray(wells_available, dtype = bool)
+
+	# Wells with an empty value in any map of the expression are never selected, not even through NOT, != or an ORDER BY without condition
+	for array_map in arrays_maps.values():
+		mask_selected = mask_selected & ~np.isnan(array_map)
+
+	# Neither the wells in which a value of ORDER BY cannot be calculated, e.g., a division 0/0, because they cannot be sorted
+	values_order = []
+	for value_order, descending in selection_expression["Order"]:
+		with np.errstate(divide = "ignore", invalid = "ignore"):
+			values_order.append([numerical(value_order), descending])
+		mask_selected = mask_selected & ~np.isnan(values_order[-1][0])
+
+	# Index of the selected wells going through the plate column by column, which is the order of the wells in the labware
+	index_wells = np.flatnonzero(mask_selected.T)
+
+	# Sort the wells by the values of ORDER BY, lexsort is stable so wells with the same values keep the labware order
+	if len(values_order) > 0:
+		keys_order = [index_wells]
+		for values_plate, descending in reversed(values_order):
+			values_wells = values_plate.T.ravel()[index_wells]
+			keys_order.append(-values_wells if descending else values_wells)
+		index_wells = index_wells[np.lexsort(keys_order)]
+
+	if selection_expression["Limit"] != None:
+		index_wells = index_wells[:selection_expression["Limit"]]
+
+	return [[int(index_well % shape_plate[0]), int(index_well // shape_plate[0])] for index_well in index_wells]
@@ -0,0 +1,75 @@
+def set_liquid_class (pipettes, liquid_class, liquid_classes, default_flow_rates, protocol):
+	"""
+	Function that will set the aspirate, dispense and blow out flow rates of the given pipettes to the ones of a liquid class
+	and the seconds that the pipettes wait after every aspiration and dispense
+
+	The rates of the liquid classes are factors of the default flow rates of each pipette, so the same liquid class can be used with any pipette,
+	or 'max' to use the maximum flow rate of the pipette. No rate is set higher than the maximum flow rate of the pipette
+	If the liquid class is None, the default flow rates of the pipettes are restored and the delays are removed
+
+	The delays replace the aspirate and dispense of the pipettes by ones that wait after them, which is only done in the versions of Opentrons
+	where it has been checked that the transfers, distributions and mixes call the aspirate and dispense of the pipette, so they also perform the delays
+
+	5 mandatory arguments are needed for this function
+	"""
+	# Maximum flow rates of aspiration, dispense and blow out, in uL/s, of the pipettes of the OT-2 as they are in their definitions
+	max_flow_rates = {"p10_single":[50, 50, 1000], "p10_multi":[50, 50, 1000], "p50_single":[100, 100, 1000], "p50_multi":[100, 100, 1000],
+					  "p300_single":[600, 600, 1000], "p300_multi":[600, 600, 1000], "p1000_single":[2000, 2000, 1000],
+					  "p20_single_gen2":[24, 24, 24], "p20_multi_gen2":[24, 24, 24], "p300_single_gen2":[275, 275, 275],
+					  "p300_multi_gen2":[275, 275, 275], "p1000_single_gen2":[812, 812, 812]}
+
+	# Check that the liquid class is one of the defined ones
+	if liquid_class != None and liquid_class not in liquid_classes.keys():
+		raise Exception(f"The liquid class '{liquid_class}' is not defined. The liquid classes defined are: {', '.join(liquid_classes.keys())}")
+
+	# Major versions of Opentrons in which the transfers, distributions and mixes call the aspirate and dispense of the pipette
+	versions_with_delays = [6, 7, 8]
+
+	if liquid_class == None:
+		factors_class = {"Aspirate Rate":1, "Dispense Rate":1, "Blow Out Rate":1, "Aspirate Delay":0, "Dispense Delay":0}
+	else:
+		factors_class = liquid_classes[liquid_class]
+
+	# Check that the delays will be performed in the complex commands of the installed version of Opentrons
+	if factors_class.get("Aspirate Delay", 0) > 0 or factors_class.get("Dispense Delay", 0) > 0:
+		import opentrons
+		version_opentrons = str(getattr(opentrons, "__version__", "unknown"))
+		if version_opentrons.split(".")[0] not in [str(version) for version in versions_with_delays]:
+			raise Exception(f"The liquid class '{liquid_class}' has delays, which can only be performed with the major versions {', '.join([str(version) for version in versions_with_delays])} of Opentrons and the installed one is {version_opentrons}. Set the delays of the liquid class to 0 or use one of those versions")
+
+	def with_delay (command, seconds):
+		# Command of the pipette that performs the given one and then waits the seconds of the liquid class
+		def command_and_delay (*args, **kwargs):
+			result_command = command(*args, **kwargs)
+			protocol.delay(seconds = seconds)
+			return result_command
+		return command_and_delay
+
+	# Set the rates and delays in all the pipettes that have been loaded
+	for pipette in pipettes:
+		if pipette == None:
+			continue
+
+		if pipette.name not in max_flow_rates.keys():
+			raise Exception(f"The maximum flow rates of the pipette '{pipette.name}' are not known, so a liquid class cannot be set in it. The pipettes contemplated are: {', '.join(max_flow_rates.keys())}")
+
+		rates_pipette = {}
+		for index_rate, name_rate in enumerate(["Aspirate", "Dispense", "Blow Out"]):
+			max_rate = max_flow_rates[pipette.name][index_rate]
+			if factors_class[f"{name_rate} Rate"] == "max":
+				rates_pipette[name_rate] = max_rate
+			else:
+				rates_pipette[name_rate] = min(default_flow_rates[pipette.mount][name_rate]*factors_class[f"{name_rate} Rate"], max_rate)
+		pipette.flow_rate.aspirate = rates_pipette["Aspirate"]
+		pipette.flow_rate.dispense = rates_pipette["Dispense"]
+		pipette.flow_rate.blow_out = rates_pipette["Blow Out"]
+
+		# The delays replace the aspirate and dispense of this pipette by ones that wait after them, the ones of a previous liquid class are removed first
+		pipette.__dict__.pop("aspirate", None)
+		pipette.__dict__.pop("dispense", None)
+		if factors_class.get("Aspirate Delay", 0) > 0:
+			pipette.aspirate = with_delay(pipette.aspirate, factors_class["Aspirate Delay"])
+		if factors_class.get("Dispense Delay", 0) > 0:
+			pipette.dispense = with_delay(pipette.dispense, factors_class["Dispense Delay"])
+
+	return
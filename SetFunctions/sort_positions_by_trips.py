@@ -0,0 +1,18 @@
+def sort_positions_by_trips (positions, trips_slots):
+	"""
+	Function that will sort the deck positions from the one with the lowest gantry travel to the one with the highest for a labware
+	that is going to be visited together with labwares that are already placed in the deck
+
+	The argument trips_slots is a dictionary with the slots of the labwares already placed as keys and the number of trips expected
+	between them and the labware that is going to be placed as values. The travel of a position is the sum of those trips multiplied by the
+	distance between slots, so setting_labware and define_tiprack will try first the positions with the least travel and, in case of deck conflict, the next ones
+
+	Positions with the same travel keep their original order
+
+	2 mandatory arguments are needed for this function
+	"""
+	travel_positions = {}
+	for position in positions.keys():
+		travel_positions[position] = sum(trips*distance_deck_slots(position, slot) for slot, trips in trips_slots.items())
+	
+	return dict(sorted(positions.items(), key = lambda position: travel_positions[position[0]]))
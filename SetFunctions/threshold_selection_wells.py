@@ -0,0 +1,24 @@
+import numpy as np
+
+def threshold_selection_wells (values_lower, values_higher, threshold):
+	"""
+	Function that will select the wells of a plate that have a value lower or equal than the threshold in one map of values
+	and a value greater or equal than the threshold in another map of values of the same plate
+
+	Both maps are compared at once as arrays and the selected wells are returned as [index_row, index_column] in the order of the wells in the labware,
+	i.e., column by column, so the selection does not need the labware to be loaded
+
+	3 mandatory arguments are needed for this function
+	"""
+	# Both maps need to have the same dimensions to be compared cell by cell
+	values_lower = np.asarray(values_lower, dtype = float)
+	values_higher = np.asarray(values_higher, dtype = float)
+
+	if values_lower.shape != values_higher.shape:
+		raise Exception(f"The maps of values need to have the same dimensions to select the wells and they have {values_lower.shape} and {values_higher.shape}")
+
+	# Cells that fulfill both conditions
+	mask_selected = (values_lower <= threshold) & (values_higher >= threshold)
+
+	# Transposing the mask the indexes come sorted by column and then by row, which is the order of the wells in the labware
+	return [[int(index_row), int(index_column)] for index_column, index_row in np.argwhere(mask_selected.T)]
@@ -0,0 +1,44 @@
+# Smoke tests of the dry run of the LAP entries (LAPEntries/DryRunEntries.py) with the filled examples of ExampleVariableFiles.py
+# The labware of the examples is only in opentrons_shared_data, so no folder of custom labware (-labware) is given
+
+import os
+import sys
+import pytest
+
+pytest.importorskip("opentrons_shared_data")
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "LAPEntries"))
+
+import DryRunEntries
+
+def test_shared_data_definitions_found ():
+	definitions = DryRunEntries.LabwareDefinitions([])
+	assert definitions.folderSharedData != None
+	assert os.path.exists(os.path.join(definitions.folderSharedData, "opentrons_96_tiprack_20ul"))
+
+@pytest.mark.parametrize("entry", DryRunEntries.entries, ids = [entry["Entry"] for entry in DryRunEntries.entries])
+def test_dry_run_example_without_custom_labware (entry):
+	protocol, planning_time, error = DryRunEntries.dry_run(entry)
+
+	assert error == None
+	assert len(protocol.loaded_instruments) > 0
+	assert sum(protocol.tipsUsed.values()) > 0
+	assert len(protocol.commands) > 0
+
+def test_dry_run_reports_deck_conflict_as_not_feasible (monkeypatch):
+	def load_labware (self, load_name, location, label = None, namespace = None, version = None):
+		raise DryRunEntries.DeckConflictError(f"The slot {location} is already occupied")
+	monkeypatch.setattr(DryRunEntries.ProtocolContext, "load_labware", load_labware)
+
+	protocol, planning_time, error = DryRunEntries.dry_run(DryRunEntries.entries[0])
+
+	# The script catches the deck conflicts and raises its own error about the variables
+	assert type(error) == Exception
+	assert "have been able to be placed" in str(error)
+
+def test_dry_run_raises_errors_that_are_not_of_the_variables (monkeypatch):
+	def load_labware (self, load_name, location, label = None, namespace = None, version = None):
+		raise TypeError("Bug of the stand-in labware")
+	monkeypatch.setattr(DryRunEntries.ProtocolContext, "load_labware", load_labware)
+
+	with pytest.raises(TypeError):
+		DryRunEntries.dry_run(DryRunEntries.entries[0])
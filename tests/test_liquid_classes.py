@@ -0,0 +1,109 @@
+# Tests of the liquid classes (SetFunctions/liquid_classes_table_to_dict.py and SetFunctions/set_liquid_class.py): the rates 'max', the delays of the classes
+# and that the delays are performed in the transfers of Opentrons
+
+import importlib.util
+import os
+import pytest
+import sys
+import types
+
+pd = pytest.importorskip("pandas")
+
+def load_set_function (name_function):
+	path_function = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "SetFunctions", f"{name_function}.py")
+	specification = importlib.util.spec_from_file_location(name_function, path_function)
+	module = importlib.util.module_from_spec(specification)
+	specification.loader.exec_module(module)
+	return getattr(module, name_function)
+
+liquid_classes_table_to_dict = load_set_function("liquid_classes_table_to_dict")
+set_liquid_class = load_set_function("set_liquid_class")
+
+table_classes = pd.DataFrame({"Liquid Class":["fast", "viscous"], "Aspirate Rate":["max", 0.1], "Dispense Rate":["MAX", 0.2], "Blow Out Rate":[4, 1],
+							  "Touch Tip":[None, True], "Aspirate Delay":[None, 2], "Dispense Delay":[None, 1.5]})
+
+def test_table_to_dict ():
+	liquid_classes, reagent_liquid_classes = liquid_classes_table_to_dict(table_classes, pd.DataFrame({"Reagent":["Ligase"], "Liquid Class":["viscous"]}), ["Ligase", "Water"])
+
+	assert liquid_classes["fast"] == {"Aspirate Rate":"max", "Dispense Rate":"max", "Blow Out Rate":4, "Aspirate Delay":0, "Dispense Delay":0, "Touch Tip":None}
+	assert liquid_classes["viscous"] == {"Aspirate Rate":0.1, "Dispense Rate":0.2, "Blow Out Rate":1, "Aspirate Delay":2, "Dispense Delay":1.5, "Touch Tip":True}
+	assert reagent_liquid_classes == {"Ligase":"viscous"}
+
+def test_table_without_touch_tip_or_delays ():
+	liquid_classes, reagent_liquid_classes = liquid_classes_table_to_dict(table_classes[["Liquid Class", "Aspirate Rate", "Dispense Rate", "Blow Out Rate"]], None, [], touch_tip = False)
+
+	assert liquid_classes["viscous"] == {"Aspirate Rate":0.1, "Dispense Rate":0.2, "Blow Out Rate":1, "Aspirate Delay":0, "Dispense Delay":0}
+	assert reagent_liquid_classes == None
+
+@pytest.mark.parametrize("column, value", [("Aspirate Rate", 0), ("Dispense Rate", "fast"), ("Aspirate Delay", -1), ("Touch Tip", "maybe")])
+def test_table_wrong_values (column, value):
+	table_wrong = table_classes.copy()
+	table_wrong[column] = table_wrong[column].astype(object)
+	table_wrong.loc[1, column] = value
+
+	with pytest.raises(Exception):
+		liquid_classes_table_to_dict(table_wrong, None, [])
+
+def test_reagent_not_allowed ():
+	with pytest.raises(Exception):
+		liquid_classes_table_to_dict(None, pd.DataFrame({"Reagent":["Serum"], "Liquid Class":["viscous"]}), ["Ligase", "Water"])
+
+def test_rates_and_delays_in_simulated_transfer ():
+	simulate = pytest.importorskip("opentrons.simulate")
+	protocol = simulate.get_protocol_api("2.14")
+	tiprack = protocol.load_labware("opentrons_96_tiprack_300ul", 1)
+	plate = protocol.load_labware("corning_96_wellplate_360ul_flat", 2)
+	pipette = protocol.load_instrument("p300_single_gen2", "right", tip_racks = [tiprack])
+	default_flow_rates = {"right":{"Aspirate":pipette.flow_rate.aspirate, "Dispense":pipette.flow_rate.dispense, "Blow Out":pipette.flow_rate.blow_out}}
+	liquid_classes, reagent_liquid_classes = liquid_classes_table_to_dict(table_classes, None, [])
+
+	set_liquid_class([pipette, None], "fast", liquid_classes, default_flow_rates, protocol)
+	assert (pipette.flow_rate.aspirate, pipette.flow_rate.dispense) == (275, 275)
+	# A factor never sets a rate higher than the maximum flow rate of the pipette
+	assert pipette.flow_rate.blow_out == 275
+
+	set_liquid_class([pipette], "viscous", liquid_classes, default_flow_rates, protocol)
+	pipette.transfer(50, plate["A1"], plate["B1"])
+	commands = [command for command in protocol.commands() if command.startswith(("Aspirating", "Dispensing", "Delaying"))]
+	assert [command.split(" ")[0] for command in commands] == ["Aspirating", "Delaying", "Dispensing", "Delaying"]
+	assert "2.0 seconds" in commands[1] and "1.5 seconds" in commands[3]
+
+	# Without a liquid class the default flow rates are restored and there are no delays
+	set_liquid_class([pipette], None, liquid_classes, default_flow_rates, protocol)
+	assert pipette.flow_rate.aspirate == default_flow_rates["right"]["Aspirate"]
+	assert "aspirate" not in pipette.__dict__ and "dispense" not in pipette.__dict__
+
+class PipetteWithoutDefinition:
+	def __init__ (self, name):
+		self.name = name
+		self.mount = "right"
+		self.flow_rate = types.SimpleNamespace(aspirate = 1, dispense = 1, blow_out = 1)
+
+	def aspirate (self, *args, **kwargs):
+		return self
+
+	def dispense (self, *args, **kwargs):
+		return self
+
+def test_unknown_pipette_raises ():
+	liquid_classes, reagent_liquid_classes = liquid_classes_table_to_dict(table_classes, None, [])
+
+	# Without the maximum flow rates of the pipette, 'max' cannot be set
+	with pytest.raises(Exception, match = "maximum flow rates"):
+		set_liquid_class([PipetteWithoutDefinition("p5000_unknown")], "fast", liquid_classes, {"right":{"Aspirate":1, "Dispense":1, "Blow Out":1}}, None)
+
+@pytest.mark.parametrize("version, raises", [("8.2.0", False), ("9.0.0", True), ("5.0.2", True)])
+def test_delays_only_in_checked_versions (monkeypatch, version, raises):
+	monkeypatch.setitem(sys.modules, "opentrons", types.SimpleNamespace(__version__ = version))
+	liquid_classes, reagent_liquid_classes = liquid_classes_table_to_dict(table_classes, None, [])
+	pipette = PipetteWithoutDefinition("p300_single_gen2")
+	default_flow_rates = {"right":{"Aspirate":1, "Dispense":1, "Blow Out":1}}
+
+	# The classes without delays do not depend on the version of Opentrons
+	set_liquid_class([pipette], "fast", liquid_classes, default_flow_rates, None)
+	if raises:
+		with pytest.raises(Exception, match = "delays"):
+			set_liquid_class([pipette], "viscous", liquid_classes, default_flow_rates, None)
+	else:
+		set_liquid_class([pipette], "viscous", liquid_classes, default_flow_rates, None)
+		assert "aspirate" in pipette.__dict__ and "dispense" in pipette.__dict__
@@ -0,0 +1,51 @@
+# Tests of the selection of wells with expressions (SetFunctions/parse_selection_expression.py and SetFunctions/selection_expression_wells.py)
+# on maps of values with empty cells, which are never selected
+
+import importlib.util
+import os
+import pytest
+
+np = pytest.importorskip("numpy")
+
+def load_set_function (name_function):
+	path_function = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "SetFunctions", f"{name_function}.py")
+	specification = importlib.util.spec_from_file_location(name_function, path_function)
+	module = importlib.util.module_from_spec(specification)
+	specification.loader.exec_module(module)
+	return getattr(module, name_function)
+
+parse_selection_expression = load_set_function("parse_selection_expression")
+selection_expression_wells = load_set_function("selection_expression_wells")
+
+# Plate of 2 rows and 3 columns, B1 does not have a value of GFP and A3 does not have a value of OD600
+maps_values = {"GFP":np.array([[0.7, 0.2, 0.9], [np.nan, 0.6, 0.4]]),
+			   "OD600":np.array([[0.5, 0.4, np.nan], [0.3, 0.0, 0.2]])}
+wells_available = np.ones((2, 3), dtype = bool)
+
+def select (expression):
+	return selection_expression_wells(parse_selection_expression(expression), maps_values, wells_available)
+
+def test_not_excludes_empty_values ():
+	# NOT GFP > 0.5 is True where GFP is empty because NaN > 0.5 is False
+	assert select("NOT GFP > 0.5") == [[0, 1], [1, 2]]
+
+def test_not_equal_excludes_empty_values ():
+	# NaN != 0.6 is True in numpy
+	assert select("GFP != 0.6") == [[0, 0], [0, 1], [0, 2], [1, 2]]
+
+def test_empty_values_of_every_map_are_excluded ():
+	# A3 has a GFP value but not an OD600 value
+	assert select("GFP > 0.3 OR OD600 > 0.3") == [[0, 0], [0, 1], [1, 1], [1, 2]]
+
+def test_order_by_without_condition_excludes_empty_values ():
+	assert select("ORDER BY GFP DESC") == [[0, 2], [0, 0], [1, 1], [1, 2], [0, 1]]
+
+def test_order_by_excludes_values_that_cannot_be_calculated ():
+	# GFP/OD600 in B2 is 0.6/0 (infinite) and it is sorted, A3 and B1 have empty values
+	assert select("ORDER BY GFP/OD600 DESC") == [[1, 1], [1, 2], [0, 0], [0, 1]]
+	# 0/0 cannot be sorted
+	maps_zero = {"GFP":np.array([[0.0, 1.0]]), "OD600":np.array([[0.0, 2.0]])}
+	assert selection_expression_wells(parse_selection_expression("ORDER BY GFP/OD600"), maps_zero) == [[0, 1]]
+
+def test_limit_after_excluding_empty_values ():
+	assert select("ORDER BY GFP DESC LIMIT 2") == [[0, 2], [0, 0]]
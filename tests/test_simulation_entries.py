@@ -0,0 +1,173 @@
+# Tests of the transfers of the scripts of the LAP entries simulated with opentrons.simulate as in LAPEntries/BenchmarkSimulationEntries.py,
+# with variations of the filled examples of ExampleVariableFiles.py
+
+import copy
+import os
+import sys
+import tempfile
+import pytest
+
+pytest.importorskip("opentrons")
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "LAPEntries"))
+
+import builtins
+import pandas as pd
+import opentrons.simulate
+from openpyxl import Workbook
+from opentrons.types import Location
+import BenchmarkSimulationEntries
+import ExampleVariableFiles
+
+def simulate_example (name_entry, variables_changed, monkeypatch):
+	"""
+	Function that will simulate the script of an entry with its example variable file, changing or adding the given variables, and return the run log
+
+	The variables are given as {sheet:{variable name:value}} for the sheets of variables (first column with the names and second one with the values)
+	or as {sheet:DataFrame} to replace or add a whole sheet, for example a map of a plate
+
+	3 mandatory arguments are needed for this function
+	"""
+	sheets = copy.deepcopy(ExampleVariableFiles.examples[name_entry]["Sheets"])
+	for name_sheet, values_sheet in variables_changed.items():
+		if isinstance(values_sheet, pd.DataFrame):
+			sheets[name_sheet] = values_sheet
+			continue
+		table = sheets[name_sheet]
+		table[table.columns[1]] = table[table.columns[1]].astype(object)
+		for name_variable, value in values_sheet.items():
+			if name_variable in table[table.columns[0]].values:
+				table.loc[table[table.columns[0]] == name_variable, table.columns[1]] = value
+			else:
+				table.loc[len(table)] = [name_variable, value]+[None]*(len(table.columns)-2)
+	monkeypatch.setitem(ExampleVariableFiles.examples[name_entry], "Sheets", sheets)
+
+	entry = [entry for entry in BenchmarkSimulationEntries.entries if entry["Entry"] == name_entry][0]
+	path_script = os.path.join(os.path.dirname(os.path.abspath(BenchmarkSimulationEntries.__file__)), entry["Entry"], entry["Script"])
+	with tempfile.TemporaryDirectory() as folder_example, tempfile.TemporaryDirectory() as folder_output:
+		ExampleVariableFiles.write_example_variable_file(name_entry, folder_example)
+		original_functions = BenchmarkSimulationEntries.redirect_user_storage(folder_example, folder_output)
+		try:
+			with open(path_script) as protocol_file:
+				run_log, bundle = opentrons.simulate.simulate(protocol_file, file_name = entry["Script"])
+		finally:
+			pd.read_excel = original_functions["read_excel"]
+			pd.ExcelWriter = original_functions["ExcelWriter"]
+			builtins.open = original_functions["open"]
+			Workbook.save = original_functions["save"]
+
+	return run_log
+
+def well_command (command):
+	# Well and height of the aspirations, dispenses and mixes of the run log, None for the rest of the commands
+	location = command["payload"].get("location")
+	if not isinstance(location, Location) or location.labware.is_well == False:
+		return None, None
+	return location.labware.as_well(), location.point.z
+
+def test_pcr_multi_dispense_samples_in_empty_final_wells (monkeypatch):
+	run_log = simulate_example("LAP-PCR-OT2-2.0.0", {"ReagentsPerReaction":{"Multi-Dispense Samples":True}}, monkeypatch)
+
+	# The first liquid of every final well is its sample, the sample touched by a tip is registered every time that it goes below the top of a final well
+	samples_final_wells = {}
+	last_aspirated_wells = {}
+	samples_touched_tips = {}
+	aspirations_samples = 0
+	for command in run_log:
+		text_command = command["payload"]["text"]
+		instrument = command["payload"].get("instrument")
+		if text_command.startswith("Picking up tip"):
+			samples_touched_tips[instrument] = set()
+		well, height = well_command(command)
+		if well == None:
+			continue
+		if text_command.startswith("Aspirating"):
+			last_aspirated_wells[instrument] = well
+			aspirations_samples += "Source Plate" in str(well)
+		elif "Final" in str(well) and text_command.startswith("Dispensing") and well not in samples_final_wells:
+			# The samples are dispensed in the bottom of the final wells before the mixes
+			assert "Source Plate" in str(last_aspirated_wells[instrument]), f"The mix has been dispensed in {well} before its sample"
+			assert height < well.top().point.z
+			samples_final_wells[well] = last_aspirated_wells[instrument]
+		if "Final" in str(well) and height < well.top().point.z:
+			samples_touched_tips[instrument].add(samples_final_wells[well])
+			assert len(samples_touched_tips[instrument]) <= 1, f"A tip has touched the samples of {', '.join(map(str, samples_touched_tips[instrument]))}"
+
+	# The example has 3 sets, so the samples are aspirated less times than there are final wells with a sample
+	assert 0 < aspirations_samples < len(samples_final_wells)
+
+def map_plate_384 (value_well):
+	# Map of a 384-well plate, 16 rows (A to P) and 24 columns (1 to 24), with the value returned by value_well(index_row, column) in every well
+	names_rows = [chr(ord("A")+index_row) for index_row in range(16)]
+	map_values = pd.DataFrame([[value_well(index_row, column) for column in range(1, 25)] for index_row in range(16)], index = names_rows, columns = range(1, 25))
+	map_values.index.name = "Row/Column"
+	return map_values
+
+def multi_channel_wells (run_log):
+	# Wells in which the multi-channel pipette aspirates and dispenses, in the order of the run log
+	wells_commands = []
+	for command in run_log:
+		if command["payload"].get("instrument") != None and command["payload"]["instrument"].channels == 8 and command["payload"]["text"].startswith(("Aspirating", "Dispensing")):
+			well, height = well_command(command)
+			wells_commands.append((command["payload"]["text"].split(" ")[0], str(well).split(" ")[0]))
+	return wells_commands
+
+@pytest.mark.parametrize("final_plate", ["corning_384_wellplate_112ul_flat", "corning_96_wellplate_360ul_flat"])
+def test_counter_selection_384_source_plate_interleaved_groups (final_plate, monkeypatch):
+	# Column 1 is fully selected, in column 2 only the rows of A2 (A, C, ..., O), in column 3 only the ones of B3 (B, D, ..., P) and in column 4 only D4
+	def selected (index_row, column):
+		return column == 1 or (column == 2 and index_row % 2 == 0) or (column == 3 and index_row % 2 == 1) or (column == 4 and index_row == 3)
+
+	run_log = simulate_example("LAP-ColonyCounterSelection-OT2-2.0.0",
+							   {"GeneralVariables":{"API Name Source Plate":"corning_384_wellplate_112ul_flat", "API Name Final Plate":final_plate},
+								"PipetteVariables":{"API Name Right Pipette":"p20_multi_gen2"},
+								"PerPlateVariables":{"Volume Transfer Sample (uL)":20},
+								"ColonyCounts":map_plate_384(lambda index_row, column: 0 if selected(index_row, column) else 100),
+								"Fluorescence":map_plate_384(lambda index_row, column: 100 if selected(index_row, column) else 0)},
+							   monkeypatch)
+
+	# The 4 groups of 8 wells are moved with the 8-channel pipette from the first well of each group and, in the final plates, they fill the groups of the columns in order
+	# The sample of a group does not fit in the tip for both final plates, so every group is aspirated twice
+	aspirations = list(dict.fromkeys(well for command, well in multi_channel_wells(run_log) if command == "Aspirating"))
+	dispenses = [well for command, well in multi_channel_wells(run_log) if command == "Dispensing"]
+	assert aspirations == ["A1", "B1", "A2", "B3"]
+	if final_plate == "corning_384_wellplate_112ul_flat":
+		# Both final plates (1 per reactive) receive every group
+		assert dispenses == ["A1", "A1", "B1", "B1", "A2", "A2", "B2", "B2"]
+	else:
+		assert dispenses == ["A1", "A1", "A2", "A2", "A3", "A3", "A4", "A4"]
+
+@pytest.mark.parametrize("source_plate, number_samples, groups_source, groups_final", [
+	("corning_384_wellplate_112ul_flat", 40, ["A1", "B1", "A2", "B2", "A3", "B3"], ["A1", "B1", "A2", "B2", "A3", "B3"]),
+	("biorad_96_wellplate_200ul_pcr", 24, ["A1", "A2", "A3"], ["A1", "B1", "A2"])])
+def test_cell_media_384_final_plate_interleaved_groups (source_plate, number_samples, groups_source, groups_final, monkeypatch):
+	run_log = simulate_example("LAP-CellMediaInoculation-OT2-2.0.0",
+							   {"GeneralVariables":{"Name Source Plate":source_plate, "Name Final Plate":"corning_384_wellplate_112ul_flat", "Name Medias":"LB", "Volume of Media to Transfer (uL)":50},
+								"PerPlateVariables":{"Samples per plate":number_samples, "Media(s) per plate":"LB", "Number of Replicas":0}},
+							   monkeypatch)
+	
+	# Every group of 8 wells of the source plate is transferred with the 8-channel pipette to the next group of the 384-well final plate, the column or every other well of it
+	aspirations = [well for command, well in multi_channel_wells(run_log) if command == "Aspirating"]
+	dispenses = [well for command, well in multi_channel_wells(run_log) if command == "Dispensing"]
+	assert aspirations == groups_source
+	assert dispenses == groups_final
+	
+	# The media is only distributed to the wells of the final plate that receive a sample
+	wells_media = set()
+	for command in run_log:
+		well, height = well_command(command)
+		if command["payload"]["text"].startswith("Dispensing") and command["payload"]["instrument"].channels == 1 and "LB" in str(well):
+			wells_media.add(well.well_name)
+	wells_source = [well for column in range(1, 25) for well in (f"{chr(ord('A')+index_row)}{column}" for index_row in range(16 if "384" in source_plate else 8))][:number_samples]
+	assert len(wells_media) == number_samples
+	if "384" in source_plate:
+		assert wells_media == set(wells_source)
+
+@pytest.mark.parametrize("position_transfer", ["top", "bottom"])
+def test_cell_media_source_groups_mixed_once (position_transfer, monkeypatch):
+	run_log = simulate_example("LAP-CellMediaInoculation-OT2-2.0.0",
+							   {"GeneralVariables":{"Position Transfer Sample":position_transfer, "Mixing Volume Before Sample Transfer (uL)":10, "Number Times of Mixing Volume":2, "Flow Rate Mixing":1}},
+							   monkeypatch)
+	
+	# The example has 24 samples (3 columns) transferred to 6 final plates (2 medias and 2 replicas), every column is mixed once whatever the position of the dispense
+	mixed_wells = [command["payload"]["location"].well_name for command in run_log if command["payload"]["text"].startswith("Mixing")]
+	assert mixed_wells == ["A1", "A2", "A3"]
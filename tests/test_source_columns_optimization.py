@@ -0,0 +1,56 @@
+# Tests of the high optimization of the source columns of LAP-CustomReagentMixingMultiSinglePip-OT2-1.0.0 (MultiChannelSourcePlates.high_opti_column_choosing):
+# with small synthetic maps of BenchmarkSourceColumnsOptimization.py the source columns are compared with the minimum found trying all the sets of columns
+
+import copy
+import itertools
+import os
+import random
+import sys
+from collections import Counter
+import pytest
+
+pytest.importorskip("opentrons")
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "LAPEntries", "LAP-CustomReagentMixingMultiSinglePip-OT2-1.0.0"))
+
+import BenchmarkSourceColumnsOptimization
+from BenchmarkSourceColumnsOptimization import MultiChannelSourcePlates
+
+def sets_columns_final_column (rows):
+	"""
+	Function that will return all the different sets of source columns that can create a final column type given the reagents of each one of its rows
+	"""
+	if sum(rows[0].values()) == 0:
+		return [frozenset()]
+	sets_columns = set()
+	for column in itertools.product(*[[reagent for reagent, count in row.items() if count > 0] for row in rows]):
+		remaining = [Counter(row) for row in rows]
+		for index_row, reagent in enumerate(column):
+			remaining[index_row][reagent] -= 1
+		sets_columns.update(set_columns | {column} for set_columns in sets_columns_final_column(remaining))
+	return list(sets_columns)
+
+def minimum_columns (maps_plates):
+	"""
+	Function that will return the minimum number of source columns of the given maps trying every combination of the sets of columns of the final column types,
+	adding the final column types one by one and keeping only the different unions of columns
+	"""
+	columns_source = MultiChannelSourcePlates(maps_plates)
+	columns_source.initial_set()
+	unions_columns = {frozenset(values_column["Reagents"] for values_column in columns_source.sourceColumnsNeeded.values())}
+	for values_movement in columns_source.combinationsPerFinalColumns.values():
+		sets_columns = sets_columns_final_column([Counter(row) for row in values_movement["Reagents/Row"]])
+		unions_columns = set(union_columns | set_columns for union_columns, set_columns in itertools.product(unions_columns, sets_columns))
+	return min(len(union_columns) for union_columns in unions_columns)
+
+@pytest.mark.parametrize("reagents_well, reagents_pool, number_rows", [(2, 3, 3), (2, 4, 3), (3, 4, 2), (3, 5, 2)])
+@pytest.mark.parametrize("seed", range(4))
+def test_high_optimization_finds_minimum (reagents_well, reagents_pool, number_rows, seed):
+	scenario = {"Plates":2, "Reagents/Well":reagents_well, "Volumes":1, "Reagents Pool":reagents_pool, "Empty Wells":0, "Layout":"Random"}
+	maps_plates = BenchmarkSourceColumnsOptimization.synthetic_maps(scenario, random.Random(seed), number_rows = number_rows, number_columns = 3)
+
+	columns_source = MultiChannelSourcePlates(copy.deepcopy(maps_plates))
+	columns_source.initial_set()
+	columns_source.high_opti_column_choosing()
+
+	assert columns_source.minimumProven
+	assert columns_source.numberNeededColumnsSource == columns_source.lowerBoundColumnsSource == minimum_columns(copy.deepcopy(maps_plates))